@@ -0,0 +1,123 @@
+import os
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from PageBuildExecutor import SharedResults
+
+# pages dont les requêtes sont en cours en même temps; chaque page a déjà ses requêtes en parallèle
+# (PageBuilder.query_workers) et le scheduler applique la limite de taux à l'ensemble
+BATCH_PAGES_IN_FLIGHT = 4
+# entités par requête pour le lot (VALUES): une requête de nom ou de liens externes pour ce nombre de pages
+BATCH_VALUES_SIZE = 50
+# fin de file pour les étapes du pipeline
+_END = None
+
+
+class BatchPageGenerator:
+    """Génère les pages d'une liste de QID avec un PageBuilder, en pipeline.
+
+    Trois étapes tournent en même temps: les requêtes de plusieurs pages (pages_in_flight), le
+    remplissage du gabarit et le nettoyage des pages dont les réponses sont arrivées, et
+    l'écriture des fichiers. Les requêtes communes aux pages ne sont envoyées qu'une fois
+    (SharedResults): celles sans __QID__, et celles dont l'entité n'est que dans un VALUES
+    (nom de l'entité, liens externes), posées pour values_size pages à la fois. Sans
+    target_dir, les pages sont gardées dans self.pages. Une page en erreur est signalée et
+    n'arrête pas le lot.
+    """
+
+    def __init__(self, builder, target_dir=None, pages_in_flight=BATCH_PAGES_IN_FLIGHT, values_size=BATCH_VALUES_SIZE):
+        self.builder = builder
+        self.target_dir = target_dir
+        self.pages_in_flight = max(1, pages_in_flight)
+        self.values_size = max(1, values_size)
+        self.shared_results = SharedResults()
+        self.pages = {}
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def filename(self, qid):
+        return f"""{self.target_dir}/{qid}.wp"""
+
+    def generate(self, qids):
+        """Génère les pages des QID (doublons ignorés), rend les statistiques du lot"""
+        t0 = time.perf_counter()
+        self.stats = {"pages": 0, "skipped": 0, "errors": 0}
+        qids = list(dict.fromkeys(qids))
+        if self.target_dir:
+            # comme generatePage, on n'écrase pas une page existante: inutile de l'interroger
+            existing = [qid for qid in qids if os.path.exists(self.filename(qid))]
+            for qid in existing:
+                print("a file already exists for ", qid)
+            self.stats["skipped"] = len(existing)
+            qids = [qid for qid in qids if qid not in existing]
+
+        rendering = queue.Queue()
+        writing = queue.Queue()
+        stages = [threading.Thread(target=self.render_stage, args=(rendering, writing), daemon=True),
+                  threading.Thread(target=self.write_stage, args=(writing,), daemon=True)]
+        for stage in stages:
+            stage.start()
+        try:
+            # pages dans l'ordre du lot: les pages en cours partagent le plus souvent les mêmes requêtes pour le lot
+            chunks = [qids[k:k + self.values_size] for k in range(0, len(qids), self.values_size)]
+            with ThreadPoolExecutor(max_workers=self.pages_in_flight) as pool:
+                futures = {pool.submit(self.builder.build_page_values, qid, self.shared_results, chunk): qid
+                           for chunk in chunks for qid in chunk}
+                # les pages passent au remplissage dans l'ordre d'arrivée de leurs réponses
+                for future in as_completed(futures):
+                    qid = futures[future]
+                    try:
+                        rendering.put((qid, future.result()))
+                    except Exception as e:
+                        self.error(qid, e)
+        finally:
+            rendering.put(_END)
+            for stage in stages:
+                stage.join()
+
+        elapsed = time.perf_counter() - t0
+        self.stats.update({
+            "elapsed_s": round(elapsed, 2),
+            "pages_per_minute": round(self.stats["pages"] * 60 / elapsed, 1) if elapsed else 0.0,
+            "shared_queries": self.shared_results.stats["queries"],
+            "shared_hits": self.shared_results.stats["hits"],
+        })
+        return self.stats
+
+    def render_stage(self, rendering, writing):
+        while True:
+            item = rendering.get()
+            if item is _END:
+                writing.put(_END)
+                return
+            qid, values = item
+            try:
+                page = self.builder.compiled_template.render(values) if values is not None else self.builder.template
+                writing.put((qid, self.builder.nettoyageContenu(page)))
+            except Exception as e:
+                self.error(qid, e)
+
+    def write_stage(self, writing):
+        while True:
+            item = writing.get()
+            if item is _END:
+                return
+            qid, page = item
+            try:
+                if self.target_dir:
+                    with open(self.filename(qid), "x", encoding="utf-8") as fpage:
+                        fpage.write(page)
+                else:
+                    self.pages[qid] = page
+                with self.lock:
+                    self.stats["pages"] += 1
+            except Exception as e:  # file already exist or other error
+                self.error(qid, e)
+
+    def error(self, qid, e):
+        print(e)
+        print("error for ", qid)
+        with self.lock:
+            self.stats["errors"] += 1
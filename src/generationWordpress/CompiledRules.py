@@ -0,0 +1,60 @@
+import re
+
+
+def _trie_pattern(words):
+    # alternative factorisée par préfixes communs: à chaque position, le moteur ne suit qu'une branche
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # un mot se termine ici: la suite est facultative, la plus longue correspondance l'emporte
+        return "(?:" + pattern + ")?" if "" in node else pattern
+
+    return build(trie)
+
+
+class CompiledRules:
+    """Règles de remplacement de texte (cf. nettoyageRules.py) compilées en une seule expression.
+
+    apply() repère en une passe toutes les occurrences de tous les textes à remplacer, puis
+    reconstruit la page une fois, en sautant les remplacements des règles dont la condition
+    n'a pas été vue dans la page. Même résultat qu'une suite de replace tant que les textes
+    à remplacer ne se chevauchent pas.
+    """
+
+    def __init__(self, rules):
+        self.replacements = {}  # texte -> (remplacement, condition)
+        for rule in rules:
+            for old, new in rule["remplacements"]:
+                self.replacements.setdefault(old, (new, rule["condition"]))
+        # une condition qui n'est pas elle-même remplacée est repérée dans la même passe
+        for rule in rules:
+            if rule["condition"] and rule["condition"] not in self.replacements:
+                self.replacements[rule["condition"]] = (rule["condition"], None)
+        self.pattern = re.compile(_trie_pattern(self.replacements)) if self.replacements else None
+
+    def apply(self, page):
+        if self.pattern is None:
+            return page
+        matches = list(self.pattern.finditer(page))
+        if not matches:
+            return page
+        seen = {match.group() for match in matches}
+        parts, pos = [], 0
+        for match in matches:
+            new, condition = self.replacements[match.group()]
+            if condition is not None and condition not in seen:
+                continue
+            parts.append(page[pos:match.start()])
+            parts.append(new)
+            pos = match.end()
+        parts.append(page[pos:])
+        return "".join(parts)
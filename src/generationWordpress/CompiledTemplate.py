@@ -0,0 +1,33 @@
+import re
+
+
+class CompiledTemplate:
+    """Gabarit de page découpé une fois pour toutes autour de ses marqueurs (__XXX__).
+
+    render() produit la page en une passe à partir d'un dict {marqueur: valeur}, au lieu d'un
+    page.replace par marqueur qui recopie toute la page à chaque appel. Un marqueur sans
+    valeur reste tel quel dans la page, comme avec replace.
+    """
+
+    def __init__(self, text, placeholders):
+        self.text = text
+        # les plus longs d'abord: un marqueur préfixe d'un autre ne le coupe pas
+        self.placeholders = sorted({p for p in placeholders if p}, key=len, reverse=True)
+        self.parts = []
+        self.slots = []  # (position dans parts, marqueur)
+        pos = 0
+        if self.placeholders:
+            for match in re.finditer("|".join(map(re.escape, self.placeholders)), text):
+                self.parts.append(text[pos:match.start()])
+                self.slots.append((len(self.parts), match.group()))
+                self.parts.append(match.group())
+                pos = match.end()
+        self.parts.append(text[pos:])
+
+    def render(self, values):
+        parts = self.parts.copy()
+        for index, name in self.slots:
+            value = values.get(name)
+            if value is not None:
+                parts[index] = value
+        return "".join(parts)
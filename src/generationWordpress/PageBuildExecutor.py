@@ -0,0 +1,209 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from QueryFusion import (batch_plan, batch_values_query, fusion_plan, projected_vars, split_batch_result,
+                         split_fused_result)
+
+# requêtes d'une page soumises en même temps au scheduler: c'est lui qui applique la limite de taux,
+# ce nombre ne borne que les attentes de réponse ouvertes côté client
+PAGE_QUERY_WORKERS = 16
+
+
+def instantiate(sparql, qid, lang):
+    return sparql.replace("__QID__", qid).replace("__LANG__", lang)
+
+
+def plan_page_queries(data_config, qid, lang, fused=False, batch_qids=None):
+    # une étape par entrée de la configuration, dans l'ordre, avec sa requête instanciée (None si pas de requête)
+    # shared: requête sans __QID__, la même pour toutes les pages d'un lot (libellés...)
+    # fused: les requêtes qui partagent le motif de base de l'entité sont servies par une requête fusionnée
+    # batch: avec batch_qids (pages du lot dont fait partie qid), les requêtes dont l'entité n'est que
+    # dans un VALUES (nom, liens externes) sont servies par une requête pour toutes ces entités
+    plan = []
+    for name, elmt in data_config.items():
+        sparql = instantiate(elmt["sparql"], qid, lang) if elmt["sparql"] else None
+        shared = bool(sparql) and "__QID__" not in elmt["sparql"]
+        plan.append({"name": name, "elmt": elmt, "sparql": sparql, "fused": None, "shared": shared})
+    if fused:
+        steps = {step["name"]: step for step in plan}
+        for group in fusion_plan(data_config):
+            fused_query = {"sparql": instantiate(group["sparql"], qid, lang), "parts": group["parts"],
+                           "order": group["order"]}
+            for name in group["parts"]:
+                steps[name]["fused"] = fused_query
+    if batch_qids:
+        for step in plan:
+            var = batch_plan(data_config).get(step["name"])
+            if var and not step["fused"]:
+                sparql = step["elmt"]["sparql"]
+                step["batch"] = {"sparql": instantiate(batch_values_query(sparql, var, batch_qids), qid, lang),
+                                 "var": var, "vars": projected_vars(sparql), "qid": qid}
+    return plan
+
+
+class SharedResults:
+    """Réponses des requêtes communes aux pages d'un lot, chaque requête envoyée une fois.
+
+    La première page qui a besoin d'une requête l'envoie, les suivantes attendent la même
+    réponse; une requête en échec est oubliée pour que les pages suivantes la renvoient.
+    Dans les templates peintre et genre, ce sont les requêtes pour le lot du nom de l'entité
+    et des liens externes (plan_page_queries, batch_qids).
+    """
+
+    def __init__(self):
+        self.futures = {}
+        self.lock = threading.Lock()
+        self.stats = {"queries": 0, "hits": 0}
+
+    def get(self, query, submit):
+        # (future de la réponse, True si la requête vient d'être envoyée par submit)
+        with self.lock:
+            future = self.futures.get(query)
+            if future is not None:
+                self.stats["hits"] += 1
+                return future, False
+            future = self.futures[query] = submit(query)
+            self.stats["queries"] += 1
+        future.add_done_callback(lambda done: self.forget(query, done))
+        return future, True
+
+    def forget(self, query, future):
+        if future.cancelled() or future.exception() is not None:
+            with self.lock:
+                if self.futures.get(query) is future:
+                    del self.futures[query]
+
+
+class PageBuildExecutor:
+    """Exécute les requêtes SPARQL d'une page en parallèle.
+
+    Les requêtes d'une page sont indépendantes (seuls __QID__ et __LANG__ y sont substitués):
+    elles partent toutes dès le début et le scheduler les espace selon sa limite de taux.
+    results() rend les étapes dans l'ordre du plan, chacune dès que sa réponse et celles des
+    étapes précédentes sont arrivées: la page se construit pendant que les requêtes suivantes
+    sont encore en attente, avec les substitutions faites dans le même ordre qu'en séquentiel.
+
+    Une requête n'est envoyée qu'une fois par page, qu'elle soit partagée par plusieurs
+    étapes ou fusionnée; si une requête fusionnée échoue, ses étapes reprennent leurs
+    requêtes propres. Avec shared_results, les requêtes communes aux pages d'un lot (sans
+    __QID__, ou pour toutes les entités du lot) ne sont envoyées qu'une fois pour tout le lot;
+    si une requête pour le lot échoue, la page reprend sa requête propre.
+
+    Si l'accès sait envoyer un lot de requêtes (sparqlQueryBatch, /api/batch), les requêtes
+    propres de la page partent en un seul appel et chacune est rendue dès sa ligne du flux.
+    """
+
+    def __init__(self, w_obj, max_workers=PAGE_QUERY_WORKERS, shared_results=None):
+        self.w_obj = w_obj
+        self.max_workers = max(1, max_workers)
+        self.shared_results = shared_results
+        self.stats = {"queries": 0, "fused_queries": 0, "fused_failures": 0, "shared_hits": 0, "batch_failures": 0,
+                      "api_batch_calls": 0}
+
+    def query_of(self, step):
+        if step.get("fused"):
+            return step["fused"]["sparql"]
+        if step.get("batch") and self.shared_results is not None:
+            return step["batch"]["sparql"]
+        return step["sparql"]
+
+    def results(self, plan):
+        queries = list(dict.fromkeys(self.query_of(step) for step in plan if self.query_of(step)))
+        if not queries:
+            for step in plan:
+                yield step, None
+            return
+        shared = set()
+        if self.shared_results is not None:
+            shared = {step["sparql"] for step in plan if step.get("shared") and not step.get("fused")}
+            shared |= {step["batch"]["sparql"] for step in plan if step.get("batch")}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(queries))) as pool:
+            futures = {}
+
+            def submit(query):
+                if query not in futures:
+                    if query in shared:
+                        futures[query], sent = self.shared_results.get(query, lambda q: pool.submit(self.w_obj.sparqlQuery, q))
+                        self.stats["queries" if sent else "shared_hits"] += 1
+                    else:
+                        futures[query] = pool.submit(self.w_obj.sparqlQuery, query)
+                        self.stats["queries"] += 1
+                return futures[query]
+
+            own = [query for query in queries if query not in shared]
+            if len(own) > 1 and hasattr(self.w_obj, "sparqlQueryBatch"):
+                self.send_batch(pool, own, futures)
+            for query in queries:
+                submit(query)
+            self.stats["fused_queries"] += len({step["fused"]["sparql"] for step in plan if step.get("fused")})
+
+            splits = {}
+            try:
+                for step in plan:
+                    query = self.query_of(step)
+                    if not query:
+                        yield step, None
+                        continue
+                    if step.get("batch") and query == step["batch"]["sparql"]:
+                        yield step, self.batch_result(step, futures[query], submit)
+                        continue
+                    # une erreur de requête remonte comme dans la boucle séquentielle
+                    res = futures[query].result()
+                    if step.get("fused"):
+                        if query not in splits:
+                            splits[query] = split_fused_result(res, step["fused"]["parts"], step["fused"]["order"])
+                            if splits[query] is None:
+                                # requête fusionnée en échec: les requêtes propres du groupe partent ensemble
+                                self.stats["fused_failures"] += 1
+                                for other in plan:
+                                    if other.get("fused") is step["fused"]:
+                                        submit(other["sparql"])
+                        res = splits[query][step["name"]] if splits[query] else futures[step["sparql"]].result()
+                    yield step, res
+            finally:
+                # une requête commune peut être attendue par d'autres pages du lot: elle va à son terme
+                for query, future in futures.items():
+                    if query not in shared:
+                        future.cancel()
+
+    def send_batch(self, pool, queries, futures):
+        # un appel pour toutes les requêtes: une future par requête, résolue à l'arrivée de sa réponse
+        pending = [Future() for _ in queries]
+        futures.update(zip(queries, pending))
+        self.stats["queries"] += len(queries)
+        self.stats["api_batch_calls"] += 1
+
+        def resolve(index, response=None, error=None):
+            # rien si la page a annulé la requête ou si sa réponse est déjà arrivée
+            future = pending[index]
+            if future.done() or not future.set_running_or_notify_cancel():
+                return
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(response)
+
+        def send():
+            try:
+                responses = self.w_obj.sparqlQueryBatch(queries, on_result=resolve)
+            except Exception as e:
+                # erreur d'appel: chaque étape la reçoit comme l'erreur de sa requête
+                for index in range(len(queries)):
+                    resolve(index, error=e)
+                return
+            for index, response in enumerate(responses):
+                resolve(index, response)
+
+        pool.submit(send)
+
+    def batch_result(self, step, future, submit):
+        # lignes de l'entité de la page dans la réponse pour le lot; en cas d'échec, requête propre de la page
+        batch = step["batch"]
+        try:
+            res = split_batch_result(future.result(), batch["var"], batch["vars"], batch["qid"])
+        except Exception:
+            res = None
+        if res is None:
+            self.stats["batch_failures"] += 1
+            res = submit(step["sparql"]).result()
+        return res
@@ -1,5 +1,7 @@
 # import datetime
-import time
+from CompiledRules import CompiledRules
+from nettoyageRules import nettoyageRules
+from PageBuildExecutor import PageBuildExecutor, plan_page_queries, PAGE_QUERY_WORKERS
 from WPGenreTemplate import WPGenreTemplate as WPGenreTemplate
 from WPPainterTemplate import WPPainterTemplate as WPPainterTemplate
 from tools.WikimediaManager.WikimediaManagerPackage.WikimediaAccess import WikimediaAccess
@@ -7,20 +9,28 @@ from tools.WikimediaManager.WikimediaManagerPackage.WikimediaAccess import Wikim
 # il parait souhaitable d'homogénéiser ici le code pour les différentes langues et les différents thèmes
 # dans le cas des créateurs, on a relativement peu d'instances d'œuvres et pas rencontré de timeout
 class PageBuilder:
-    def __init__(self, o_type, lang="fr"):
+    nettoyage = CompiledRules(nettoyageRules)
+
+    def __init__(self, o_type, lang="fr", query_workers=PAGE_QUERY_WORKERS, fused_queries=False):
         self.objectType = o_type
         self.lang = lang
+        # nombre de requêtes SPARQL d'une page en attente simultanément (1: une à la fois)
+        self.query_workers = query_workers
+        # requêtes partageant le motif de base de l'entité envoyées en une requête fusionnée (cf. QueryFusion)
+        self.fused_queries = fused_queries
         self.template_builder = None
         if self.objectType:
             templates = {
                 "Q1028181": WPPainterTemplate(lang),  # template pour page de peintre
-                "Q1792379": WPGenreTemplate,  # template pour page de genre
+                "Q1792379": WPGenreTemplate(lang),  # template pour page de genre
             }
             self.template_builder = templates.get(self.objectType, None)
             if self.template_builder:
                 self.template_manager = self.template_builder
             if self.template_manager:
-                self.template = self.template_manager.buildPageTemplate()
+                # gabarit découpé une seule fois par template et langue, rempli en une passe
+                self.compiled_template = self.template_manager.buildCompiledTemplate()
+                self.template = self.compiled_template.text
         pass
 
     def check_object_type(self, w_obj):
@@ -34,43 +44,51 @@ class PageBuilder:
 
     # fonction destinée à généraliser et remplacer la fonction ci-dessous buildScrutartArtistPage
     def build_scrutart_page(self, qid):
-        page = None
+        values = self.build_page_values(qid)
+        return self.compiled_template.render(values) if values is not None else self.template
+
+    def build_page_values(self, qid, shared_results=None, batch_qids=None):
+        # valeurs des marqueurs de la page (None sans template); shared_results: réponses communes à un lot de pages,
+        # batch_qids: entités du lot servies avec qid par une même requête (nom, liens externes)
+        values = None
         wAccess = WikimediaAccess(qid, lang=self.lang)
         with  wAccess as w_obj:
             check = self.check_object_type(w_obj)
-            page = self.template
-            if page:
-                # liste de requêtes sparql utiles pour construire une page
-                sparql_list = self.template_manager.getDataConfig()
-                for name, elmt in sparql_list.items():
-                    print(name, elmt)
-                    filtres = elmt["filtres"]
-                    urlqueryref = elmt["urlquery"]
-                    # recuperation d'une query pour avoir les données du QID liées à l'item 'name'
-                    crtquery = elmt["sparql"].replace("__QID__", qid).replace("__LANG__", self.lang) if elmt["sparql"] else None
-                    if crtquery:
-                        res = w_obj.sparqlQuery(crtquery)
-                        # print(crtquery, datetime.datetime.now())
-                        # recuperation d'un lien vers WDQS pour la query courante
-                        wdqsquery = w_obj.get_wdqs_query(crtquery)
-                        # recuperation d'un lien d'affichage de bargraph pour la query courante
-                        embedquery = w_obj.get_wikidata_bar_graph(crtquery, qid)
-                    else:
-                        res = None
-                        wdqsquery = None
-                        embedquery = None
-                    for filtrage in filtres:
-                        if filtrage["filtre"]:
-                            fct = w_obj.get_wkd_fct(filtrage["filtre"])
-                            if fct:
-                                output = fct(w_obj, res, qid)
-                                page = page.replace(filtrage["key"], str(output))
-                        else:
-                            page = page.replace(filtrage["key"], embedquery)  # hack
-                    if wdqsquery and urlqueryref:
-                        page = page.replace(urlqueryref, wdqsquery)
-                    time.sleep(0.2)
-        return page
+            if self.template:
+                # liste de requêtes sparql utiles pour construire une page, toutes soumises d'emblée
+                plan = plan_page_queries(self.template_manager.getDataConfig(), qid, self.lang, fused=self.fused_queries,
+                                         batch_qids=batch_qids if shared_results is not None else None)
+                executor = PageBuildExecutor(w_obj, max_workers=self.query_workers, shared_results=shared_results)
+                self.query_stats = executor.stats
+                values = {}
+                for step, res in executor.results(plan):
+                    self.fill_step(values, w_obj, step, res, qid)
+        return values
+
+    def fill_step(self, values, w_obj, step, res, qid):
+        # valeurs des marqueurs de l'étape; comme avec replace, la première valeur d'un marqueur l'emporte
+        name, elmt, crtquery = step["name"], step["elmt"], step["sparql"]
+        print(name, elmt)
+        filtres = elmt["filtres"]
+        urlqueryref = elmt["urlquery"]
+        if crtquery:
+            # recuperation d'un lien vers WDQS pour la query courante
+            wdqsquery = w_obj.get_wdqs_query(crtquery)
+            # recuperation d'un lien d'affichage de bargraph pour la query courante
+            embedquery = w_obj.get_wikidata_bar_graph(crtquery, qid)
+        else:
+            wdqsquery = None
+            embedquery = None
+        for filtrage in filtres:
+            if filtrage["filtre"]:
+                fct = w_obj.get_wkd_fct(filtrage["filtre"])
+                if fct:
+                    output = fct(w_obj, res, qid)
+                    values.setdefault(filtrage["key"], str(output))
+            elif embedquery:
+                values.setdefault(filtrage["key"], embedquery)  # hack
+        if wdqsquery and urlqueryref:
+            values.setdefault(urlqueryref, wdqsquery)
 
     def generatePage(self, qid, targetDir):
         # en faire un log print(p["entity"], " ", p["entityLabel"])
@@ -90,41 +108,5 @@ class PageBuilder:
         pass
 
     def nettoyageContenu(self, page):
-        if "<p><strong>0 pages</strong> d'un <strong>Wikipedia</strong> dans au moins une langue sont associées à ces œuvres.</p>" in page:
-            page = page.replace(
-                "<p><strong>0 pages</strong> d'un <strong>Wikipedia</strong> dans au moins une langue sont associées à ces œuvres.</p>",
-                "<p>Je n'ai trouvé aucune page dans Wikipedia associée à ces œuvres</p>")
-            page = page.replace("<p>Dont 0 dans le Wikipedia anglophone et 0 dans le Wikidata francophone.</p>",
-                         "<p>Et bien sûr, il n'y a de page pour ces œuvres ni dans le Wikipedia francophone, ni dans l'anglophone</p>")
-            page = page.replace("<p>L'ensemble des <strong>pages</strong> concerne <strong>0 œuvres</strong>.</p>",
-                         "<p>Et aussi, aucune de ces œuvres n'est concernée par une page de Wikipedia.</p>")
-        if "<p>Il y a <strong>0 images</strong> dans Wikimedia Commons associées à ces œuvres.</p>" in page:
-            page = page.replace("<p>Il y a <strong>0 images</strong> dans Wikimedia Commons associées à ces œuvres.</p>",
-                         "<p>Il n'a aucune image dans Wikimedia Commons associée à ces œuvres.</p>")
-            pass
-        if "On peut voir une sélection de ces œuvres dans . (vous avez plus de possibilités de réglages sur la galerie si vous vous inscrivez comme utilisateur)." in page:
-            page = page.replace("On peut voir une sélection de ces œuvres dans . (vous avez plus de possibilités de réglages sur la galerie si vous vous inscrivez comme utilisateur).", "")
-        # gestion de pluriels spécifiques
-        page = page.replace("série de peinturess", "séries de peintures")
-        page = page.replace("œuvre d'arts", "œuvres d'art")
-        page = page.replace("pièce de monnaies", "pièces de monnaie")
-        page = page.replace("rouleau suspendus", "rouleaux suspendus")
-        page = page.replace("photo-carte de visites", "photo-cartes de visite")
-        page = page.replace("film négatifs", "films négatifs")
-        page = page.replace("série de peinturess", "séries de peintures")
-        page = page.replace("eau-fortes", "eaux-fortes")
-        page = page.replace("carte postales", "cartes postales")
-        page = page.replace("œuvre inachevées", "œuvres inachevées")
-        page = page.replace("plaque commémoratives", "plaques commémoratives")
-        page = page.replace("élément d’une collection ou d’une expositions", "éléments d’une collection ou d’une exposition")
-        page = page.replace("carreaus", "carreaux")
-        page = page.replace("peinture sur panneaus", "peintures sur panneau")
-        page = page.replace("estampe à la manière noires", "estampes à la manière noire")
-        page = page.replace("peinture murales", "peintures murales")
-        page = page.replace("groupe de peinturess", "groupes de peintures")
-        page = page.replace("aureuss", "aurei")
-        page = page.replace("artefact archéologiques", "artefacts archéologiques")
-        page = page.replace("impression photomécaniques", "impressions photomécaniques")
-        page = page.replace("œuvre avec de multiples exécutionss", "œuvres avec de multiples exécutions")
-        return page
-
+        # corrections de nettoyageRules.py appliquées en une passe sur la page
+        return PageBuilder.nettoyage.apply(page)
@@ -0,0 +1,215 @@
+import re
+
+# motif de base des requêtes d'une page: les œuvres de l'entité (?s wdt:P170 wd:__QID__ pour un créateur,
+# wdt:P136 pour un genre...), suivi de ';' (même sujet), '.' ou de la fin du groupe
+SHARED_PATTERN = re.compile(r"(\?\w+)\s+(wdt:P\d+)\s+wd:__QID__\s*([;.]?)")
+# nombre minimal de requêtes partageant le motif pour qu'une fusion vaille la peine
+FUSION_MIN_QUERIES = 2
+# variable qui indique, dans la réponse fusionnée, la requête d'origine de chaque ligne
+PART_VAR = "part"
+SHARED_NAME = "%oeuvres"
+# entité de la page donnée par un VALUES (libellé, liens externes...): VALUES ?qid { <.../__QID__> }
+ENTITY_VALUES = re.compile(r"\bvalues\s+(\?\w+)\s*\{\s*(?:<http://www\.wikidata\.org/entity/__QID__>|wd:__QID__)\s*\}",
+                           re.IGNORECASE)
+ENTITY_URI = "http://www.wikidata.org/entity/"
+# ce qui mêlerait les lignes de plusieurs entités dans une requête pour un lot
+MIXES_ENTITIES = re.compile(r"\b(group\s+by|having|limit|offset|count|sum|avg|min|max|sample|group_concat)\b",
+                            re.IGNORECASE)
+
+COMMENT = re.compile(r"(^|\s)#[^\n]*")
+# ORDER BY de la requête (après son groupe WHERE) et ses clés: ?x, (?x), ASC(?x), DESC(?x)
+ORDER_BY = re.compile(r"\border\s+by\b(.*?)(?:\blimit\b|\boffset\b|$)", re.IGNORECASE | re.DOTALL)
+ORDER_KEY = re.compile(r"\s*(?:(asc|desc)\s*)?(?:\(\s*\?(\w+)\s*\)|\?(\w+))", re.IGNORECASE)
+NUMERIC_TYPES = {"integer", "decimal", "double", "float", "int", "long", "short", "byte", "nonNegativeInteger",
+                 "positiveInteger", "negativeInteger", "nonPositiveInteger", "unsignedInt", "unsignedLong"}
+
+
+def strip_comments(sparql):
+    # un # précédé d'un blanc commence un commentaire (pas ceux des IRI comme ...XMLSchema#integer)
+    return COMMENT.sub(r"\1", sparql)
+
+
+def shared_pattern(sparql):
+    """(variable, propriété) du motif de base si la requête l'utilise, toujours le même, et
+    peut être placée dans une sous-requête (pas de PREFIX/BASE); None sinon"""
+    text = strip_comments(sparql)
+    if re.match(r"\s*(PREFIX|BASE)\b", text, re.IGNORECASE):
+        return None
+    found = {(var, prop) for var, prop, _ in SHARED_PATTERN.findall(text)}
+    return found.pop() if len(found) == 1 else None
+
+
+def projected_vars(sparql):
+    """Variables projetées par le SELECT de la requête, dans l'ordre"""
+    text = strip_comments(sparql)
+    start = re.search(r"\bselect\b", text, re.IGNORECASE)
+    if not start:
+        return []
+    names, depth, alias, after_as = [], 0, None, False
+    for token in re.finditer(r"\(|\)|\{|\bwhere\b|\?\w+|\bas\b", text[start.end():], re.IGNORECASE):
+        value = token.group()
+        if depth == 0 and (value == "{" or value.lower() == "where"):
+            break
+        if value == "(":
+            depth += 1
+        elif value == ")":
+            depth -= 1
+            if depth == 0 and alias:
+                names.append(alias)
+                alias = None
+        elif value.lower() == "as":
+            after_as = True
+        elif depth == 0:
+            names.append(value[1:])
+        else:
+            # (expression AS ?x): seule ?x est projetée
+            if after_as:
+                alias = value[1:]
+            after_as = False
+    return names
+
+
+def order_keys(sparql):
+    """Clés de l'ORDER BY de la requête, [(variable, décroissant)] ([] sans ORDER BY); None si
+    l'ordre porte sur autre chose que des variables et ne peut être rétabli après fusion"""
+    text = strip_comments(sparql)
+    found = ORDER_BY.search(text[text.rfind("}") + 1:])
+    if not found:
+        return []
+    keys, clause, pos = [], found.group(1).rstrip(), 0
+    while pos < len(clause):
+        key = ORDER_KEY.match(clause, pos)
+        if not key:
+            return None
+        keys.append((key.group(2) or key.group(3), (key.group(1) or "").lower() == "desc"))
+        pos = key.end()
+        while pos < len(clause) and clause[pos].isspace():
+            pos += 1
+    return keys
+
+
+def _sort_value(binding, var):
+    # ordre SPARQL simplifié: non lié, puis nombres, puis les autres valeurs comme chaînes
+    term = binding.get(var)
+    if term is None:
+        return (0, 0)
+    if term.get("datatype", "").rpartition("#")[2] in NUMERIC_TYPES:
+        try:
+            return (1, float(term["value"]))
+        except ValueError:
+            pass
+    return (2, term.get("value", ""))
+
+
+def _include_shared(sparql):
+    # le motif de base est remplacé par la lecture du résultat matérialisé
+    def include(match):
+        var, _, end = match.groups()
+        return {";": f"INCLUDE {SHARED_NAME} . {var} ", ".": f"INCLUDE {SHARED_NAME} ."}.get(end, f"INCLUDE {SHARED_NAME} ")
+    return SHARED_PATTERN.sub(include, sparql)
+
+
+def fuse_queries(queries, var, prop):
+    """Une requête pour plusieurs requêtes {nom: sparql} du même motif de base.
+
+    Le motif n'est évalué qu'une fois, dans une sous-requête nommée (WITH ... AS %oeuvres,
+    extension Blazegraph de WDQS) que chaque requête lit par INCLUDE; les requêtes deviennent
+    les branches d'une UNION, chaque ligne portant le nom de sa requête dans ?part. L'ordre
+    des lignes d'une branche n'est pas garanti: split_fused_result rétablit les ORDER BY.
+    """
+    branches = [f"""{{ {{ {_include_shared(sparql).strip()}
+ }} BIND("{name}" AS ?{PART_VAR}) }}""" for name, sparql in queries.items()]
+    return (f"SELECT * WITH {{ SELECT {var} WHERE {{ {var} {prop} wd:__QID__ }} }} AS {SHARED_NAME}\n"
+            "WHERE {\n" + "\nUNION\n".join(branches) + "\n}")
+
+
+_fusion_plans = {}
+
+
+def fusion_plan(data_config):
+    """Groupes de requêtes fusionnables d'une configuration: [{"sparql": requête fusionnée,
+    "parts": {nom: variables projetées}, "order": {nom: clés de l'ORDER BY}}], calculés une
+    fois par configuration"""
+    cached = _fusion_plans.get(id(data_config))
+    if cached is not None and cached[0] is data_config:
+        return cached[1]
+    groups = {}
+    for name, elmt in data_config.items():
+        pattern = shared_pattern(elmt["sparql"]) if elmt["sparql"] else None
+        if pattern and order_keys(elmt["sparql"]) is not None:
+            groups.setdefault(pattern, {})[name] = elmt["sparql"]
+    plan = [{"sparql": fuse_queries(queries, *pattern),
+             "parts": {name: projected_vars(sparql) for name, sparql in queries.items()},
+             "order": {name: order_keys(sparql) for name, sparql in queries.items()}}
+            for pattern, queries in groups.items() if len(queries) >= FUSION_MIN_QUERIES]
+    _fusion_plans[id(data_config)] = (data_config, plan)
+    return plan
+
+
+def split_fused_result(res, parts, order=None):
+    """Réponse SPARQL JSON de chaque requête d'origine, {nom: réponse}, ses lignes triées selon
+    son ORDER BY (order: {nom: clés}); None si la réponse fusionnée n'est pas un résultat
+    (erreur, délai dépassé...)"""
+    if not isinstance(res, dict) or not isinstance(res.get("results"), dict):
+        return None
+    rows = {name: [] for name in parts}
+    for binding in res["results"].get("bindings", []):
+        part = binding.get(PART_VAR, {}).get("value")
+        if part in rows:
+            rows[part].append({key: value for key, value in binding.items() if key != PART_VAR})
+    for name, keys in (order or {}).items():
+        # tris stables successifs, de la dernière clé à la première
+        for var, descending in reversed(keys or []):
+            rows.get(name, []).sort(key=lambda binding: _sort_value(binding, var), reverse=descending)
+    return {name: {"head": {"vars": parts[name]}, "results": {"bindings": rows[name]}} for name in parts}
+
+
+# Requêtes pour un lot de pages: la même requête sert plusieurs entités quand l'entité n'y
+# apparaît que dans un VALUES; chaque page en reprend ses lignes
+
+def entity_values(sparql):
+    """Variable du VALUES qui porte seule l'entité de la page, si la requête peut servir un lot
+    de pages (pas d'agrégat, de LIMIT ni d'OFFSET qui mêleraient les entités); None sinon"""
+    text = strip_comments(sparql)
+    found = ENTITY_VALUES.findall(text)
+    if len(found) != 1 or text.count("__QID__") != 1 or MIXES_ENTITIES.search(text):
+        return None
+    return found[0]
+
+
+_batch_plans = {}
+
+
+def batch_plan(data_config):
+    """{nom: variable de l'entité} des requêtes d'une configuration qui peuvent servir un lot
+    de pages, calculé une fois par configuration"""
+    cached = _batch_plans.get(id(data_config))
+    if cached is not None and cached[0] is data_config:
+        return cached[1]
+    plan = {name: entity_values(elmt["sparql"]) for name, elmt in data_config.items() if elmt["sparql"]}
+    plan = {name: var for name, var in plan.items() if var}
+    _batch_plans[id(data_config)] = (data_config, plan)
+    return plan
+
+
+def batch_values_query(sparql, var, qids):
+    """La requête pour toutes les entités qids: VALUES élargi, variable de l'entité projetée"""
+    values = " ".join(f"<{ENTITY_URI}{qid}>" for qid in dict.fromkeys(qids))
+    query = ENTITY_VALUES.sub(lambda match: f"VALUES {var} {{ {values} }}", sparql, count=1)
+    if var[1:] not in projected_vars(query) and not re.search(r"\bselect\s+(distinct\s+|reduced\s+)?\*", query,
+                                                              re.IGNORECASE):
+        query = re.sub(r"\bselect(\s+distinct|\s+reduced)?", lambda match: f"{match.group()} {var}", query, count=1,
+                       flags=re.IGNORECASE)
+    return query
+
+
+def split_batch_result(res, var, projected, qid):
+    """Réponse SPARQL JSON de la requête d'origine pour l'entité qid (projected: ses variables
+    projetées); None si la réponse du lot n'est pas un résultat (erreur, délai dépassé...)"""
+    if not isinstance(res, dict) or not isinstance(res.get("results"), dict):
+        return None
+    name, uri = var[1:], ENTITY_URI + qid
+    keep = name in projected or not projected
+    rows = [binding if keep else {key: value for key, value in binding.items() if key != name}
+            for binding in res["results"].get("bindings", []) if binding.get(name, {}).get("value") == uri]
+    return {"head": {"vars": projected or res.get("head", {}).get("vars", [])}, "results": {"bindings": rows}}
@@ -1,3 +1,6 @@
+from CompiledTemplate import CompiledTemplate
+
+
 class WPTemplate():
     dataConfig = {
         "__DATE__": {"sparql": None,
@@ -35,6 +38,9 @@ class WPTemplate():
             "urlquery": None},
     }
 
+    # gabarits compilés, un par classe de template, langue et version
+    compiledTemplates = {}
+
     def __init__(self, lang="fr"):
         self.lang = lang
         self.version = "1.5"
@@ -43,6 +49,23 @@ class WPTemplate():
     def getDataConfig(self):
         return self.dataConfig
 
+    def getPlaceholders(self):
+        # marqueurs remplis par les filtres et liens WDQS de la configuration
+        placeholders = []
+        for elmt in self.getDataConfig().values():
+            placeholders += [filtrage["key"] for filtrage in elmt["filtres"]]
+            if elmt["urlquery"]:
+                placeholders.append(elmt["urlquery"])
+        return placeholders
+
+    def buildCompiledTemplate(self):
+        key = (type(self).__name__, self.lang, self.version)
+        compiled = WPTemplate.compiledTemplates.get(key)
+        if compiled is None:
+            compiled = CompiledTemplate(self.buildPageTemplate(), self.getPlaceholders())
+            WPTemplate.compiledTemplates[key] = compiled
+        return compiled
+
     def wpWrapPara(self, str):
         return """
         <!-- wp:paragraph -->
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Débit de génération (pages/minute) d'une liste de QID contre un WDQS bidon local, via un
+APIRequestScheduler en mémoire:
+
+- loop: boucle des scripts generation*AnalysesWikidata.py, une page après l'autre, requêtes
+  de la page une à une et --sleep-s d'attente entre deux pages;
+- loop_parallel: même boucle, requêtes de chaque page en parallèle, sans attente;
+- batch: BatchPageGenerator, plusieurs pages en cours, remplissage et écriture en pipeline,
+  requêtes communes au lot envoyées une fois.
+
+Par défaut, le template genre tel quel: seules ses requêtes VALUES ?qid { wd:__QID__ } (nom de
+l'entité, liens externes) servent tout le lot, une requête par tranche de QID. --shared-queries N
+lui ajoute N requêtes de libellé sans __QID__, les mêmes pour toutes les pages.
+
+Usage: python benchmarks/bench_batch_generation.py [--pages 12] [--latency-ms 300] [--rate 10]
+"""
+
+import io
+import json
+import time
+import types
+import argparse
+import tempfile
+import contextlib
+
+from page_bench_support import (SchedulerAccess, install_access, start_mock_wdqs, start_scheduler,
+                                reset_wdqs_stats, wdqs_stats)
+
+LABEL_QUERY = "SELECT ?l WHERE {{ wd:Q{k} rdfs:label ?l FILTER(lang(?l) = '__LANG__') }}"
+
+
+def make_builder(PageBuilder, shared_queries, **kwargs):
+    builder = PageBuilder.PageBuilder("Q1792379", **kwargs)
+    config = dict(builder.template_manager.getDataConfig())
+    for k in range(shared_queries):
+        config[f"__LABEL{k}__"] = {"sparql": LABEL_QUERY.format(k=k + 1),
+                                   "filtres": [{"filtre": "get_label", "key": f"__LABEL{k}__"}], "urlquery": None}
+    builder.template_manager = types.SimpleNamespace(getDataConfig=lambda: config)
+    return builder
+
+
+def run_loop(builder, qids, target, sleep_s):
+    for qid in qids:
+        with open(f"{target}/{qid}.wp", "x", encoding="utf-8") as fpage:
+            fpage.write(builder.nettoyageContenu(builder.build_scrutart_page(qid)))
+        time.sleep(sleep_s)
+
+
+def measure(name, generate, qids):
+    target = tempfile.mkdtemp(prefix=f"bench_batch_{name}_")
+    reset_wdqs_stats()
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        extra = generate(target) or {}
+    elapsed = time.perf_counter() - t0
+    pages = {}
+    for qid in qids:
+        with open(f"{target}/{qid}.wp", encoding="utf-8") as f:
+            pages[qid] = f.read()
+    result = {
+        "variant": name,
+        "pages_per_minute": round(len(qids) * 60 / elapsed, 1),
+        "elapsed_s": round(elapsed, 2),
+        "upstream_queries": wdqs_stats()["calls"],
+    }
+    result.update({key: extra[key] for key in ("shared_queries", "shared_hits") if key in extra})
+    return pages, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=12, help="QID du lot")
+    parser.add_argument("--latency-ms", type=float, default=300, help="temps de service de chaque requête")
+    parser.add_argument("--rate", type=float, default=10, help="limite de taux du scheduler (requêtes/s)")
+    parser.add_argument("--sleep-s", type=float, default=3, help="attente entre deux pages de la boucle d'origine")
+    parser.add_argument("--pages-in-flight", type=int, default=4, help="pages en cours en même temps (batch)")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="requêtes HTTP simultanées du scheduler (défaut: MAX_IN_FLIGHT_REQUESTS)")
+    parser.add_argument("--shared-queries", type=int, default=0, help="requêtes sans __QID__ ajoutées au template")
+    args = parser.parse_args()
+
+    server, endpoint = start_mock_wdqs(args.latency_ms)
+    SchedulerAccess.endpoint = endpoint
+    SchedulerAccess.scheduler = start_scheduler(endpoint, args.rate)
+    if args.max_in_flight:
+        SchedulerAccess.scheduler.set_max_in_flight(args.max_in_flight)
+    install_access(SchedulerAccess)
+    import PageBuilder
+    from BatchPageGenerator import BatchPageGenerator
+
+    qids = [f"Q{3000 + k}" for k in range(args.pages)]
+    variants = {
+        "loop": lambda target: run_loop(make_builder(PageBuilder, args.shared_queries, query_workers=1),
+                                        qids, target, args.sleep_s),
+        "loop_parallel": lambda target: run_loop(make_builder(PageBuilder, args.shared_queries), qids, target, 0),
+        "batch": lambda target: BatchPageGenerator(make_builder(PageBuilder, args.shared_queries), target,
+                                                   pages_in_flight=args.pages_in_flight).generate(qids),
+    }
+    results, pages = [], {}
+    for name, generate in variants.items():
+        pages[name], result = measure(name, generate, qids)
+        results.append(result)
+    print(json.dumps({
+        "latency_ms": args.latency_ms, "rate": args.rate, "pages": args.pages, "sleep_s": args.sleep_s,
+        "pages_in_flight": args.pages_in_flight, "max_in_flight": SchedulerAccess.scheduler.max_in_flight,
+        "shared_queries": args.shared_queries,
+        "identical": all(pages[name] == pages["loop"] for name in pages),
+        "speedup_vs_loop": round(results[-1]["pages_per_minute"] / results[0]["pages_per_minute"], 1),
+        "results": results,
+    }, indent=2))
+    SchedulerAccess.scheduler.cleanup()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
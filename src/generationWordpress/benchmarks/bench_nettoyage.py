@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Nettoyage des pages générées (PageBuilder.nettoyageContenu): suite de replace (avant,
+extraite de git) contre les règles compilées de nettoyageRules.py (une passe). Sans réseau.
+
+Corpus: les pages .wp de src/generationWordpress/pages (ou --pages), telles quelles, puis
+"à nettoyer": chaque page reçoit aussi les textes visés par les règles, comme une page
+sortie de build_scrutart_page. Les sorties des deux versions sont comparées.
+
+Usage: python benchmarks/bench_nettoyage.py [--repeat 5] [--pages DIR]
+"""
+
+import os
+import glob
+import json
+import time
+import random
+import argparse
+import statistics
+
+from page_bench_support import GENERATION_DIR, install_access, load_reference
+
+install_access(None)
+import PageBuilder  # noqa: E402
+from nettoyageRules import nettoyageRules  # noqa: E402
+
+
+def load_corpus(directory):
+    pages = []
+    for filename in sorted(glob.glob(os.path.join(directory, "**", "*.wp"), recursive=True)):
+        with open(filename, encoding="utf-8") as f:
+            pages.append(f.read())
+    return pages
+
+
+def with_rule_texts(pages):
+    # textes des règles (conditions comprises) insérés entre deux lignes de chaque page
+    texts = [old for rule in nettoyageRules for old, _ in rule["remplacements"]]
+    generator = random.Random(0)
+    dirty = []
+    for page in pages:
+        lines = page.split("\n")
+        for text in texts:
+            lines.insert(generator.randint(0, len(lines)), f"<p>Il y a 3 {text} dans Wikidata.</p>")
+        dirty.append("\n".join(lines))
+    return dirty
+
+
+def timed(fn, pages, repeat):
+    durations = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for page in pages:
+            fn(page)
+        durations.append((time.perf_counter() - t0) / len(pages) * 1e6)
+    return round(statistics.median(durations), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="passes sur le corpus (médiane)")
+    parser.add_argument("--pages", default=os.path.join(GENERATION_DIR, "pages"), help="répertoire des pages .wp")
+    parser.add_argument("--reference", help="fichier PageBuilder.py de référence (défaut: git)")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.pages)
+    reference = load_reference("PageBuilder.py", "CompiledRules.py", args.reference)
+    before = object.__new__(reference.PageBuilder).nettoyageContenu
+    after = object.__new__(PageBuilder.PageBuilder).nettoyageContenu
+
+    results = []
+    for corpus, texts in (("generated", pages), ("to_clean", with_rule_texts(pages))):
+        before_us, after_us = timed(before, texts, args.repeat), timed(after, texts, args.repeat)
+        results.append({
+            "corpus": corpus,
+            "pages": len(texts),
+            "page_kb_mean": round(sum(map(len, texts)) / len(texts) / 1024, 1),
+            "identical": all(before(page) == after(page) for page in texts),
+            "before_us_per_page": before_us,
+            "after_us_per_page": after_us,
+            "speedup": round(before_us / after_us, 2),
+        })
+    print(json.dumps({"rules": sum(len(rule["remplacements"]) for rule in nettoyageRules), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
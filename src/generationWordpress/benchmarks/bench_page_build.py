@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Temps de construction d'une page (PageBuilder.build_scrutart_page) contre un WDQS bidon
+local, les requêtes passant par un APIRequestScheduler en mémoire:
+
+- "before": PageBuilder tel qu'il était avant PageBuildExecutor (extrait de git), une
+  requête à la fois et 0,2 s d'attente après chaque entrée de la configuration;
+- "sequential": PageBuilder actuel avec query_workers=1;
+- "parallel": PageBuilder actuel, toutes les requêtes de la page soumises d'emblée.
+
+Les trois pages produites sont comparées.
+
+Usage: python benchmarks/bench_page_build.py [--pages 3] [--latency-ms 300] [--rate 10]
+"""
+
+import io
+import json
+import time
+import argparse
+import statistics
+import contextlib
+
+from page_bench_support import (SchedulerAccess, install_access, load_reference, start_mock_wdqs,
+                                start_scheduler, reset_wdqs_stats, wdqs_stats)
+
+PAINTER = "Q1028181"
+
+
+def measure(builder, qids):
+    durations, pages = [], []
+    reset_wdqs_stats()
+    for qid in qids:
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            pages.append(builder.build_scrutart_page(qid))
+        durations.append(time.perf_counter() - t0)
+    stats = wdqs_stats()
+    return pages, {
+        "page_s_median": round(statistics.median(durations), 3),
+        "page_s_max": round(max(durations), 3),
+        "upstream_queries_per_page": stats["calls"] / len(qids),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=3, help="pages construites par variante")
+    parser.add_argument("--latency-ms", type=float, default=300, help="latence du WDQS bidon par requête")
+    parser.add_argument("--rate", type=float, default=10, help="limite de taux du scheduler (requêtes/s)")
+    parser.add_argument("--reference", help="fichier PageBuilder.py de référence (défaut: git)")
+    args = parser.parse_args()
+
+    server, endpoint = start_mock_wdqs(args.latency_ms)
+    SchedulerAccess.endpoint = endpoint
+    SchedulerAccess.scheduler = start_scheduler(endpoint, args.rate)
+    install_access(SchedulerAccess)
+
+    import PageBuilder
+    reference = load_reference("PageBuilder.py", "PageBuildExecutor.py", args.reference)
+    # QID différents par variante: pas de réponse déjà en vol ou en cache d'une variante à l'autre
+    qids = {name: [f"Q{1000 * (i + 1) + k}" for k in range(args.pages)] for i, name in enumerate(("before", "sequential", "parallel"))}
+
+    variants = {
+        "before": reference.PageBuilder(PAINTER),
+        "sequential": PageBuilder.PageBuilder(PAINTER, query_workers=1),
+        "parallel": PageBuilder.PageBuilder(PAINTER),
+    }
+    results, pages = {}, {}
+    for name, builder in variants.items():
+        pages[name], results[name] = measure(builder, qids[name])
+
+    # même page au QID près
+    normalized = {name: [page.replace(qid, "QID") for page, qid in zip(pages[name], qids[name])] for name in pages}
+    report = {
+        "latency_ms": args.latency_ms, "rate": args.rate, "pages": args.pages,
+        "identical": normalized["before"] == normalized["sequential"] == normalized["parallel"],
+        "results": results,
+        "speedup_vs_before": round(results["before"]["page_s_median"] / results["parallel"]["page_s_median"], 1),
+    }
+    print(json.dumps(report, indent=2))
+    SchedulerAccess.scheduler.cleanup()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
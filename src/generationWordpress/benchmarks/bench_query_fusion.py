@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Requêtes amont et temps WDQS par page, sans et avec fusion des requêtes qui partagent le
+motif de base de l'entité (PageBuilder(fused_queries=True), cf. QueryFusion.py), contre un
+WDQS bidon local via un APIRequestScheduler en mémoire.
+
+Le WDQS bidon facture --join-ms par évaluation du motif de base (?s wdt:P170 wd:Q...):
+c'est la jointure que WDQS refait pour chaque requête d'une page, et qu'une requête
+fusionnée n'évalue qu'une fois (WITH ... AS %oeuvres). S'y ajoutent --latency-ms par
+requête et --branch-ms par branche de requête fusionnée.
+
+Usage: python benchmarks/bench_query_fusion.py [--pages 3] [--join-ms 400] [--latency-ms 100]
+"""
+
+import io
+import json
+import time
+import argparse
+import statistics
+import contextlib
+
+from page_bench_support import (SchedulerAccess, install_access, start_mock_wdqs, start_scheduler,
+                                reset_wdqs_stats, wdqs_stats)
+
+TEMPLATES = {"painter": "Q1028181", "genre": "Q1792379"}
+
+
+def measure(builder, qids):
+    durations, pages = [], []
+    reset_wdqs_stats()
+    for qid in qids:
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            pages.append(builder.build_scrutart_page(qid))
+        durations.append(time.perf_counter() - t0)
+    stats = wdqs_stats()
+    return pages, {
+        "upstream_queries_per_page": round(stats["calls"] / len(qids), 1),
+        "wdqs_s_per_page": round(stats["busy_s"] / len(qids), 2),
+        "page_s_median": round(statistics.median(durations), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=3, help="pages construites par variante et par template")
+    parser.add_argument("--latency-ms", type=float, default=100, help="coût fixe de chaque requête")
+    parser.add_argument("--join-ms", type=float, default=400, help="coût de chaque évaluation du motif de base")
+    parser.add_argument("--branch-ms", type=float, default=30, help="coût de chaque branche d'une requête fusionnée")
+    parser.add_argument("--rate", type=float, default=10, help="limite de taux du scheduler (requêtes/s)")
+    args = parser.parse_args()
+
+    server, endpoint = start_mock_wdqs(args.latency_ms, args.join_ms, args.branch_ms)
+    SchedulerAccess.endpoint = endpoint
+    SchedulerAccess.scheduler = start_scheduler(endpoint, args.rate)
+    install_access(SchedulerAccess)
+    import PageBuilder
+
+    results = []
+    for template, object_type in TEMPLATES.items():
+        qids = [f"Q{2000 + k}" for k in range(args.pages)]
+        separate_pages, separate = measure(PageBuilder.PageBuilder(object_type), qids)
+        fused_pages, fused = measure(PageBuilder.PageBuilder(object_type, fused_queries=True), qids)
+        results.append({
+            "template": template,
+            "identical": separate_pages == fused_pages,
+            "separate": separate,
+            "fused": fused,
+            "wdqs_time_ratio": round(fused["wdqs_s_per_page"] / separate["wdqs_s_per_page"], 2),
+        })
+    print(json.dumps({"latency_ms": args.latency_ms, "join_ms": args.join_ms, "branch_ms": args.branch_ms,
+                      "rate": args.rate, "pages": args.pages, "results": results}, indent=2))
+    SchedulerAccess.scheduler.cleanup()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Remplissage des marqueurs d'une page (gabarit WPTemplate.buildPageTemplate): un
+page.replace par marqueur (avant) contre CompiledTemplate.render (une passe). Sans réseau.
+
+Par page: temps médian, pic de mémoire (tracemalloc) et allocations de chaînes: nombre de
+copies de la page et octets alloués pour les produire. Le coût de compilation, payé une
+fois par template et langue, est donné à part.
+
+Usage: python benchmarks/bench_template_render.py [--repeat 2000] [--table-kb 40]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import tracemalloc
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+from CompiledTemplate import CompiledTemplate  # noqa: E402
+from WPGenreTemplate import WPGenreTemplate  # noqa: E402
+from WPPainterTemplate import WPPainterTemplate  # noqa: E402
+
+
+def replace_all(text, values):
+    for key, value in values.items():
+        text = text.replace(key, value)
+    return text
+
+
+def replace_allocations(text, values):
+    copies, allocated = 0, 0
+    for key, value in values.items():
+        new = text.replace(key, value)
+        if new is not text:
+            copies += 1
+            allocated += sys.getsizeof(new)
+        text = new
+    return copies, allocated
+
+
+def render_allocations(compiled, values):
+    page = compiled.render(values)
+    return 1, sys.getsizeof(page) + sys.getsizeof(compiled.parts)
+
+
+def page_values(template, table_kb):
+    # valeurs courtes (nombres, liens) et une table de propriétés volumineuse, comme getTable
+    values = {}
+    for i, key in enumerate(template.getPlaceholders()):
+        values[key] = f'<a href="https://query.wikidata.org/index.html#{"q" * 80}{i}">{i * 37}</a>'
+    tables = [key for key in values if "TABLE" in key] or list(values)[-1:]
+    values[tables[0]] = "<tr><td>P180</td><td>dépeint</td><td>paysage (123)</td></tr>" * (table_kb * 1024 // 60)
+    return values
+
+
+def timed(fn, repeat):
+    durations = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - t0) * 1e6)
+    return round(statistics.median(durations), 1)
+
+
+def peak(fn):
+    tracemalloc.start()
+    fn()
+    _, top = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return top
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000, help="rendus mesurés par variante (médiane)")
+    parser.add_argument("--table-kb", type=int, default=40, help="taille de la table de propriétés (Ko)")
+    args = parser.parse_args()
+
+    results = []
+    for template in (WPPainterTemplate("fr"), WPGenreTemplate("fr")):
+        text, placeholders = template.buildPageTemplate(), template.getPlaceholders()
+        t0 = time.perf_counter()
+        compiled = CompiledTemplate(text, placeholders)
+        compile_us = (time.perf_counter() - t0) * 1e6
+        values = page_values(template, args.table_kb)
+        before_page, after_page = replace_all(text, values), compiled.render(values)
+        before_alloc, after_alloc = replace_allocations(text, values), render_allocations(compiled, values)
+        before_us = timed(lambda: replace_all(text, values), args.repeat)
+        after_us = timed(lambda: compiled.render(values), args.repeat)
+        results.append({
+            "template": type(template).__name__,
+            "placeholders": len(set(placeholders)),
+            "page_kb": round(len(after_page) / 1024, 1),
+            "identical": before_page == after_page,
+            "compile_us": round(compile_us, 1),
+            "before": {"render_us": before_us, "peak_bytes": peak(lambda: replace_all(text, values)),
+                       "page_copies": before_alloc[0], "allocated_bytes": before_alloc[1]},
+            "after": {"render_us": after_us, "peak_bytes": peak(lambda: compiled.render(values)),
+                      "page_copies": after_alloc[0], "allocated_bytes": after_alloc[1]},
+            "speedup": round(before_us / after_us, 1),
+        })
+    print(json.dumps({"repeat": args.repeat, "table_kb": args.table_kb, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
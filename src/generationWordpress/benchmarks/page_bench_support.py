@@ -0,0 +1,174 @@
+"""
+Outils communs aux benchmarks de génération de pages: un WDQS bidon local (temps de
+service injecté, compteur d'appels et de temps de service), un accès Wikidata qui passe par un
+APIRequestScheduler en mémoire, et le chargement d'une version antérieure d'un module
+depuis git pour comparer avant/après.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import types
+import tempfile
+import threading
+import subprocess
+from urllib.parse import urlparse, parse_qs, urlencode
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+GENERATION_DIR = os.path.dirname(SCRIPT_DIR)
+PACKAGE_DIR = os.path.join(GENERATION_DIR, "tools", "WikimediaManager", "WikimediaManagerPackage")
+sys.path.insert(0, GENERATION_DIR)
+sys.path.insert(0, PACKAGE_DIR)
+
+# module d'accès à Wikidata importé par PageBuilder
+ACCESS_MODULE = "tools.WikimediaManager.WikimediaManagerPackage.WikimediaAccess"
+
+
+class MockWdqsHandler(BaseHTTPRequestHandler):
+    """GET /sparql?query=...: rend quelques lignes de résultat SPARQL JSON après un temps de service
+
+    temps de service = latency_ms par requête + join_ms par évaluation du motif de base
+    (?s wdt:Pxxx wd:Qxxx) + branch_ms par branche d'une requête fusionnée (QueryFusion);
+    une requête fusionnée reçoit les lignes de chacune de ses branches, marquées par ?part;
+    une requête VALUES ?var { <entité> ... } reçoit les lignes de chaque entité, liée à ?var.
+    """
+    latency_ms = 200.0
+    join_ms = 0.0
+    branch_ms = 0.0
+    rows = 5
+    stats = {"calls": 0, "busy_s": 0.0, "queries": []}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        t0 = time.perf_counter()
+        query = parse_qs(urlparse(self.path).query).get("query", [""])[0]
+        parts = re.findall(r'BIND\("([^"]+)" AS \?part\)', query)
+        joins = len(re.findall(r"wdt:P\d+\s+wd:Q\d+", query))
+        time.sleep((self.latency_ms + self.join_ms * joins + self.branch_ms * len(parts)) / 1000)
+        names = ["v", "vLabel", "c"]
+        rows = [
+            {"v": {"type": "uri", "value": f"http://www.wikidata.org/entity/Q{i + 1}"},
+             "vLabel": {"type": "literal", "value": f"valeur {i}"},
+             "c": {"type": "literal", "value": str(self.rows - i)}}
+            for i in range(self.rows)
+        ]
+        if parts:
+            names = names + ["part"]
+            rows = [dict(row, part={"type": "literal", "value": part}) for part in parts for row in rows]
+        values = re.search(r"\bvalues\s+\?(\w+)\s*\{([^}]*)\}", query, re.IGNORECASE)
+        entities = re.findall(r"<(http://www\.wikidata\.org/entity/Q\d+)>", values.group(2)) if values else []
+        if entities:
+            names = names + [values.group(1)]
+            rows = [dict(row, **{values.group(1): {"type": "uri", "value": uri}}) for uri in entities for row in rows]
+        body = json.dumps({"head": {"vars": names}, "results": {"bindings": rows}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/sparql-results+json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with MockWdqsHandler.lock:
+            MockWdqsHandler.stats["calls"] += 1
+            MockWdqsHandler.stats["busy_s"] += time.perf_counter() - t0
+            MockWdqsHandler.stats["queries"].append(query)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_mock_wdqs(latency_ms: float, join_ms: float = 0.0, branch_ms: float = 0.0):
+    MockWdqsHandler.latency_ms = latency_ms
+    MockWdqsHandler.join_ms = join_ms
+    MockWdqsHandler.branch_ms = branch_ms
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockWdqsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/sparql"
+
+
+def reset_wdqs_stats():
+    with MockWdqsHandler.lock:
+        MockWdqsHandler.stats = {"calls": 0, "busy_s": 0.0, "queries": []}
+
+
+def wdqs_stats():
+    with MockWdqsHandler.lock:
+        return dict(MockWdqsHandler.stats)
+
+
+def start_scheduler(endpoint: str, rate: float):
+    """APIRequestScheduler en mémoire pour l'endpoint; cache et logs dans un répertoire temporaire"""
+    try:
+        import configPrivee  # noqa: F401
+    except ImportError:
+        sys.modules['configPrivee'] = types.SimpleNamespace(config={'admin': {'Bearer': 'bench'}})
+    os.chdir(tempfile.mkdtemp(prefix="bench_pages_"))
+    import logging
+    import apiManagerClaude
+    logging.getLogger().setLevel(logging.WARNING)
+    scheduler = apiManagerClaude.APIRequestScheduler([endpoint])
+    scheduler.set_rate_limit(rate, burst=max(1, int(rate)), adaptive=False)
+    return scheduler
+
+
+class SchedulerAccess:
+    """Accès Wikidata de benchmark, avec l'interface utilisée par PageBuilder.
+
+    Les requêtes passent par le scheduler (limite de taux, requêtes en vol) vers le WDQS
+    bidon, sans cache: chaque requête est un appel amont. Les filtres rendent le nombre de
+    lignes du résultat, la mesure porte sur les requêtes et l'assemblage.
+    """
+    scheduler = None
+    endpoint = None
+
+    def __init__(self, qid, lang="fr"):
+        self.qid = qid
+        self.lang = lang
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, exception_traceback):
+        return False
+
+    def getTypes(self, qid):
+        return []
+
+    def sparqlQuery(self, query, format=None, priority=None):
+        url = f"{self.endpoint}?{urlencode({'query': query, 'format': format or 'JSON'})}"
+        request_id, _ = self.scheduler.add_request(url, method="GET", cache_duration=0)
+        return self.scheduler.wait_for_response(request_id, timeout=300)
+
+    def get_wdqs_query(self, sparql):
+        return "https://query.wikidata.org/index.html#" + str(len(sparql))
+
+    def get_wikidata_bar_graph(self, sparql, qid):
+        return "https://query.wikidata.org/embed.html#" + str(len(sparql))
+
+    def get_wkd_fct(self, name):
+        return lambda w_obj, res, qid: len(res["results"]["bindings"]) if isinstance(res, dict) and "results" in res else 0
+
+
+def install_access(access_class):
+    """Fournit à PageBuilder le module d'accès à Wikidata qu'il importe"""
+    sys.modules[ACCESS_MODULE] = types.SimpleNamespace(WikimediaAccess=access_class)
+
+
+def load_reference(filename: str, added_with: str, path: str = None):
+    """Module `filename` tel qu'il était avant le commit qui a ajouté `added_with` (HEAD s'il
+    n'est pas encore commité), ou le fichier `path` s'il est donné"""
+    if path:
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+    else:
+        added = subprocess.run(["git", "log", "--diff-filter=A", "--format=%H", "--", added_with],
+                               cwd=GENERATION_DIR, capture_output=True, text=True).stdout.split()
+        rev = f"{added[-1]}^" if added else "HEAD"
+        source = subprocess.run(["git", "show", f"{rev}:./{filename}"],
+                                cwd=GENERATION_DIR, capture_output=True, text=True, check=True).stdout
+    name = os.path.splitext(filename)[0] + "Reference"
+    module = types.ModuleType(name)
+    exec(compile(source, name + ".py", "exec"), module.__dict__)
+    return module
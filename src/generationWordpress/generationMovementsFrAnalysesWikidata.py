@@ -699,6 +699,8 @@ for qid in filterPainters:
     if "{qid}.wp".format(qid=qid) in filelist:
         os.remove("pages/{qid}.wp".format(qid=qid))
 
+# pas de génération par lot (BatchPageGenerator) tant que PageBuilder n'a pas de template pour les mouvements:
+# ce script, encore une copie de celui des créateurs, produit des pages de créateurs (wdt:P170)
 #page = "test"
 with open("data/wikidataSignificantPaintersTicket1527.json") as fListPainters:
     # temporaire painters = json.load(fListPainters)
@@ -0,0 +1,51 @@
+# règles de nettoyage des pages générées (PageBuilder.nettoyageContenu), compilées par CompiledRules
+# "condition": les remplacements de la règle ne s'appliquent que si ce texte est dans la page (None: toujours)
+# "remplacements": paires [texte, remplacement]; pour un même texte, la première règle l'emporte
+nettoyageRules = [
+    # aucune page Wikipedia
+    {"condition": "<p><strong>0 pages</strong> d'un <strong>Wikipedia</strong> dans au moins une langue sont associées à ces œuvres.</p>",
+     "remplacements": [
+        ["<p><strong>0 pages</strong> d'un <strong>Wikipedia</strong> dans au moins une langue sont associées à ces œuvres.</p>",
+         "<p>Je n'ai trouvé aucune page dans Wikipedia associée à ces œuvres</p>"],
+        ["<p>Dont 0 dans le Wikipedia anglophone et 0 dans le Wikidata francophone.</p>",
+         "<p>Et bien sûr, il n'y a de page pour ces œuvres ni dans le Wikipedia francophone, ni dans l'anglophone</p>"],
+        ["<p>L'ensemble des <strong>pages</strong> concerne <strong>0 œuvres</strong>.</p>",
+         "<p>Et aussi, aucune de ces œuvres n'est concernée par une page de Wikipedia.</p>"],
+     ]},
+    # aucune image
+    {"condition": "<p>Il y a <strong>0 images</strong> dans Wikimedia Commons associées à ces œuvres.</p>",
+     "remplacements": [
+        ["<p>Il y a <strong>0 images</strong> dans Wikimedia Commons associées à ces œuvres.</p>",
+         "<p>Il n'a aucune image dans Wikimedia Commons associée à ces œuvres.</p>"],
+     ]},
+    # pas de galerie
+    {"condition": "On peut voir une sélection de ces œuvres dans . (vous avez plus de possibilités de réglages sur la galerie si vous vous inscrivez comme utilisateur).",
+     "remplacements": [
+        ["On peut voir une sélection de ces œuvres dans . (vous avez plus de possibilités de réglages sur la galerie si vous vous inscrivez comme utilisateur).",
+         ""],
+     ]},
+    # gestion de pluriels spécifiques
+    {"condition": None,
+     "remplacements": [
+        ["série de peinturess", "séries de peintures"],
+        ["œuvre d'arts", "œuvres d'art"],
+        ["pièce de monnaies", "pièces de monnaie"],
+        ["rouleau suspendus", "rouleaux suspendus"],
+        ["photo-carte de visites", "photo-cartes de visite"],
+        ["film négatifs", "films négatifs"],
+        ["eau-fortes", "eaux-fortes"],
+        ["carte postales", "cartes postales"],
+        ["œuvre inachevées", "œuvres inachevées"],
+        ["plaque commémoratives", "plaques commémoratives"],
+        ["élément d’une collection ou d’une expositions", "éléments d’une collection ou d’une exposition"],
+        ["carreaus", "carreaux"],
+        ["peinture sur panneaus", "peintures sur panneau"],
+        ["estampe à la manière noires", "estampes à la manière noire"],
+        ["peinture murales", "peintures murales"],
+        ["groupe de peinturess", "groupes de peintures"],
+        ["aureuss", "aurei"],
+        ["artefact archéologiques", "artefacts archéologiques"],
+        ["impression photomécaniques", "impressions photomécaniques"],
+        ["œuvre avec de multiples exécutionss", "œuvres avec de multiples exécutions"],
+     ]},
+]
@@ -0,0 +1,147 @@
+import os
+import re
+import sys
+import time
+import types
+import shutil
+import tempfile
+import threading
+import unittest
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+ENTITY = re.compile(r"<http://www\.wikidata\.org/entity/(\w+)>")
+
+
+class CountingAccess:
+    """Accès Wikidata sans réseau qui compte les requêtes reçues; une requête contenant 'boom' échoue"""
+    latency = 0.02
+    queries = []
+    lock = threading.Lock()
+
+    def __init__(self, qid, lang="fr"):
+        self.qid = qid
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, exception_traceback):
+        return False
+
+    def getTypes(self, qid):
+        return ["Q1792379"]
+
+    def sparqlQuery(self, query):
+        with CountingAccess.lock:
+            CountingAccess.queries.append(query)
+        time.sleep(CountingAccess.latency)
+        if "boom" in query:
+            raise RuntimeError("requête en échec")
+        entities = ENTITY.findall(query)
+        if entities:
+            # une ligne par entité du VALUES: la même, que la page soit seule ou avec d'autres
+            return {"results": {"bindings": [{"qid": {"value": f"http://www.wikidata.org/entity/{qid}"},
+                                              "c": {"value": qid}} for qid in entities]}}
+        return {"results": {"bindings": [{"c": {"value": str(len(query))}}]}}
+
+    def get_wdqs_query(self, sparql):
+        return f"wdqs:{len(sparql)}"
+
+    def get_wikidata_bar_graph(self, sparql, qid):
+        return f"embed:{len(sparql)}"
+
+    def get_wkd_fct(self, name):
+        return lambda w_obj, res, qid: f"{name}({res['results']['bindings'][0]['c']['value'] if res else '-'})"
+
+
+# le module d'accès à Wikidata attendu par PageBuilder est remplacé par l'accès sans réseau
+sys.modules.setdefault('tools.WikimediaManager.WikimediaManagerPackage.WikimediaAccess',
+                       types.SimpleNamespace(WikimediaAccess=CountingAccess))
+
+import PageBuilder  # noqa: E402
+from BatchPageGenerator import BatchPageGenerator  # noqa: E402
+from QueryFusion import batch_plan  # noqa: E402
+
+# requête de libellé sans __QID__: la même pour toutes les pages
+LABEL_QUERY = {"sparql": "SELECT ?l WHERE { wd:Q1792379 rdfs:label ?l FILTER(lang(?l) = '__LANG__') }",
+               "filtres": [{"filtre": "get_label", "key": "__GENRELABEL__"}], "urlquery": None}
+
+
+class TestBatchPageGenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.access = PageBuilder.WikimediaAccess
+        PageBuilder.WikimediaAccess = CountingAccess
+        CountingAccess.queries = []
+        self.builder = PageBuilder.PageBuilder("Q1792379")
+
+    def tearDown(self):
+        PageBuilder.WikimediaAccess = self.access
+
+    def test_pages_identical_to_page_by_page_generation(self):
+        qids = ["Q134307", "Q1", "Q2", "Q1"]
+        expected = {qid: self.builder.nettoyageContenu(self.builder.build_scrutart_page(qid)) for qid in qids}
+        batch = BatchPageGenerator(self.builder)
+        stats = batch.generate(qids)
+        self.assertEqual(batch.pages, expected)
+        self.assertEqual((stats["pages"], stats["errors"]), (3, 0))
+        self.assertGreater(stats["pages_per_minute"], 0)
+
+    def test_shared_query_sent_once_per_batch(self):
+        config = dict(self.builder.template_manager.getDataConfig(), __GENRELABEL__=LABEL_QUERY)
+        self.builder.template_manager = types.SimpleNamespace(getDataConfig=lambda: config)
+        qids = [f"Q{k}" for k in range(1, 7)]
+        stats = BatchPageGenerator(self.builder, pages_in_flight=3).generate(qids)
+        # nom de l'entité et liens externes: une requête pour toutes les pages
+        batched = len(batch_plan(config))
+        self.assertEqual(batched, 2)
+        per_page = sum(1 for name, elmt in config.items()
+                       if elmt["sparql"] and "__QID__" in elmt["sparql"] and name not in batch_plan(config))
+        self.assertEqual(CountingAccess.queries.count(LABEL_QUERY["sparql"].replace("__LANG__", "fr")), 1)
+        self.assertEqual(len(CountingAccess.queries), len(qids) * per_page + 1 + batched)
+        self.assertEqual((stats["shared_queries"], stats["shared_hits"]), (1 + batched, (len(qids) - 1) * (1 + batched)))
+
+    def test_entity_queries_sent_per_values_chunk(self):
+        qids = [f"Q{k}" for k in range(1, 8)]
+        expected = {qid: self.builder.nettoyageContenu(self.builder.build_scrutart_page(qid)) for qid in qids}
+        CountingAccess.queries = []
+        batch = BatchPageGenerator(self.builder, values_size=3)
+        stats = batch.generate(qids)
+        self.assertEqual(batch.pages, expected)
+        name_queries = [query for query in CountingAccess.queries if "?qidLabel" in query]
+        self.assertEqual([len(re.findall(r"entity/Q", query)) for query in name_queries], [3, 3, 1])
+        self.assertEqual(stats["shared_queries"], 3 * 2)
+
+    def test_failed_values_query_falls_back_to_page_query(self):
+        qids = ["Q1", "Q2"]
+        expected = {qid: self.builder.nettoyageContenu(self.builder.build_scrutart_page(qid)) for qid in qids}
+        sparql_query = CountingAccess.sparqlQuery
+
+        def failing_values(access, query):
+            if set(qids) <= set(ENTITY.findall(query)):
+                raise RuntimeError("requête pour le lot en échec")
+            return sparql_query(access, query)
+        CountingAccess.sparqlQuery = failing_values
+        self.addCleanup(setattr, CountingAccess, "sparqlQuery", sparql_query)
+        batch = BatchPageGenerator(self.builder)
+        stats = batch.generate(qids)
+        self.assertEqual(batch.pages, expected)
+        self.assertEqual(stats["errors"], 0)
+
+    def test_writes_pages_and_keeps_going_after_errors(self):
+        target = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, target)
+        with open(os.path.join(target, "Q3.wp"), "w", encoding="utf-8") as f:
+            f.write("déjà là")
+        stats = BatchPageGenerator(self.builder, target).generate(["Q1", "boom", "Q2", "Q3"])
+        self.assertEqual((stats["pages"], stats["errors"], stats["skipped"]), (2, 1, 1))
+        self.assertEqual(sorted(os.listdir(target)), ["Q1.wp", "Q2.wp", "Q3.wp"])
+        with open(os.path.join(target, "Q3.wp"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "déjà là")
+        # la page existante n'a pas été interrogée
+        self.assertFalse(any("wd:Q3 " in query or "wd:Q3\n" in query for query in CountingAccess.queries))
+
+
+if __name__ == '__main__':
+    unittest.main()
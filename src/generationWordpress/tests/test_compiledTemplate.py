@@ -0,0 +1,43 @@
+import os
+import sys
+import unittest
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+from CompiledTemplate import CompiledTemplate  # noqa: E402
+from WPGenreTemplate import WPGenreTemplate  # noqa: E402
+from WPPainterTemplate import WPPainterTemplate  # noqa: E402
+
+
+def replace_all(text, values):
+    # remplissage d'origine: un page.replace par marqueur
+    for key, value in values.items():
+        text = text.replace(key, value)
+    return text
+
+
+class TestCompiledTemplate(unittest.TestCase):
+
+    def test_render_identical_to_sequential_replace(self):
+        for template in (WPPainterTemplate("fr"), WPPainterTemplate("en"), WPGenreTemplate("fr")):
+            compiled = template.buildCompiledTemplate()
+            values = {key: f"<b>{i}</b>" for i, key in enumerate(template.getPlaceholders())}
+            self.assertEqual(compiled.render(values), replace_all(template.buildPageTemplate(), values))
+            # marqueurs sans valeur laissés en place
+            partial = dict(list(values.items())[::2])
+            self.assertEqual(compiled.render(partial), replace_all(template.buildPageTemplate(), partial))
+
+    def test_longest_placeholder_first(self):
+        compiled = CompiledTemplate("a __X__ b __X__Y__ c __X__", ["__X__", "__X__Y__"])
+        self.assertEqual(compiled.render({"__X__": "1", "__X__Y__": "2"}), "a 1 b 2 c 1")
+        self.assertEqual(CompiledTemplate("sans marqueur", []).render({"__X__": "1"}), "sans marqueur")
+
+    def test_compiled_once_per_template_and_language(self):
+        self.assertIs(WPPainterTemplate("fr").buildCompiledTemplate(), WPPainterTemplate("fr").buildCompiledTemplate())
+        self.assertIsNot(WPPainterTemplate("fr").buildCompiledTemplate(), WPPainterTemplate("en").buildCompiledTemplate())
+        self.assertIsNot(WPPainterTemplate("fr").buildCompiledTemplate(), WPGenreTemplate("fr").buildCompiledTemplate())
+
+
+if __name__ == '__main__':
+    unittest.main()
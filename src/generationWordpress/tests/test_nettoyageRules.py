@@ -0,0 +1,106 @@
+import os
+import sys
+import glob
+import random
+import unittest
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+from CompiledRules import CompiledRules  # noqa: E402
+from nettoyageRules import nettoyageRules  # noqa: E402
+
+PAGES_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "pages")
+
+
+# PageBuilder.nettoyageContenu avant les règles compilées: la référence
+def nettoyage_reference(page):
+    if "<p><strong>0 pages</strong> d'un <strong>Wikipedia</strong> dans au moins une langue sont associées à ces œuvres.</p>" in page:
+        page = page.replace(
+            "<p><strong>0 pages</strong> d'un <strong>Wikipedia</strong> dans au moins une langue sont associées à ces œuvres.</p>",
+            "<p>Je n'ai trouvé aucune page dans Wikipedia associée à ces œuvres</p>")
+        page = page.replace("<p>Dont 0 dans le Wikipedia anglophone et 0 dans le Wikidata francophone.</p>",
+                     "<p>Et bien sûr, il n'y a de page pour ces œuvres ni dans le Wikipedia francophone, ni dans l'anglophone</p>")
+        page = page.replace("<p>L'ensemble des <strong>pages</strong> concerne <strong>0 œuvres</strong>.</p>",
+                     "<p>Et aussi, aucune de ces œuvres n'est concernée par une page de Wikipedia.</p>")
+    if "<p>Il y a <strong>0 images</strong> dans Wikimedia Commons associées à ces œuvres.</p>" in page:
+        page = page.replace("<p>Il y a <strong>0 images</strong> dans Wikimedia Commons associées à ces œuvres.</p>",
+                     "<p>Il n'a aucune image dans Wikimedia Commons associée à ces œuvres.</p>")
+        pass
+    if "On peut voir une sélection de ces œuvres dans . (vous avez plus de possibilités de réglages sur la galerie si vous vous inscrivez comme utilisateur)." in page:
+        page = page.replace("On peut voir une sélection de ces œuvres dans . (vous avez plus de possibilités de réglages sur la galerie si vous vous inscrivez comme utilisateur).", "")
+    # gestion de pluriels spécifiques
+    page = page.replace("série de peinturess", "séries de peintures")
+    page = page.replace("œuvre d'arts", "œuvres d'art")
+    page = page.replace("pièce de monnaies", "pièces de monnaie")
+    page = page.replace("rouleau suspendus", "rouleaux suspendus")
+    page = page.replace("photo-carte de visites", "photo-cartes de visite")
+    page = page.replace("film négatifs", "films négatifs")
+    page = page.replace("série de peinturess", "séries de peintures")
+    page = page.replace("eau-fortes", "eaux-fortes")
+    page = page.replace("carte postales", "cartes postales")
+    page = page.replace("œuvre inachevées", "œuvres inachevées")
+    page = page.replace("plaque commémoratives", "plaques commémoratives")
+    page = page.replace("élément d’une collection ou d’une expositions", "éléments d’une collection ou d’une exposition")
+    page = page.replace("carreaus", "carreaux")
+    page = page.replace("peinture sur panneaus", "peintures sur panneau")
+    page = page.replace("estampe à la manière noires", "estampes à la manière noire")
+    page = page.replace("peinture murales", "peintures murales")
+    page = page.replace("groupe de peinturess", "groupes de peintures")
+    page = page.replace("aureuss", "aurei")
+    page = page.replace("artefact archéologiques", "artefacts archéologiques")
+    page = page.replace("impression photomécaniques", "impressions photomécaniques")
+    page = page.replace("œuvre avec de multiples exécutionss", "œuvres avec de multiples exécutions")
+    return page
+
+
+def rule_texts():
+    texts = {rule["condition"] for rule in nettoyageRules if rule["condition"]}
+    return texts | {old for rule in nettoyageRules for old, _ in rule["remplacements"]}
+
+
+class TestNettoyageRules(unittest.TestCase):
+
+    def setUp(self):
+        self.rules = CompiledRules(nettoyageRules)
+
+    def test_rule_texts_do_not_overlap(self):
+        # condition d'équivalence avec la suite de replace: aucun texte n'en contient un autre, et
+        # deux textes ne se recouvrent que collés dans un même mot ("...postalesérie de..."),
+        # sauf si le premier passait déjà avant le second dans la suite de replace
+        order = list(self.rules.replacements)
+        for i, a in enumerate(order):
+            for j, b in enumerate(order):
+                if a == b:
+                    continue
+                self.assertNotIn(a, b)
+                for k in range(1, min(len(a), len(b))):
+                    if a.endswith(b[:k]) and i > j:
+                        self.assertTrue(a[-k - 1:].isalpha(), (a, b))
+
+    def test_identical_on_generated_pages(self):
+        files = glob.glob(os.path.join(PAGES_DIR, "**", "*.wp"), recursive=True)
+        if not files:
+            self.skipTest("pas de pages générées dans " + PAGES_DIR)
+        for filename in files:
+            with open(filename, encoding="utf-8") as f:
+                page = f.read()
+            self.assertEqual(self.rules.apply(page), nettoyage_reference(page), filename)
+
+    def test_identical_on_every_rule_and_condition(self):
+        texts = sorted(rule_texts()) + ["œuvre", "peinture", "0 pages", "<p>", " "]
+        generator = random.Random(4)
+        for _ in range(300):
+            page = "".join(generator.choice(texts) for _ in range(generator.randint(0, 12)))
+            self.assertEqual(self.rules.apply(page), nettoyage_reference(page), page)
+
+    def test_condition_gates_its_rule(self):
+        rule = nettoyageRules[0]
+        other = rule["remplacements"][1][0]
+        self.assertEqual(self.rules.apply(other), other)
+        self.assertEqual(self.rules.apply(other + rule["condition"]),
+                         rule["remplacements"][1][1] + rule["remplacements"][0][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
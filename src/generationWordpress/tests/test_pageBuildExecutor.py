@@ -0,0 +1,141 @@
+import os
+import sys
+import time
+import types
+import threading
+import unittest
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+
+class FakeAccess:
+    """Accès Wikidata sans réseau: chaque requête attend `latency` secondes et rend une réponse déterministe"""
+    latency = 0.05
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def __init__(self, qid, lang="fr"):
+        self.qid = qid
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, exception_traceback):
+        return False
+
+    def getTypes(self, qid):
+        return ["Q1792379"]
+
+    def sparqlQuery(self, query):
+        with FakeAccess.lock:
+            FakeAccess.in_flight += 1
+            FakeAccess.max_in_flight = max(FakeAccess.max_in_flight, FakeAccess.in_flight)
+        # les requêtes courtes finissent d'abord: ordre d'arrivée différent de l'ordre de la page
+        time.sleep(FakeAccess.latency * (1 + len(query) % 3))
+        with FakeAccess.lock:
+            FakeAccess.in_flight -= 1
+        if "boom" in query:
+            raise RuntimeError("requête en échec")
+        return {"results": {"bindings": [{"c": {"value": str(len(query))}}]}}
+
+    def get_wdqs_query(self, sparql):
+        return f"wdqs:{len(sparql)}"
+
+    def get_wikidata_bar_graph(self, sparql, qid):
+        return f"embed:{len(sparql)}"
+
+    def get_wkd_fct(self, name):
+        return lambda w_obj, res, qid: f"{name}({res['results']['bindings'][0]['c']['value'] if res else '-'})"
+
+
+class BatchAccess(FakeAccess):
+    """Accès qui envoie les requêtes d'une page en un appel: réponses rendues dans l'ordre de fin"""
+    calls = []
+
+    def sparqlQueryBatch(self, queries, on_result=None):
+        BatchAccess.calls.append(list(queries))
+        responses = [None] * len(queries)
+
+        def run(index):
+            try:
+                responses[index] = self.sparqlQuery(queries[index])
+            except RuntimeError:
+                pass  # requête en échec: pas de réponse, comme une requête expirée du flux
+            if on_result:
+                on_result(index, responses[index])
+        threads = [threading.Thread(target=run, args=(index,)) for index in range(len(queries))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return responses
+
+
+# le module d'accès à Wikidata attendu par PageBuilder est remplacé par l'accès sans réseau
+sys.modules['tools.WikimediaManager.WikimediaManagerPackage.WikimediaAccess'] = types.SimpleNamespace(
+    WikimediaAccess=FakeAccess)
+
+import PageBuilder  # noqa: E402
+from PageBuildExecutor import PageBuildExecutor, plan_page_queries  # noqa: E402
+
+
+class TestPageBuildExecutor(unittest.TestCase):
+
+    def setUp(self):
+        # PageBuilder peut avoir été importé par un autre test avec un autre accès
+        self.access = PageBuilder.WikimediaAccess
+        PageBuilder.WikimediaAccess = FakeAccess
+        FakeAccess.max_in_flight = 0
+
+    def tearDown(self):
+        PageBuilder.WikimediaAccess = self.access
+
+    def test_parallel_page_identical_to_sequential(self):
+        sequential = PageBuilder.PageBuilder("Q1792379", query_workers=1).build_scrutart_page("Q134307")
+        self.assertEqual(FakeAccess.max_in_flight, 1)
+        parallel = PageBuilder.PageBuilder("Q1792379").build_scrutart_page("Q134307")
+        self.assertGreater(FakeAccess.max_in_flight, 1)
+        self.assertEqual(parallel, sequential)
+        self.assertNotIn("__ENTITYNAME__", parallel)
+
+    def test_queries_overlap(self):
+        builder = PageBuilder.PageBuilder("Q1792379")
+        queries = sum(1 for step in plan_page_queries(builder.template_manager.getDataConfig(), "Q1", "fr")
+                      if step["sparql"])
+        t0 = time.perf_counter()
+        builder.build_scrutart_page("Q1")
+        # séquentiel: au moins queries * latency
+        self.assertLess(time.perf_counter() - t0, queries * FakeAccess.latency / 2)
+
+    def test_steps_in_plan_order_and_errors_raised(self):
+        plan = [{"name": "a", "elmt": {}, "sparql": "select boom"}, {"name": "b", "elmt": {}, "sparql": None}]
+        results = PageBuildExecutor(FakeAccess("Q1")).results(plan)
+        with self.assertRaises(RuntimeError):
+            next(results)
+        plan[0]["sparql"] = "select 1"
+        self.assertEqual([step["name"] for step, _ in PageBuildExecutor(FakeAccess("Q1")).results(plan)], ["a", "b"])
+
+    def test_page_queries_sent_in_one_batch_call(self):
+        sequential = PageBuilder.PageBuilder("Q1792379", query_workers=1).build_scrutart_page("Q134307")
+        PageBuilder.WikimediaAccess = BatchAccess
+        BatchAccess.calls = []
+        builder = PageBuilder.PageBuilder("Q1792379")
+        self.assertEqual(builder.build_scrutart_page("Q134307"), sequential)
+        queries = {step["sparql"] for step in plan_page_queries(builder.template_manager.getDataConfig(), "Q134307", "fr")
+                   if step["sparql"]}
+        self.assertEqual(len(BatchAccess.calls), 1)
+        self.assertEqual(set(BatchAccess.calls[0]), queries)
+        self.assertEqual((builder.query_stats["api_batch_calls"], builder.query_stats["queries"]), (1, len(queries)))
+
+    def test_failed_batch_call_raises_at_first_step(self):
+        access = BatchAccess("Q1")
+        access.sparqlQueryBatch = lambda queries, on_result=None: 1 / 0
+        plan = [{"name": "a", "elmt": {}, "sparql": "select 1"}, {"name": "b", "elmt": {}, "sparql": "select 2"}]
+        with self.assertRaises(ZeroDivisionError):
+            next(PageBuildExecutor(access).results(plan))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import os
+import re
+import sys
+import unittest
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+from QueryFusion import (batch_plan, batch_values_query, entity_values, fusion_plan, order_keys,  # noqa: E402
+                         projected_vars, shared_pattern, split_batch_result, split_fused_result)
+from PageBuildExecutor import PageBuildExecutor, plan_page_queries  # noqa: E402
+from WPGenreTemplate import WPGenreTemplate  # noqa: E402
+from WPPainterTemplate import WPPainterTemplate  # noqa: E402
+
+
+XSD_INTEGER = "http://www.w3.org/2001/XMLSchema#integer"
+
+
+def count(value):
+    return {"type": "literal", "datatype": XSD_INTEGER, "value": str(value)}
+
+
+def rows_for(query):
+    # deux lignes propres à la requête, par compteur décroissant comme les ORDER BY DESC(?c) des templates
+    return [{"c": count(len(query) + i)} for i in (1, 0)]
+
+
+class FusionAwareAccess:
+    """WDQS simulé: rend les lignes de chaque requête d'origine, y compris dans une requête fusionnée"""
+
+    def __init__(self, originals, fail_fused=False):
+        self.originals = originals  # nom -> requête d'origine instanciée
+        self.fail_fused = fail_fused
+        self.queries = []
+
+    def sparqlQuery(self, query):
+        self.queries.append(query)
+        parts = re.findall(r'BIND\("([^"]+)" AS \?part\)', query)
+        if not parts:
+            return {"head": {"vars": ["c"]}, "results": {"bindings": rows_for(query)}}
+        if self.fail_fused:
+            return {"error": "Query timeout"}
+        # lignes des branches entrelacées et chacune dans l'ordre inverse, comme l'UNION peut les rendre
+        bindings = [dict(row, part={"type": "literal", "value": part})
+                    for i in (1, 0) for part in parts for row in rows_for(self.originals[part])[i:i + 1]]
+        return {"head": {"vars": ["c", "part"]}, "results": {"bindings": bindings}}
+
+
+class TestQueryFusion(unittest.TestCase):
+
+    def test_projected_vars(self):
+        self.assertEqual(projected_vars("select (count(distinct ?p) as ?c) where { ?s ?p [] }"), ["c"])
+        self.assertEqual(projected_vars("SELECT DISTINCT ?v ?vLabel (COUNT(DISTINCT ?s) AS ?c) WHERE {}"), ["v", "vLabel", "c"])
+        self.assertEqual(projected_vars("select ?wiki # (count(?wiki) as ?c)\n where { }"), ["wiki"])
+
+    def test_order_keys(self):
+        self.assertEqual(order_keys("select ?t (count(?s) as ?c) where { } group by ?t\n order by desc(?c)"), [("c", True)])
+        self.assertEqual(order_keys("SELECT ?y WHERE { { select ?y where {} ORDER BY ?y } } ORDER BY (?y) DESC (?c) LIMIT 5"),
+                         [("y", False), ("c", True)])
+        self.assertEqual(order_keys("select ?t where { { select ?t where {} order by ?t } }"), [])
+        # ordre sur une expression: pas de fusion possible
+        self.assertIsNone(order_keys("select ?t where { } order by desc(strlen(?t))"))
+        plan = fusion_plan({name: {"sparql": f"select ?t (count(?s) as ?c) where {{ ?s wdt:P136 wd:__QID__; wdt:P31 ?t }} "
+                                             f"group by ?t order by {order}"} for name, order in
+                            (("a", "desc(?c)"), ("b", "?t"), ("c", "desc(xsd:integer(?c))"))})
+        self.assertEqual(plan[0]["order"], {"a": [("c", True)], "b": [("t", False)]})
+
+    def test_groups_templates_sharing_the_entity_pattern(self):
+        for template, prop in ((WPPainterTemplate("fr"), "wdt:P170"), (WPGenreTemplate("fr"), "wdt:P136")):
+            config = template.getDataConfig()
+            plan = fusion_plan(config)
+            self.assertIs(fusion_plan(config), plan)
+            self.assertEqual(len(plan), 1)
+            parts = plan[0]["parts"]
+            # requêtes sans le motif (nom, liens externes) ou avec un PREFIX (barres): à part
+            self.assertNotIn("__ENTITYNAME__", parts)
+            self.assertNotIn("__LIENSWIKIDATABARRES__", parts)
+            self.assertEqual(len(parts), 13)
+            self.assertEqual(shared_pattern(config["__NBTYPES__"]["sparql"]), ("?s", prop))
+            # le motif n'est plus évalué qu'une fois, dans la sous-requête nommée
+            fused = plan[0]["sparql"]
+            self.assertEqual(fused.count(f"{prop} wd:__QID__"), 1)
+            self.assertEqual(fused.count("INCLUDE %oeuvres"), 14)
+
+    def test_split_fused_result(self):
+        res = {"results": {"bindings": [{"c": {"value": "1"}, "part": {"value": "a"}},
+                                        {"c": {"value": "2"}, "part": {"value": "b"}}]}}
+        split = split_fused_result(res, {"a": ["c"], "b": ["c"], "d": ["x"]})
+        self.assertEqual(split["a"], {"head": {"vars": ["c"]}, "results": {"bindings": [{"c": {"value": "1"}}]}})
+        self.assertEqual(split["d"]["results"]["bindings"], [])
+        self.assertIsNone(split_fused_result({"error": "Query timeout"}, {"a": ["c"]}))
+        self.assertIsNone(split_fused_result(None, {"a": ["c"]}))
+
+    def test_split_restores_order_of_interleaved_rows(self):
+        # l'UNION ne garde pas l'ordre de chaque branche: lignes des requêtes mêlées et désordonnées
+        def row(part, c, t=None):
+            return dict({"c": count(c), "part": {"value": part}}, **({"t": {"value": t}} if t else {}))
+        res = {"results": {"bindings": [row("types", 3, "Q3305213"), row("items", 7), row("types", 120, "Q93184"),
+                                        row("langs", 2, "fr"), row("types", 15, "Q11060274"), row("items", 9),
+                                        row("langs", 2, "de"), row("langs", 10, "en")]}}
+        split = split_fused_result(res, {"types": ["t", "c"], "langs": ["t", "c"], "items": ["c"]},
+                                   {"types": [("c", True)], "langs": [("c", True), ("t", False)], "items": []})
+        values = {name: [(b.get("t", {}).get("value"), b["c"]["value"]) for b in split[name]["results"]["bindings"]]
+                  for name in split}
+        # getMainType lit la première ligne: le type le plus fréquent
+        self.assertEqual(values["types"], [("Q93184", "120"), ("Q11060274", "15"), ("Q3305213", "3")])
+        self.assertEqual(values["langs"], [("en", "10"), ("de", "2"), ("fr", "2")])
+        # sans ORDER BY, l'ordre d'arrivée est gardé
+        self.assertEqual(values["items"], [(None, "7"), (None, "9")])
+
+    def test_fused_plan_gives_same_results_with_fewer_queries(self):
+        config = WPPainterTemplate("fr").getDataConfig()
+        separate_plan = plan_page_queries(config, "Q42", "fr")
+        originals = {step["name"]: step["sparql"] for step in separate_plan}
+
+        separate_access = FusionAwareAccess(originals)
+        separate = [(step["name"], res) for step, res in PageBuildExecutor(separate_access).results(separate_plan)]
+        fused_access = FusionAwareAccess(originals)
+        executor = PageBuildExecutor(fused_access)
+        fused = [(step["name"], res) for step, res in executor.results(plan_page_queries(config, "Q42", "fr", fused=True))]
+
+        def rows(results):
+            # lignes d'une requête sans ORDER BY: ordre quelconque
+            return [(name, res["results"]["bindings"] if order_keys(originals[name]) else
+                     sorted(res["results"]["bindings"], key=repr)) for name, res in results if res]
+        self.assertEqual(rows(fused), rows(separate))
+        self.assertEqual((len(separate_access.queries), len(fused_access.queries)), (16, 4))
+        self.assertEqual(executor.stats["fused_queries"], 1)
+
+    def test_failed_fused_query_falls_back_to_separate_queries(self):
+        config = WPGenreTemplate("fr").getDataConfig()
+        originals = {step["name"]: step["sparql"] for step in plan_page_queries(config, "Q1", "fr")}
+        access = FusionAwareAccess(originals, fail_fused=True)
+        executor = PageBuildExecutor(access)
+        results = dict((step["name"], res) for step, res in executor.results(plan_page_queries(config, "Q1", "fr", fused=True)))
+        self.assertEqual(results["__NBTYPES__"]["results"]["bindings"], rows_for(originals["__NBTYPES__"]))
+        self.assertEqual(len(access.queries), 4 + 13)
+        self.assertEqual(executor.stats["fused_failures"], 1)
+
+
+    def test_entity_values(self):
+        self.assertEqual(entity_values("select ?l where { values ?qid { wd:__QID__ } ?qid rdfs:label ?l }"), "?qid")
+        self.assertEqual(entity_values("SELECT * WHERE { VALUES ?e {<http://www.wikidata.org/entity/__QID__>} }"), "?e")
+        # agrégat ou entité hors du VALUES: les entités se mêleraient
+        self.assertIsNone(entity_values("select (count(?s) as ?c) where { values ?q { wd:__QID__ } ?s wdt:P170 ?q }"))
+        self.assertIsNone(entity_values("select ?s where { values ?q { wd:__QID__ } ?s wdt:P170 wd:__QID__ }"))
+        self.assertIsNone(entity_values("select ?s where { ?s wdt:P170 wd:__QID__ }"))
+        for template in (WPPainterTemplate, WPGenreTemplate):
+            self.assertEqual(batch_plan(template().dataConfig),
+                             {"__ENTITYNAME__": "?qid", "__EXTERNALLINKSTABLE__": "?qid"})
+
+    def test_batch_values_query_and_split(self):
+        query = batch_values_query("select ?l where { values ?qid { wd:__QID__ } ?qid rdfs:label ?l }", "?qid", ["Q1", "Q2", "Q1"])
+        self.assertEqual(query, "select ?qid ?l where { VALUES ?qid { <http://www.wikidata.org/entity/Q1> "
+                                "<http://www.wikidata.org/entity/Q2> } ?qid rdfs:label ?l }")
+        res = {"head": {"vars": ["qid", "l"]}, "results": {"bindings": [
+            {"qid": {"value": "http://www.wikidata.org/entity/Q1"}, "l": {"value": "un"}},
+            {"qid": {"value": "http://www.wikidata.org/entity/Q2"}, "l": {"value": "deux"}}]}}
+        self.assertEqual(split_batch_result(res, "?qid", ["l"], "Q2"),
+                         {"head": {"vars": ["l"]}, "results": {"bindings": [{"l": {"value": "deux"}}]}})
+        self.assertEqual(split_batch_result(res, "?qid", ["qid", "l"], "Q3")["results"]["bindings"], [])
+        self.assertIsNone(split_batch_result({"error": "Query timeout"}, "?qid", ["l"], "Q1"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,7 @@ import datetime
 from urllib.parse import urlparse
 import os
 from WikimediaManagerPackage.configPrivee import config
+from WikimediaManagerPackage.columnar_result import columnar
 import time
 from urllib.parse import urlencode, urlunsplit
 # from WikimediaManagerPackage import configPrivee
@@ -143,12 +144,9 @@ class WikimediaAccess:
     def __enter__(self):
         # création du scheduler qui sera détruit dans __exit__(...)
         self.scheduler_id = createScheduler(["https://query.wikidata.org/sparql"], bearer=self.bearer)
-        data = {
-            "scheduler_id": self.scheduler_id,
-            "limit": 1.0/10.0 # un appel toutes les 10 secondes
-        }
-        # limit est le nombre d'appels par seconde pour ce manager
-        lim = requests.post(f"{self.baseurl}/api/set_rate_limit", json=data, headers=self.headers)
+        # nouveau scheduler: la limite gardée par cet accès ne vaut plus
+        self.rateLimit = None
+        self.setRateLimit(1.0/10.0)  # un appel toutes les 10 secondes
         return self
 
     def __exit__(self, exception_type, exception_value, exception_traceback):
@@ -177,19 +175,7 @@ class WikimediaAccess:
     def getOccupations(self, qid):
         sparqlQuery = """select ?occupation where {{ wd:{qid} wdt:P106 ?occupation }}""".format(qid=qid)
         sparqlres = self.sparqlQuery(sparqlQuery)
-        occupations = []
-        if type(sparqlres)==dict:
-            if sparqlres and "results" in sparqlres and "bindings" in sparqlres["results"]:
-                if len(sparqlres["results"]["bindings"]):
-                    list = sparqlres["results"]["bindings"]
-                    for elmt in list:
-                        occupations.append(elmt["occupation"]["value"].replace('http://www.wikidata.org/entity/', ''))
-        else:
-            if sparqlres and hasattr(sparqlres, "bindings"):
-                if len(sparqlres.bindings):
-                    list = sparqlres.bindings
-                    for elmt in list:
-                        occupations.append(elmt["occupation"].value.replace('http://www.wikidata.org/entity/', ''))
+        occupations = [value.replace('http://www.wikidata.org/entity/', '') for value in columnar(sparqlres).column("occupation")]
         return occupations
 
     def getTypes(self, qid):
@@ -200,19 +186,7 @@ class WikimediaAccess:
         # pour un genre (P136), on aura P31 'genre artistique' (Q1792379)
         sparqlQuery = """select ?type where {{ wd:{qid} wdt:P31 ?type }}""".format(qid=qid)
         sparqlres = self.sparqlQuery(sparqlQuery)
-        objectTypes = []
-        if type(sparqlres)==dict:
-            if sparqlres and "results" in sparqlres and "bindings" in sparqlres["results"]:
-                if len(sparqlres["results"]["bindings"]):
-                    list = sparqlres["results"]["bindings"]
-                    for elmt in list:
-                        objectTypes.append(elmt["type"]["value"].replace('http://www.wikidata.org/entity/', ''))
-        else:
-            if sparqlres and hasattr(sparqlres, "bindings"):
-                if len(sparqlres.bindings):
-                    list = sparqlres.bindings
-                    for elmt in list:
-                        objectTypes.append(elmt["type"].value.replace('http://www.wikidata.org/entity/', ''))
+        objectTypes = [value.replace('http://www.wikidata.org/entity/', '') for value in columnar(sparqlres).column("type")]
         return objectTypes
 
     def getWObjFct(self, fctname):
@@ -262,10 +236,7 @@ class WikimediaAccess:
         # __IMAGES_TABLE_BOXES__
         imageFormats = ['jpg','jpeg','png','gif','webp','tif','tiff', 'eps', 'svg', 'psd', 'ai']
         boxes = ""
-        if type(sparqlres)==dict:
-            images = [elmt["image"]["value"] for elmt in sparqlres["results"]["bindings"]]
-        else:
-            images = [elmt["image"].value for elmt in sparqlres.bindings]
+        images = self.columnar(sparqlres).column("image")
         count = 0
         for image in images:
             extension = self.get_file_extension_query_params(image).replace(".", "")
@@ -331,24 +302,10 @@ class WikimediaAccess:
     def getUrlImage(self, sparqlres, qid):
         url = None
         imageFormats = ['jpg', 'jpeg', 'png', 'gif', 'webp', 'tif', 'tiff', 'eps', 'svg', 'psd', 'ai']
-        if type(sparqlres)==dict:
-            if sparqlres and "results" in sparqlres and "bindings" in sparqlres["results"]:
-                if len(sparqlres["results"]["bindings"]):
-                    list = sparqlres["results"]["bindings"]
-                    for elmt in list:
-                        url = elmt["image"]["value"]
-                        extension = self.get_file_extension_query_params(url)
-                        if extension in imageFormats:
-                            break
-        else:
-            if sparqlres and hasattr(sparqlres, "bindings"):
-                if len(sparqlres.bindings):
-                    list = sparqlres.bindings
-                    for elmt in list:
-                        url = elmt["image"].value
-                        extension = self.get_file_extension_query_params(url)
-                        if extension in imageFormats:
-                            break
+        for url in self.columnar(sparqlres).column("image"):
+            extension = self.get_file_extension_query_params(url)
+            if extension in imageFormats:
+                break
         return url
 
     def getWikidataBarGraph(self, sparqlres, qid):
@@ -361,13 +318,42 @@ class WikimediaAccess:
         url = url + quote(sparql)
         return url
 
-    def sparqlQuery(self, query, format=None):
+    def setRateLimit(self, limit, headers=None):
+        # limit est le nombre d'appels par seconde pour ce manager; pas d'appel si la limite est inchangée
+        if getattr(self, "rateLimit", None) == limit:
+            return
+        data = {"scheduler_id": self.scheduler_id, "limit": limit}
+        lim = requests.post(f"{baseurl}/api/set_rate_limit", json=data, headers=headers if headers is not None else self.headers)
+        # limite gardée seulement si le serveur l'a acceptée: sinon elle sera redemandée au prochain appel
+        if 200 <= lim.status_code < 300:
+            self.rateLimit = limit
+
+    def waitResponse(self, reqinfo, headers):
+        # attente de la réponse: long-poll sur /api/wait (réveil dès que la réponse est stockée)
+        # repli sur l'interrogation de /api/status pour un serveur qui ne propose pas /api/wait
+        waitUrl = f"{baseurl}{reqinfo['wait_url']}" if "wait_url" in reqinfo else None
+        statusUrl = f"{baseurl}{reqinfo['status_url']}"
+        while True:
+            if waitUrl:
+                stat = requests.get(waitUrl, params={"timeout": 25}, headers=headers, timeout=60)
+            else:
+                stat = requests.get(statusUrl, headers=headers)
+            jstat = json.loads(stat.text)
+            if "status" in jstat and jstat["status"] == "complete":
+                return jstat["response"]
+            elif "status" in jstat and jstat["status"] == "pending":
+                if not waitUrl:
+                    time.sleep(0.3)
+            else:
+                # requête inconnue du serveur (expirée ou scheduler supprimé)
+                print(jstat)
+                return None
+
+    def sparqlQuery(self, query, format=None, priority=None):
         bearer = config['admin']["Bearer"]
         headers = {f"Authorization": f"Bearer {bearer}"} if bearer else {}
         scheduler_id = self.scheduler_id # createScheduler(["https://query.wikidata.org/sparql"], bearer=bearer)
-        # limit est le nombre d'appels par seconde pour ce manager
-        data = { "scheduler_id": scheduler_id, "limit": 0.5 }
-        lim = requests.post(f"{baseurl}/api/set_rate_limit", json=data, headers=headers)
+        self.setRateLimit(0.5, headers)
         cachedur = 600  # 0;  en secondes
         parameters = {"query": query, "format": format if format else "JSON"}
         encodedquery = urlencode(query=parameters, doseq=True)
@@ -380,25 +366,15 @@ class WikimediaAccess:
                 "User-Agent": "Scrutart-UA (https://scrutart.grains-de-culture.fr/; scrutart@grains-de-culture.fr)"
             }
         }
-        # mise de la requête dans la file d'attente
-        req = requests.get(f"{baseurl}/api/request", json=data, headers=headers)
-        uuidreq = json.loads(req.text)["uuid"]
-        statusUrl = f"{baseurl}{json.loads(req.text)['status_url']}"
-        while True:
-            stat = requests.get(statusUrl, headers=headers)
-            jstat = json.loads(stat.text)
-            if "status" in jstat and jstat["status"] == "complete":
-                rep = jstat["response"]
-                break
-            elif "status" in jstat and jstat["status"] == "pending":
-                time.sleep(0.3)
-            else:
-                # print(jstat)
-                if "error" in jstat and "Request ID not found:" in jstat["error"]:
-                    print(jstat)
-                    rep = None
-                    break
-                pass
+        if priority:
+            # voie de la file du scheduler: "interactive", "normal" ou "batch"
+            data["priority"] = priority
+        # mise de la requête dans la file d'attente; en POST, le serveur lit tous les champs
+        # (dont priority) dans le corps JSON, un GET n'est lu que dans la chaîne de requête
+        req = requests.post(f"{baseurl}/api/request", json=data, headers=headers)
+        reqinfo = json.loads(req.text)
+        uuidreq = reqinfo["uuid"]
+        rep = self.waitResponse(reqinfo, headers)
 
         # un scheduler pourrait être créé pour une série de requêtes au lieu de le faire requête par requête
         # en fait, c'est fait au niveau de la création, un nouvel objet n'est créé que s'il s'agit d'un
@@ -409,6 +385,47 @@ class WikimediaAccess:
         #    rep = json.loads(rep)
         return rep
 
+    def sparqlQueryBatch(self, queries, format=None, priority=None, on_result=None):
+        # soumet toutes les requêtes en un seul appel à /api/batch et lit le flux des résultats
+        # (une ligne JSON par requête terminée, dans l'ordre de fin); renvoie les réponses dans l'ordre des requêtes
+        # on_result(index, réponse) est appelé pour chaque ligne du flux, dès son arrivée
+        bearer = config['admin']["Bearer"]
+        headers = {f"Authorization": f"Bearer {bearer}"} if bearer else {}
+        self.setRateLimit(0.5, headers)
+        specs = []
+        for query in queries:
+            parameters = {"query": query, "format": format if format else "JSON"}
+            specs.append({
+                "url": urlunsplit(("https", "query.wikidata.org", "/sparql", urlencode(query=parameters, doseq=True), "")),
+                "method": "GET",
+                "cache_duration": 600,
+                "headers": {
+                    "User-Agent": "Scrutart-UA (https://scrutart.grains-de-culture.fr/; scrutart@grains-de-culture.fr)"
+                }
+            })
+        data = {"scheduler_id": self.scheduler_id, "requests": specs}
+        if priority:
+            data["priority"] = priority
+        req = requests.post(f"{baseurl}/api/batch", json=data, headers=headers)
+        batchinfo = json.loads(req.text)
+        if "stream_url" not in batchinfo:
+            print(batchinfo)
+            return [None] * len(specs)
+
+        results = [None] * len(specs)
+        with requests.get(f"{baseurl}{batchinfo['stream_url']}", headers=headers, stream=True, timeout=60) as stream:
+            for line in stream.iter_lines():
+                if not line:
+                    continue
+                item = json.loads(line)
+                if "index" in item:
+                    results[item["index"]] = item["response"]
+                    if on_result:
+                        on_result(item["index"], item["response"])
+                elif item.get("done"):
+                    break
+        return results
+
     def sparqlQuery2(self, query, format=None):
         logging.debug("SPARQLQUERY " + query)
         parameters = {
@@ -437,103 +454,51 @@ class WikimediaAccess:
         # res = self.wdqsWrapper.queryAndConvert()
         # return res
 
+    def columnar(self, sparqlres):
+        # les filtres d'une étape reçoivent la même réponse, l'un après l'autre: la dernière
+        # conversion est gardée par cet accès (une page), jusqu'à la réponse suivante
+        last = getattr(self, "_last_columnar", None)
+        if last is not None and last[0] is sparqlres:
+            return last[1]
+        result = columnar(sparqlres)
+        self._last_columnar = (sparqlres, result)
+        return result
+
     def getName(self, sparqlres, qid):
-        name = "???"
-        if type(sparqlres)==dict:
-            if sparqlres and "results" in sparqlres and "bindings" in sparqlres["results"]:
-                if len(sparqlres["results"]["bindings"]):
-                    list = sparqlres["results"]["bindings"]
-        else:
-            if sparqlres and hasattr(sparqlres, "bindings"):
-                if len(sparqlres.bindings):
-                    list = sparqlres.bindings
-        name = list[0]["qidLabel"].value if hasattr(list[0]["qidLabel"], "value") else list[0]["qidLabel"]["value"]
-        return name
+        return self.columnar(sparqlres).first("qidLabel", "???")
 
     def getLink(self, sparqlres, qid):
-        link = """<a href="">???</a>"""
-        if type(sparqlres)==dict:
-            if sparqlres and "results" in sparqlres and "bindings" in sparqlres["results"]:
-                if len(sparqlres["results"]["bindings"]):
-                    list = sparqlres["results"]["bindings"]
-                    name = list[0]["qidLabel"]["value"]
-                    uri = list[0]["qid"]["value"]
-                    link = """<a href="{uri}">{name}</a>""".format(uri=uri, name=name)
-        else:
-            if sparqlres and hasattr(sparqlres, "bindings"):
-                if len(sparqlres.bindings):
-                    list = sparqlres.bindings
-        name = list[0]["qidLabel"].value if hasattr(list[0]["qidLabel"], "value") else list[0]["qidLabel"]["value"]
-        uri = list[0]["qid"].value if hasattr(list[0]["qid"], "value") else list[0]["qid"]["value"]
-        link = """<a href="{uri}">{name}</a>""".format(uri=uri, name=name)
-        return link
+        result = self.columnar(sparqlres)
+        if not len(result):
+            return """<a href="">???</a>"""
+        return """<a href="{uri}">{name}</a>""".format(uri=result.first("qid"), name=result.first("qidLabel"))
 
     def getCurrentDate(self, sparqlres, qid):
         return str(datetime.date.today())
 
     def getInt(self, sparqlres, qid):
-        value = 0
-        list = []
-        if type(sparqlres)==dict:
-            if sparqlres and "results" in sparqlres and "bindings" in sparqlres["results"]:
-                if len(sparqlres["results"]["bindings"]):
-                    list = sparqlres["results"]["bindings"]
-                    value = list[0]["c"]["value"]
-        else:
-            if sparqlres and hasattr(sparqlres, "bindings"):
-                if len(sparqlres.bindings):
-                    list = sparqlres.bindings
-        value = list[0]["c"].value if hasattr(list, "value") else list[0]["c"]["value"]
-        return int(value)
+        return int(self.columnar(sparqlres).first("c", 0))
 
     def getLen(self, sparqlres, qid):
-        value = 0
-        if sparqlres:
-            value = len(sparqlres.bindings) if hasattr(sparqlres, "bindings") else len(sparqlres["results"]["bindings"])
-        return int(value)
+        return len(self.columnar(sparqlres))
 
     def getMainType(self, sparqlres, qid):
-        value = ""
-        if sparqlres:
-            if type(sparqlres)==dict:
-                if  "results" in sparqlres and "bindings" in sparqlres["results"]:
-                    if len(sparqlres["results"]["bindings"]):
-                        list = sparqlres["results"]["bindings"]
-                        name = list[0]["typeLabel"]["value"]
-                        uri = list[0]["type"]["value"]
-                        count = int(list[0]["c"]["value"])
-                        if (count > 1) and (self.lang == "fr"):
-                            name += "s"
-                        value = "{count} {type}".format(count=str(count), type=name)
-            else:
-                if len(sparqlres.bindings):
-                    list = sparqlres.bindings
-                    name = list[0]["typeLabel"].value
-                    uri = list[0]["type"].value
-                    count = int(list[0]["c"].value)
-                    if (count > 1) and (self.lang == "fr"):
-                        name += "s"
-                    value = "{count} {type}".format(count=str(count), type=name)
-        return value
+        result = self.columnar(sparqlres)
+        if not len(result):
+            return ""
+        name = result.first("typeLabel")
+        count = int(result.first("c"))
+        if (count > 1) and (self.lang == "fr"):
+            name += "s"
+        return "{count} {type}".format(count=str(count), type=name)
 
     def getOtherTypes(self, sparqlres, qid):
         value = ""
-        list = []
-        if sparqlres and "results" in sparqlres and "bindings" in sparqlres["results"]:
-            if len(sparqlres["results"]["bindings"]):
-                list = sparqlres["results"]["bindings"]
-        else:
-            if sparqlres and hasattr(sparqlres, "bindings"):
-                if len(sparqlres.bindings):
-                    list = sparqlres.bindings
-        for type in list[1:]:
-            name = type["typeLabel"].value  if hasattr(type["typeLabel"], "value") else type["typeLabel"]["value"]
-            uri = type["type"].value  if hasattr(type["type"], "value") else type["type"]["value"]
-            count = int(type["c"].value  if hasattr(type["c"], "value") else type["c"]["value"])
-            if (count > 1) and (self.lang == "fr"):
-                name += "s"
+        plural = "s" if self.lang == "fr" else ""
+        for name, count in self.columnar(sparqlres).rows("typeLabel", "c", start=1):
+            count = int(count)
             if (count >= 10):
-                value += "{count} {type}, ".format(count=str(count), type=name)
+                value += f"{count} {name}{plural}, "
         otherTypes = {
             "fr":" et d'autres types d'oeuvres plus exceptionnels.",
             "en": " and other more exceptional types of work.",
@@ -569,18 +534,8 @@ class WikimediaAccess:
             "http://www.wikidata.org/prop/direct/P2048": "{value} ({count}), ",  # height
             "http://www.wikidata.org/prop/direct/P2049": "{value} ({count}), ",  # width
         }
-        list = []
-        if sparqlres and "results" in sparqlres and "bindings" in sparqlres["results"]:
-            if len(sparqlres["results"]["bindings"]):
-                list = sparqlres["results"]["bindings"]
-        else:
-            if sparqlres and hasattr(sparqlres, "bindings"):
-                if len(sparqlres.bindings):
-                    list = sparqlres.bindings
         value = ""
-        for prop in list:
-            name = prop["propLabel"].value if hasattr(prop["propLabel"], "value") else prop["propLabel"]["value"]
-            propuri = prop["p"].value if hasattr(prop["p"], "value") else prop["p"]["value"]
+        for name, propuri in self.columnar(sparqlres).rows("propLabel", "p"):
             propid = propuri.replace("http://www.wikidata.org/prop/direct/", "")
             valuesList = ""
             sparqlquery = f"""SELECT DISTINCT ?v ?vLabel ?c WHERE {{
@@ -599,18 +554,7 @@ class WikimediaAccess:
             valuesList = ""
             res = self.sparqlQuery(sparqlquery)
             time.sleep(0.1)
-            listval = []
-            if res and "results" in res and "bindings" in res["results"]:
-                if len(res["results"]["bindings"]):
-                    listval = res["results"]["bindings"]
-            else:
-                if res and hasattr(res, "bindings"):
-                    if len(res.bindings):
-                        listval = res.bindings
-            for elmt in listval:
-                valLabel = elmt["vLabel"].value  if hasattr(elmt["vLabel"], "value") else elmt["vLabel"]["value"]
-                uriVal = elmt["v"].value  if hasattr(elmt["v"], "value") else elmt["v"]["value"]
-                count = elmt["c"].value  if hasattr(elmt["c"], "value") else elmt["c"]["value"]
+            for valLabel, uriVal, count in columnar(res).rows("vLabel", "v", "c"):
                 formatage = """<a href="{uri}">{value}</a> ({count}), """ if not propid in ["P571",
                                                                                             "P577",
                                                                                             "P2048",
@@ -630,33 +574,13 @@ class WikimediaAccess:
         return value
 
     def getItemList(self, sparqlres, qid):
-        value = ""
-        if sparqlres and "results" in sparqlres and "bindings" in sparqlres["results"]:
-            if len(sparqlres["results"]["bindings"]):
-                list = sparqlres["results"]["bindings"]
-                for elmt in list:
-                    name = elmt["vLabel"]["value"]
-                    uri = elmt["v"]["value"]
-                    count = int(elmt["c"]["value"])
-                    value += """      {name}\n""".format(name=name, uri=uri)
-                    # value += """      <a href="{uri}">{name}</a>\n""".format(name=name, uri=uri)
-        else:
-            if sparqlres and hasattr(sparqlres, "bindings"):
-                if len(sparqlres.bindings):
-                    list = sparqlres.bindings
-                    for elmt in list:
-                        name = elmt["vLabel"].value
-                        uri = elmt["v"].value
-                        count = int(elmt["c"].value)
-                        value += """      {name}\n""".format(name=name, uri=uri)
-                        # value += """      <a href="{uri}">{name}</a>\n""".format(name=name, uri=uri)
-        return value
+        # rendue une fois par réponse: getGenreList, getDepictList... repartent de cette liste
+        # avec lien: """      <a href="{uri}">{name}</a>\n""" sur les colonnes "v" et "vLabel"
+        result = self.columnar(sparqlres)
+        return result.derive("itemList", lambda: "".join(f"      {name}\n" for name in result.column("vLabel")))
 
     def getItemListSansMinus(self, sparqlres, qid):  # pas de - pour mermaid
-        value = self.getItemList(sparqlres, qid)
-        if value!="":
-            value = value.replace("-", " ")
-        return value
+        return self.columnar(sparqlres).derive("itemListSansMinus", lambda: self.getItemList(sparqlres, qid).replace("-", " "))
 
     def getGenreList(self, sparqlres, qid):
         value = self.getItemListSansMinus(sparqlres, qid)
@@ -692,21 +616,8 @@ class WikimediaAccess:
         return value
 
     def getCountByLang(self, sparqlres, qid, lang):
-        value = 0
-        if sparqlres and "results" in sparqlres and "bindings" in sparqlres["results"]:
-            if len(sparqlres["results"]["bindings"]):
-                list = sparqlres["results"]["bindings"]
-                for elmt in list:
-                    if elmt["lang"]["value"] == lang:
-                        value = elmt["c"]["value"]
-        else:
-            if sparqlres and hasattr(sparqlres, "bindings"):
-                if len(sparqlres.bindings):
-                    list = sparqlres.bindings
-                    for elmt in list:
-                        if elmt["lang"].value == lang:
-                            value = elmt["c"].value
-        return int(value)
+        # colonne lang extraite une fois par réponse, partagée par getCountFr/getCountEn
+        return int(self.columnar(sparqlres).last("lang", lang, "c", 0))
 
     def getCountFr(self, sparqlres, qid):
         value = self.getCountByLang(sparqlres, qid, "fr")
@@ -757,41 +668,21 @@ class WikimediaAccess:
         }
         linkTemplate = """<td><a href="__LINK__"><img class="wp-image-710" style="width: 50px;" src="__IMAGELINK__" alt="__ALTLINK__"></a></td>"""
         externalLinks = ""
-        if type(sparqlres)==dict:
-            if sparqlres and "results" in sparqlres and "bindings" in sparqlres["results"]:
-                if len(sparqlres["results"]["bindings"]):
-                    list = sparqlres["results"]["bindings"]
-                    for elmt in list:
-                        if "link" in elmt:
-                            link = elmt["link"]["value"]
-                            baseUrl = elmt["baseUrl"]["value"]
-                            imageDesc = imageFromBaseUrl.get(
-                                baseUrl,
-                                {
-                                    "imageUrl": "https://scrutart.grains-de-culture.fr/wp-content/uploads/2024/05/boutonScrutart-1.svg",
-                                    "alt": "lien interne scrutart"
-                                }
-                            )
-                            imageLink = imageDesc["imageUrl"]
-                            imageAlt = imageDesc["alt"]
-                            externalLinks += linkTemplate.replace("__LINK__", link).replace("__IMAGELINK__",
-                                                                                            imageLink).replace(
-                                "__ALTLINK__", imageAlt) + """\n"""
-        else:
-            if sparqlres and hasattr(sparqlres, "bindings"):
-                if len(sparqlres.bindings):
-                    list = sparqlres.bindings
-                    for elmt in list:
-                        if "link" in elmt:
-                            link = elmt["link"].value
-                            baseUrl = elmt["baseUrl"].value
-                            imageDesc = imageFromBaseUrl.get(
-                                baseUrl,
-                                {"imageUrl":"https://scrutart.grains-de-culture.fr/wp-content/uploads/2024/05/boutonScrutart-1.svg", "alt":"link"}
-                            )
-                            imageLink = imageDesc["imageUrl"]
-                            imageAlt = imageDesc["alt"]
-                            externalLinks += linkTemplate.replace("__LINK__", link).replace("__IMAGELINK__", imageLink).replace("__ALTLINK__",imageAlt)+"""\n"""
+        defaultDesc = {
+            "imageUrl": "https://scrutart.grains-de-culture.fr/wp-content/uploads/2024/05/boutonScrutart-1.svg",
+            "alt": "lien interne scrutart" if type(sparqlres)==dict else "link"
+        }
+        # gabarit complété une fois par baseUrl, il ne reste que le lien à insérer par ligne
+        templates = {}
+        for link, baseUrl in self.columnar(sparqlres).rows("link", "baseUrl"):
+            if link is not None:
+                template = templates.get(baseUrl)
+                if template is None:
+                    imageDesc = imageFromBaseUrl.get(baseUrl, defaultDesc)
+                    template = linkTemplate.replace("__IMAGELINK__", imageDesc["imageUrl"]).replace(
+                        "__ALTLINK__", imageDesc["alt"]).split("__LINK__") + ["""\n"""]
+                    templates[baseUrl] = template
+                externalLinks += template[0] + link + template[1] + template[2]
         return externalLinks
 
 
@@ -29,6 +29,7 @@ from datetime import datetime, timedelta
 import aiohttp
 
 from configPrivee import config
+from disk_cache import stable_digest, build_cache_key
 
 # Configuration
 API_IP_ADDRESS = "127.0.0.1"
@@ -180,8 +181,8 @@ class APIRequestScheduler:
         logger.info(f"Limite de taux mise à jour: {calls_per_second} appels/seconde")
 
     def get_cache_path(self, cache_key: str) -> str:
-        """Génère le chemin du fichier cache"""
-        return os.path.join(self.cache_dir, f"{abs(hash(str(cache_key)))}.json")
+        """Génère le chemin du fichier cache (empreinte stable entre redémarrages)"""
+        return os.path.join(self.cache_dir, f"{stable_digest(cache_key)}.json")
 
     def _cleanup_expired_cache(self):
         """Nettoie les fichiers de cache expirés"""
@@ -238,9 +239,8 @@ class APIRequestScheduler:
 
         print(f"🔄 Processing request {request_id[:8]}... - {method} {url}")
 
-        # Construct a cache key based on URL, payload, and request kwargs
-        cache_key = (url, frozenset(payload.items()) if payload else None,
-                     frozenset(request_kwargs.items()) if request_kwargs else None)
+        # Construct a canonical cache key (a frozenset repr depends on the per-process hash seed)
+        cache_key = build_cache_key(method, url, payload, headers, request_kwargs)
         cache_path = self.get_cache_path(cache_key)
 
         # ✅ Check cache first
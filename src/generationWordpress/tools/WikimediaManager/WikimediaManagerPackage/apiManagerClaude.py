@@ -7,16 +7,16 @@ import psutil
 import os
 import time
 import uuid
-from functools import wraps
-from queue import Queue, Empty
+from functools import wraps, partial
+from queue import Full, Queue, Empty
 from urllib.parse import urlparse
 import logging
 from logging.handlers import RotatingFileHandler
-from typing import Dict, Any, Optional, Tuple, List
-from aiohttp import ClientSession, ClientTimeout, ClientError
-from flask import Flask, request, jsonify
+from typing import Dict, Any, Optional, Tuple, List, Callable
+from aiohttp import ClientTimeout, ClientError
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_socketio import SocketIO, emit, join_room, leave_room
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from contextlib import asynccontextmanager
 import signal
 import atexit
@@ -24,6 +24,17 @@ from datetime import datetime, timedelta
 import aiohttp
 
 from configPrivee import config
+from disk_cache import DiskCache, build_cache_key, stable_digest
+from http_pool import HostSessionPool
+from async_queue import PriorityLaneQueue
+from result_store import ResultStore
+from request_journal import RequestJournal
+from event_bus import EventBus
+from failure_cache import FailureCache, classify_failure
+from raw_json import RawJSON, decode, encode_with_raw, is_json_content_type, looks_like_json_document
+from metrics import LatencyHistogram, prometheus_histogram, prometheus_metric
+from rate_limiter import TokenBucket, AdaptiveRateController, parse_retry_after
+from shared_state import SharedState, SharedTokenBucket
 
 # Configuration
 API_IP_ADDRESS = "127.0.0.1"
@@ -33,7 +44,42 @@ MAX_RETRIES = 3
 RETRY_BACKOFF_FACTOR = 1.5
 REQUEST_TIMEOUT = 30
 CACHE_CLEANUP_INTERVAL = 3600  # 1 hour
+CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', 2 * 1024 ** 3))  # 2 Go, éviction LRU au-delà
+# Compression des réponses en cache: auto (zstd si installé, sinon gzip), gzip, zstd, identity
+CACHE_COMPRESSION = os.getenv('CACHE_COMPRESSION', 'auto')
 MAX_QUEUE_SIZE = 10000
+MAX_BATCH_SIZE = 1000  # requêtes par appel à /api/batch
+PRIORITY_LANES = {'interactive': 8, 'normal': 3, 'batch': 1}  # poids du round-robin entre voies
+DEFAULT_PRIORITY = 'normal'
+RESULT_STORE_MAX_BYTES = int(os.getenv('RESULT_STORE_MAX_BYTES', 512 * 1024 ** 2))  # 512 Mo de réponses en attente
+RESULT_TTL = 300  # 5 minutes pour récupérer une réponse
+DELIVERED_RESULT_TTL = 30  # réponse déjà poussée au client par notification
+COALESCE_METHODS = ('GET', 'HEAD')  # méthodes idempotentes: requêtes identiques fusionnées
+LONG_POLL_TIMEOUT = 25  # secondes, sous les timeouts usuels des proxys
+# Attentes (long-poll, flux de lot, notifications) en green threads eventlet: intervalle de
+# vérification, doublé à chaque tour jusqu'au maximum
+GREEN_POLL_MIN_INTERVAL = 0.01
+GREEN_POLL_MAX_INTERVAL = 0.1
+NOTIFICATION_TOPIC = 'completion'  # sujet du bus pour les fins de requête à pousser aux clients socketio
+NOTIFICATION_BUFFER = int(os.getenv('NOTIFICATION_BUFFER', 1000))  # notifications en attente avant abandon
+RATE_LIMIT_BURST = int(os.getenv('RATE_LIMIT_BURST', 1))  # départs immédiats autorisés par pattern
+# Taux ajusté d'après les refus de l'amont (429/503, Retry-After), sous le taux configuré; désactivé par
+# ADAPTIVE_RATE_CONTROL=0 ou "adaptive": false sur /api/set_rate_limit
+ADAPTIVE_RATE_CONTROL = os.getenv('ADAPTIVE_RATE_CONTROL', '1') != '0'
+THROTTLE_STATUSES = (429, 503)
+MAX_IN_FLIGHT_REQUESTS = int(os.getenv('MAX_IN_FLIGHT_REQUESTS', 4))  # requêtes HTTP simultanées par scheduler
+# Réponses JSON gardées en octets (cache et clients servis sans décodage ni ré-encodage)
+RAW_JSON_RESPONSES = os.getenv('RAW_JSON_RESPONSES', '1') != '0'
+# Échecs des requêtes idempotentes resservis sans rappeler l'amont (durée selon la cause)
+NEGATIVE_CACHE = os.getenv('NEGATIVE_CACHE', '1') != '0'
+CIRCUIT_BREAKER_THRESHOLD = int(os.getenv('CIRCUIT_BREAKER_THRESHOLD', 3))  # échecs consécutifs avant ouverture
+# Journal sqlite des requêtes acceptées et des réponses non récupérées, rejoué au démarrage (désactivé si vide)
+REQUEST_JOURNAL = os.getenv('REQUEST_JOURNAL', '')
+# Fichier sqlite d'état partagé entre workers (plusieurs processus, ex. gunicorn): taux, requêtes
+# en vol, index du cache et réponses communs, /api/status et /api/wait servis par n'importe quel
+# worker (un lot /api/batch reste suivi par le worker qui l'a reçu); vide = état propre au processus
+SHARED_STATE = os.getenv('SHARED_STATE', '')
+SHARED_CLAIM_POLL_INTERVAL = 0.05  # secondes entre deux tentatives de reprise d'un appel tenu par un autre worker
 
 # Configuration du logging
 def setup_logging():
@@ -77,6 +123,8 @@ class RequestData:
     client_id: Optional[str] = None
     timestamp: float = None
     retry_count: int = 0
+    priority: str = DEFAULT_PRIORITY
+    coalesce_key: Optional[str] = None
 
     def __post_init__(self):
         if self.timestamp is None:
@@ -86,12 +134,26 @@ class RequestData:
         if self.request_kwargs is None:
             self.request_kwargs = {}
 
+@dataclass
+class BatchState:
+    """Lot de requêtes soumis en un appel; les terminées arrivent dans `completed`"""
+    batch_id: str
+    request_ids: List[str] = field(default_factory=list)
+    index: Dict[str, int] = field(default_factory=dict)
+    completed: Queue = field(default_factory=Queue)
+    signalled: set = field(default_factory=set)
+    delivered: int = 0
+    created_at: float = field(default_factory=time.time)
+
+
 class APIError(Exception):
     """Exception personnalisée pour les erreurs d'API"""
-    def __init__(self, message: str, status_code: int = None, request_id: str = None):
+    def __init__(self, message: str, status_code: int = None, request_id: str = None, reason: str = None):
         super().__init__(message)
         self.status_code = status_code
         self.request_id = request_id
+        # Cause classée (failure_cache.classify_failure); None: échec non mis en cache
+        self.reason = reason
 
 class RateLimitExceeded(APIError):
     """Exception pour les dépassements de limite de taux"""
@@ -120,14 +182,66 @@ class APIRequestScheduler:
         self.CALLS_PER_SECOND = 1
         self.CALL_INTERVAL = 1 / self.CALLS_PER_SECOND
 
+        # Journal durable: l'identifiant du scheduler est conservé d'un redémarrage à l'autre
+        self.journal = RequestJournal(REQUEST_JOURNAL) if REQUEST_JOURNAL else None
+        if self.journal:
+            self.scheduler_id = self.journal.scheduler_id_for(api_patterns, self.scheduler_id)
+
+        # État partagé entre workers: même identifiant de scheduler dans tous les processus
+        self.shared_state = SharedState(SHARED_STATE) if SHARED_STATE else None
+        if self.shared_state:
+            self.scheduler_id = self.shared_state.scheduler_id_for(api_patterns, self.scheduler_id)
+        self.shared_stats = {'waited_for_other_worker': 0, 'served_from_other_worker': 0,
+                             'results_from_other_worker': 0}
+
+        # Un seau à jetons par pattern: le taux limite les départs, pas la durée des requêtes
+        self.rate_limiters: Dict[str, TokenBucket] = {
+            str(getattr(pattern, "pattern", pattern)): self._new_bucket(str(getattr(pattern, "pattern", pattern)))
+            for pattern in api_patterns
+        }
+        # Le taux configuré sert de plafond; le contrôleur le réduit quand l'amont sature
+        self.rate_controllers: Dict[str, AdaptiveRateController] = {
+            key: AdaptiveRateController(bucket, enabled=ADAPTIVE_RATE_CONTROL)
+            for key, bucket in self.rate_limiters.items()
+        }
+        self.max_in_flight = MAX_IN_FLIGHT_REQUESTS
+        self.in_flight: set = set()
+
+        # Histogrammes de latence: appel amont par pattern, soumission -> réponse par voie
+        self.upstream_latency: Dict[str, LatencyHistogram] = {key: LatencyHistogram() for key in self.rate_limiters}
+        self.request_latency: Dict[str, LatencyHistogram] = {lane: LatencyHistogram() for lane in PRIORITY_LANES}
+
         # Queues et stockage
-        self.request_queue = Queue(maxsize=MAX_QUEUE_SIZE)
-        self.response_store: Dict[str, Any] = {}
+        # File alimentée par les handlers Flask, consommée sans blocage par la boucle du worker;
+        # une voie par classe de priorité pour que l'interactif ne patiente pas derrière les lots
+        self.request_queue = PriorityLaneQueue(PRIORITY_LANES, DEFAULT_PRIORITY, maxsize=MAX_QUEUE_SIZE)
+        # Réponses en attente de récupération: bornées en octets, avec TTL par entrée
+        self.response_store = ResultStore(
+            max_bytes=RESULT_STORE_MAX_BYTES,
+            ttl=RESULT_TTL,
+            delivered_ttl=DELIVERED_RESULT_TTL,
+            on_evict=self._on_result_evicted
+        )
         self.request_dict: Dict[str, RequestData] = {}
+        # Signalés dès que la réponse est stockée (long-poll de /api/wait)
+        self.completion_events: Dict[str, threading.Event] = {}
+        # Requêtes identiques en attente ou en vol: clé -> [meneuse, suiveuses...]
+        self.coalesced: Dict[str, List[str]] = {}
+        self.coalescing_stats = {'groups': 0, 'upstream_calls_saved': 0}
+        # Lots soumis via /api/batch, et lot de chaque requête
+        self.batches: Dict[str, BatchState] = {}
+        self.batch_of: Dict[str, str] = {}
+        # Cache négatif et disjoncteur par requête idempotente
+        self.failure_cache = FailureCache(threshold=CIRCUIT_BREAKER_THRESHOLD, enabled=NEGATIVE_CACHE)
 
         # Configuration du cache
         self.cache_dir = os.path.join(os.getcwd(), 'cache')
         self._ensure_cache_directory()
+        self.disk_cache = DiskCache(self.cache_dir, max_bytes=CACHE_MAX_BYTES, compression=CACHE_COMPRESSION,
+                                    shared=self.shared_state is not None)
+
+        # Pool de connexions HTTP par hôte, vivant aussi longtemps que le scheduler
+        self.http_pool = HostSessionPool(timeout=ClientTimeout(total=REQUEST_TIMEOUT))
 
         # Threading et async
         self.lock = threading.Lock()
@@ -144,6 +258,8 @@ class APIRequestScheduler:
         # Initialisation des threads
         self._start_worker_threads()
         self._start_cache_cleanup_thread()
+        if self.journal:
+            self._replay_journal()
 
         # Enregistrement des handlers de fermeture
         atexit.register(self.cleanup)
@@ -153,17 +269,46 @@ class APIRequestScheduler:
         self._initialized = True
         logger.info(f"APIRequestScheduler initialisé pour {len(api_patterns)} URLs - ID: {self.scheduler_id}")
 
+    def _new_bucket(self, pattern: str):
+        """Seau à jetons d'un pattern, dans l'état partagé entre workers s'il est configuré"""
+        if self.shared_state:
+            return SharedTokenBucket(self.shared_state, f"{self.scheduler_id} {pattern}",
+                                     self.CALLS_PER_SECOND, RATE_LIMIT_BURST)
+        return TokenBucket(self.CALLS_PER_SECOND, RATE_LIMIT_BURST)
+
     def _periodic_cleanup(self):
         """Thread de nettoyage périodique"""
         while not self.shutdown_event.is_set():
             try:
                 self._cleanup_old_requests()
+                self.failure_cache.evict_stale()
+                sample_process_memory()
                 # Attendre 60 secondes avant le prochain nettoyage
                 self.shutdown_event.wait(60)
             except Exception as e:
                 logger.error(f"Erreur dans le nettoyage périodique: {e}")
 
 
+    def _replay_journal(self):
+        """Remet en file les requêtes journalisées non traitées et à disposition les réponses
+        non récupérées (identifiants de requête inchangés)"""
+        pending, completed = self.journal.load(self.api_patterns)
+        with self.lock:
+            for request_id, response in completed:
+                self.response_store[request_id] = response
+
+        replayed = 0
+        for data in pending:
+            try:
+                self._admit(RequestData(**data))
+                replayed += 1
+            except RateLimitExceeded:
+                logger.error(f"Queue pleine: {len(pending) - replayed} requêtes journalisées non rejouées")
+                break
+
+        if pending or completed:
+            logger.info(f"Journal rejoué: {replayed} requêtes remises en file, {len(completed)} réponses restaurées")
+
     def _ensure_cache_directory(self):
         """Crée le répertoire de cache s'il n'existe pas"""
         try:
@@ -173,9 +318,9 @@ class APIRequestScheduler:
             raise APIError(f"Impossible de créer le répertoire cache: {e}")
 
     def _start_worker_threads(self):
-        """Démarre les threads de traitement"""
+        """Démarre le thread du worker et sa boucle d'événements asyncio"""
         try:
-            # Thread principal de traitement
+            self.loop = asyncio.new_event_loop()
             self.worker_thread = threading.Thread(
                 target=self._worker_wrapper,
                 name=f"APIWorker-{self.scheduler_id[:8]}",
@@ -183,15 +328,6 @@ class APIRequestScheduler:
             )
             self.worker_thread.start()
 
-            # Event loop asyncio
-            self.loop = asyncio.new_event_loop()
-            self.loop_thread = threading.Thread(
-                target=self._start_event_loop,
-                name=f"EventLoop-{self.scheduler_id[:8]}",
-                daemon=True
-            )
-            self.loop_thread.start()
-
             logger.info("Threads de traitement démarrés avec succès")
         except Exception as e:
             logger.error(f"Erreur lors du démarrage des threads: {e}")
@@ -222,58 +358,71 @@ class APIRequestScheduler:
     def _worker_wrapper(self):
         """Wrapper pour le worker asyncio"""
         try:
-            asyncio.run(self._process_queue())
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self._process_queue())
         except Exception as e:
             logger.error(f"Erreur critique dans le worker: {e}")
+        finally:
+            self.loop.close()
 
-    def _start_event_loop(self):
-        """Démarre la boucle d'événements asyncio"""
-        try:
-            asyncio.set_event_loop(self.loop)
-            self.loop.run_forever()
-        except Exception as e:
-            logger.error(f"Erreur dans la boucle d'événements: {e}")
+    def set_rate_limit(self, calls_per_second: float, burst: Optional[int] = None,
+                       pattern: Optional[str] = None, adaptive: Optional[bool] = None):
+        """Configure la limitation de taux (de tous les patterns, ou d'un seul)
 
-    def set_rate_limit(self, calls_per_second: float):
-        """Configure la limitation de taux"""
+        Avec le contrôle adaptatif, calls_per_second est un plafond: le taux effectif
+        baisse sur 429/503, puis remonte jusqu'à lui.
+        """
         if calls_per_second <= 0:
             raise ValueError("Le taux d'appels doit être positif")
-
-        self.CALLS_PER_SECOND = calls_per_second
-        self.CALL_INTERVAL = 1 / self.CALLS_PER_SECOND
-        logger.info(f"Limite de taux mise à jour: {calls_per_second} appels/seconde")
+        if burst is not None and burst < 1:
+            raise ValueError("La rafale doit être d'au moins 1 requête")
+        if pattern is not None and pattern not in self.rate_limiters:
+            raise ValueError(f"Pattern inconnu: {pattern}")
+
+        targets = [pattern] if pattern is not None else list(self.rate_limiters)
+        for key in targets:
+            if burst is not None:
+                self.rate_limiters[key].configure(self.rate_limiters[key].rate, burst)
+            if adaptive is not None:
+                self.rate_controllers[key].enabled = bool(adaptive)
+            self.rate_controllers[key].set_ceiling(calls_per_second)
+
+        if pattern is None:
+            self.CALLS_PER_SECOND = calls_per_second
+            self.CALL_INTERVAL = 1 / self.CALLS_PER_SECOND
+        logger.info(f"Limite de taux mise à jour: {calls_per_second} appels/seconde"
+                    f" (rafale: {burst}, pattern: {pattern or 'tous'})")
+
+    def set_max_in_flight(self, max_in_flight: int):
+        """Configure le nombre de requêtes HTTP simultanées"""
+        if max_in_flight < 1:
+            raise ValueError("Au moins une requête simultanée est requise")
+        self.max_in_flight = max_in_flight
+        logger.info(f"Requêtes simultanées: {max_in_flight}")
+
+    def _match_pattern(self, url: str) -> str:
+        """Retourne la clé du seau à jetons du pattern le plus spécifique couvrant l'URL"""
+        best = None
+        for pattern in self.api_patterns:
+            if hasattr(pattern, "pattern"):
+                if re.match(pattern, url):
+                    return pattern.pattern
+            elif url.startswith(str(pattern)) and (best is None or len(str(pattern)) > len(best)):
+                best = str(pattern)
+        return best if best is not None else next(iter(self.rate_limiters))
 
     def get_cache_path(self, cache_key: str) -> str:
-        """Génère le chemin du fichier cache"""
-        return os.path.join(self.cache_dir, f"{abs(hash(str(cache_key)))}.json")
+        """Génère le chemin du fichier cache (empreinte stable entre redémarrages)"""
+        return self.disk_cache.path_for(cache_key)
 
     def _cleanup_expired_cache(self):
-        """Nettoie les fichiers de cache expirés"""
+        """Nettoie les entrées de cache expirées puis applique la limite de taille (LRU)"""
         try:
-            current_time = time.time()
-            cleaned_count = 0
-
-            for filename in os.listdir(self.cache_dir):
-                if filename.endswith('.json'):
-                    filepath = os.path.join(self.cache_dir, filename)
-                    try:
-                        with open(filepath, 'r') as f:
-                            data = json.load(f)
-
-                        # Vérifier si le cache est expiré (plus de 24h)
-                        if current_time - data.get('timestamp', 0) > 86400:
-                            os.remove(filepath)
-                            cleaned_count += 1
-                    except (json.JSONDecodeError, OSError) as e:
-                        logger.warning(f"Erreur lors du nettoyage de {filepath}: {e}")
-                        try:
-                            os.remove(filepath)
-                            cleaned_count += 1
-                        except OSError:
-                            pass
+            expired_count = self.disk_cache.evict_expired()
+            lru_count = self.disk_cache.enforce_size_limit()
 
-            if cleaned_count > 0:
-                logger.info(f"{cleaned_count} fichiers de cache expirés supprimés")
+            if expired_count or lru_count:
+                logger.info(f"Cache nettoyé: {expired_count} entrées expirées, {lru_count} évincées (LRU)")
         except Exception as e:
             logger.error(f"Erreur lors du nettoyage du cache: {e}")
 
@@ -283,26 +432,36 @@ class APIRequestScheduler:
 
         while not self.shutdown_event.is_set():
             try:
-                # Récupère une requête avec timeout
-                try:
-                    request_data = self.request_queue.get(timeout=1.0)
-                except Empty:
-                    continue
+                # Attente non bloquante: la boucle reste libre tant que la file est vide
+                request_data = await self.request_queue.get()
 
                 if request_data is None:
                     break
 
-                await self._perform_request(request_data)
+                # Au plus max_in_flight requêtes en cours: une requête lente n'en bloque pas d'autres
+                while len(self.in_flight) >= self.max_in_flight:
+                    await asyncio.wait(self.in_flight, return_when=asyncio.FIRST_COMPLETED)
+
+                task = asyncio.create_task(self._perform_request(request_data))
+                self.in_flight.add(task)
+                task.add_done_callback(self.in_flight.discard)
                 self.request_queue.task_done()
 
             except Exception as e:
                 logger.error(f"Erreur dans le traitement de la queue: {e}")
 
+        if self.in_flight:
+            _, pending = await asyncio.wait(self.in_flight, timeout=1)
+            for task in pending:
+                task.cancel()
+        await self.http_pool.close()
+
     async def _perform_request(self, request_data: RequestData):
         """Effectue une requête HTTP avec gestion d'erreurs et retry - VERSION CORRIGÉE"""
         request_id = request_data.request_id
         client_id = request_data.client_id
         logger.info(f"Traitement de la requête {request_id[:8]}... - URL: {request_data.url}")
+        failure_key, upstream_start, claim_key = None, None, None
 
         try:
             # Vérification du cache
@@ -312,14 +471,28 @@ class APIRequestScheduler:
                     await self._store_response_safely(request_id, cached_response, client_id)
                     return
 
-            # Respect de la limite de taux
-            await asyncio.sleep(self.CALL_INTERVAL)
+            # Échec connu (cache négatif, disjoncteur ouvert): réponse immédiate, sans appel amont
+            if request_data.method.upper() in COALESCE_METHODS:
+                failure_key = stable_digest(self._generate_cache_key(request_data))
+                known_failure = self.failure_cache.check(failure_key)
+                if known_failure is not None:
+                    await self._store_response_safely(request_id, self._failure_response(request_data, known_failure),
+                                                      client_id)
+                    return
 
-            # Effectuer la requête HTTP avec timeout strict
-            api_response = await asyncio.wait_for(
-                self._make_http_request(request_data),
-                timeout=REQUEST_TIMEOUT + 5  # Timeout global plus strict
-            )
+                # Plusieurs workers: un seul appelle l'amont, les autres reprennent sa réponse en cache
+                if self.shared_state and request_data.cache_duration > 0:
+                    cached_response = await self._claim_upstream_call(request_data, failure_key)
+                    if cached_response is not None:
+                        await self._store_response_safely(request_id, cached_response, client_id)
+                        return
+                    claim_key = failure_key
+
+            # Effectuer la requête HTTP (un jeton du pattern par tentative)
+            upstream_start = time.perf_counter()
+            api_response = await self._make_http_request(request_data)
+            if failure_key:
+                self.failure_cache.record_success(failure_key)
 
             # Cache et stockage de la réponse
             if request_data.cache_duration > 0:
@@ -350,9 +523,55 @@ class APIRequestScheduler:
                 "url": request_data.url,
                 "error_type": type(e).__name__
             }
+            if isinstance(e, APIError):
+                error_response.update(status_code=e.status_code, reason=e.reason)
+                if failure_key and upstream_start is not None:
+                    self.failure_cache.record_failure(failure_key, e.reason, str(e), e.status_code,
+                                                      cost=time.perf_counter() - upstream_start)
             await self._store_response_safely(request_id, error_response, client_id)
             logger.error(f"Erreur lors du traitement de la requête {request_id[:8]}...: {str(e)}")
 
+        finally:
+            if claim_key:
+                await asyncio.get_running_loop().run_in_executor(None, self.shared_state.release, claim_key)
+            self.request_latency[request_data.priority].record(time.time() - request_data.timestamp)
+
+    async def _claim_upstream_call(self, request_data: RequestData, claim_key: str) -> Optional[Any]:
+        """Réserve l'appel amont de cette requête pour ce worker (None: l'appel est à faire ici).
+
+        Si un autre worker le tient, attend qu'il le relâche: sa réponse est alors dans le
+        cache disque partagé et elle est retournée. Sans réponse en cache (échec de l'autre
+        worker), la réservation est reprise et l'appel fait ici.
+        """
+        # transactions sqlite (jusqu'à BUSY_TIMEOUT si un autre worker écrit): hors de la boucle
+        loop = asyncio.get_running_loop()
+        waited = False
+        while not await loop.run_in_executor(None, self.shared_state.claim, claim_key):
+            if not waited:
+                waited = True
+                self.shared_stats['waited_for_other_worker'] += 1
+            await asyncio.sleep(SHARED_CLAIM_POLL_INTERVAL)
+        if waited:
+            cached_response = await self._check_cache(request_data)
+            if cached_response is not None:
+                await loop.run_in_executor(None, self.shared_state.release, claim_key)
+                self.shared_stats['served_from_other_worker'] += 1
+                return cached_response
+        return None
+
+    def _failure_response(self, request_data: RequestData, failure) -> Dict:
+        """Réponse d'erreur d'une requête dont l'échec est connu (failure_cache.FailureEntry)"""
+        return {
+            "error": failure.error,
+            "request_id": request_data.request_id,
+            "timestamp": time.time(),
+            "url": request_data.url,
+            "error_type": "circuit_open" if failure.failures >= self.failure_cache.threshold else "cached_failure",
+            "status_code": failure.status_code,
+            "reason": failure.reason,
+            "retry_after": round(max(failure.until - time.time(), 0), 1)
+        }
+
     async def _store_response_safely(self, request_id: str, response: Any, client_id: Optional[str]):
         """Stocke la réponse de manière thread-safe - NOUVELLE MÉTHODE"""
         try:
@@ -360,11 +579,18 @@ class APIRequestScheduler:
             async with asyncio.Lock():  # Lock asyncio pour éviter les race conditions
                 with self.lock:  # Lock threading pour compatibilité
                     self.response_store[request_id] = response
-
-            # Notification du client si connecté
-            if client_id and client_id in connected_clients:
-                await self._notify_client_safely(client_id, {
-                    "request_id": request_id,
+                    self._signal_completion(request_id)
+                    followers = self._complete_followers(request_id, response)
+
+            if self.journal:
+                self.journal.record_completed([request_id] + [follower_id for follower_id, _ in followers], response)
+            if self.shared_state:
+                await self._share_response([request_id] + [follower_id for follower_id, _ in followers], response)
+
+            # Notification des clients connectés (y compris ceux des requêtes fusionnées)
+            for notified_id, notified_client in [(request_id, client_id)] + followers:
+                self._publish_completion(notified_id, notified_client, {
+                    "request_id": notified_id,
                     "response": response,
                     "message": "Requête terminée avec succès"
                 })
@@ -372,43 +598,55 @@ class APIRequestScheduler:
         except Exception as e:
             logger.error(f"Erreur lors du stockage de la réponse {request_id[:8]}...: {e}")
 
-    async def _notify_client_safely(self, client_id: str, message: Dict):
-        """Notifie un client de manière sécurisée - NOUVELLE MÉTHODE"""
+    async def _share_response(self, request_ids: List[str], response: Any):
+        """Mode partagé: réponse écrite dans le cache disque partagé, lisible par les autres workers"""
+        result_key = f"result {request_ids[0]}"
         try:
-            # Timeout très court pour éviter les blocages
-            timeout = ClientTimeout(total=2)
-
-            notify_url = f"http://{API_IP_ADDRESS}:{API_PORT}/send_message"
-            data = {"client_id": client_id, "message": message}
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, partial(self.disk_cache.put, result_key, response, ttl=RESULT_TTL,
+                                                     request_id=request_ids[0]))
+            await loop.run_in_executor(None, self.shared_state.complete_requests, request_ids, result_key)
+        except Exception as e:
+            logger.error(f"Réponse {request_ids[0][:8]}... non partagée avec les autres workers: {e}")
+
+    def get_shared_response(self, request_id: str, raw: bool = False) -> Optional[Any]:
+        """Réponse d'une requête reçue par un autre worker, lue dans le cache disque partagé
+        (None tant qu'elle n'y est pas); comme get_response, elle n'est rendue qu'une fois"""
+        info = self.shared_state.request_info(request_id) if self.shared_state else None
+        if not info or not info['result_key']:
+            return None
+        response = self.disk_cache.get(info['result_key'], raw=True)
+        if response is not None:
+            self.shared_state.forget_request(request_id)
+            self.shared_stats['results_from_other_worker'] += 1
+        return response if raw else decode(response)
 
-            async with ClientSession(timeout=timeout) as session:
-                try:
-                    async with session.post(notify_url, json=data) as response:
-                        if response.status == 200:
-                            logger.debug(f"Client {client_id} notifié avec succès")
-                        else:
-                            logger.warning(f"Échec de notification du client {client_id}: {response.status}")
-                except asyncio.TimeoutError:
-                    logger.warning(f"Timeout lors de la notification du client {client_id}")
-                except Exception as e:
-                    logger.warning(f"Erreur de notification du client {client_id}: {e}")
+    def _publish_completion(self, request_id: str, client_id: Optional[str], message: Dict):
+        """Publie la fin d'une requête sur le bus de notifications: ni attente ni entrée/sortie,
+        l'envoi au client socketio est fait par la tâche de relais"""
+        if client_id and client_id in connected_clients:
+            notification_bus.publish(NOTIFICATION_TOPIC, {
+                "scheduler_id": self.scheduler_id,
+                "request_id": request_id,
+                "client_id": client_id,
+                "message": message
+            })
 
-        except Exception as e:
-            logger.error(f"Erreur critique lors de la notification du client {client_id}: {e}")
+    def mark_delivered(self, request_id: str):
+        """Réponse poussée au client: conservée moins longtemps"""
+        with self.lock:
+            self.response_store.mark_delivered(request_id)
 
     async def _check_cache(self, request_data: RequestData) -> Optional[Any]:
         """Vérifie si une réponse en cache est disponible"""
         try:
             cache_key = self._generate_cache_key(request_data)
-            cache_path = self.get_cache_path(cache_key)
-
-            if os.path.exists(cache_path):
-                with open(cache_path, 'r') as cache_file:
-                    cached_data = json.load(cache_file)
-
-                if time.time() - cached_data['timestamp'] < request_data.cache_duration:
-                    logger.info(f"Cache hit pour la requête {request_data.request_id[:8]}...")
-                    return cached_data['response']
+            # Lecture et décompression hors de la boucle d'événements
+            cached_response = await asyncio.get_running_loop().run_in_executor(
+                None, partial(self.disk_cache.get, cache_key, request_data.cache_duration, raw=RAW_JSON_RESPONSES))
+            if cached_response is not None:
+                logger.info(f"Cache hit pour la requête {request_data.request_id[:8]}...")
+                return cached_response
 
         except Exception as e:
             logger.warning(f"Erreur lors de la vérification du cache: {e}")
@@ -416,36 +654,37 @@ class APIRequestScheduler:
         return None
 
     def _generate_cache_key(self, request_data: RequestData) -> str:
-        """Génère une clé de cache unique"""
-        key_components = [
+        """Génère une clé de cache canonique (méthode, URL, payload, en-têtes pertinents)"""
+        return build_cache_key(
+            request_data.method,
             request_data.url,
-            str(request_data.payload) if request_data.payload else '',
-            str(request_data.method),
-            str(request_data.headers),
-            str(request_data.request_kwargs)
-        ]
-        return '|'.join(key_components)
+            request_data.payload,
+            request_data.headers,
+            request_data.request_kwargs
+        )
 
     async def _make_http_request(self, request_data: RequestData) -> Any:
-        """Effectue la requête HTTP avec retry automatique"""
+        """Effectue la requête HTTP avec retry automatique
+
+        Chaque tentative consomme un jeton du pattern: les retries respectent le taux.
+        Un 429/503 réduit le taux du pattern et suspend ses départs pendant le Retry-After.
+        """
         timeout = ClientTimeout(total=REQUEST_TIMEOUT)
+        pattern = self._match_pattern(request_data.url)
+        controller = self.rate_controllers[pattern]
 
         for attempt in range(MAX_RETRIES + 1):
-            session = None  # ✅ AJOUT: Initialiser session à None
             try:
-                # ✅ MODIFICATION: Créer la session avec un connecteur limité
-                connector = aiohttp.TCPConnector(
-                    limit=20,
-                    limit_per_host=10,
-                    enable_cleanup_closed=True
-                )
-
-                session = ClientSession(timeout=timeout, connector=connector)
+                await self.rate_limiters[pattern].acquire()
+
+                # Session du pool de l'hôte: les connexions keep-alive sont réutilisées
+                session = self.http_pool.get_session(request_data.url)
                 method = request_data.method.upper()
 
                 # Préparation des paramètres de requête
                 request_params = {
                     'headers': request_data.headers,
+                    'timeout': timeout,
                     **request_data.request_kwargs
                 }
 
@@ -455,14 +694,42 @@ class APIRequestScheduler:
                     request_params['params'] = request_data.payload
 
                 # Effectuer la requête
+                upstream_start = time.perf_counter()
                 async with session.request(method, request_data.url, **request_params) as response:
+                    if response.status in THROTTLE_STATUSES:
+                        pause = controller.on_throttled(parse_retry_after(response.headers.get('Retry-After')))
+                        if attempt == MAX_RETRIES:
+                            raise APIError(f"Amont saturé (HTTP {response.status}) après {MAX_RETRIES + 1} tentatives",
+                                           status_code=response.status, request_id=request_data.request_id)
+                        logger.warning(f"HTTP {response.status} pour {request_data.request_id[:8]}..., départs suspendus "
+                                       f"{pause:.1f}s, taux ramené à {self.rate_limiters[pattern].rate:.2f}/s")
+                        # Pas d'attente ici: la prochaine tentative attend la fin de la pause du pattern
+                        continue
+
                     response.raise_for_status()
 
-                    # Tentative de parsing JSON
-                    try:
-                        return await response.json()
-                    except:
-                        return await response.text()
+                    result = None
+                    if RAW_JSON_RESPONSES and is_json_content_type(response.content_type):
+                        # Corps gardé tel quel: décodé seulement si un consommateur le demande
+                        body = await response.read()
+                        if looks_like_json_document(body):
+                            result = RawJSON(body)
+                        else:
+                            result = body.decode(response.charset or 'utf-8', errors='replace')
+                    if result is None:
+                        # Tentative de parsing JSON
+                        try:
+                            result = await response.json()
+                        except:
+                            result = await response.text()
+
+                latency = time.perf_counter() - upstream_start
+                self.upstream_latency[pattern].record(latency)
+                controller.on_success(latency)
+                return result
+
+            except APIError:
+                raise
 
             except asyncio.TimeoutError:
                 error_msg = f"Timeout lors de la requête (tentative {attempt + 1}/{MAX_RETRIES + 1})"
@@ -470,7 +737,7 @@ class APIRequestScheduler:
 
                 if attempt == MAX_RETRIES:
                     raise APIError(f"Timeout après {MAX_RETRIES + 1} tentatives",
-                                   request_id=request_data.request_id)
+                                   request_id=request_data.request_id, reason=classify_failure(timeout=True))
 
             except ClientError as e:
                 error_msg = f"Erreur client HTTP: {str(e)} (tentative {attempt + 1}/{MAX_RETRIES + 1})"
@@ -479,11 +746,14 @@ class APIRequestScheduler:
                 # Ne pas retry sur certaines erreurs client (4xx)
                 if hasattr(e, 'status') and 400 <= e.status < 500:
                     raise APIError(f"Erreur client HTTP {e.status}: {str(e)}",
-                                   status_code=e.status, request_id=request_data.request_id)
+                                   status_code=e.status, request_id=request_data.request_id,
+                                   reason=classify_failure(e.status))
 
                 if attempt == MAX_RETRIES:
+                    status = getattr(e, 'status', None)
                     raise APIError(f"Erreur HTTP après {MAX_RETRIES + 1} tentatives: {str(e)}",
-                                   request_id=request_data.request_id)
+                                   status_code=status, request_id=request_data.request_id,
+                                   reason=classify_failure(status))
 
             except Exception as e:
                 error_msg = f"Erreur inattendue: {str(e)} (tentative {attempt + 1}/{MAX_RETRIES + 1})"
@@ -493,16 +763,6 @@ class APIRequestScheduler:
                     raise APIError(f"Erreur après {MAX_RETRIES + 1} tentatives: {str(e)}",
                                    request_id=request_data.request_id)
 
-            finally:
-                # ✅ CORRECTION CRITIQUE: Fermer la session proprement
-                if session and not session.closed:
-                    try:
-                        await session.close()
-                        # ✅ AJOUT: Attendre que les connexions se ferment
-                        await asyncio.sleep(0.01)  # Très court délai
-                    except Exception as e:
-                        logger.debug(f"Erreur mineure lors de la fermeture de session: {e}")
-
             # Attente avant retry avec backoff exponentiel
             if attempt < MAX_RETRIES:
                 wait_time = RETRY_BACKOFF_FACTOR ** attempt
@@ -513,17 +773,10 @@ class APIRequestScheduler:
         """Met en cache la réponse"""
         try:
             cache_key = self._generate_cache_key(request_data)
-            cache_path = self.get_cache_path(cache_key)
-
-            cache_data = {
-                'response': response,
-                'timestamp': time.time(),
-                'request_id': request_data.request_id
-            }
-
-            with open(cache_path, 'w') as cache_file:
-                json.dump(cache_data, cache_file, default=str)
-
+            # Sérialisation et compression hors de la boucle d'événements
+            await asyncio.get_running_loop().run_in_executor(
+                None, partial(self.disk_cache.put, cache_key, response,
+                                        ttl=request_data.cache_duration, request_id=request_data.request_id))
             logger.debug(f"Réponse mise en cache: {request_data.request_id[:8]}...")
 
         except Exception as e:
@@ -533,11 +786,13 @@ class APIRequestScheduler:
         """Stocke la réponse et notifie le client si nécessaire"""
         with self.lock:
             self.response_store[request_id] = response
+            self._signal_completion(request_id)
+            followers = self._complete_followers(request_id, response)
 
-        # Notification du client WebSocket
-        if client_id and client_id in connected_clients:
-            await self._notify_client(client_id, {
-                "request_id": request_id,
+        # Notification des clients WebSocket
+        for notified_id, notified_client in [(request_id, client_id)] + followers:
+            self._publish_completion(notified_id, notified_client, {
+                "request_id": notified_id,
                 "response": response,
                 "message": "Requête terminée avec succès"
             })
@@ -561,32 +816,14 @@ class APIRequestScheduler:
         # Stockage de l'erreur
         with self.lock:
             self.response_store[request_id] = error_response
+            self._signal_completion(request_id)
 
         # Notification du client
-        if request_data.client_id and request_data.client_id in connected_clients:
-            await self._notify_client(request_data.client_id, {
-                "request_id": request_id,
-                "error": str(error),
-                "message": "Erreur lors du traitement de la requête"
-            })
-
-    async def _notify_client(self, client_id: str, message: Dict):
-        """Notifie un client via WebSocket"""
-        try:
-            notify_url = f"http://{API_IP_ADDRESS}:{API_PORT}/send_message"
-            data = {"client_id": client_id, "message": message}
-
-            # Utiliser asyncio pour l'appel HTTP
-            timeout = ClientTimeout(total=5)
-            async with ClientSession(timeout=timeout) as session:
-                async with session.post(notify_url, json=data) as response:
-                    if response.status == 200:
-                        logger.debug(f"Client {client_id} notifié avec succès")
-                    else:
-                        logger.warning(f"Échec de notification du client {client_id}: {response.status}")
-
-        except Exception as e:
-            logger.error(f"Erreur lors de la notification du client {client_id}: {e}")
+        self._publish_completion(request_id, request_data.client_id, {
+            "request_id": request_id,
+            "error": str(error),
+            "message": "Erreur lors du traitement de la requête"
+        })
 
     def validate_url(self, base_url):
         """Valide l'URL contre les patterns autorisés"""
@@ -604,9 +841,13 @@ class APIRequestScheduler:
     def add_request(self, url: str, payload: Optional[Dict] = None,
                    cache_duration: int = 0, method: str = "POST",
                    client_id: Optional[str] = None, headers: Optional[Dict] = None,
+                   priority: str = DEFAULT_PRIORITY, batch_id: Optional[str] = None,
                    **request_kwargs) -> Tuple[str, float]:
-        """Ajoute une requête à la queue"""
+        """Ajoute une requête à la queue, dans la voie de sa priorité"""
         try:
+            if priority not in PRIORITY_LANES:
+                raise ValueError(f"Priorité inconnue: {priority} (attendu: {', '.join(PRIORITY_LANES)})")
+
             # Validation de l'URL
             parsed_url = urlparse(url)
             base_url = f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}"
@@ -628,51 +869,107 @@ class APIRequestScheduler:
                 headers=headers or {},
                 cache_duration=cache_duration,
                 request_kwargs=request_kwargs,
-                client_id=client_id
+                client_id=client_id,
+                priority=priority
             )
 
-            # Ajout à la queue et au dictionnaire de suivi
-            self.request_queue.put(request_data)
-
-            with self.lock:
-                self.request_dict[request_id] = request_data
+            if request_data.method in COALESCE_METHODS:
+                request_data.coalesce_key = self._generate_cache_key(request_data)
 
-            estimated_delay = self.request_queue.qsize() * self.CALL_INTERVAL
+            if self.journal:
+                # Écrit avant que le client ne reçoive l'identifiant: la requête survit à un arrêt
+                self.journal.record_accepted(self.api_patterns, request_id, asdict(request_data))
+            if self.shared_state:
+                # /api/status et /api/wait peuvent arriver sur un autre worker
+                self.shared_state.register_request(request_id, self.scheduler_id)
 
-            logger.info(f"Requête {request_id[:8]}... ajoutée à la queue - Délai estimé: {estimated_delay:.1f}s")
-            return request_id, estimated_delay
+            try:
+                return self._admit(request_data, batch_id)
+            except RateLimitExceeded:
+                if self.journal:
+                    self.journal.record_delivered(request_id)
+                if self.shared_state:
+                    self.shared_state.forget_request(request_id)
+                raise
 
         except Exception as e:
             logger.error(f"Erreur lors de l'ajout de la requête: {e}")
             raise
 
-    def _cleanup_old_requests(self):
-        """Nettoie les anciennes requêtes (fallback safety)"""
-        current_time = time.time()
-        cleanup_delay = 300  # 5 minutes
-
+    def _admit(self, request_data: RequestData, batch_id: Optional[str] = None) -> Tuple[str, float]:
+        """Enregistre une requête et la met en file, ou la greffe sur une requête identique en cours"""
+        request_id, url = request_data.request_id, request_data.url
+        # Ajout au dictionnaire de suivi puis à la queue (le worker peut la traiter aussitôt)
         with self.lock:
-            # Identifier les requêtes anciennes qui n'ont pas été récupérées
-            old_requests = []
-
-            for request_id, request_data in list(self.request_dict.items()):
-                # Si la requête date de plus de cleanup_delay secondes
-                if current_time - request_data.timestamp > cleanup_delay:
-                    # Et qu'elle a une réponse prête (donc traitée)
-                    if request_id in self.response_store:
-                        old_requests.append(request_id)
-
-            # Nettoyer les anciennes requêtes
-            for request_id in old_requests:
+            self.request_dict[request_id] = request_data
+            self.completion_events[request_id] = threading.Event()
+            if batch_id in self.batches:
+                batch = self.batches[batch_id]
+                batch.index[request_id] = len(batch.request_ids)
+                batch.request_ids.append(request_id)
+                self.batch_of[request_id] = batch_id
+
+            # Requête identique déjà en attente ou en vol: on se greffe sur son résultat
+            group = self.coalesced.get(request_data.coalesce_key) if request_data.coalesce_key else None
+            if group is not None:
+                if len(group) == 1:
+                    self.coalescing_stats['groups'] += 1
+                group.append(request_id)
+                self.coalescing_stats['upstream_calls_saved'] += 1
+                logger.info(f"Requête {request_id[:8]}... fusionnée avec {group[0][:8]}...")
+                return request_id, self.request_queue.qsize() / self.rate_limiters[self._match_pattern(url)].rate
+            if request_data.coalesce_key:
+                self.coalesced[request_data.coalesce_key] = [request_id]
+
+        try:
+            self.request_queue.put(request_data)
+        except Full:
+            with self.lock:
                 self.request_dict.pop(request_id, None)
-                self.response_store.pop(request_id, None)
-                logger.warning(f"Nettoyage automatique de la requête ancienne {request_id[:8]}...")
+                self.completion_events.pop(request_id, None)
+                self.coalesced.pop(request_data.coalesce_key, None)
+            raise RateLimitExceeded("Queue pleine, requête rejetée")
 
-            if old_requests:
-                logger.info(f"Nettoyage automatique: {len(old_requests)} requêtes supprimées")
+        estimated_delay = self.request_queue.qsize() / self.rate_limiters[self._match_pattern(url)].rate
 
-    def get_response(self, request_id: str) -> Optional[Any]:
-        """Récupère la réponse d'une requête et nettoie les références"""
+        logger.info(f"Requête {request_id[:8]}... ajoutée à la queue - Délai estimé: {estimated_delay:.1f}s")
+        return request_id, estimated_delay
+
+    def _cleanup_old_requests(self):
+        """Évince les réponses non récupérées dont le TTL est dépassé (et leurs requêtes),
+        puis les lots abandonnés dont plus aucune requête n'est suivie"""
+        with self.lock:
+            old_requests = self.response_store.evict_expired()
+
+            for batch_id, batch in list(self.batches.items()):
+                if (time.time() - batch.created_at > RESULT_TTL
+                        and not any(rid in self.request_dict for rid in batch.request_ids)):
+                    self.batches.pop(batch_id, None)
+                    for request_id in batch.request_ids:
+                        self.batch_of.pop(request_id, None)
+
+        if self.shared_state:
+            self.shared_state.evict_requests(RESULT_TTL)
+
+        if old_requests:
+            logger.info(f"Nettoyage automatique: {len(old_requests)} requêtes supprimées")
+
+    def _on_result_evicted(self, request_id: str, reason: str):
+        """Rappel du stockage des réponses (sous self.lock): oublie la requête associée"""
+        # Un lot en attente de cette réponse la recevra comme évincée
+        self._signal_completion(request_id)
+        self.request_dict.pop(request_id, None)
+        self.completion_events.pop(request_id, None)
+        if self.journal:
+            self.journal.record_delivered(request_id)
+        logger.warning(f"Réponse de la requête {request_id[:8]}... évincée ({reason})")
+
+    def get_response(self, request_id: str, raw: bool = False) -> Optional[Any]:
+        """Récupère la réponse d'une requête et nettoie les références
+
+        raw=True: une réponse JSON gardée en octets est rendue telle quelle (RawJSON),
+        sinon elle est décodée ici, hors du verrou.
+        """
         with self.lock:
             # Récupérer la réponse
             response = self.response_store.pop(request_id, None)
@@ -681,9 +978,155 @@ class APIRequestScheduler:
                 # ✅ MAINTENANT on peut supprimer du request_dict
                 # puisque le client a récupéré sa réponse
                 self.request_dict.pop(request_id, None)
+                self.completion_events.pop(request_id, None)
                 logger.debug(f"Réponse récupérée et nettoyée pour {request_id[:8]}...")
 
-            return response
+        if response is not None and self.journal:
+            self.journal.record_delivered(request_id)
+        if response is not None and self.shared_state:
+            self.shared_state.forget_request(request_id)
+        return response if raw else decode(response)
+
+    def _complete_followers(self, request_id: str, response: Any) -> List[Tuple[str, Optional[str]]]:
+        """Distribue la réponse d'une meneuse aux requêtes fusionnées; à appeler sous self.lock
+
+        Retourne les (request_id, client_id) des suiveuses à notifier.
+        """
+        request_data = self.request_dict.get(request_id)
+        if request_data is None or request_data.coalesce_key is None:
+            return []
+        group = self.coalesced.get(request_data.coalesce_key)
+        if not group or group[0] != request_id:
+            return []
+        del self.coalesced[request_data.coalesce_key]
+
+        followers = []
+        for follower_id in group[1:]:
+            follower = self.request_dict.get(follower_id)
+            if follower is None:
+                continue
+            self.response_store.put(follower_id, response, size=self.response_store.size_of(request_id))
+            self._signal_completion(follower_id)
+            followers.append((follower_id, follower.client_id))
+        return followers
+
+    def _signal_completion(self, request_id: str):
+        """Réveille les attentes sur une requête; à appeler sous self.lock"""
+        event = self.completion_events.get(request_id)
+        if event is not None:
+            event.set()
+        batch = self.batches.get(self.batch_of.get(request_id))
+        if batch is not None and request_id not in batch.signalled:
+            batch.signalled.add(request_id)
+            batch.completed.put(request_id)
+
+    def add_batch(self, requests: List[Dict], client_id: Optional[str] = None,
+                  priority: str = DEFAULT_PRIORITY) -> Tuple[str, List[str]]:
+        """Ajoute un lot de requêtes (dicts url, method, payload, headers, cache_duration,
+        request_kwargs, priority); retourne l'identifiant du lot et ceux des requêtes"""
+        if not requests:
+            raise ValueError("Lot vide")
+        if len(requests) > MAX_BATCH_SIZE:
+            raise ValueError(f"Lot trop grand: {len(requests)} requêtes (max {MAX_BATCH_SIZE})")
+
+        # Validation complète avant tout ajout: un lot est accepté ou refusé en entier
+        for i, spec in enumerate(requests):
+            if not isinstance(spec, dict) or not spec.get("url"):
+                raise ValueError(f"Requête {i}: URL requise")
+            parsed_url = urlparse(spec["url"])
+            if not self.validate_url(f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}"):
+                raise ValueError(f"Requête {i}: URL non gérée par cette instance: {spec['url']}")
+            if spec.get("priority", priority) not in PRIORITY_LANES:
+                raise ValueError(f"Requête {i}: priorité inconnue: {spec.get('priority')}")
+        if self.request_queue.qsize() + len(requests) > MAX_QUEUE_SIZE:
+            raise RateLimitExceeded("Queue pleine, lot rejeté")
+
+        batch = BatchState(batch_id=str(uuid.uuid4()))
+        with self.lock:
+            self.batches[batch.batch_id] = batch
+
+        for spec in requests:
+            self.add_request(
+                url=spec["url"],
+                payload=spec.get("payload"),
+                cache_duration=max(int(spec.get("cache_duration", 0)), 0),
+                method=spec.get("method", "POST"),
+                client_id=client_id,
+                headers=spec.get("headers") or {},
+                priority=spec.get("priority", priority),
+                batch_id=batch.batch_id,
+                **(spec.get("request_kwargs") or {})
+            )
+
+        logger.info(f"Lot {batch.batch_id[:8]}... ajouté: {len(batch.request_ids)} requêtes")
+        return batch.batch_id, list(batch.request_ids)
+
+    def next_batch_result(self, batch_id: str, timeout: float,
+                          wait_fn: Optional[Callable[[Callable[[], Any], float], Any]] = None,
+                          raw: bool = False) -> Optional[Dict]:
+        """Prochain résultat terminé d'un lot (None si rien dans le délai); lève KeyError si lot inconnu
+
+        wait_fn(poll, timeout) permet de remplacer l'attente bloquante sur la file (cf. eventlet):
+        il rappelle poll() jusqu'à une valeur ou jusqu'au timeout.
+        """
+        with self.lock:
+            batch = self.batches.get(batch_id)
+        if batch is None:
+            raise KeyError(batch_id)
+
+        if wait_fn is not None and timeout > 0:
+            def poll():
+                try:
+                    return batch.completed.get_nowait()
+                except Empty:
+                    return None
+            request_id = wait_fn(poll, timeout)
+            if request_id is None:
+                return None
+        else:
+            try:
+                request_id = batch.completed.get(timeout=timeout)
+            except Empty:
+                return None
+
+        response = self.get_response(request_id, raw=raw)
+        with self.lock:
+            self.batch_of.pop(request_id, None)
+            batch.delivered += 1
+            if batch.delivered >= len(batch.request_ids):
+                self.batches.pop(batch_id, None)
+
+        if response is None:
+            response = {"error": "Réponse évincée avant sa lecture", "request_id": request_id, "error_type": "evicted"}
+        return {"index": batch.index[request_id], "request_id": request_id, "response": response}
+
+    def get_batch_progress(self, batch_id: str) -> Optional[Dict]:
+        """Avancement d'un lot (None si lot inconnu ou entièrement livré)"""
+        with self.lock:
+            batch = self.batches.get(batch_id)
+            if batch is None:
+                return None
+            return {
+                "batch_id": batch_id,
+                "total": len(batch.request_ids),
+                "delivered": batch.delivered,
+                "ready": batch.completed.qsize()
+            }
+
+    def wait_for_response(self, request_id: str, timeout: float,
+                          wait_fn: Optional[Callable[[threading.Event, float], bool]] = None,
+                          raw: bool = False) -> Optional[Any]:
+        """Attend (au plus timeout secondes) puis récupère la réponse d'une requête
+
+        wait_fn permet de remplacer l'attente bloquante threading.Event.wait (cf. eventlet).
+        """
+        with self.lock:
+            event = None if request_id in self.response_store else self.completion_events.get(request_id)
+
+        if event is not None:
+            (wait_fn or threading.Event.wait)(event, timeout)
+
+        return self.get_response(request_id, raw=raw)
 
     def has_request(self, request_id: str) -> bool:
         """Vérifie si une requête existe (en cours OU terminée mais non récupérée)"""
@@ -705,12 +1148,50 @@ class APIRequestScheduler:
             return {
                 "scheduler_id": self.scheduler_id,
                 "queue_size": self.request_queue.qsize(),
+                "lanes": self.request_queue.get_stats(),
                 "pending_requests": len(self.request_dict),
                 "pending_responses": len(self.response_store),
+                "response_store": self.response_store.get_stats(),
                 "calls_per_second": self.CALLS_PER_SECOND,
-                "managed_urls": len(self.api_patterns)
+                "in_flight": len(self.in_flight),
+                "max_in_flight": self.max_in_flight,
+                "journal": self.journal.get_stats() if self.journal else None,
+                "shared_state": {**self.shared_state.get_stats(), **self.shared_stats} if self.shared_state else None,
+                "rate_limiters": {key: {**bucket.get_stats(), **self.rate_controllers[key].get_stats()}
+                                  for key, bucket in self.rate_limiters.items()},
+                "coalescing": {**self.coalescing_stats, "pending_groups": len(self.coalesced)},
+                "latency": {
+                    "upstream": {key: h.summary_ms() for key, h in self.upstream_latency.items()},
+                    "end_to_end": {lane: h.summary_ms() for lane, h in self.request_latency.items()}
+                },
+                "managed_urls": len(self.api_patterns),
+                "cache": self.disk_cache.get_stats(),
+                "failure_cache": self.failure_cache.get_stats(),
+                "http_pool": self.http_pool.get_stats()
             }
 
+    def prometheus_series(self) -> Dict[str, List]:
+        """Séries de ce scheduler pour l'export Prometheus, par nom de métrique"""
+        labels = {"scheduler": self.scheduler_id}
+        lanes = self.request_queue.get_stats()
+        return {
+            "upstream": [({**labels, "pattern": key}, h) for key, h in self.upstream_latency.items()],
+            "end_to_end": [({**labels, "lane": lane}, h) for lane, h in self.request_latency.items()],
+            "queue_depth": [({**labels, "lane": lane}, stats["depth"]) for lane, stats in lanes.items()],
+            "in_flight": [(labels, len(self.in_flight))],
+            "cache_hits": [(labels, self.disk_cache.stats["hits"])],
+            "cache_bytes": [(labels, self.disk_cache.total_bytes)],
+            "cache_read": [(labels, self.disk_cache.read_latency)],
+            "calls_saved": [(labels, self.coalescing_stats["upstream_calls_saved"])],
+            "fast_failures": [({**labels, "reason": reason}, count)
+                              for reason, count in self.failure_cache.fast_failures_by_reason.items()],
+            "failure_time_saved": [(labels, self.failure_cache.stats["time_saved"])],
+            "open_breakers": [(labels, self.failure_cache.get_stats()["open_breakers"])],
+            "rate": [({**labels, "pattern": key}, bucket.rate) for key, bucket in self.rate_limiters.items()],
+            "throttled": [({**labels, "pattern": key}, controller.stats["throttled"])
+                          for key, controller in self.rate_controllers.items()],
+        }
+
     def cleanup(self):
         """Nettoie les ressources"""
         logger.info(f"Nettoyage du scheduler {self.scheduler_id[:8]}...")
@@ -719,16 +1200,11 @@ class APIRequestScheduler:
             # 1. Signaler l'arrêt
             self.shutdown_event.set()
 
-            # 2. Arrêt de la boucle d'événements (si elle existe)
-            if hasattr(self, 'loop') and self.loop and not self.loop.is_closed():
-                try:
-                    if self.loop.is_running():
-                        self.loop.call_soon_threadsafe(self.loop.stop)
-                except Exception as e:
-                    logger.debug(f"Erreur lors de l'arrêt de la boucle: {e}")
+            # 2. Réveil du worker pour qu'il termine sa boucle et ferme ses connexions
+            self.request_queue.close()
 
             # 3. Attendre les threads (timeout court pour éviter les blocages)
-            for thread_attr in ['worker_thread', 'loop_thread', 'cleanup_thread']:
+            for thread_attr in ['worker_thread', 'cleanup_thread']:
                 if hasattr(self, thread_attr):
                     thread = getattr(self, thread_attr)
                     if thread and thread.is_alive():
@@ -738,6 +1214,16 @@ class APIRequestScheduler:
             with self.lock:
                 self.response_store.clear()
                 self.request_dict.clear()
+                for event in self.completion_events.values():
+                    event.set()
+                self.completion_events.clear()
+                self.coalesced.clear()
+                self.batches.clear()
+                self.batch_of.clear()
+
+            # 5. Écritures différées du journal sur disque avant l'arrêt
+            if self.journal:
+                self.journal.flush()
 
             logger.info(f"Nettoyage terminé pour {self.scheduler_id[:8]}")
 
@@ -782,6 +1268,57 @@ socketio = SocketIO(app, async_mode='eventlet', cors_allowed_origins="*", logger
 # Stockage des clients connectés
 connected_clients: Dict[str, str] = {}
 
+# Fins de requête publiées par les schedulers, relayées aux clients socketio par une tâche de fond
+notification_bus = EventBus()
+notification_subscription = None
+notification_lock = threading.Lock()
+
+
+def _dispatch_notifications(subscription):
+    """Tâche socketio: relaie aux clients enregistrés les fins de requête publiées sur le bus"""
+    while True:
+        # rend les événements en attente, ou True si l'abonnement est fermé
+        events = _green_poll(lambda: subscription.get_batch(100, 0) or subscription.closed, 1.0)
+        if events is True:
+            events = []
+        if not events and subscription.closed:
+            return
+        for event in events:
+            client_id = event["client_id"]
+            if client_id not in connected_clients:
+                continue
+            try:
+                message = event["message"]
+                if isinstance(message.get("response"), RawJSON):
+                    message = {**message, "response": message["response"].json()}
+                socketio.emit('message', {'data': message}, room=client_id, namespace='/')
+            except Exception as e:
+                logger.warning(f"Échec de notification du client {client_id}: {e}")
+                continue
+            scheduler = schedulers.get(event["scheduler_id"])
+            if scheduler is not None:
+                scheduler.mark_delivered(event["request_id"])
+
+
+def start_notification_dispatcher():
+    """Abonne la couche socketio au bus et démarre la tâche de relais (une seule fois)"""
+    global notification_subscription
+    with notification_lock:
+        if notification_subscription is None:
+            notification_subscription = notification_bus.subscribe(NOTIFICATION_TOPIC, NOTIFICATION_BUFFER)
+            socketio.start_background_task(_dispatch_notifications, notification_subscription)
+
+
+# Pic de mémoire résidente observé (échantillonné par le health check et le nettoyage périodique)
+memory_high_water = {"rss_bytes": 0}
+
+
+def sample_process_memory() -> int:
+    """Mesure la mémoire résidente du processus et met à jour le pic observé"""
+    rss = psutil.Process().memory_info().rss
+    memory_high_water["rss_bytes"] = max(memory_high_water["rss_bytes"], rss)
+    return rss
+
 # Gestionnaires WebSocket améliorés
 @socketio.on('custom_event')
 def handle_custom_event():
@@ -818,6 +1355,7 @@ def handle_register(data):
 
         connected_clients[client_id] = request.sid
         join_room(client_id)
+        start_notification_dispatcher()
 
         logger.info(f"Client enregistré - client_id: {client_id}, sid: {request.sid}")
         emit('message', {
@@ -883,6 +1421,24 @@ def send_message():
 schedulers: Dict[str, APIRequestScheduler] = {}
 scheduler_ids: Dict[Tuple, str] = {}
 
+def _resolve_scheduler(scheduler_id: Optional[str]) -> Optional[APIRequestScheduler]:
+    """Scheduler d'un identifiant; en mode partagé, un scheduler créé par un autre worker
+    est recréé ici à la première demande, avec le même identifiant"""
+    scheduler = schedulers.get(scheduler_id)
+    if scheduler is None and SHARED_STATE and scheduler_id:
+        state = SharedState(SHARED_STATE)
+        try:
+            api_patterns = state.patterns_for(scheduler_id)
+        finally:
+            state.close()
+        if api_patterns:
+            scheduler = APIRequestScheduler(api_patterns)
+            schedulers[scheduler.scheduler_id] = scheduler
+            scheduler_ids[tuple(sorted(api_patterns))] = scheduler.scheduler_id
+            logger.info(f"Scheduler {scheduler_id[:8]}... d'un autre worker repris dans ce processus")
+    return scheduler
+
+
 @app.route("/api/initialize", methods=["GET", "POST"])
 @authenticate
 def initialize_scheduler():
@@ -963,16 +1519,30 @@ def set_rate_limit():
         if not scheduler_id:
             return jsonify({"error": "scheduler_id requis"}), 400
 
-        if scheduler_id not in schedulers:
+        if _resolve_scheduler(scheduler_id) is None:
             return jsonify({"error": "Scheduler non trouvé"}), 404
 
         if not limit or limit <= 0:
             return jsonify({"error": "Limite valide requise (> 0)"}), 400
 
+        # Paramètres optionnels: rafale, pattern ciblé, requêtes simultanées
+        data = request.get_json(silent=True) or {}
+        burst = request.args.get("burst", type=int, default=data.get("burst"))
+        pattern = request.args.get("pattern", default=data.get("pattern"))
+        max_in_flight = request.args.get("max_in_flight", type=int, default=data.get("max_in_flight"))
+        adaptive = data.get("adaptive")
+        if "adaptive" in request.args:
+            adaptive = request.args.get("adaptive").lower() in ("1", "true", "yes")
+
         # Mise à jour de la limite
         scheduler = schedulers[scheduler_id]
         old_limit = scheduler.CALLS_PER_SECOND
-        scheduler.set_rate_limit(limit)
+        try:
+            scheduler.set_rate_limit(limit, burst=burst, pattern=pattern, adaptive=adaptive)
+            if max_in_flight is not None:
+                scheduler.set_max_in_flight(int(max_in_flight))
+        except (ValueError, TypeError) as e:
+            return jsonify({"error": str(e)}), 400
 
         logger.info(f"Limite de taux mise à jour pour {scheduler_id[:8]}...: {old_limit} -> {limit}")
 
@@ -980,7 +1550,10 @@ def set_rate_limit():
             "message": "Limite de taux mise à jour",
             "scheduler_id": scheduler_id,
             "old_limit": old_limit,
-            "new_limit": limit
+            "new_limit": limit,
+            "burst": burst,
+            "pattern": pattern,
+            "max_in_flight": scheduler.max_in_flight
         })
 
     except Exception as e:
@@ -1015,11 +1588,12 @@ def api_request():
         scheduler_id = get_request_param(request, "scheduler_id")
         client_id = get_request_param(request, "client_id")
         url = get_request_param(request, "url")
+        priority = get_request_param(request, "priority") or DEFAULT_PRIORITY
 
         if not scheduler_id:
             return jsonify({"error": "scheduler_id requis"}), 400
 
-        if scheduler_id not in schedulers:
+        if _resolve_scheduler(scheduler_id) is None:
             return jsonify({"error": "Scheduler non trouvé"}), 404
 
         if not url:
@@ -1064,14 +1638,17 @@ def api_request():
             method=api_method,
             client_id=client_id,
             headers=headers,
+            priority=priority,
             **request_kwargs
         )
 
         response_data = {
             "uuid": request_id,
             "status_url": f"/api/status/{request_id}",
+            "wait_url": f"/api/wait/{request_id}",
             "estimated_delay": round(estimated_delay, 2),
             "queue_position": scheduler.request_queue.qsize(),
+            "priority": priority,
             "message": "Requête ajoutée à la queue avec succès"
         }
 
@@ -1091,6 +1668,78 @@ def api_request():
         logger.error(f"Erreur lors de l'ajout de la requête: {e}")
         return jsonify({"error": "Erreur interne du serveur"}), 500
 
+def _find_scheduler(request_id: str) -> Optional[APIRequestScheduler]:
+    """Retourne le scheduler qui connaît la requête"""
+    for scheduler_id, scheduler in schedulers.items():
+        if scheduler.has_request(request_id):
+            logger.debug(f"Requête {request_id[:8]}... trouvée dans scheduler {scheduler_id[:8]}...")
+            return scheduler
+    return None
+
+
+def _find_shared_scheduler(request_id: str) -> Optional[APIRequestScheduler]:
+    """Mode partagé: scheduler (repris dans ce worker si besoin) d'une requête reçue par un autre worker"""
+    if not SHARED_STATE:
+        return None
+    state = next((scheduler.shared_state for scheduler in schedulers.values() if scheduler.shared_state), None)
+    if state is not None:
+        info = state.request_info(request_id)
+    else:
+        state = SharedState(SHARED_STATE)
+        try:
+            info = state.request_info(request_id)
+        finally:
+            state.close()
+    return _resolve_scheduler(info['scheduler_id']) if info else None
+
+
+def _green_poll(poll: Callable[[], Any], timeout: float) -> Any:
+    """Rappelle poll() jusqu'à une valeur vraie (rendue) ou jusqu'au timeout (dernière valeur rendue).
+
+    Sans monkey-patching, les réponses sont signalées par des threads natifs: une attente
+    bloquante gèlerait le hub eventlet, et la déporter dans le pool tpool (20 threads) le
+    saturerait avec les long-polls. Entre deux vérifications, eventlet.sleep rend la main
+    aux autres green threads; l'intervalle croît jusqu'à GREEN_POLL_MAX_INTERVAL.
+    """
+    if socketio.async_mode == 'eventlet':
+        import eventlet
+        sleep = eventlet.sleep
+    else:
+        sleep = time.sleep
+    deadline = time.monotonic() + timeout
+    interval = GREEN_POLL_MIN_INTERVAL
+    while True:
+        result = poll()
+        remaining = deadline - time.monotonic()
+        if result or remaining <= 0:
+            return result
+        sleep(min(interval, remaining))
+        interval = min(interval * 2, GREEN_POLL_MAX_INTERVAL)
+
+
+def _wait_event(event: threading.Event, timeout: float) -> bool:
+    """Attend un threading.Event sans bloquer le hub eventlet ni occuper un thread natif"""
+    return _green_poll(event.is_set, timeout)
+
+
+def _json_chunks_response(chunks: List[bytes]) -> Response:
+    """Réponse JSON servie par morceaux: le corps d'une réponse RawJSON n'est pas recopié"""
+    return Response(chunks, mimetype="application/json",
+                    headers={"Content-Length": str(sum(len(chunk) for chunk in chunks))})
+
+
+def _complete_response(request_id: str, response: Any) -> Response:
+    """Réponse "complete" de /api/status et /api/wait, réponse amont recopiée telle quelle"""
+    return _json_chunks_response(
+        encode_with_raw({"status": "complete", "request_id": request_id}, "response", response))
+
+
+def _batch_result_chunks(result: Dict) -> List[bytes]:
+    """Un résultat de lot ({index, request_id, response}) sérialisé sans décoder la réponse"""
+    envelope = {key: value for key, value in result.items() if key != "response"}
+    return encode_with_raw(envelope, "response", result["response"])
+
+
 @app.route("/api/status/<request_id>", methods=["GET"])
 @authenticate
 def api_status(request_id: str):
@@ -1103,26 +1752,24 @@ def api_status(request_id: str):
         logger.debug(f"Vérification statut pour {request_id[:8]}...")
 
         # Rechercher la requête dans tous les schedulers
-        found_scheduler = None
-        for scheduler_id, scheduler in schedulers.items():
-            if scheduler.has_request(request_id):
-                found_scheduler = scheduler
-                logger.debug(f"Requête {request_id[:8]}... trouvée dans scheduler {scheduler_id[:8]}...")
-                break
-
+        found_scheduler = _find_scheduler(request_id)
         if not found_scheduler:
+            # Requête reçue par un autre worker: réponse lue dans le cache disque partagé
+            shared_scheduler = _find_shared_scheduler(request_id)
+            if shared_scheduler:
+                response = shared_scheduler.get_shared_response(request_id, raw=True)
+                if response is not None:
+                    return _complete_response(request_id, response)
+                return jsonify({"status": "pending", "message": "Requête en cours de traitement par un autre worker",
+                                "request_id": request_id})
             logger.warning(f"Requête {request_id[:8]}... non trouvée dans aucun scheduler")
             return jsonify({"error": f"Requête non trouvée: {request_id}"}), 404
 
         # Vérifier si la réponse est prête
-        response = found_scheduler.get_response(request_id)
+        response = found_scheduler.get_response(request_id, raw=True)
         if response is not None:
             logger.info(f"Réponse récupérée pour {request_id[:8]}...")
-            return jsonify({
-                "status": "complete",
-                "response": response,
-                "request_id": request_id
-            })
+            return _complete_response(request_id, response)
 
         # Requête encore en traitement
         stats = found_scheduler.get_stats()
@@ -1139,6 +1786,159 @@ def api_status(request_id: str):
         return jsonify({"error": "Erreur interne du serveur"}), 500
 
 
+@app.route("/api/wait/<request_id>", methods=["GET"])
+@authenticate
+def api_wait(request_id: str):
+    """Long-poll: répond dès que la réponse est stockée, ou "pending" après timeout secondes"""
+    try:
+        timeout = min(max(request.args.get("timeout", LONG_POLL_TIMEOUT, type=float), 0), LONG_POLL_TIMEOUT)
+
+        found_scheduler = _find_scheduler(request_id)
+        if not found_scheduler:
+            shared_scheduler = _find_shared_scheduler(request_id)
+            if shared_scheduler:
+                response = _green_poll(partial(shared_scheduler.get_shared_response, request_id, raw=True), timeout)
+                if response is not None:
+                    return _complete_response(request_id, response)
+                return jsonify({"status": "pending", "message": "Requête en cours de traitement par un autre worker",
+                                "request_id": request_id})
+            logger.warning(f"Requête {request_id[:8]}... non trouvée dans aucun scheduler")
+            return jsonify({"error": f"Requête non trouvée: {request_id}"}), 404
+
+        response = found_scheduler.wait_for_response(request_id, timeout, wait_fn=_wait_event, raw=True)
+        if response is not None:
+            logger.info(f"Réponse récupérée pour {request_id[:8]}...")
+            return _complete_response(request_id, response)
+
+        return jsonify({
+            "status": "pending",
+            "message": "Requête en cours de traitement",
+            "request_id": request_id,
+            "queue_size": found_scheduler.request_queue.qsize()
+        })
+
+    except Exception as e:
+        logger.error(f"Erreur lors de l'attente de {request_id[:8]}...: {e}")
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+
+@app.route("/api/batch", methods=["POST"])
+@authenticate
+def api_batch():
+    """Ajoute un lot de requêtes; retourne un identifiant de lot unique"""
+    try:
+        data = request.get_json(silent=True) or {}
+        scheduler_id = data.get("scheduler_id")
+        if not scheduler_id:
+            return jsonify({"error": "scheduler_id requis"}), 400
+        if _resolve_scheduler(scheduler_id) is None:
+            return jsonify({"error": "Scheduler non trouvé"}), 404
+
+        requests_list = data.get("requests")
+        if not isinstance(requests_list, list):
+            return jsonify({"error": "requests requis (liste de requêtes)"}), 400
+
+        scheduler = schedulers[scheduler_id]
+        batch_id, request_ids = scheduler.add_batch(
+            requests_list,
+            client_id=data.get("client_id"),
+            priority=data.get("priority") or DEFAULT_PRIORITY
+        )
+
+        return jsonify({
+            "batch_id": batch_id,
+            "request_ids": request_ids,
+            "stream_url": f"/api/batch/{batch_id}/stream?scheduler_id={scheduler_id}",
+            "status_url": f"/api/batch/{batch_id}?scheduler_id={scheduler_id}",
+            "message": f"{len(request_ids)} requêtes ajoutées à la queue"
+        })
+
+    except RateLimitExceeded as e:
+        logger.warning(f"Limite de taux dépassée: {e}")
+        return jsonify({"error": "Queue pleine, réessayez plus tard"}), 429
+
+    except ValueError as e:
+        logger.warning(f"Erreur de validation du lot: {e}")
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        logger.error(f"Erreur lors de l'ajout du lot: {e}")
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+
+def _batch_scheduler(batch_id: str) -> Optional[APIRequestScheduler]:
+    """Scheduler d'un lot (désigné par ?scheduler_id=, sinon recherché)"""
+    scheduler_id = request.args.get("scheduler_id")
+    if scheduler_id:
+        scheduler = _resolve_scheduler(scheduler_id)
+        return scheduler if scheduler and scheduler.get_batch_progress(batch_id) else None
+    for scheduler in list(schedulers.values()):
+        if scheduler.get_batch_progress(batch_id):
+            return scheduler
+    return None
+
+
+@app.route("/api/batch/<batch_id>", methods=["GET"])
+@authenticate
+def api_batch_status(batch_id: str):
+    """Avancement d'un lot et résultats déjà terminés (retirés du lot une fois rendus)"""
+    try:
+        scheduler = _batch_scheduler(batch_id)
+        if scheduler is None:
+            return jsonify({"error": f"Lot non trouvé: {batch_id}"}), 404
+
+        progress = scheduler.get_batch_progress(batch_id)
+        results = []
+        while (result := scheduler.next_batch_result(batch_id, timeout=0, raw=True)) is not None:
+            results.append(result)
+            if len(results) >= progress["ready"]:
+                break
+
+        delivered = progress["delivered"] + len(results)
+        head = json.dumps({**progress, "delivered": delivered, "done": delivered >= progress["total"]})
+        chunks = [(head[:-1] + ', "results": [').encode("utf-8")]
+        for position, result in enumerate(results):
+            if position:
+                chunks.append(b", ")
+            chunks.extend(_batch_result_chunks(result))
+        chunks.append(b"]}")
+        return _json_chunks_response(chunks)
+
+    except KeyError:
+        return jsonify({"error": f"Lot non trouvé: {batch_id}"}), 404
+    except Exception as e:
+        logger.error(f"Erreur lors de la lecture du lot {batch_id[:8]}...: {e}")
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+
+@app.route("/api/batch/<batch_id>/stream", methods=["GET"])
+@authenticate
+def api_batch_stream(batch_id: str):
+    """Flux NDJSON des résultats d'un lot, une ligne par requête dès qu'elle se termine"""
+    scheduler = _batch_scheduler(batch_id)
+    if scheduler is None:
+        return jsonify({"error": f"Lot non trouvé: {batch_id}"}), 404
+
+    def generate():
+        progress = scheduler.get_batch_progress(batch_id) or {"total": 0, "delivered": 0}
+        total, delivered = progress["total"], progress["delivered"]
+        while delivered < total:
+            try:
+                result = scheduler.next_batch_result(batch_id, LONG_POLL_TIMEOUT, wait_fn=_green_poll, raw=True)
+            except KeyError:
+                break
+            if result is None:
+                # Ligne de maintien de la connexion pendant les longues attentes
+                yield json.dumps({"pending": total - delivered}) + "\n"
+                continue
+            delivered += 1
+            yield from _batch_result_chunks(result)
+            yield "\n"
+        yield json.dumps({"done": True, "batch_id": batch_id, "delivered": delivered}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
 @app.route("/api/openstatus", methods=["GET"])
 def api_openstatus():
     """Statut ouvert pour debug avec informations détaillées"""
@@ -1191,7 +1991,7 @@ def api_openstatus():
 def get_scheduler_stats(scheduler_id: str):
     """Récupère les statistiques détaillées d'un scheduler"""
     try:
-        if scheduler_id not in schedulers:
+        if _resolve_scheduler(scheduler_id) is None:
             return jsonify({"error": "Scheduler non trouvé"}), 404
 
         scheduler = schedulers[scheduler_id]
@@ -1221,12 +2021,16 @@ def delete_scheduler():
         if not scheduler_id:
             return jsonify({"error": "scheduler_id requis"}), 400
 
-        if scheduler_id not in schedulers:
+        if _resolve_scheduler(scheduler_id) is None:
             return jsonify({"error": "Scheduler non trouvé"}), 404
 
         scheduler = schedulers[scheduler_id]
 
-        # Nettoyage du scheduler
+        # Nettoyage du scheduler; une suppression explicite abandonne aussi son travail journalisé
+        if scheduler.journal:
+            scheduler.journal.forget(scheduler.api_patterns)
+        if scheduler.shared_state:
+            scheduler.shared_state.forget_scheduler(scheduler_id)
         scheduler.cleanup()
 
         # Suppression des références
@@ -1263,6 +2067,18 @@ def health_check():
             "uptime_seconds": time.time() - start_time if 'start_time' in globals() else 0
         }
 
+        # Mémoire: processus et réponses en attente, avec leurs pics
+        stores = [scheduler.response_store for scheduler in list(schedulers.values())]
+        health_data["memory"] = {
+            "rss_bytes": sample_process_memory(),
+            "rss_high_water_bytes": memory_high_water["rss_bytes"],
+            "response_store_bytes": sum(store.total_bytes for store in stores),
+            "response_store_high_water_bytes": sum(store.high_water_bytes for store in stores),
+            "response_store_entries": sum(len(store) for store in stores),
+            "request_dict_entries": sum(len(scheduler.request_dict) for scheduler in list(schedulers.values()))
+        }
+        health_data["notifications"] = notification_bus.get_stats()
+
         return jsonify(health_data)
 
     except Exception as e:
@@ -1270,6 +2086,64 @@ def health_check():
         return jsonify({"status": "unhealthy", "error": str(e)}), 500
 
 
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Export des métriques des schedulers au format texte Prometheus"""
+    try:
+        series = [scheduler.prometheus_series() for scheduler in list(schedulers.values())]
+
+        def merged(name):
+            return [sample for scheduler_series in series for sample in scheduler_series[name]]
+
+        lines = prometheus_histogram(
+            "api_manager_upstream_duration_seconds", "Durée des appels amont par pattern", merged("upstream"))
+        lines += prometheus_histogram(
+            "api_manager_request_duration_seconds", "Durée soumission -> réponse par voie", merged("end_to_end"))
+        lines += prometheus_metric(
+            "api_manager_queue_depth", "Requêtes en file par voie", "gauge", merged("queue_depth"))
+        lines += prometheus_metric(
+            "api_manager_in_flight", "Requêtes amont en cours", "gauge", merged("in_flight"))
+        lines += prometheus_metric(
+            "api_manager_cache_hits_total", "Réponses servies par le cache disque", "counter", merged("cache_hits"))
+        lines += prometheus_metric(
+            "api_manager_cache_disk_bytes", "Octets du cache sur disque (compressés)", "gauge", merged("cache_bytes"))
+        lines += prometheus_histogram(
+            "api_manager_cache_read_duration_seconds", "Durée des lectures du cache (décompression comprise)",
+            merged("cache_read"))
+        lines += prometheus_metric(
+            "api_manager_upstream_calls_saved_total", "Appels amont évités par fusion", "counter",
+            merged("calls_saved"))
+        lines += prometheus_metric(
+            "api_manager_fast_failures_total", "Échecs resservis sans appel amont, par cause", "counter",
+            merged("fast_failures"))
+        lines += prometheus_metric(
+            "api_manager_failure_time_saved_seconds_total",
+            "Temps d'attente amont évité par les échecs resservis (estimation)", "counter",
+            merged("failure_time_saved"))
+        lines += prometheus_metric(
+            "api_manager_open_circuit_breakers", "Requêtes au disjoncteur ouvert", "gauge", merged("open_breakers"))
+        lines += prometheus_metric(
+            "api_manager_rate_limit", "Taux effectif (appels/s) par pattern", "gauge", merged("rate"))
+        lines += prometheus_metric(
+            "api_manager_upstream_throttled_total", "Réponses 429/503 de l'amont", "counter", merged("throttled"))
+        notifications = notification_bus.get_stats()
+        lines += prometheus_metric(
+            "api_manager_notifications_published_total", "Fins de requête publiées sur le bus", "counter",
+            [({}, notifications["published"])])
+        lines += prometheus_metric(
+            "api_manager_notifications_dropped_total", "Notifications abandonnées (tampon plein)", "counter",
+            [({}, notifications["dropped"])])
+        lines += prometheus_metric(
+            "api_manager_memory_rss_bytes", "Mémoire résidente du processus", "gauge",
+            [({}, sample_process_memory())])
+
+        return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
+    except Exception as e:
+        logger.error(f"Erreur lors de l'export des métriques: {e}")
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+
 @app.route("/", methods=["GET"])
 def home():
     """Page d'accueil avec informations sur l'API"""
@@ -1309,6 +2183,12 @@ def home():
                 <div class="endpoint">
                     <strong>GET /api/status/&lt;id&gt;</strong> - Vérifier le statut
                 </div>
+                <div class="endpoint">
+                    <strong>GET /api/wait/&lt;id&gt;?timeout=25</strong> - Attendre la réponse (long-poll)
+                </div>
+                <div class="endpoint">
+                    <strong>POST /api/batch</strong> - Ajouter un lot de requêtes (flux des résultats: <code>GET /api/batch/&lt;id&gt;/stream</code>)
+                </div>
                 <div class="endpoint">
                     <strong>GET /api/health</strong> - Health check
                 </div>
@@ -1360,6 +2240,9 @@ def cleanup_on_shutdown():
     """Nettoie les ressources à l'arrêt"""
     logger.info("Arrêt de l'application - nettoyage en cours...")
 
+    if notification_subscription is not None:
+        notification_subscription.close()
+
     # Nettoyer les schedulers
     for scheduler_id, scheduler in list(schedulers.items()):
         try:
@@ -1372,6 +2255,26 @@ def cleanup_on_shutdown():
 # Enregistrement du nettoyage
 atexit.register(cleanup_on_shutdown)
 
+
+def restore_journaled_schedulers():
+    """Recrée au démarrage les schedulers qui ont du travail journalisé, avec leurs identifiants d'origine"""
+    if not REQUEST_JOURNAL:
+        return
+    journal = RequestJournal(REQUEST_JOURNAL)
+    try:
+        journaled = journal.journaled_patterns()
+    finally:
+        journal.close()
+
+    for api_patterns in journaled:
+        key = tuple(sorted(api_patterns))
+        if key in scheduler_ids:
+            continue
+        scheduler = APIRequestScheduler(api_patterns)
+        schedulers[scheduler.scheduler_id] = scheduler
+        scheduler_ids[key] = scheduler.scheduler_id
+        logger.info(f"Scheduler {scheduler.scheduler_id[:8]}... restauré depuis le journal")
+
 # Variables globales pour le monitoring
 start_time = time.time()
 
@@ -1380,6 +2283,7 @@ if __name__ == "__main__":
         logger.info(f"Démarrage de l'API Manager sur {API_IP_ADDRESS}:{API_PORT}")
         logger.info(f"Niveau de log: {LOG_LEVEL}")
         logger.info(f"Configuration: Timeout={REQUEST_TIMEOUT}s, Max retries={MAX_RETRIES}")
+        restore_journaled_schedulers()
 
         # ✅ CORRECTION: Configuration plus robuste pour les tests
         socketio.run(
@@ -0,0 +1,157 @@
+# WikimediaManagerPackage/async_queue.py
+import time
+import asyncio
+import threading
+from collections import deque
+from queue import Full
+from typing import Any, Callable, Dict, Optional
+
+
+class ThreadSafeAsyncQueue:
+    """File FIFO alimentée depuis n'importe quel thread (handlers Flask) et
+    consommée par une coroutine sans jamais bloquer sa boucle d'événements.
+
+    put() est synchrone et thread-safe; le consommateur n'est réveillé (via
+    call_soon_threadsafe) que s'il attend réellement, ce qui évite à la fois
+    l'attente active et le get(timeout=...) bloquant de queue.Queue.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        self.maxsize = maxsize
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._not_empty: Optional[asyncio.Event] = None
+        self._waiting = False
+        self._closed = False
+
+    def qsize(self) -> int:
+        with self._lock:
+            return self._count()
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def put(self, item: Any):
+        """Ajoute un élément (depuis n'importe quel thread); lève queue.Full si la file est pleine"""
+        with self._lock:
+            if self.maxsize and self._count() >= self.maxsize:
+                raise Full
+            self._append(item)
+            wake = self._waiting
+        if wake:
+            self._wake()
+
+    def close(self):
+        """Signale l'arrêt: get() retourne None une fois la file vidée"""
+        with self._lock:
+            self._closed = True
+        self._wake()
+
+    def _wake(self):
+        loop, event = self._loop, self._not_empty
+        if loop is not None and event is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # Boucle fermée entre-temps: plus personne à réveiller
+                pass
+
+    def _count(self) -> int:
+        """Nombre d'éléments; à appeler sous self._lock"""
+        return len(self._items)
+
+    def _append(self, item: Any):
+        """Range un élément; à appeler sous self._lock"""
+        self._items.append(item)
+
+    def _pop(self):
+        """Retire le prochain élément; à appeler sous self._lock avec une file non vide"""
+        return self._items.popleft()
+
+    async def get(self) -> Any:
+        """Attend et retourne le prochain élément (None après close())"""
+        if self._not_empty is None:
+            self._loop = asyncio.get_running_loop()
+            self._not_empty = asyncio.Event()
+
+        while True:
+            with self._lock:
+                if self._count():
+                    self._waiting = False
+                    return self._pop()
+                if self._closed:
+                    return None
+                self._waiting = True
+                self._not_empty.clear()
+            await self._not_empty.wait()
+
+    def task_done(self):
+        """Compatibilité avec l'interface de queue.Queue"""
+        pass
+
+
+class PriorityLaneQueue(ThreadSafeAsyncQueue):
+    """File à voies de priorité, servies par round-robin pondéré lissé.
+
+    Chaque voie non vide reçoit une part des retraits proportionnelle à son poids:
+    une voie interactive n'attend pas derrière des milliers de requêtes d'un lot,
+    et un lot n'est jamais affamé. L'attente en file est mesurée par voie.
+    """
+
+    def __init__(self, lanes: Dict[str, int], default_lane: str, maxsize: int = 0,
+                 lane_of: Optional[Callable[[Any], Optional[str]]] = None):
+        super().__init__(maxsize=maxsize)
+        if default_lane not in lanes:
+            raise ValueError(f"Voie par défaut inconnue: {default_lane}")
+        self.weights = dict(lanes)
+        self.default_lane = default_lane
+        self.lane_of = lane_of or (lambda item: getattr(item, 'priority', None))
+        self._lanes = {lane: deque() for lane in lanes}
+        self._current = {lane: 0 for lane in lanes}
+        self._waits = {lane: {'dequeued': 0, 'total_wait': 0.0, 'max_wait': 0.0,
+                              'recent': deque(maxlen=500)} for lane in lanes}
+
+    def _count(self) -> int:
+        return sum(len(items) for items in self._lanes.values())
+
+    def _append(self, item: Any):
+        lane = self.lane_of(item)
+        if lane not in self._lanes:
+            lane = self.default_lane
+        self._lanes[lane].append((time.monotonic(), item))
+
+    def _pop(self):
+        # Round-robin pondéré lissé sur les voies non vides
+        active = [lane for lane, items in self._lanes.items() if items]
+        for lane in active:
+            self._current[lane] += self.weights[lane]
+        chosen = max(active, key=lambda lane: self._current[lane])
+        self._current[chosen] -= sum(self.weights[lane] for lane in active)
+
+        enqueued_at, item = self._lanes[chosen].popleft()
+        wait = time.monotonic() - enqueued_at
+        waits = self._waits[chosen]
+        waits['dequeued'] += 1
+        waits['total_wait'] += wait
+        waits['max_wait'] = max(waits['max_wait'], wait)
+        waits['recent'].append(wait)
+        return item
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Profondeur et temps d'attente (moyen, p95 récent, max) par voie"""
+        with self._lock:
+            stats = {}
+            for lane, items in self._lanes.items():
+                waits = self._waits[lane]
+                recent = sorted(waits['recent'])
+                stats[lane] = {
+                    'weight': self.weights[lane],
+                    'depth': len(items),
+                    'oldest_wait': round(time.monotonic() - items[0][0], 3) if items else 0.0,
+                    'dequeued': waits['dequeued'],
+                    'avg_wait': round(waits['total_wait'] / waits['dequeued'], 4) if waits['dequeued'] else 0.0,
+                    'p95_wait': round(recent[int(0.95 * (len(recent) - 1))], 4) if recent else 0.0,
+                    'max_wait': round(waits['max_wait'], 4)
+                }
+            return stats
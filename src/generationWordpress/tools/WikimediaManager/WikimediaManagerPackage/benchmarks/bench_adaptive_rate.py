@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Débit utile contre un amont à capacité bornée (/mockapi/limited de l'API bidon, 429 +
+Retry-After au-delà de --capacity appels/s), avec un taux configuré trop haut (--rate):
+taux fixe (seul le Retry-After est respecté) puis contrôle adaptatif AIMD.
+
+Usage: python benchmarks/bench_adaptive_rate.py [--requests 200] [--rate 40] [--capacity 10]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import urllib.request
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+from bench_queue_latency import MOCK_HOST, MOCK_PORT, start_mock_api, load_scheduler_module, summarize
+
+
+def limited_stats():
+    with urllib.request.urlopen(f"http://{MOCK_HOST}:{MOCK_PORT}/mockapi/limited/stats", timeout=5) as resp:
+        return json.loads(resp.read())
+
+
+def run_scenario(scheduler, args, adaptive: bool):
+    scheduler.set_rate_limit(args.rate, burst=1, adaptive=adaptive)
+    time.sleep(1.5)  # fenêtre de l'amont et pauses précédentes écoulées
+    before = limited_stats()
+
+    base = f"http://{MOCK_HOST}:{MOCK_PORT}/mockapi/limited"
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def wait_one(request_id, submitted_at):
+        response = scheduler.wait_for_response(request_id, timeout=300)
+        with lock:
+            if response is None or (isinstance(response, dict) and "error" in response):
+                errors[0] += 1
+            else:
+                latencies.append(time.perf_counter() - submitted_at)
+
+    t0 = time.perf_counter()
+    waiters = []
+    for i in range(args.requests):
+        request_id, _ = scheduler.add_request(f"{base}/{i}?capacity={args.capacity}&run={adaptive}", method="GET")
+        waiter = threading.Thread(target=wait_one, args=(request_id, time.perf_counter()))
+        waiter.start()
+        waiters.append(waiter)
+    for waiter in waiters:
+        waiter.join()
+    wall = time.perf_counter() - t0
+
+    after = limited_stats()
+    stats = scheduler.get_stats()["rate_limiters"][f"http://{MOCK_HOST}:{MOCK_PORT}/mockapi"]
+    return {
+        "adaptive": adaptive,
+        "wall_s": round(wall, 2),
+        "goodput_per_second": round(len(latencies) / wall, 2),
+        "client_errors": errors[0],
+        "upstream_429": after["refused"] - before["refused"],
+        "upstream_calls": after["accepted"] + after["refused"] - before["accepted"] - before["refused"],
+        "final_rate": round(stats["rate"], 2),
+        "latency": summarize(latencies),
+    }
+
+
+def run(args):
+    start_mock_api()
+    api_manager = load_scheduler_module()
+    scheduler = api_manager.APIRequestScheduler([f"http://{MOCK_HOST}:{MOCK_PORT}/mockapi"])
+    scheduler.set_max_in_flight(8)
+
+    results = [run_scenario(scheduler, args, adaptive=False), run_scenario(scheduler, args, adaptive=True)]
+    scheduler.cleanup()
+    return {"requests": args.requests, "configured_rate": args.rate, "upstream_capacity": args.capacity,
+            "runs": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="requêtes par scénario")
+    parser.add_argument("--rate", type=float, default=40, help="taux configuré (plafond), appels/s")
+    parser.add_argument("--capacity", type=int, default=10, help="capacité de l'amont, appels/s")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="bench_scheduler_"))
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Taille sur disque, taux de compression et latence d'écriture/lecture du cache disque
+(disk_cache.DiskCache) selon l'encodage, pour des résultats de type WDQS (clés de
+binding et URIs répétées) de plusieurs tailles. La lecture est mesurée fichier en
+cache de pages (lectures répétées), décompression et décodage JSON compris.
+
+Usage: python benchmarks/bench_cache_compression.py [--rows 100 1000 10000 50000] [--reads 20]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+import disk_cache
+from disk_cache import DiskCache, build_cache_key
+
+
+def sparql_result(rows: int):
+    return {"head": {"vars": ["oeuvre", "oeuvreLabel", "image", "date"]}, "results": {"bindings": [
+        {"oeuvre": {"type": "uri", "value": f"http://www.wikidata.org/entity/Q{100000 + i * 7}"},
+         "oeuvreLabel": {"xml:lang": "fr", "type": "literal", "value": f"Paysage avec rivière {i}"},
+         "image": {"type": "uri",
+                   "value": f"http://commons.wikimedia.org/wiki/Special:FilePath/Paysage%20{i}.jpg"},
+         "date": {"datatype": "http://www.w3.org/2001/XMLSchema#dateTime", "type": "literal",
+                  "value": f"{1850 + i % 100}-01-01T00:00:00Z"}}
+        for i in range(rows)]}}
+
+
+def measure(encoding, rows: int, reads: int):
+    directory = tempfile.mkdtemp(prefix="bench_cache_")
+    cache = DiskCache(directory, compression=encoding)
+    try:
+        key = build_cache_key("GET", "https://query.wikidata.org/sparql", {"rows": rows})
+        response = sparql_result(rows)
+
+        t0 = time.perf_counter()
+        size = cache.put(key, response, ttl=600)
+        write_ms = (time.perf_counter() - t0) * 1000
+
+        latencies = []
+        for _ in range(reads):
+            t0 = time.perf_counter()
+            cache.get(key, max_age=600)
+            latencies.append((time.perf_counter() - t0) * 1000)
+        raw = cache.get_stats()["raw_bytes"]
+        return {
+            "encoding": encoding or "identity",
+            "raw_bytes": raw,
+            "disk_bytes": size,
+            "ratio": round(raw / size, 2),
+            "write_ms": round(write_ms, 2),
+            "read_ms_p50": round(statistics.median(latencies), 3),
+        }
+    finally:
+        cache.close()
+        shutil.rmtree(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 10000, 50000], help="lignes de résultat")
+    parser.add_argument("--reads", type=int, default=20, help="lectures par mesure")
+    args = parser.parse_args()
+
+    encodings = [None, "gzip"] + (["zstd"] if disk_cache.zstandard is not None else [])
+    results = [{"rows": rows, "encodings": [measure(encoding, rows, args.reads) for encoding in encodings]}
+               for rows in args.rows]
+    print(json.dumps({"compress_min_bytes": disk_cache.COMPRESS_MIN_BYTES, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
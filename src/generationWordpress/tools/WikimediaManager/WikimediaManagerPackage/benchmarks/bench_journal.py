@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Coût du journal durable des requêtes (request_journal.py).
+
+1. Micro-benchmark: coût par requête de l'écriture synchrone à l'acceptation
+   (payé par add_request) et débit du thread d'écritures différées (réponse puis
+   suppression), pour des réponses de --payload-size octets.
+2. Bout en bout: bench_scheduler.py lancé --rounds fois sans puis avec --journal
+   (exécutions alternées, processus neufs); médianes des requêtes/s et écart relatif.
+
+Usage: python benchmarks/bench_journal.py [--requests 5000] [--payload-size 1024]
+    [--rounds 3] [--concurrency 8] [--skip-end-to-end]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+from request_journal import RequestJournal
+
+
+def micro(requests_count: int, payload_size: int):
+    journal = RequestJournal(os.path.join(tempfile.mkdtemp(prefix="bench_journal_"), "journal.sqlite"))
+    patterns = ["https://query.wikidata.org/sparql"]
+    data = {"url": "https://query.wikidata.org/sparql?query=SELECT", "method": "GET", "headers": {}, "priority": "normal"}
+    response = {"data": "x" * payload_size}
+
+    t0 = time.perf_counter()
+    for i in range(requests_count):
+        journal.record_accepted(patterns, f"r{i}", {**data, "request_id": f"r{i}"})
+    accept = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for i in range(requests_count):
+        journal.record_completed([f"r{i}"], response)
+        journal.record_delivered(f"r{i}")
+    enqueue = time.perf_counter() - t0
+    journal.flush()
+    deferred = time.perf_counter() - t0
+    journal.close()
+
+    return {
+        "requests": requests_count,
+        "accept_us_per_request": round(accept / requests_count * 1e6, 2),
+        "enqueue_us_per_request": round(enqueue / requests_count * 1e6, 2),
+        "deferred_writes_per_second": round(requests_count / deferred, 1),
+    }
+
+
+def end_to_end(rounds: int, concurrency: int, requests_count: int):
+    def one(journal: bool):
+        command = [sys.executable, os.path.join(SCRIPT_DIR, "bench_scheduler.py"), "--concurrency", str(concurrency),
+                   "--requests", str(requests_count), "--distinct", str(requests_count)]
+        if journal:
+            command.append("--journal")
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        return json.loads(output)["runs"][0]["requests_per_second"]
+
+    without, with_journal = [], []
+    for _ in range(rounds):
+        without.append(one(False))
+        with_journal.append(one(True))
+    base, journaled = statistics.median(without), statistics.median(with_journal)
+    return {
+        "concurrency": concurrency,
+        "requests_per_second_without": without,
+        "requests_per_second_with": with_journal,
+        "median_overhead": round(1 - journaled / base, 4) if base else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000, help="requêtes du micro-benchmark")
+    parser.add_argument("--payload-size", type=int, default=1024, help="octets par réponse journalisée")
+    parser.add_argument("--rounds", type=int, default=3, help="exécutions de bout en bout de chaque variante")
+    parser.add_argument("--concurrency", type=int, default=8, help="clients simultanés de bout en bout")
+    parser.add_argument("--skip-end-to-end", action="store_true")
+    args = parser.parse_args()
+
+    result = {"micro": micro(args.requests, args.payload_size)}
+    if not args.skip_end_to_end:
+        result["end_to_end"] = end_to_end(args.rounds, args.concurrency, 600)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Pic de mémoire d'une grosse réponse SPARQL (/mockapi/large/<i>?rows=n de l'API bidon)
+sur tout son trajet dans le scheduler: lecture amont, écriture dans le cache, réponse
+/api/status au client; puis une seconde requête identique servie par le cache.
+
+Chaque variante tourne dans un processus neuf; le pic est celui de tracemalloc
+(allocations Python, tous threads), mesuré au-dessus de l'état après préchauffage:
+- raw: corps gardé en octets (RAW_JSON_RESPONSES=1, défaut);
+- decoded: RAW_JSON_RESPONSES=0, corps décodé puis ré-encodé pour le cache et pour le client.
+Les durées sont gonflées par tracemalloc, surtout pour la variante decoded.
+
+Usage: python benchmarks/bench_large_results.py [--rows 20000 100000]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+VARIANTS = {"raw": "1", "decoded": "0"}
+
+
+def measure(variant: str, rows: int):
+    """Mesure dans le processus courant (lancé par main avec RAW_JSON_RESPONSES positionné)"""
+    from bench_queue_latency import MOCK_HOST, MOCK_PORT, start_mock_api, load_scheduler_module
+    import mockApiForApiManager
+
+    start_mock_api()
+    body_bytes = len(mockApiForApiManager.sparql_results_body(rows))  # généré hors mesure
+    api_manager = load_scheduler_module()
+    scheduler = api_manager.APIRequestScheduler([f"http://{MOCK_HOST}:{MOCK_PORT}/mockapi"])
+    scheduler.set_rate_limit(10000)
+    api_manager.schedulers[scheduler.scheduler_id] = scheduler
+    api_manager.config = {'admin': {'Bearer': 'bench'}}
+    client = api_manager.app.test_client()
+    url = f"http://{MOCK_HOST}:{MOCK_PORT}/mockapi/large/1?rows={rows}"
+
+    def round_trip():
+        t0 = time.perf_counter()
+        request_id, _ = scheduler.add_request(url, method="GET", cache_duration=600)
+        while not scheduler.has_request(request_id) or request_id not in scheduler.response_store:
+            time.sleep(0.002)
+        served = client.get(f"/api/status/{request_id}", headers={"Authorization": "Bearer bench"})
+        size = len(served.get_data())
+        return time.perf_counter() - t0, size
+
+    round_trip()  # préchauffage (connexions, imports paresseux), puis cache vidé
+    scheduler.disk_cache.evict_expired(now=time.time() + 3600)
+
+    results = {}
+    tracemalloc.start()
+    for phase in ("upstream", "cache_hit"):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        elapsed, size = round_trip()
+        results[phase] = {
+            "peak_mb": round((tracemalloc.get_traced_memory()[1] - baseline) / 1e6, 1),
+            "seconds": round(elapsed, 3),
+            "served_bytes": size,
+        }
+    tracemalloc.stop()
+    scheduler.cleanup()
+    return {"variant": variant, "rows": rows, "body_mb": round(body_bytes / 1e6, 1), **results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[20000, 100000], help="lignes du résultat")
+    parser.add_argument("--variant", choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="bench_scheduler_"))
+    if args.variant:
+        print(json.dumps(measure(args.variant, args.rows[0])))
+        return
+
+    results = []
+    for rows in args.rows:
+        for variant, raw_setting in VARIANTS.items():
+            output = subprocess.run(
+                [sys.executable, os.path.realpath(__file__), "--variant", variant, "--rows", str(rows)],
+                env={**os.environ, "RAW_JSON_RESPONSES": raw_setting}, capture_output=True, text=True, check=True)
+            results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+    print(json.dumps({"results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
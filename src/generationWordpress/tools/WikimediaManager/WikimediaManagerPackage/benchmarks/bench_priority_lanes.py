@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Latence des requêtes interactives pendant un lot massif, contre l'API bidon
+(tests/mockApiForApiManager.py): d'abord dans la même voie que le lot (équivalent
+FIFO), puis dans la voie "interactive".
+
+Usage: python benchmarks/bench_priority_lanes.py [--batch 400] [--interactive 20] [--rate 100]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+from bench_queue_latency import MOCK_HOST, MOCK_PORT, start_mock_api, load_scheduler_module, wait_for, summarize
+
+
+def run_scenario(scheduler, batch: int, interactive: int, interactive_lane: str, tag: str):
+    base = f"http://{MOCK_HOST}:{MOCK_PORT}/mockapi/test"
+    batch_ids = [scheduler.add_request(f"{base}/{tag}-batch-{i}", method="GET", priority="batch")[0]
+                 for i in range(batch)]
+
+    # Requêtes interactives espacées, pendant que le lot s'écoule; chacune attendue dans son thread
+    latencies = []
+
+    def wait_interactive(request_id, submitted_at):
+        if scheduler.wait_for_response(request_id, timeout=120) is not None:
+            latencies.append(time.perf_counter() - submitted_at)
+
+    waiters = []
+    for i in range(interactive):
+        request_id, _ = scheduler.add_request(f"{base}/{tag}-ui-{i}", method="GET", priority=interactive_lane)
+        waiter = threading.Thread(target=wait_interactive, args=(request_id, time.perf_counter()))
+        waiter.start()
+        waiters.append(waiter)
+        time.sleep(0.05)
+
+    for waiter in waiters:
+        waiter.join()
+    wait_for(scheduler, batch_ids)
+    return {
+        "interactive_lane": interactive_lane,
+        "interactive_latency": summarize(latencies),
+        "lanes": scheduler.get_stats()["lanes"],
+    }
+
+
+def run(batch: int, interactive: int, rate: float):
+    start_mock_api()
+    api_manager = load_scheduler_module()
+    scheduler = api_manager.APIRequestScheduler([f"http://{MOCK_HOST}:{MOCK_PORT}/mockapi"])
+    scheduler.set_rate_limit(rate)
+
+    results = [
+        run_scenario(scheduler, batch, interactive, "batch", "fifo"),
+        run_scenario(scheduler, batch, interactive, "interactive", "lanes"),
+    ]
+    scheduler.cleanup()
+    return {"batch_requests": batch, "rate_limit": rate, "runs": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch", type=int, default=400, help="requêtes du lot")
+    parser.add_argument("--interactive", type=int, default=20, help="requêtes interactives")
+    parser.add_argument("--rate", type=float, default=100, help="appels/seconde autorisés")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="bench_scheduler_"))
+    print(json.dumps(run(args.batch, args.interactive, args.rate), indent=2))
+
+
+if __name__ == "__main__":
+    main()
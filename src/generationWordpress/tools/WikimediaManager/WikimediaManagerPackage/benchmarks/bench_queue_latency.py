@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark de latence de bout en bout du scheduler (ajout -> réponse disponible)
+contre l'API bidon locale tests/mockApiForApiManager.py, à vide et sous charge.
+
+Usage: python benchmarks/bench_queue_latency.py [--requests 50] [--burst 200]
+"""
+
+import os
+import sys
+import json
+import time
+import types
+import argparse
+import tempfile
+import threading
+import statistics
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+PACKAGE_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, PACKAGE_DIR)
+sys.path.insert(0, os.path.join(PACKAGE_DIR, 'tests'))
+
+MOCK_HOST = "127.0.0.1"
+MOCK_PORT = 5010
+
+
+def start_mock_api():
+    """Démarre l'API bidon dans un thread (serveur werkzeug multi-thread)"""
+    from werkzeug.serving import make_server
+    import mockApiForApiManager
+
+    server = make_server(MOCK_HOST, MOCK_PORT, mockApiForApiManager.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def load_scheduler_module(module_name: str = "apiManagerClaude"):
+    """Importe le module du scheduler; la configuration privée est remplacée si absente"""
+    try:
+        import configPrivee  # noqa: F401
+    except ImportError:
+        sys.modules['configPrivee'] = types.SimpleNamespace(config={'admin': {'Bearer': 'bench'}})
+    import logging
+    import importlib
+    module = importlib.import_module(module_name)
+    logging.getLogger().setLevel(logging.WARNING)
+    return module
+
+
+def wait_for(scheduler, request_ids, timeout=120.0):
+    """Attend les réponses, retourne {request_id: instant de disponibilité}"""
+    done = {}
+    deadline = time.perf_counter() + timeout
+    while len(done) < len(request_ids) and time.perf_counter() < deadline:
+        for request_id in request_ids:
+            if request_id not in done and scheduler.get_response(request_id) is not None:
+                done[request_id] = time.perf_counter()
+        time.sleep(0.0005)
+    return done
+
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+    if not latencies:
+        return {}
+    return {
+        "count": len(latencies),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+    }
+
+
+def run(requests_count: int, burst: int):
+    start_mock_api()
+    api_manager = load_scheduler_module()
+    scheduler = api_manager.APIRequestScheduler([f"http://{MOCK_HOST}:{MOCK_PORT}/mockapi"])
+    # Limite de taux très haute: on mesure le coût du scheduler, pas l'attente imposée
+    scheduler.set_rate_limit(10000)
+
+    # À vide: une requête à la fois
+    idle = []
+    for i in range(requests_count):
+        t0 = time.perf_counter()
+        request_id, _ = scheduler.add_request(f"http://{MOCK_HOST}:{MOCK_PORT}/mockapi/test/{i}", method="GET")
+        done = wait_for(scheduler, [request_id])
+        idle.append(done[request_id] - t0)
+
+    # Sous charge: une rafale d'ajouts concurrents
+    submitted = {}
+    t0 = time.perf_counter()
+    for i in range(burst):
+        request_id, _ = scheduler.add_request(f"http://{MOCK_HOST}:{MOCK_PORT}/mockapi/test/{i}", method="GET")
+        submitted[request_id] = time.perf_counter()
+    done = wait_for(scheduler, list(submitted))
+    elapsed = time.perf_counter() - t0
+    loaded = [done[r] - submitted[r] for r in done]
+
+    scheduler.cleanup()
+    return {
+        "idle": summarize(idle),
+        "load": {**summarize(loaded), "requests_per_second": round(len(done) / elapsed, 1)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50, help="requêtes séquentielles à vide")
+    parser.add_argument("--burst", type=int, default=200, help="requêtes de la rafale sous charge")
+    args = parser.parse_args()
+
+    # Le cache et les logs du scheduler vont dans un répertoire temporaire
+    os.chdir(tempfile.mkdtemp(prefix="bench_scheduler_"))
+    print(json.dumps(run(args.requests, args.burst), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Débit du scheduler contre l'endpoint lent /mockapi/delay/<n> de l'API bidon
+(tests/mockApiForApiManager.py), en série (1 requête en vol, comportement
+d'avant le seau à jetons) puis avec plusieurs requêtes simultanées.
+
+Usage: python benchmarks/bench_rate_limiter_throughput.py [--requests 20] [--delay 2]
+       [--rate 5] [--burst 1] [--in-flight 1 4 10]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+from bench_queue_latency import MOCK_HOST, MOCK_PORT, start_mock_api, load_scheduler_module, wait_for, summarize
+
+
+def run(requests_count: int, delay: int, rate: float, burst: int, in_flight_values):
+    start_mock_api()
+    api_manager = load_scheduler_module()
+    scheduler = api_manager.APIRequestScheduler([f"http://{MOCK_HOST}:{MOCK_PORT}/mockapi"])
+    scheduler.set_rate_limit(rate, burst=burst)
+
+    results = []
+    for max_in_flight in in_flight_values:
+        scheduler.set_max_in_flight(max_in_flight)
+        submitted = {}
+        t0 = time.perf_counter()
+        for _ in range(requests_count):
+            request_id, _ = scheduler.add_request(f"http://{MOCK_HOST}:{MOCK_PORT}/mockapi/delay/{delay}", method="GET")
+            submitted[request_id] = time.perf_counter()
+        done = wait_for(scheduler, list(submitted), timeout=requests_count * (delay + 1) + 30)
+        elapsed = time.perf_counter() - t0
+        results.append({
+            "max_in_flight": max_in_flight,
+            "completed": len(done),
+            "elapsed_s": round(elapsed, 2),
+            "requests_per_second": round(len(done) / elapsed, 2),
+            "latency": summarize([done[r] - submitted[r] for r in done]),
+        })
+
+    scheduler.cleanup()
+    return {
+        "endpoint_delay_s": delay,
+        "rate_limit": rate,
+        "burst": burst,
+        "runs": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20, help="requêtes par mesure")
+    parser.add_argument("--delay", type=int, default=2, help="durée de l'endpoint lent (s)")
+    parser.add_argument("--rate", type=float, default=5, help="appels/seconde autorisés")
+    parser.add_argument("--burst", type=int, default=1, help="rafale du seau à jetons")
+    parser.add_argument("--in-flight", type=int, nargs="+", default=[1, 4, 10], help="requêtes simultanées à tester")
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix="bench_scheduler_"))
+    print(json.dumps(run(args.requests, args.delay, args.rate, args.burst, args.in_flight), indent=2))
+
+
+if __name__ == "__main__":
+    main()
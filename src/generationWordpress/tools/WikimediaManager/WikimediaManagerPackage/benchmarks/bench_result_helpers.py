@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Latence des filtres get* de WikimediaAccessLegacy sur de gros résultats SPARQL (plusieurs
+Mo), avant et après la représentation en colonnes (columnar_result). Comme dans
+PageBuilder.build_scrutart_page, plusieurs filtres sont appliqués à la même réponse:
+la mesure porte sur ce groupe de filtres, puis sur chaque filtre seul.
+
+La version "avant" est le module tel qu'il était avant l'introduction de
+columnar_result.py (extrait de git), ou le fichier donné par --reference. Les sorties
+des deux versions sont comparées. Aucun accès réseau: les filtres mesurés n'appellent
+pas l'amont.
+
+Usage: python benchmarks/bench_result_helpers.py [--rows 10000 50000] [--repeat 5]
+"""
+
+import os
+import sys
+import json
+import time
+import types
+import argparse
+import statistics
+import subprocess
+from unittest.mock import MagicMock
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+PACKAGE_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, os.path.dirname(PACKAGE_DIR))
+
+try:
+    import WikimediaManagerPackage.configPrivee  # noqa: F401
+except ImportError:
+    sys.modules['WikimediaManagerPackage.configPrivee'] = MagicMock()
+
+from WikimediaManagerPackage import WikimediaAccessLegacy
+
+# Groupes de filtres appliqués à une même réponse, avec les variables de la requête
+GROUPS = {
+    "types": (["type", "typeLabel", "c"], ["getMainType", "getOtherTypes", "getLen"]),
+    "items": (["v", "vLabel", "c"], ["getItemList", "getGenreList", "getDepictList", "getTypeList", "getLen"]),
+    "langs": (["lang", "c"], ["getCountFr", "getCountEn"]),
+    "links": (["link", "baseUrl"], ["getExternalLinks", "getLen"]),
+}
+
+
+def sparql_result(names, rows: int):
+    def value(name, i):
+        if name in ("type", "v"):
+            return {"type": "uri", "value": f"http://www.wikidata.org/entity/Q{100000 + i * 7}"}
+        if name == "c":
+            return {"datatype": "http://www.w3.org/2001/XMLSchema#integer", "type": "literal", "value": str(rows - i)}
+        if name == "lang":
+            return {"type": "literal", "value": ["fr", "en", "es", "de", "it"][i % 5] + str(i // 5)}
+        if name == "link":
+            return {"type": "uri", "value": f"https://viaf.org/viaf/{i}/"}
+        if name == "baseUrl":
+            return {"type": "literal", "value": "https://viaf.org/viaf/$1/"}
+        return {"xml:lang": "fr", "type": "literal", "value": f"Paysage-avec rivière {i}"}
+    return {"head": {"vars": names},
+            "results": {"bindings": [{name: value(name, i) for name in names} for i in range(rows)]}}
+
+
+def load_reference(path: str):
+    if path:
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+    else:
+        # Version antérieure à columnar_result.py (HEAD tant qu'il n'est pas commité)
+        added = subprocess.run(["git", "log", "--diff-filter=A", "--format=%H", "--", "columnar_result.py"],
+                               cwd=PACKAGE_DIR, capture_output=True, text=True).stdout.split()
+        rev = f"{added[-1]}^" if added else "HEAD"
+        source = subprocess.run(["git", "show", f"{rev}:./WikimediaAccessLegacy.py"],
+                                cwd=PACKAGE_DIR, capture_output=True, text=True, check=True).stdout
+    module = types.ModuleType("WikimediaAccessReference")
+    exec(compile(source, "WikimediaAccessReference.py", "exec"), module.__dict__)
+    return module
+
+
+def make_access(module):
+    # Sans __init__/__enter__: pas de scheduler distant pour des filtres purs
+    access = object.__new__(module.WikimediaAccess)
+    access.lang = "fr"
+    return access
+
+
+def timed(fn, names, rows: int, repeat: int, release=None) -> float:
+    # Réponse neuve à chaque tour, construite (et la précédente libérée) hors mesure:
+    # la conversion en colonnes est comptée
+    durations = []
+    for _ in range(repeat):
+        if release:
+            release()
+        res = sparql_result(names, rows)
+        t0 = time.perf_counter()
+        fn(res)
+        durations.append((time.perf_counter() - t0) * 1000)
+    return round(statistics.median(durations), 2)
+
+
+def measure(access, names, helpers, rows: int, repeat: int):
+    def group(res):
+        return [getattr(access, helper)(res, "Q0") for helper in helpers]
+
+    def release():
+        # dernière conversion gardée par l'accès (WikimediaAccess.columnar)
+        access.__dict__.pop("_last_columnar", None)
+
+    return {
+        "group_ms": timed(group, names, rows, repeat, release),
+        "helpers_ms": {helper: timed(lambda res, helper=helper: getattr(access, helper)(res, "Q0"), names, rows, repeat,
+                                     release)
+                       for helper in helpers},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 50000], help="lignes de résultat")
+    parser.add_argument("--repeat", type=int, default=5, help="mesures par filtre (médiane)")
+    parser.add_argument("--reference", help="fichier WikimediaAccessLegacy.py de référence (défaut: git)")
+    args = parser.parse_args()
+
+    before, after = make_access(load_reference(args.reference)), make_access(WikimediaAccessLegacy)
+    results = []
+    for rows in args.rows:
+        for group, (names, helpers) in GROUPS.items():
+            res = sparql_result(names, rows)
+            identical = all(getattr(before, helper)(res, "Q0") == getattr(after, helper)(res, "Q0") for helper in helpers)
+            size = len(json.dumps(res))
+            old, new = measure(before, names, helpers, rows, args.repeat), measure(after, names, helpers, rows, args.repeat)
+            results.append({
+                "rows": rows, "group": group, "result_mb": round(size / 1e6, 1), "identical": identical,
+                "before": old, "after": new, "speedup": round(old["group_ms"] / new["group_ms"], 1),
+            })
+    print(json.dumps({"results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Banc d'essai reproductible du scheduler (apiManagerClaude ou apiManager) contre l'API
+bidon tests/mockApiForApiManager.py.
+
+L'API bidon tourne dans un sous-processus (sa mémoire n'est pas comptée), le scheduler
+dans ce processus; des clients concurrents soumettent des requêtes vers
+/mockapi/bench/<i>?size=...&latency_ms=... puis attendent leur réponse.
+
+Sortie JSON, par niveau de concurrence: requêtes/s, latence de bout en bout p50/p99,
+taux de hits du cache, appels amont évités, pic de RSS. Avec --baseline, les écarts
+au-delà de --tolerance sont listés dans "regressions" et le code de sortie vaut 1.
+
+Usage:
+  python benchmarks/bench_scheduler.py [--module apiManagerClaude] [--concurrency 1 8 32]
+      [--requests 400] [--payload-size 1024] [--latency-ms 20] [--distinct 100]
+      [--cache-duration 600] [--rate 1000] [--journal] [--output resultat.json]
+      [--baseline reference.json --tolerance 0.2]
+
+--journal active le journal durable (REQUEST_JOURNAL) pour mesurer son coût: comparer
+avec --baseline une exécution sans journal.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import platform
+import threading
+import contextlib
+import subprocess
+import statistics
+import urllib.request
+
+import psutil
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+PACKAGE_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, SCRIPT_DIR)
+sys.path.insert(0, os.path.join(PACKAGE_DIR, 'tests'))
+
+from bench_queue_latency import MOCK_HOST, load_scheduler_module
+
+DEFAULT_MOCK_PORT = 5011
+
+
+def serve_mock(port: int):
+    """Sert l'API bidon (appelé dans le sous-processus)"""
+    import logging
+    from werkzeug.serving import make_server
+    import mockApiForApiManager
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    make_server(MOCK_HOST, port, mockApiForApiManager.app, threaded=True).serve_forever()
+
+
+def fetch_json(url: str):
+    with urllib.request.urlopen(url, timeout=5) as resp:
+        return json.loads(resp.read())
+
+
+def start_mock_process(port: int) -> subprocess.Popen:
+    process = subprocess.Popen([sys.executable, os.path.realpath(__file__), "--serve-mock", "--mock-port", str(port)])
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            fetch_json(f"http://{MOCK_HOST}:{port}/mockapi/bench/stats")
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("L'API bidon n'a pas démarré")
+
+
+class RssSampler(threading.Thread):
+    """Échantillonne la mémoire résidente du processus et garde le pic"""
+
+    def __init__(self, interval: float = 0.02):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.process = psutil.Process()
+        self.peak = self.process.memory_info().rss
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.peak = max(self.peak, self.process.memory_info().rss)
+
+    def stop(self) -> int:
+        self.stopped.set()
+        self.join()
+        return max(self.peak, self.process.memory_info().rss)
+
+
+def percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def wait_response(scheduler, request_id: str, timeout: float = 120.0):
+    """Attente événementielle si le scheduler la propose, sinon interrogation de get_response"""
+    if hasattr(scheduler, "wait_for_response"):
+        return scheduler.wait_for_response(request_id, timeout)
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        response = scheduler.get_response(request_id)
+        if response is not None:
+            return response
+        time.sleep(0.0005)
+    return None
+
+
+def run_level(scheduler, mock_base: str, concurrency: int, args, tag: str):
+    """Un niveau de concurrence: `concurrency` clients se partagent args.requests requêtes"""
+    upstream_before = fetch_json(f"{mock_base}/stats")["count"]
+    cache_before = dict(getattr(scheduler, "disk_cache").stats) if hasattr(scheduler, "disk_cache") else None
+
+    latencies, errors, timeouts = [], [0], [0]
+    next_index = iter(range(args.requests))
+    index_lock = threading.Lock()
+
+    def client():
+        while True:
+            with index_lock:
+                i = next(next_index, None)
+            if i is None:
+                return
+            url = (f"{mock_base}/{i % args.distinct}?size={args.payload_size}"
+                   f"&latency_ms={args.latency_ms}&run={tag}")
+            t0 = time.perf_counter()
+            request_id, _ = scheduler.add_request(url, method="GET", cache_duration=args.cache_duration)
+            response = wait_response(scheduler, request_id)
+            elapsed = time.perf_counter() - t0
+            with index_lock:
+                if response is None:
+                    timeouts[0] += 1
+                    continue
+                if isinstance(response, dict) and "error" in response:
+                    errors[0] += 1
+                latencies.append(elapsed)
+
+    sampler = RssSampler()
+    sampler.start()
+    t0 = time.perf_counter()
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    wall = time.perf_counter() - t0
+    peak_rss = sampler.stop()
+
+    upstream_calls = fetch_json(f"{mock_base}/stats")["count"] - upstream_before
+    cache_hit_ratio = None
+    if cache_before is not None:
+        stats = scheduler.disk_cache.stats
+        hits, misses = stats["hits"] - cache_before["hits"], stats["misses"] - cache_before["misses"]
+        cache_hit_ratio = round(hits / (hits + misses), 4) if hits + misses else 0.0
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": args.requests,
+        "completed": len(latencies),
+        "errors": errors[0],
+        "timeouts": timeouts[0],
+        "wall_s": round(wall, 3),
+        "requests_per_second": round(len(latencies) / wall, 2) if wall else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 2),
+            "p99": round(percentile(latencies, 0.99) * 1000, 2),
+            "mean": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+            "max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        },
+        "upstream_calls": upstream_calls,
+        "upstream_calls_saved_ratio": round(1 - upstream_calls / args.requests, 4) if args.requests else 0.0,
+        "cache_hit_ratio": cache_hit_ratio,
+        "peak_rss_bytes": peak_rss,
+    }
+
+
+def compare(runs, baseline, tolerance: float):
+    """Écarts défavorables par rapport à une exécution de référence, au même niveau de concurrence"""
+    reference = {run["concurrency"]: run for run in baseline.get("runs", [])}
+    regressions = []
+    for run in runs:
+        ref = reference.get(run["concurrency"])
+        if ref is None:
+            continue
+        checks = [
+            ("requests_per_second", run["requests_per_second"], ref["requests_per_second"], -1),
+            ("latency_p50_ms", run["latency_ms"]["p50"], ref["latency_ms"]["p50"], 1),
+            ("latency_p99_ms", run["latency_ms"]["p99"], ref["latency_ms"]["p99"], 1),
+            ("peak_rss_bytes", run["peak_rss_bytes"], ref["peak_rss_bytes"], 1),
+        ]
+        for metric, value, ref_value, worse in checks:
+            if ref_value and worse * (value - ref_value) / ref_value > tolerance:
+                regressions.append({
+                    "concurrency": run["concurrency"],
+                    "metric": metric,
+                    "baseline": ref_value,
+                    "current": value,
+                    "change": round((value - ref_value) / ref_value, 4),
+                })
+    return regressions
+
+
+def run(args):
+    mock_process = start_mock_process(args.mock_port)
+    mock_base = f"http://{MOCK_HOST}:{args.mock_port}/mockapi/bench"
+    try:
+        # L'ancien scheduler écrit sur stdout: on garde stdout pour le JSON
+        if args.journal:
+            os.environ["REQUEST_JOURNAL"] = os.path.abspath("journal.sqlite")
+        with contextlib.redirect_stdout(sys.stderr):
+            api_manager = load_scheduler_module(args.module)
+            scheduler = api_manager.APIRequestScheduler([f"http://{MOCK_HOST}:{args.mock_port}/mockapi"])
+            scheduler.set_rate_limit(args.rate)
+            runs = [run_level(scheduler, mock_base, concurrency, args, f"{int(time.time())}-{concurrency}")
+                    for concurrency in args.concurrency]
+            if hasattr(scheduler, "cleanup"):
+                scheduler.cleanup()
+    finally:
+        mock_process.terminate()
+        mock_process.wait()
+
+    return {
+        "module": args.module,
+        "python": platform.python_version(),
+        "parameters": {
+            "requests": args.requests,
+            "payload_size": args.payload_size,
+            "latency_ms": args.latency_ms,
+            "distinct": args.distinct,
+            "cache_duration": args.cache_duration,
+            "rate": args.rate,
+            "journal": args.journal,
+        },
+        "runs": runs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="apiManagerClaude", help="module du scheduler (apiManagerClaude, apiManager)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="clients simultanés")
+    parser.add_argument("--requests", type=int, default=400, help="requêtes par niveau de concurrence")
+    parser.add_argument("--payload-size", type=int, default=1024, help="octets de charge utile par réponse")
+    parser.add_argument("--latency-ms", type=float, default=20, help="latence amont injectée")
+    parser.add_argument("--distinct", type=int, default=100, help="URLs distinctes (les autres sont des répétitions)")
+    parser.add_argument("--cache-duration", type=int, default=600, help="durée de cache demandée (0: sans cache)")
+    parser.add_argument("--rate", type=float, default=1000, help="appels/seconde autorisés")
+    parser.add_argument("--journal", action="store_true", help="journal durable des requêtes activé")
+    parser.add_argument("--mock-port", type=int, default=DEFAULT_MOCK_PORT)
+    parser.add_argument("--output", help="fichier où écrire le résultat JSON")
+    parser.add_argument("--baseline", help="résultat JSON de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="écart relatif toléré avant régression")
+    parser.add_argument("--serve-mock", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_mock:
+        serve_mock(args.mock_port)
+        return 0
+
+    # Le cache et les logs du scheduler vont dans un répertoire temporaire
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    output_path = os.path.abspath(args.output) if args.output else None
+    os.chdir(tempfile.mkdtemp(prefix="bench_scheduler_"))
+
+    result = run(args)
+    exit_code = 0
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as f:
+            result["regressions"] = compare(result["runs"], json.load(f), args.tolerance)
+        exit_code = 1 if result["regressions"] else 0
+
+    output = json.dumps(result, indent=2)
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+# WikimediaManagerPackage/columnar_result.py
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+class ColumnarResult:
+    """Résultat SPARQL lu par colonnes: pour chaque variable, la liste des valeurs (None si
+    la variable n'est pas liée dans la ligne). Une colonne est extraite en une passe à la
+    première demande puis partagée par tous les filtres; les valeurs dérivées (texte rendu,
+    index) le sont aussi via derive().
+
+    Accepte le JSON SPARQL (dict {"head", "results": {"bindings"}}) comme les résultats
+    SPARQLWrapper2 (objet .bindings dont les valeurs ont un attribut .value).
+    """
+
+    def __init__(self, bindings: List[Dict[str, Any]], attribute_values: bool = False):
+        self.bindings = bindings
+        self.attribute_values = attribute_values
+        self.columns: Dict[str, List[Optional[str]]] = {}
+        self.derived: Dict[Any, Any] = {}
+
+    @classmethod
+    def from_sparql(cls, sparqlres: Any) -> 'ColumnarResult':
+        if isinstance(sparqlres, dict):
+            return cls(sparqlres.get("results", {}).get("bindings", []))
+        if sparqlres and hasattr(sparqlres, "bindings"):
+            return cls(sparqlres.bindings, attribute_values=True)
+        return cls([])
+
+    def __len__(self) -> int:
+        return len(self.bindings)
+
+    def _value(self, row: Dict[str, Any], name: str) -> Optional[str]:
+        if name not in row:
+            return None
+        return row[name].value if self.attribute_values else row[name]["value"]
+
+    def column(self, name: str) -> List[Optional[str]]:
+        """Valeurs d'une variable, ligne par ligne"""
+        values = self.columns.get(name)
+        if values is None:
+            if self.attribute_values:
+                values = [row[name].value if name in row else None for row in self.bindings]
+            else:
+                values = [row[name]["value"] if name in row else None for row in self.bindings]
+            self.columns[name] = values
+        return values
+
+    def first(self, name: str, default: Any = None) -> Any:
+        """Valeur de la première ligne, sans extraire la colonne"""
+        value = self._value(self.bindings[0], name) if self.bindings else None
+        return default if value is None else value
+
+    def rows(self, *names: str, start: int = 0) -> Iterator[Tuple]:
+        """Tuples des valeurs des variables demandées, à partir de la ligne start"""
+        return zip(*(self.column(name)[start:] for name in names))
+
+    def derive(self, key: Any, build: Callable[[], Any]) -> Any:
+        """Valeur calculée une seule fois pour cette réponse (build n'est appelé qu'au premier accès)"""
+        if key not in self.derived:
+            self.derived[key] = build()
+        return self.derived[key]
+
+    def last(self, key: str, match: str, name: str, default: Any = None) -> Any:
+        """Valeur de name dans la dernière ligne où key vaut match; la recherche se fait dans
+        la colonne key (parcours en C), seule la ligne trouvée est lue pour name"""
+        keys = self.column(key)
+        try:
+            index = len(keys) - 1 - keys[::-1].index(match)
+        except ValueError:
+            return default
+        value = self._value(self.bindings[index], name)
+        return default if value is None else value
+
+
+def columnar(sparqlres: Any) -> ColumnarResult:
+    """Version en colonnes d'une réponse (la réponse elle-même si elle l'est déjà)"""
+    if isinstance(sparqlres, ColumnarResult):
+        return sparqlres
+    return ColumnarResult.from_sparql(sparqlres)
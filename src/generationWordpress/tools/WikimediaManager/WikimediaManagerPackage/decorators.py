@@ -1,14 +1,21 @@
 # WikimediaManagerPackage/decorators.py
 import functools
 import time
+import random
 import logging
 from typing import Tuple, Any
 from .exceptions import NetworkError, ValidationError
 
 
 def retry_on_error(max_retries: int = 3, backoff_factor: float = 1.5,
-                   retry_on_exceptions: Tuple = (NetworkError,)):
-    """Décorateur pour retry avec backoff exponentiel"""
+                   retry_on_exceptions: Tuple = (NetworkError,), max_backoff: float = 60.0,
+                   jitter: bool = True):
+    """Décorateur pour retry avec backoff exponentiel
+
+    Le délai est tiré au hasard jusqu'au backoff (full jitter) pour que des appelants
+    échouant ensemble ne réessaient pas ensemble. Les refus 429/503 de l'amont sont
+    réessayés par le scheduler (AdaptiveRateController), pas ici.
+    """
 
     def decorator(func):
         @functools.wraps(func)
@@ -36,7 +43,9 @@ def retry_on_error(max_retries: int = 3, backoff_factor: float = 1.5,
                         logger.error(f"{func_name} échec final après {max_retries + 1} tentatives: {str(e)}")
                         raise
 
-                    wait_time = backoff_factor ** attempt
+                    wait_time = min(backoff_factor ** attempt, max_backoff)
+                    if jitter:
+                        wait_time = random.uniform(0, wait_time)
                     logger.warning(
                         f"{func_name} tentative {attempt + 1} échouée, retry dans {wait_time:.1f}s: {str(e)}")
                     time.sleep(wait_time)
@@ -0,0 +1,364 @@
+# WikimediaManagerPackage/disk_cache.py
+import os
+import zlib
+import gzip
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from metrics import LatencyHistogram
+from raw_json import RawJSON, encode_with_raw
+
+try:
+    import zstandard
+except ImportError:  # dépendance optionnelle: repli sur gzip
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# En-têtes qui changent réellement la réponse d'une API (les autres, comme
+# Authorization ou User-Agent, ne doivent pas fragmenter le cache)
+CACHE_KEY_HEADERS = ('accept', 'accept-language', 'content-type')
+INDEX_FILENAME = 'cache_index.sqlite'
+# Sous ce seuil la compression gagne peu et ralentit la lecture: fichier JSON brut
+COMPRESS_MIN_BYTES = 4096
+# Encodage -> suffixe du fichier de réponse
+ENCODING_SUFFIXES = {'identity': '.json', 'gzip': '.json.gz', 'zstd': '.json.zst'}
+# Début d'un fichier de réponse au format courant: {"timestamp": ..., "request_id": ..., "response": <réponse>}
+# (réponse en dernier, recopiée sans décodage); les fichiers plus anciens commencent par "response"
+ENVELOPE_PREFIX = b'{"timestamp": '
+RESPONSE_MARKER = b'"response": '
+
+
+def compress_payload(body: bytes, encoding: str) -> bytes:
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=3).compress(body)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=6)
+    return body
+
+
+def compress_chunks(chunks: List[bytes], encoding: str) -> List[bytes]:
+    """compress_payload sur une suite de morceaux, sans les concaténer"""
+    if encoding == 'identity':
+        return chunks
+    if encoding == 'zstd':
+        compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    else:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31: en-tête gzip
+    return [compressor.compress(chunk) for chunk in chunks] + [compressor.flush()]
+
+
+def decompress_payload(data: bytes, encoding: str) -> bytes:
+    if encoding == 'zstd':
+        if zstandard is None:
+            raise OSError("Entrée compressée en zstd mais le module zstandard est absent")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if encoding == 'gzip':
+        return gzip.decompress(data)
+    return data
+
+
+def build_cache_key(method: str, url: str, payload: Any = None,
+                    headers: Optional[Dict] = None, request_kwargs: Optional[Dict] = None) -> str:
+    """Construit une clé canonique et stable (indépendante du processus) pour une requête"""
+    relevant_headers = {
+        k.lower(): v for k, v in (headers or {}).items() if k.lower() in CACHE_KEY_HEADERS
+    }
+    return json.dumps(
+        [str(method).upper(), url, payload, relevant_headers, request_kwargs or {}],
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+
+
+def stable_digest(cache_key: Any) -> str:
+    """Empreinte SHA-256 d'une clé de cache, identique d'un redémarrage à l'autre
+    (contrairement à hash() qui est salé par processus)"""
+    return hashlib.sha256(str(cache_key).encode('utf-8')).hexdigest()
+
+
+class DiskCache:
+    """Cache disque adressé par contenu, avec un index sqlite (taille, date de création, TTL).
+
+    L'index porte aussi la date d'expiration et le dernier accès de chaque entrée:
+    l'expiration et l'éviction LRU se font par requêtes indexées, sans jamais
+    relire les fichiers de réponse.
+
+    Les réponses d'au moins `compress_min_bytes` octets sont compressées (zstd si le
+    module zstandard est installé, sinon gzip); l'encodage de chaque entrée est dans
+    l'index et la lecture décompresse quel que soit le réglage courant. `size` et
+    `max_bytes` comptent les octets sur disque.
+
+    shared=True: le répertoire est partagé par plusieurs processus (workers). L'index
+    passe en WAL et le total des octets est tenu par des triggers sqlite, pour que la
+    limite de taille vaille pour l'ensemble des écritures et pas seulement celles du
+    processus courant.
+    """
+
+    def __init__(self, cache_dir: str, default_ttl: int = 86400, max_bytes: Optional[int] = None,
+                 compression: Optional[str] = 'auto', compress_min_bytes: int = COMPRESS_MIN_BYTES,
+                 shared: bool = False):
+        if compression == 'auto':
+            compression = 'zstd' if zstandard is not None else 'gzip'
+        if compression not in (None, 'identity', 'gzip', 'zstd'):
+            raise ValueError(f"Compression inconnue: {compression}")
+        if compression == 'zstd' and zstandard is None:
+            raise ValueError("Compression zstd demandée mais le module zstandard est absent")
+        self.cache_dir = cache_dir
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.compression = compression if compression != 'identity' else None
+        self.compress_min_bytes = compress_min_bytes
+        self.shared = shared
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'writes': 0, 'errors': 0,
+                      'expired_evictions': 0, 'lru_evictions': 0, 'compressed_writes': 0}
+        self.read_latency = LatencyHistogram()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.index_path = os.path.join(self.cache_dir, INDEX_FILENAME)
+        self.db = sqlite3.connect(self.index_path, check_same_thread=False)
+        # INSERT OR REPLACE doit déclencher le trigger de suppression (total partagé)
+        self.db.execute("PRAGMA recursive_triggers = ON")
+        if shared:
+            self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                ttl INTEGER NOT NULL
+            )
+        """)
+        self._migrate_index()
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_entries_expires ON entries (expires_at)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_entries_access ON entries (last_access)")
+        if shared:
+            self._create_shared_total()
+        self.db.commit()
+        self.total_bytes = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _encoding_for(self, size: int) -> str:
+        return self.compression if self.compression and size >= self.compress_min_bytes else 'identity'
+
+    def _file_path(self, digest: str, encoding: str) -> str:
+        return os.path.join(self.cache_dir, digest + ENCODING_SUFFIXES.get(encoding, '.json'))
+
+    def _migrate_index(self):
+        """Ajoute les colonnes d'expiration et de dernier accès à un index plus ancien"""
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(entries)")}
+        if 'expires_at' not in columns:
+            self.db.execute("ALTER TABLE entries ADD COLUMN expires_at REAL")
+            self.db.execute("UPDATE entries SET expires_at = created_at + ttl")
+        if 'last_access' not in columns:
+            self.db.execute("ALTER TABLE entries ADD COLUMN last_access REAL")
+            self.db.execute("UPDATE entries SET last_access = created_at")
+        if 'encoding' not in columns:
+            self.db.execute("ALTER TABLE entries ADD COLUMN encoding TEXT NOT NULL DEFAULT 'identity'")
+        if 'raw_size' not in columns:
+            self.db.execute("ALTER TABLE entries ADD COLUMN raw_size INTEGER")
+            self.db.execute("UPDATE entries SET raw_size = size")
+
+    def _create_shared_total(self):
+        """Total des octets dans l'index, maintenu par triggers; recalculé à l'ouverture
+        (un processus sans triggers a pu écrire entre-temps)"""
+        self.db.execute("CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL)")
+        self.db.execute("INSERT OR REPLACE INTO totals (id, bytes) SELECT 0, COALESCE(SUM(size), 0) FROM entries")
+        self.db.execute("CREATE TRIGGER IF NOT EXISTS entries_total_insert AFTER INSERT ON entries "
+                        "BEGIN UPDATE totals SET bytes = bytes + NEW.size WHERE id = 0; END")
+        self.db.execute("CREATE TRIGGER IF NOT EXISTS entries_total_delete AFTER DELETE ON entries "
+                        "BEGIN UPDATE totals SET bytes = bytes - OLD.size WHERE id = 0; END")
+        self.db.execute("CREATE TRIGGER IF NOT EXISTS entries_total_update AFTER UPDATE OF size ON entries "
+                        "BEGIN UPDATE totals SET bytes = bytes - OLD.size + NEW.size WHERE id = 0; END")
+
+    def _account(self, delta: int):
+        """Met à jour total_bytes après une écriture de l'index (sous self.lock)"""
+        if self.shared:
+            # D'autres processus écrivent aussi: on relit le total tenu par sqlite
+            self.total_bytes = self.db.execute("SELECT bytes FROM totals WHERE id = 0").fetchone()[0]
+        else:
+            self.total_bytes += delta
+
+    def path_for(self, cache_key: Any) -> str:
+        """Chemin du fichier de cache pour une clé (selon l'encodage de l'entrée indexée)"""
+        digest = stable_digest(cache_key)
+        with self.lock:
+            row = self.db.execute("SELECT encoding FROM entries WHERE digest = ?", (digest,)).fetchone()
+        return self._file_path(digest, row[0] if row else 'identity')
+
+    def get(self, cache_key: Any, max_age: Optional[float] = None, raw: bool = False) -> Optional[Any]:
+        """Retourne la réponse en cache si elle a moins de max_age secondes, sinon None
+
+        raw=True: la réponse est rendue sans décodage (RawJSON), sauf pour les fichiers
+        écrits par une version antérieure.
+        """
+        start = time.perf_counter()
+        digest = stable_digest(cache_key)
+        with self.lock:
+            row = self.db.execute(
+                "SELECT created_at, ttl, encoding FROM entries WHERE digest = ?", (digest,)
+            ).fetchone()
+
+        if row is None:
+            self.stats['misses'] += 1
+            return None
+
+        created_at, ttl, encoding = row
+        age = time.time() - created_at
+        if age >= (max_age if max_age is not None else ttl):
+            self.stats['misses'] += 1
+            return None
+
+        try:
+            with open(self._file_path(digest, encoding), 'rb') as cache_file:
+                document = decompress_payload(cache_file.read(), encoding)
+            if document.startswith(ENVELOPE_PREFIX):
+                body_start = document.index(RESPONSE_MARKER) + len(RESPONSE_MARKER)
+                body = document[body_start:document.rindex(b'}')]
+                del document
+                response = RawJSON(body) if raw else json.loads(body)
+            else:
+                response = json.loads(document)['response']
+        except (OSError, ValueError) as e:
+            # Fichier disparu ou corrompu: l'entrée d'index n'est plus valable
+            logger.warning(f"Entrée de cache illisible {digest[:12]}...: {e}")
+            self._forget(digest)
+            self.stats['misses'] += 1
+            self.stats['errors'] += 1
+            return None
+
+        with self.lock:
+            self.db.execute("UPDATE entries SET last_access = ? WHERE digest = ?", (time.time(), digest))
+            self.db.commit()
+        self.stats['hits'] += 1
+        self.read_latency.record(time.perf_counter() - start)
+        return response
+
+    def put(self, cache_key: Any, response: Any, ttl: Optional[int] = None,
+            request_id: Optional[str] = None) -> int:
+        """Écrit la réponse sur disque (écriture atomique) et met à jour l'index; retourne la taille
+
+        Une réponse RawJSON est écrite telle quelle, sans décodage ni copie intermédiaire.
+        """
+        digest = stable_digest(cache_key)
+        now = time.time()
+        chunks = encode_with_raw({'timestamp': now, 'request_id': request_id}, 'response', response)
+        raw_size = sum(len(chunk) for chunk in chunks)
+        encoding = self._encoding_for(raw_size)
+        chunks = compress_chunks(chunks, encoding)
+        size = sum(len(chunk) for chunk in chunks)
+        path = self._file_path(digest, encoding)
+
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as cache_file:
+            cache_file.writelines(chunks)
+        os.replace(tmp_path, path)
+
+        ttl = int(ttl if ttl is not None else self.default_ttl)
+        with self.lock:
+            previous = self.db.execute("SELECT size, encoding FROM entries WHERE digest = ?", (digest,)).fetchone()
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries (digest, size, created_at, ttl, expires_at, last_access, encoding, raw_size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (digest, size, now, ttl, now + ttl, now, encoding, raw_size)
+            )
+            self.db.commit()
+            self._account(size - (previous[0] if previous else 0))
+        if previous and previous[1] != encoding:
+            # Réécriture sous un autre encodage: l'ancien fichier n'est plus indexé
+            self._unlink(digest, previous[1])
+        self.stats['writes'] += 1
+        if encoding != 'identity':
+            self.stats['compressed_writes'] += 1
+
+        if self.max_bytes is not None and self.total_bytes > self.max_bytes:
+            self.enforce_size_limit()
+        return size
+
+    def _forget(self, digest: str):
+        """Supprime une entrée de l'index"""
+        with self.lock:
+            row = self.db.execute("SELECT size FROM entries WHERE digest = ?", (digest,)).fetchone()
+            if row:
+                self.db.execute("DELETE FROM entries WHERE digest = ?", (digest,))
+                self.db.commit()
+                self._account(-row[0])
+
+    def _unlink(self, digest: str, encoding: str):
+        try:
+            os.remove(self._file_path(digest, encoding))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Impossible de supprimer l'entrée de cache {digest[:12]}...: {e}")
+
+    def _remove_entries(self, rows) -> int:
+        """Supprime fichiers et lignes d'index pour une liste de (digest, size, encoding)"""
+        for digest, _, encoding in rows:
+            self._unlink(digest, encoding)
+        self.db.executemany("DELETE FROM entries WHERE digest = ?", [(digest,) for digest, _, _ in rows])
+        self.db.commit()
+        self._account(-sum(size for _, size, _ in rows))
+        return len(rows)
+
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        """Supprime les entrées expirées, en O(expirées) grâce à l'index sur expires_at"""
+        now = now if now is not None else time.time()
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT digest, size, encoding FROM entries WHERE expires_at <= ?", (now,)
+            ).fetchall()
+            removed = self._remove_entries(rows)
+        self.stats['expired_evictions'] += removed
+        return removed
+
+    def enforce_size_limit(self, max_bytes: Optional[int] = None) -> int:
+        """Évince les entrées les moins récemment utilisées jusqu'à repasser sous max_bytes"""
+        max_bytes = max_bytes if max_bytes is not None else self.max_bytes
+        if max_bytes is None:
+            return 0
+        with self.lock:
+            self._account(0)
+            excess = self.total_bytes - max_bytes
+            if excess <= 0:
+                return 0
+            victims = []
+            for digest, size, encoding in self.db.execute(
+                    "SELECT digest, size, encoding FROM entries ORDER BY last_access ASC"):
+                victims.append((digest, size, encoding))
+                excess -= size
+                if excess <= 0:
+                    break
+            removed = self._remove_entries(victims)
+        self.stats['lru_evictions'] += removed
+        return removed
+
+    def get_stats(self) -> Dict:
+        """Statistiques du cache: entrées, octets sur disque et décompressés, taux de hit, latence de lecture"""
+        with self.lock:
+            entries, total_bytes, raw_bytes = self.db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(raw_size), 0) FROM entries"
+            ).fetchone()
+            encodings = dict(self.db.execute("SELECT encoding, COUNT(*) FROM entries GROUP BY encoding").fetchall())
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            'entries': entries,
+            'total_bytes': total_bytes,
+            'raw_bytes': raw_bytes,
+            'compression_ratio': round(raw_bytes / total_bytes, 3) if total_bytes else 1.0,
+            'compression': self.compression or 'identity',
+            'encodings': encodings,
+            'max_bytes': self.max_bytes,
+            'hit_ratio': self.stats['hits'] / lookups if lookups else 0.0,
+            'read_latency': self.read_latency.summary_ms(),
+            **self.stats
+        }
+
+    def close(self):
+        """Ferme l'index"""
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,94 @@
+# WikimediaManagerPackage/event_bus.py
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+
+class Subscription:
+    """Tampon borné d'un abonné: au-delà de `maxsize` événements non lus, le plus
+    ancien est abandonné (et compté) pour que l'éditeur ne bloque jamais"""
+
+    def __init__(self, topic: str, maxsize: int = 1000):
+        if maxsize < 1:
+            raise ValueError("Le tampon d'un abonné doit contenir au moins un événement")
+        self.topic = topic
+        self.maxsize = maxsize
+        self.buffer: deque = deque()
+        self.cond = threading.Condition(threading.Lock())
+        self.closed = False
+        self.stats = {'received': 0, 'consumed': 0, 'dropped': 0, 'high_water': 0}
+
+    def _offer(self, event: Any):
+        with self.cond:
+            if self.closed:
+                return
+            if len(self.buffer) >= self.maxsize:
+                self.buffer.popleft()
+                self.stats['dropped'] += 1
+            self.buffer.append(event)
+            self.stats['received'] += 1
+            self.stats['high_water'] = max(self.stats['high_water'], len(self.buffer))
+            self.cond.notify()
+
+    def get_batch(self, max_items: int = 100, timeout: Optional[float] = None) -> List[Any]:
+        """Jusqu'à max_items événements; attend au plus timeout secondes s'il n'y en a aucun"""
+        with self.cond:
+            if not self.buffer and not self.closed:
+                self.cond.wait(timeout)
+            batch = [self.buffer.popleft() for _ in range(min(max_items, len(self.buffer)))]
+            self.stats['consumed'] += len(batch)
+            return batch
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.cond:
+            return {'topic': self.topic, 'depth': len(self.buffer), 'maxsize': self.maxsize, **self.stats}
+
+
+class EventBus:
+    """Bus d'événements en mémoire (publication/abonnement par sujet).
+
+    publish() ne fait qu'ajouter l'événement au tampon de chaque abonné, sans attente
+    ni entrée/sortie: un abonné lent ou absent ne ralentit pas l'éditeur.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions: Dict[str, List[Subscription]] = {}
+        self.stats = {'published': 0, 'unrouted': 0}
+
+    def subscribe(self, topic: str, maxsize: int = 1000) -> Subscription:
+        subscription = Subscription(topic, maxsize)
+        with self.lock:
+            self.subscriptions.setdefault(topic, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self.lock:
+            subscribers = self.subscriptions.get(subscription.topic, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+        subscription.close()
+
+    def publish(self, topic: str, event: Any) -> int:
+        """Publie un événement; retourne le nombre d'abonnés qui l'ont reçu"""
+        with self.lock:
+            subscribers = list(self.subscriptions.get(topic, ()))
+            self.stats['published'] += 1
+            if not subscribers:
+                self.stats['unrouted'] += 1
+        for subscription in subscribers:
+            subscription._offer(event)
+        return len(subscribers)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            subscriptions = [s for subscribers in self.subscriptions.values() for s in subscribers]
+            stats = dict(self.stats)
+        stats['subscriptions'] = [s.get_stats() for s in subscriptions]
+        stats['dropped'] = sum(s['dropped'] for s in stats['subscriptions'])
+        return stats
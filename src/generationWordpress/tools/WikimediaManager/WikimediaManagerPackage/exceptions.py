@@ -1,4 +1,5 @@
 # WikimediaManagerPackage/exceptions.py
+import uuid
 import datetime
 from typing import Dict, Any
 
@@ -0,0 +1,132 @@
+# WikimediaManagerPackage/failure_cache.py
+import time
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+# Durée (secondes) pendant laquelle un échec est resservi sans rappeler l'amont, par cause.
+# Les refus pour surcharge (429/503) ne sont pas mis en cache: ils concernent le pattern
+# entier et sont gérés par le contrôle de taux, pas par requête.
+FAILURE_TTLS = {
+    'client_error': 900,  # 4xx: requête invalide, l'échec se reproduira
+    'timeout': 300,       # requête trop lourde pour le délai de l'amont
+    'server_error': 60,   # 5xx: souvent passager
+    'network': 30,
+}
+
+
+def classify_failure(status_code: Optional[int] = None, timeout: bool = False) -> Optional[str]:
+    """Cause d'un échec (clé de FAILURE_TTLS), ou None s'il ne doit pas être mis en cache"""
+    if timeout:
+        return 'timeout'
+    if status_code is None:
+        return 'network'
+    if status_code in (429, 503):
+        return None
+    if 400 <= status_code < 500:
+        return 'client_error'
+    if status_code >= 500:
+        return 'server_error'
+    return None
+
+
+@dataclass
+class FailureEntry:
+    reason: str
+    error: str
+    status_code: Optional[int]
+    failures: int  # échecs consécutifs
+    until: float   # fin de l'échec rapide: la requête suivante sera une sonde
+    cost: float    # secondes perdues par la dernière tentative réelle
+
+
+class FailureCache:
+    """Cache négatif et disjoncteur par requête (clé de cache).
+
+    Un échec classé est resservi pendant FAILURE_TTLS[cause] secondes sans appeler
+    l'amont. À partir de `threshold` échecs consécutifs le disjoncteur est ouvert:
+    la durée double à chaque nouvel échec, jusqu'à `max_open`. Une fois la durée
+    écoulée, une requête passe (sonde); un succès efface l'entrée.
+
+    Le temps économisé est estimé, pour chaque échec rapide, par la durée de la
+    dernière tentative réelle ayant échoué.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, threshold: int = 3,
+                 max_open: float = 3600, enabled: bool = True):
+        self.ttls = dict(FAILURE_TTLS, **(ttls or {}))
+        self.threshold = threshold
+        self.max_open = max_open
+        self.enabled = enabled
+        self.entries: Dict[str, FailureEntry] = {}
+        self.lock = threading.Lock()
+        self.stats = {'recorded': 0, 'fast_failures': 0, 'probes': 0, 'recovered': 0, 'time_saved': 0.0}
+        self.fast_failures_by_reason: Dict[str, int] = defaultdict(int)
+
+    def check(self, key: str, now: Optional[float] = None) -> Optional[FailureEntry]:
+        """Entrée à resservir si la requête doit échouer tout de suite, sinon None"""
+        if not self.enabled:
+            return None
+        now = now if now is not None else time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if now >= entry.until:
+                self.stats['probes'] += 1
+                return None
+            self.stats['fast_failures'] += 1
+            self.stats['time_saved'] += entry.cost
+            self.fast_failures_by_reason[entry.reason] += 1
+            return entry
+
+    def record_failure(self, key: str, reason: Optional[str], error: str, status_code: Optional[int] = None,
+                       cost: float = 0.0, now: Optional[float] = None) -> Optional[FailureEntry]:
+        if not self.enabled or reason is None:
+            return None
+        now = now if now is not None else time.time()
+        with self.lock:
+            previous = self.entries.get(key)
+            failures = previous.failures + 1 if previous else 1
+            duration = self.ttls.get(reason, 0)
+            if failures >= self.threshold:
+                duration = min(duration * 2 ** (failures - self.threshold + 1), self.max_open)
+            entry = FailureEntry(reason, error, status_code, failures, now + duration, cost)
+            self.entries[key] = entry
+            self.stats['recorded'] += 1
+            return entry
+
+    def record_success(self, key: str):
+        if not self.entries:
+            return
+        with self.lock:
+            if self.entries.pop(key, None) is not None:
+                self.stats['recovered'] += 1
+
+    def evict_stale(self, now: Optional[float] = None) -> int:
+        """Oublie les entrées échues depuis plus de max_open (plus de sonde attendue)"""
+        now = now if now is not None else time.time()
+        with self.lock:
+            stale = [key for key, entry in self.entries.items() if now - entry.until > self.max_open]
+            for key in stale:
+                del self.entries[key]
+        return len(stale)
+
+    def get_stats(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = now if now is not None else time.time()
+        with self.lock:
+            active = [entry for entry in self.entries.values() if entry.until > now]
+            by_reason = defaultdict(int)
+            for entry in active:
+                by_reason[entry.reason] += 1
+            return {
+                'enabled': self.enabled,
+                'entries': len(self.entries),
+                'active': len(active),
+                'open_breakers': sum(1 for entry in active if entry.failures >= self.threshold),
+                'active_by_reason': dict(by_reason),
+                'fast_failures_by_reason': dict(self.fast_failures_by_reason),
+                **self.stats,
+                'time_saved': round(self.stats['time_saved'], 3)
+            }
@@ -0,0 +1,97 @@
+# WikimediaManagerPackage/http_pool.py
+import logging
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+from aiohttp import ClientSession, ClientTimeout
+
+logger = logging.getLogger(__name__)
+
+POOL_LIMIT_PER_HOST = 10
+POOL_KEEPALIVE_TIMEOUT = 60  # secondes de vie d'une connexion inactive
+
+
+class HostSessionPool:
+    """Une ClientSession aiohttp longue durée par hôte cible.
+
+    Les sessions sont créées paresseusement dans la boucle asyncio du worker
+    et gardent leurs connexions ouvertes (keep-alive): DNS, TCP et TLS ne sont
+    payés qu'une fois par connexion et non à chaque requête.
+    """
+
+    def __init__(self, limit_per_host: int = POOL_LIMIT_PER_HOST,
+                 keepalive_timeout: float = POOL_KEEPALIVE_TIMEOUT,
+                 timeout: Optional[ClientTimeout] = None):
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.sessions: Dict[str, ClientSession] = {}
+        self.stats = {'requests': 0, 'connections_created': 0, 'connections_reused': 0}
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        """Trace aiohttp pour compter créations et réutilisations de connexions"""
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            self.stats['requests'] += 1
+
+        async def on_connection_create_end(session, ctx, params):
+            self.stats['connections_created'] += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self.stats['connections_reused'] += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    def get_session(self, url: str) -> ClientSession:
+        """Retourne la session de l'hôte de l'URL (à appeler depuis la boucle du worker)"""
+        parsed = urlparse(url)
+        host = f"{parsed.scheme}://{parsed.netloc}"
+        session = self.sessions.get(host)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                enable_cleanup_closed=True
+            )
+            session = ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                trace_configs=[self._trace_config()]
+            )
+            self.sessions[host] = session
+            logger.info(f"Pool de connexions créé pour {host} (max {self.limit_per_host} connexions)")
+        return session
+
+    async def close(self):
+        """Ferme toutes les sessions (à appeler depuis la boucle du worker)"""
+        for host, session in list(self.sessions.items()):
+            try:
+                if not session.closed:
+                    await session.close()
+            except Exception as e:
+                logger.debug(f"Erreur mineure lors de la fermeture de la session {host}: {e}")
+        self.sessions.clear()
+
+    def get_stats(self) -> Dict:
+        """Connexions ouvertes/inactives par hôte et taux de réutilisation"""
+        hosts = {}
+        for host, session in list(self.sessions.items()):
+            connector = session.connector
+            # _conns (connexions inactives du pool) et _acquired (en cours d'utilisation)
+            # sont privés dans aiohttp: lecture défensive
+            idle = sum(len(conns) for conns in getattr(connector, '_conns', {}).values()) if connector else 0
+            in_use = len(getattr(connector, '_acquired', ())) if connector else 0
+            hosts[host] = {'open': idle + in_use, 'idle': idle, 'in_use': in_use}
+
+        connections = self.stats['connections_created'] + self.stats['connections_reused']
+        return {
+            'hosts': hosts,
+            'limit_per_host': self.limit_per_host,
+            'reuse_ratio': self.stats['connections_reused'] / connections if connections else 0.0,
+            **self.stats
+        }
@@ -1,10 +1,111 @@
 # WikimediaManagerPackage/metrics.py
 import time
+import bisect
 import threading
 from dataclasses import dataclass, field
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable, Optional, Tuple
 from collections import defaultdict, deque
 
+# Bornes supérieures des buckets (secondes): progression géométrique de raison 2^(1/4),
+# de 1 ms à ~131 s; l'erreur relative d'un quantile reste sous ~19 %
+DEFAULT_LATENCY_BUCKETS = tuple(round(0.001 * 2 ** (i / 4), 6) for i in range(69))
+
+
+class LatencyHistogram:
+    """Histogramme de latences à buckets fixes: mémoire constante, fusionnable,
+    quantiles approchés par interpolation dans le bucket"""
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # dernier bucket: +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self.lock = threading.Lock()
+
+    def record(self, value: float):
+        value = max(value, 0.0)
+        index = bisect.bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            self.min = min(self.min, value)
+            self.max = max(self.max, value)
+
+    def merge(self, other: 'LatencyHistogram'):
+        if other.bounds != self.bounds:
+            raise ValueError("Histogrammes de bornes différentes")
+        with self.lock:
+            for i, c in enumerate(other.counts):
+                self.counts[i] += c
+            self.count += other.count
+            self.sum += other.sum
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        with self.lock:
+            if not self.count:
+                return 0.0
+            rank = q * self.count
+            cumulative = 0
+            for i, c in enumerate(self.counts):
+                if c and cumulative + c >= rank:
+                    lower = self.bounds[i - 1] if i > 0 else 0.0
+                    upper = self.bounds[i] if i < len(self.bounds) else self.max
+                    value = lower + (upper - lower) * (rank - cumulative) / c
+                    return min(max(value, self.min), self.max)
+                cumulative += c
+            return self.max
+
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def summary_ms(self) -> Dict[str, float]:
+        """p50/p90/p99/max en millisecondes"""
+        return {
+            'count': self.count,
+            'p50_ms': round(self.quantile(0.50) * 1000, 3),
+            'p90_ms': round(self.quantile(0.90) * 1000, 3),
+            'p99_ms': round(self.quantile(0.99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3)
+        }
+
+
+def _prometheus_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    escaped = (key + '="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+               for key, value in labels.items())
+    return '{' + ','.join(escaped) + '}'
+
+
+def prometheus_metric(name: str, help_text: str, metric_type: str,
+                      samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    """Lignes au format texte Prometheus d'un compteur ou d'une jauge"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_prometheus_labels(labels)} {value}")
+    return lines
+
+
+def prometheus_histogram(name: str, help_text: str,
+                         series: Iterable[Tuple[Dict[str, str], LatencyHistogram]]) -> List[str]:
+    """Lignes au format texte Prometheus d'histogrammes (buckets cumulés, _sum, _count)"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, histogram in series:
+        with histogram.lock:
+            counts, total, count = list(histogram.counts), histogram.sum, histogram.count
+        cumulative = 0
+        for bound, c in zip(list(histogram.bounds) + ['+Inf'], counts):
+            cumulative += c
+            lines.append(f"{name}_bucket{_prometheus_labels({**labels, 'le': bound})} {cumulative}")
+        lines.append(f"{name}_sum{_prometheus_labels(labels)} {total}")
+        lines.append(f"{name}_count{_prometheus_labels(labels)} {count}")
+    return lines
+
 
 @dataclass
 class OperationMetrics:
@@ -13,22 +114,30 @@ class OperationMetrics:
     total_calls: int = 0
     successful_calls: int = 0
     failed_calls: int = 0
-    response_times: deque = field(default_factory=lambda: deque(maxlen=1000))
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    endpoints: Dict[str, LatencyHistogram] = field(default_factory=dict)
     error_types: Dict[str, int] = field(default_factory=dict)
     last_error: str = ""
     last_success: float = 0
 
-    def record_success(self, response_time: float):
+    def _record_latency(self, response_time: float, endpoint: Optional[str]):
+        self.latency.record(response_time)
+        if endpoint:
+            if endpoint not in self.endpoints:
+                self.endpoints[endpoint] = LatencyHistogram()
+            self.endpoints[endpoint].record(response_time)
+
+    def record_success(self, response_time: float, endpoint: Optional[str] = None):
         self.total_calls += 1
         self.successful_calls += 1
-        self.response_times.append(response_time)
+        self._record_latency(response_time, endpoint)
         self.last_success = time.time()
 
-    def record_error(self, error_type: str, response_time: float = 0):
+    def record_error(self, error_type: str, response_time: float = 0, endpoint: Optional[str] = None):
         self.total_calls += 1
         self.failed_calls += 1
         if response_time > 0:
-            self.response_times.append(response_time)
+            self._record_latency(response_time, endpoint)
         self.error_types[error_type] = self.error_types.get(error_type, 0) + 1
         self.last_error = error_type
 
@@ -38,9 +147,7 @@ class OperationMetrics:
         return (self.successful_calls / self.total_calls) * 100
 
     def get_avg_response_time(self) -> float:
-        if not self.response_times:
-            return 0.0
-        return sum(self.response_times) / len(self.response_times)
+        return self.latency.mean()
 
 
 class WikimediaMetricsCollector:
@@ -51,17 +158,18 @@ class WikimediaMetricsCollector:
         self.lock = threading.Lock()
         self.start_time = time.time()
 
-    def record_operation_success(self, operation_name: str, response_time: float):
+    def record_operation_success(self, operation_name: str, response_time: float, endpoint: Optional[str] = None):
         with self.lock:
             if operation_name not in self.operations:
                 self.operations[operation_name] = OperationMetrics(operation_name)
-            self.operations[operation_name].record_success(response_time)
+            self.operations[operation_name].record_success(response_time, endpoint)
 
-    def record_operation_error(self, operation_name: str, error_type: str, response_time: float = 0):
+    def record_operation_error(self, operation_name: str, error_type: str, response_time: float = 0,
+                               endpoint: Optional[str] = None):
         with self.lock:
             if operation_name not in self.operations:
                 self.operations[operation_name] = OperationMetrics(operation_name)
-            self.operations[operation_name].record_error(error_type, response_time)
+            self.operations[operation_name].record_error(error_type, response_time, endpoint)
 
     def get_metrics(self) -> Dict[str, Any]:
         with self.lock:
@@ -80,6 +188,9 @@ class WikimediaMetricsCollector:
                     'failed_calls': op_metrics.failed_calls,
                     'success_rate_percent': op_metrics.get_success_rate(),
                     'avg_response_time_ms': op_metrics.get_avg_response_time() * 1000,
+                    'latency': op_metrics.latency.summary_ms(),
+                    'endpoints': {endpoint: histogram.summary_ms()
+                                  for endpoint, histogram in op_metrics.endpoints.items()},
                     'error_types': dict(op_metrics.error_types),
                     'last_error': op_metrics.last_error
                 }
@@ -96,6 +207,28 @@ class WikimediaMetricsCollector:
 
             return metrics
 
+    def to_prometheus(self) -> str:
+        """Export au format texte Prometheus"""
+        with self.lock:
+            operations = list(self.operations.values())
+
+        lines = prometheus_metric(
+            'wikimedia_operation_calls_total', "Appels par opération et par issue", 'counter',
+            [({'operation': op.name, 'outcome': outcome}, value) for op in operations
+             for outcome, value in (('success', op.successful_calls), ('error', op.failed_calls))])
+        lines += prometheus_metric(
+            'wikimedia_operation_errors_total', "Erreurs par opération et par type", 'counter',
+            [({'operation': op.name, 'error_type': error_type}, count) for op in operations
+             for error_type, count in op.error_types.items()])
+        lines += prometheus_histogram(
+            'wikimedia_operation_duration_seconds', "Durée des opérations",
+            [({'operation': op.name}, op.latency) for op in operations])
+        lines += prometheus_histogram(
+            'wikimedia_endpoint_duration_seconds', "Durée des opérations par endpoint",
+            [({'operation': op.name, 'endpoint': endpoint}, histogram) for op in operations
+             for endpoint, histogram in op.endpoints.items()])
+        return '\n'.join(lines) + '\n'
+
 
 # Instance globale pour collecter les métriques
 metrics_collector = WikimediaMetricsCollector()
@@ -6,8 +6,8 @@ from .metrics import metrics_collector
 from .exceptions import WikimediaAccessError
 
 
-def monitor_operation(operation_name: str = None):
-    """Décorateur pour monitorer les opérations"""
+def monitor_operation(operation_name: str = None, endpoint: str = None):
+    """Décorateur pour monitorer les opérations (latences aussi ventilées par endpoint si fourni)"""
 
     def decorator(func):
         @functools.wraps(func)
@@ -22,7 +22,7 @@ def monitor_operation(operation_name: str = None):
 
                 # Enregistrer le succès
                 response_time = time.time() - start_time
-                metrics_collector.record_operation_success(op_name, response_time)
+                metrics_collector.record_operation_success(op_name, response_time, endpoint)
 
                 logger.debug(f"Opération {op_name} réussie en {response_time:.3f}s")
                 return result
@@ -31,7 +31,7 @@ def monitor_operation(operation_name: str = None):
                 # Erreur métier - enregistrer avec type
                 response_time = time.time() - start_time
                 error_type = type(e).__name__
-                metrics_collector.record_operation_error(op_name, error_type, response_time)
+                metrics_collector.record_operation_error(op_name, error_type, response_time, endpoint)
 
                 logger.error(f"Opération {op_name} échouée ({error_type}) après {response_time:.3f}s: {str(e)}")
                 raise
@@ -39,7 +39,7 @@ def monitor_operation(operation_name: str = None):
             except Exception as e:
                 # Erreur système - enregistrer comme "SystemError"
                 response_time = time.time() - start_time
-                metrics_collector.record_operation_error(op_name, "SystemError", response_time)
+                metrics_collector.record_operation_error(op_name, "SystemError", response_time, endpoint)
 
                 logger.error(f"Erreur système dans {op_name} après {response_time:.3f}s: {str(e)}")
                 raise
@@ -0,0 +1,205 @@
+# WikimediaManagerPackage/rate_limiter.py
+import time
+import asyncio
+import threading
+import email.utils
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """Seau à jetons asynchrone: `rate` départs par seconde en régime établi,
+    jusqu'à `burst` départs immédiats après une période calme.
+
+    Le jeton est consommé au départ de la requête; sa durée n'entre pas en compte,
+    une requête lente ne gaspille donc pas le budget de taux.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("Le taux d'appels doit être positif")
+        self.rate = rate
+        self.burst = max(1, int(burst))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+        self.stats = {'acquired': 0, 'waited': 0, 'wait_time': 0.0, 'pauses': 0}
+
+    def configure(self, rate: float, burst: int = None):
+        """Change le taux (et éventuellement la rafale) sans perdre les jetons accumulés"""
+        if rate <= 0:
+            raise ValueError("Le taux d'appels doit être positif")
+        self._refill(time.monotonic())
+        self.rate = rate
+        if burst is not None:
+            self.burst = max(1, int(burst))
+        self.tokens = min(self.tokens, float(self.burst))
+
+    def pause(self, seconds: float):
+        """Suspend les départs pendant `seconds` (Retry-After de l'amont); les jetons sont vidés
+        pour que la reprise se fasse au rythme du taux et non en rafale"""
+        until = time.monotonic() + max(0.0, seconds)
+        if until > self.paused_until:
+            self.paused_until = until
+            self.tokens = 0.0
+            self.updated = until
+            self.stats['pauses'] += 1
+
+    def _refill(self, now: float):
+        # `updated` peut être dans le futur pendant une pause: pas de jetons avant sa fin
+        self.tokens = min(float(self.burst), self.tokens + max(0.0, now - self.updated) * self.rate)
+        self.updated = max(self.updated, now)
+
+    async def acquire(self):
+        """Attend un jeton; les appelants sont servis dans leur ordre d'arrivée"""
+        start = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+        waited = time.monotonic() - start
+        self.stats['acquired'] += 1
+        if waited > 0.001:
+            self.stats['waited'] += 1
+            self.stats['wait_time'] += waited
+
+    def get_stats(self) -> Dict:
+        now = time.monotonic()
+        return {
+            'rate': self.rate,
+            'burst': self.burst,
+            'tokens': round(min(float(self.burst), self.tokens + max(0.0, now - self.updated) * self.rate), 3),
+            'paused_for': round(max(0.0, self.paused_until - now), 3),
+            **self.stats
+        }
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Délai en secondes d'un en-tête Retry-After (nombre de secondes ou date HTTP), None si absent ou illisible"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - (time.time() if now is None else now))
+
+
+class AdaptiveRateController:
+    """Ajuste le taux d'un TokenBucket en AIMD d'après les réponses de l'amont.
+
+    - 429/503: taux multiplié par `throttle_factor` et départs suspendus pendant le
+      Retry-After (ou `default_pause` s'il manque);
+    - amont sain: +`increase_step` x plafond par seconde, jusqu'au plafond.
+
+    La latence n'est que suivie (latency_ewma): les requêtes d'un même pattern vont de
+    quelques ms à plusieurs secondes selon la requête, un écart de latence n'est pas un
+    signal de saturation de l'amont.
+
+    Une baisse au plus par `cooldown` secondes: les réponses d'une même vague de
+    requêtes en vol ne font pas s'effondrer le taux.
+    """
+
+    def __init__(self, bucket: TokenBucket, ceiling: Optional[float] = None, min_rate: float = 0.05,
+                 increase_step: float = 0.05, throttle_factor: float = 0.5,
+                 cooldown: float = 1.0, default_pause: float = 1.0,
+                 max_pause: float = 300.0, enabled: bool = True):
+        self.bucket = bucket
+        self._ceiling = ceiling if ceiling is not None else bucket.rate
+        self.min_rate = min_rate
+        self.increase_step = increase_step
+        self.throttle_factor = throttle_factor
+        self.cooldown = cooldown
+        self.default_pause = default_pause
+        self.max_pause = max_pause
+        self.enabled = enabled
+
+        self.latency_ewma: Optional[float] = None
+        self.last_decrease = 0.0
+        self.last_increase = time.monotonic()
+        self._lock = threading.Lock()
+        self.stats = {'throttled': 0, 'decreases': 0, 'increases': 0, 'retry_after_honored': 0}
+
+    @property
+    def ceiling(self) -> float:
+        # Seau partagé entre processus (shared_state.SharedTokenBucket): le plafond est porté par le seau
+        return getattr(self.bucket, 'ceiling', self._ceiling)
+
+    @ceiling.setter
+    def ceiling(self, ceiling: float):
+        self._ceiling = ceiling
+        if hasattr(self.bucket, 'ceiling'):
+            self.bucket.ceiling = ceiling
+
+    def set_ceiling(self, ceiling: float):
+        """Nouveau plafond (taux configuré); appliqué tout de suite sauf pendant un repli récent.
+
+        Sans changement du plafond, le taux adapté est gardé: des clients rappellent
+        set_rate_limit avec la même valeur avant chaque requête.
+        """
+        if ceiling <= 0:
+            raise ValueError("Le taux d'appels doit être positif")
+        with self._lock:
+            if ceiling == self.ceiling and (self.enabled or self.bucket.rate == ceiling):
+                return
+            self.ceiling = ceiling
+            backing_off = time.monotonic() - self.last_decrease < 10 * self.cooldown
+            rate = min(self.bucket.rate, ceiling) if self.enabled and backing_off else ceiling
+            self.bucket.configure(rate)
+
+    def on_throttled(self, retry_after: Optional[float] = None) -> float:
+        """Réponse 429/503: baisse multiplicative et pause; retourne la durée de la pause"""
+        pause = min(retry_after if retry_after is not None else self.default_pause, self.max_pause)
+        with self._lock:
+            self.stats['throttled'] += 1
+            if retry_after is not None:
+                self.stats['retry_after_honored'] += 1
+            self.bucket.pause(pause)
+            if self.enabled:
+                self._decrease(self.throttle_factor)
+        return pause
+
+    def on_success(self, latency: float):
+        """Réponse saine: met à jour la latence lissée et remonte le taux vers le plafond"""
+        if not self.enabled:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+            if self.bucket.rate < self.ceiling and now >= self.bucket.paused_until:
+                elapsed = now - max(self.last_increase, self.last_decrease)
+                if elapsed > 0:
+                    self.bucket.configure(min(self.ceiling, self.bucket.rate + self.increase_step * self.ceiling * elapsed))
+                    self.stats['increases'] += 1
+                self.last_increase = now
+            else:
+                self.last_increase = now
+
+    def _decrease(self, factor: float):
+        now = time.monotonic()
+        if now - self.last_decrease < self.cooldown:
+            return
+        self.bucket.configure(max(self.min_rate, min(self.bucket.rate, self.ceiling) * factor))
+        self.last_decrease = now
+        self.stats['decreases'] += 1
+
+    def get_stats(self) -> Dict:
+        return {
+            'adaptive': self.enabled,
+            'ceiling': self.ceiling,
+            'latency_ewma_ms': round(self.latency_ewma * 1000, 3) if self.latency_ewma is not None else None,
+            **self.stats
+        }
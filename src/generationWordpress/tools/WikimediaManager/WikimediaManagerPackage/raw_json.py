@@ -0,0 +1,77 @@
+# WikimediaManagerPackage/raw_json.py
+import re
+import json
+from typing import Any, Dict, Iterator, List
+
+# Début du tableau des lignes d'un résultat SPARQL JSON ({"head": ..., "results": {"bindings": [...]}})
+BINDINGS_START = re.compile(r'"bindings"\s*:\s*\[')
+SEPARATORS = ' \t\n\r,'  # entre deux lignes du tableau
+
+
+def is_json_content_type(content_type: Any) -> bool:
+    """application/json et ses variantes (application/sparql-results+json de WDQS)"""
+    return isinstance(content_type, str) and (content_type == 'application/json' or content_type.endswith('+json'))
+
+
+def looks_like_json_document(body: bytes) -> bool:
+    """Contrôle de forme sans décodage: un objet ou un tableau JSON complet"""
+    stripped = body.strip()
+    return (stripped[:1], stripped[-1:]) in ((b'{', b'}'), (b'[', b']'))
+
+
+class RawJSON:
+    """Réponse JSON gardée sous forme d'octets, telle que reçue de l'amont.
+
+    Écrite telle quelle dans le cache et recopiée telle quelle dans les réponses aux
+    clients: aucun décodage ni ré-encodage. Le décodage n'a lieu que si un consommateur
+    demande l'objet (json()) ou les lignes d'un résultat SPARQL (iter_rows()).
+    """
+
+    __slots__ = ('raw',)
+
+    def __init__(self, raw: bytes):
+        self.raw = bytes(raw)
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def __repr__(self) -> str:
+        return f"RawJSON({len(self.raw)} octets)"
+
+    def json(self) -> Any:
+        """Décode tout le document (sans le garder: chaque appel décode à nouveau)"""
+        return json.loads(self.raw)
+
+    def iter_rows(self) -> Iterator[Dict]:
+        """Lignes (bindings) d'un résultat SPARQL, décodées une à une: seule la ligne
+        courante est un objet Python, le reste du document reste du texte"""
+        text = self.raw.decode('utf-8')
+        match = BINDINGS_START.search(text)
+        if match is None:
+            yield from self.json().get('results', {}).get('bindings', [])
+            return
+        decoder = json.JSONDecoder()
+        position = match.end()
+        while True:
+            while text[position] in SEPARATORS:
+                position += 1
+            if text[position] == ']':
+                return
+            row, position = decoder.raw_decode(text, position)
+            yield row
+
+
+def decode(value: Any) -> Any:
+    """Valeur Python d'une réponse, qu'elle soit brute (RawJSON) ou déjà décodée"""
+    return value.json() if isinstance(value, RawJSON) else value
+
+
+def encode_with_raw(envelope: Dict[str, Any], key: str, value: Any) -> List[bytes]:
+    """Sérialise {**envelope, key: value} en morceaux d'octets; une valeur RawJSON est
+    insérée telle quelle, en dernier champ, sans être copiée"""
+    if not isinstance(value, RawJSON):
+        return [json.dumps({**envelope, key: value}, default=str).encode('utf-8')]
+    head = json.dumps(envelope, default=str)[:-1]
+    head += (', ' if envelope else '') + json.dumps(key) + ': '
+    return [head.encode('utf-8'), value.raw, b'}']
+
@@ -0,0 +1,176 @@
+# WikimediaManagerPackage/request_journal.py
+import json
+import time
+import queue
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, List, Tuple
+
+from raw_json import RawJSON
+
+logger = logging.getLogger(__name__)
+
+
+class RequestJournal:
+    """Journal sqlite des requêtes acceptées et des réponses non encore récupérées.
+
+    Une ligne par requête, écrite avant que le client ne reçoive son identifiant,
+    complétée par la réponse, supprimée quand la réponse est récupérée ou évincée.
+    Au redémarrage, les lignes restantes sont rejouées: requêtes remises en file,
+    réponses remises à disposition.
+
+    Seule l'acceptation est écrite de façon synchrone. Réponses et suppressions sont
+    regroupées par un thread d'écriture (une transaction par lot): en cas de plantage,
+    les dernières peuvent manquer, ce qui fait au pire rejouer une requête déjà
+    servie ou redonner une réponse déjà récupérée.
+
+    Mode WAL avec synchronous=NORMAL par défaut: chaque écriture survit à l'arrêt
+    ou au plantage du processus; seule une coupure du système peut perdre les
+    dernières écritures (synchronous='FULL' pour l'éviter, au prix d'un fsync par écriture).
+    """
+
+    def __init__(self, path: str, synchronous: str = 'NORMAL'):
+        self.path = path
+        self.lock = threading.Lock()
+        self.stats = {'writes': 0, 'write_time': 0.0, 'replayed_pending': 0, 'replayed_completed': 0}
+
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(f"PRAGMA synchronous={synchronous}")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS schedulers (
+                patterns TEXT PRIMARY KEY,
+                scheduler_id TEXT NOT NULL
+            )
+        """)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS requests (
+                request_id TEXT PRIMARY KEY,
+                patterns TEXT NOT NULL,
+                data TEXT NOT NULL,
+                accepted_at REAL NOT NULL,
+                response TEXT,
+                completed_at REAL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_requests_patterns ON requests (patterns, accepted_at)")
+
+        self._deferred: queue.Queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_deferred, name="RequestJournalWriter", daemon=True)
+        self._writer.start()
+
+    @staticmethod
+    def patterns_key(api_patterns: List[str]) -> str:
+        return json.dumps(sorted(str(getattr(p, "pattern", p)) for p in api_patterns))
+
+    def _write(self, sql: str, params):
+        start = time.perf_counter()
+        with self.lock:
+            self.db.execute(sql, params)
+            self.stats['writes'] += 1
+            self.stats['write_time'] += time.perf_counter() - start
+
+    def _write_deferred(self):
+        """Thread d'écriture: vide la file des écritures différées, une transaction par lot"""
+        while True:
+            batch = [self._deferred.get()]
+            while len(batch) < 500:
+                try:
+                    batch.append(self._deferred.get_nowait())
+                except queue.Empty:
+                    break
+            statements = [item for item in batch if item is not None]
+            try:
+                if statements:
+                    start = time.perf_counter()
+                    with self.lock:
+                        self.db.execute("BEGIN")
+                        for sql, params in statements:
+                            self.db.executemany(sql, params)
+                        self.db.execute("COMMIT")
+                        self.stats['writes'] += len(statements)
+                        self.stats['write_time'] += time.perf_counter() - start
+            except sqlite3.Error as e:
+                logger.error(f"Écriture différée du journal impossible: {e}")
+            finally:
+                for _ in batch:
+                    self._deferred.task_done()
+            if len(statements) < len(batch):
+                return
+
+    def flush(self):
+        """Attend que les écritures différées soient sur disque"""
+        self._deferred.join()
+
+    def scheduler_id_for(self, api_patterns: List[str], default: str) -> str:
+        """Identifiant déjà attribué à ce jeu de patterns (stable d'un redémarrage à l'autre)"""
+        key = self.patterns_key(api_patterns)
+        with self.lock:
+            self.db.execute("INSERT OR IGNORE INTO schedulers (patterns, scheduler_id) VALUES (?, ?)", (key, default))
+            return self.db.execute("SELECT scheduler_id FROM schedulers WHERE patterns = ?", (key,)).fetchone()[0]
+
+    def journaled_patterns(self) -> List[List[str]]:
+        """Jeux de patterns ayant du travail en attente ou des réponses non récupérées"""
+        with self.lock:
+            rows = self.db.execute("SELECT DISTINCT patterns FROM requests").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def record_accepted(self, api_patterns: List[str], request_id: str, data: Dict[str, Any]):
+        self._write("INSERT OR REPLACE INTO requests (request_id, patterns, data, accepted_at) VALUES (?, ?, ?, ?)",
+                    (request_id, self.patterns_key(api_patterns), json.dumps(data, default=str), time.time()))
+
+    def record_completed(self, request_ids: List[str], response: Any):
+        """Réponse d'une requête (et des requêtes fusionnées avec elle), sérialisée une seule fois"""
+        if isinstance(response, RawJSON):
+            serialized = response.raw.decode('utf-8')  # déjà du JSON: pas de ré-encodage
+        else:
+            serialized = json.dumps(response, default=str)
+        now = time.time()
+        self._deferred.put(("UPDATE requests SET response = ?, completed_at = ? WHERE request_id = ?",
+                            [(serialized, now, request_id) for request_id in request_ids]))
+
+    def record_delivered(self, request_id: str):
+        self._deferred.put(("DELETE FROM requests WHERE request_id = ?", [(request_id,)]))
+
+    def load(self, api_patterns: List[str]) -> Tuple[List[Dict[str, Any]], List[Tuple[str, Any]]]:
+        """(requêtes en attente dans leur ordre d'arrivée, [(request_id, réponse)] non récupérées)"""
+        self.flush()
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT request_id, data, response FROM requests WHERE patterns = ? ORDER BY accepted_at",
+                (self.patterns_key(api_patterns),)).fetchall()
+        pending = [json.loads(data) for _, data, response in rows if response is None]
+        completed = [(request_id, json.loads(response)) for request_id, _, response in rows if response is not None]
+        self.stats['replayed_pending'] += len(pending)
+        self.stats['replayed_completed'] += len(completed)
+        return pending, completed
+
+    def forget(self, api_patterns: List[str]):
+        """Oublie un scheduler supprimé et tout son travail journalisé"""
+        key = self.patterns_key(api_patterns)
+        self.flush()
+        with self.lock:
+            self.db.execute("DELETE FROM requests WHERE patterns = ?", (key,))
+            self.db.execute("DELETE FROM schedulers WHERE patterns = ?", (key,))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            pending, completed = self.db.execute(
+                "SELECT COUNT(*) - COUNT(response), COUNT(response) FROM requests").fetchone()
+        return {
+            'path': self.path,
+            'pending': pending,
+            'completed': completed,
+            'writes': self.stats['writes'],
+            'deferred': self._deferred.qsize(),
+            'avg_write_ms': round(self.stats['write_time'] / self.stats['writes'] * 1000, 4) if self.stats['writes'] else 0.0,
+            'replayed_pending': self.stats['replayed_pending'],
+            'replayed_completed': self.stats['replayed_completed']
+        }
+
+    def close(self):
+        self._deferred.put(None)
+        self._writer.join()
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,130 @@
+# WikimediaManagerPackage/result_store.py
+import json
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from raw_json import RawJSON
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_size(value: Any) -> int:
+    """Taille approximative en octets d'une réponse (longueur de sa sérialisation JSON)"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, RawJSON):
+        return len(value.raw)
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    try:
+        return len(json.dumps(value, default=str, ensure_ascii=False).encode('utf-8'))
+    except (TypeError, ValueError):
+        return len(str(value))
+
+
+class ResultStore(dict):
+    """Dictionnaire request_id -> réponse borné en octets, avec TTL par entrée.
+
+    Reste un dict pour les appelants existants (affectation, pop, in, len, keys);
+    la comptabilité est tenue dans __setitem__/pop/__delitem__/clear. Non thread-safe:
+    le propriétaire le protège par son propre verrou, sous lequel on_evict est appelé.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, ttl: float = 300, delivered_ttl: float = 30,
+                 on_evict: Optional[Callable[[str, str], None]] = None):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.delivered_ttl = delivered_ttl
+        self.on_evict = on_evict
+        self._sizes: Dict[str, int] = {}
+        self._expires: Dict[str, float] = {}
+        self.total_bytes = 0
+        self.high_water_bytes = 0
+        self.high_water_entries = 0
+        self.stats = {'stored': 0, 'evicted_ttl': 0, 'evicted_size': 0}
+
+    def __setitem__(self, key: str, value: Any):
+        self.put(key, value)
+
+    def put(self, key: str, value: Any, size: Optional[int] = None):
+        """Stocke une réponse; size évite de re-mesurer un objet déjà compté (réponse partagée)"""
+        if key in self:
+            self._forget(key)
+        size = size if size is not None else estimate_size(value)
+        super().__setitem__(key, value)
+        self._sizes[key] = size
+        self._expires[key] = time.time() + self.ttl
+        self.total_bytes += size
+        self.stats['stored'] += 1
+        self.high_water_bytes = max(self.high_water_bytes, self.total_bytes)
+        self.high_water_entries = max(self.high_water_entries, len(self))
+        self.enforce_size_limit(keep=key)
+
+    def __delitem__(self, key: str):
+        super().__delitem__(key)
+        self._forget(key)
+
+    def pop(self, key: str, *default):
+        if key in self:
+            self._forget(key)
+        return super().pop(key, *default)
+
+    def clear(self):
+        super().clear()
+        self._sizes.clear()
+        self._expires.clear()
+        self.total_bytes = 0
+
+    def _forget(self, key: str):
+        self.total_bytes -= self._sizes.pop(key, 0)
+        self._expires.pop(key, None)
+
+    def _evict(self, key: str, reason: str):
+        self.pop(key, None)
+        self.stats[f'evicted_{reason}'] += 1
+        if self.on_evict:
+            self.on_evict(key, reason)
+
+    def size_of(self, key: str) -> Optional[int]:
+        return self._sizes.get(key)
+
+    def mark_delivered(self, key: str):
+        """Réponse livrée au client (notification): conservée seulement delivered_ttl secondes"""
+        if key in self._expires:
+            self._expires[key] = min(self._expires[key], time.time() + self.delivered_ttl)
+
+    def evict_expired(self, now: Optional[float] = None) -> List[str]:
+        """Retire les réponses dont le TTL est dépassé"""
+        now = now if now is not None else time.time()
+        expired = [key for key, expires_at in self._expires.items() if expires_at <= now]
+        for key in expired:
+            self._evict(key, 'ttl')
+        return expired
+
+    def enforce_size_limit(self, keep: Optional[str] = None) -> List[str]:
+        """Retire les réponses les plus anciennes tant que la taille dépasse max_bytes"""
+        evicted = []
+        if not self.max_bytes or self.total_bytes <= self.max_bytes:
+            return evicted
+        for key in list(self.keys()):
+            if self.total_bytes <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            self._evict(key, 'size')
+            evicted.append(key)
+        if evicted:
+            logger.warning(f"Stockage des réponses plein: {len(evicted)} réponses non récupérées évincées")
+        return evicted
+
+    def get_stats(self) -> Dict:
+        return {
+            'entries': len(self),
+            'total_bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'high_water_bytes': self.high_water_bytes,
+            'high_water_entries': self.high_water_entries,
+            **self.stats
+        }
@@ -0,0 +1,312 @@
+# WikimediaManagerPackage/shared_state.py
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from request_journal import RequestJournal
+
+logger = logging.getLogger(__name__)
+
+# Attente maximale d'un verrou d'écriture tenu par un autre processus
+BUSY_TIMEOUT = 5.0
+# Réservation d'appel amont plus ancienne: considérée comme abandonnée (worker tué en pleine requête)
+CLAIM_STALE_AFTER = 300
+# Requête suivie jamais terminée (worker arrêté sans journal...): oubliée après ce délai
+REQUEST_STALE_AFTER = 24 * 3600
+
+
+class SharedState:
+    """État partagé par les processus d'un même hôte (workers gunicorn) dans une base sqlite locale.
+
+    - identifiant de scheduler par jeu de patterns: le même dans tous les workers;
+    - seaux à jetons: le budget de taux vaut pour l'ensemble des workers, pas pour chacun;
+    - réservations d'appel amont: pour une requête cachable identique, un seul worker
+      appelle l'amont, les autres lisent sa réponse dans le cache disque (dont l'index
+      sqlite est lui aussi partagé);
+    - requêtes suivies: scheduler de chaque identifiant de requête et, une fois la requête
+      terminée, clé de sa réponse dans le cache disque partagé, pour que /api/status et
+      /api/wait répondent quel que soit le worker qui reçoit l'appel.
+
+    Chaque opération est une transaction courte (BEGIN IMMEDIATE: un écrivain à la fois,
+    les autres patientent au plus BUSY_TIMEOUT secondes). Les dates sont en temps
+    système (time.time()), commun à tous les processus.
+    """
+
+    def __init__(self, path: str, claim_stale_after: float = CLAIM_STALE_AFTER):
+        self.path = path
+        self.claim_stale_after = claim_stale_after
+        self.owner = f"{os.getpid()}-{id(self):x}"
+        self.lock = threading.Lock()
+        self.stats = {'claims': 0, 'claim_conflicts': 0, 'stale_claims': 0}
+
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=BUSY_TIMEOUT)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        with self._transaction() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS schedulers (
+                    patterns TEXT PRIMARY KEY,
+                    scheduler_id TEXT NOT NULL
+                )
+            """)
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS buckets (
+                    key TEXT PRIMARY KEY,
+                    rate REAL NOT NULL,
+                    burst INTEGER NOT NULL,
+                    ceiling REAL NOT NULL,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    paused_until REAL NOT NULL
+                )
+            """)
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS claims (
+                    key TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    claimed_at REAL NOT NULL
+                )
+            """)
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS requests (
+                    request_id TEXT PRIMARY KEY,
+                    scheduler_id TEXT NOT NULL,
+                    result_key TEXT,
+                    updated REAL NOT NULL
+                )
+            """)
+
+    @contextmanager
+    def _transaction(self):
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.db
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+
+    def scheduler_id_for(self, api_patterns: List[str], default: str) -> str:
+        """Identifiant du scheduler de ce jeu de patterns: celui du premier worker qui l'a créé"""
+        key = RequestJournal.patterns_key(api_patterns)
+        with self._transaction() as db:
+            db.execute("INSERT OR IGNORE INTO schedulers (patterns, scheduler_id) VALUES (?, ?)", (key, default))
+            return db.execute("SELECT scheduler_id FROM schedulers WHERE patterns = ?", (key,)).fetchone()[0]
+
+    def patterns_for(self, scheduler_id: str) -> Optional[List[str]]:
+        """Patterns d'un scheduler créé par n'importe quel worker, None s'il est inconnu"""
+        with self.lock:
+            row = self.db.execute("SELECT patterns FROM schedulers WHERE scheduler_id = ?", (scheduler_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def forget_scheduler(self, scheduler_id: str):
+        with self._transaction() as db:
+            db.execute("DELETE FROM schedulers WHERE scheduler_id = ?", (scheduler_id,))
+            db.execute("DELETE FROM buckets WHERE key LIKE ?", (f"{scheduler_id} %",))
+            db.execute("DELETE FROM requests WHERE scheduler_id = ?", (scheduler_id,))
+
+    # Seaux à jetons
+
+    def ensure_bucket(self, key: str, rate: float, burst: int):
+        """Crée le seau s'il n'existe pas; un seau existant (autre worker) garde son réglage"""
+        with self._transaction() as db:
+            db.execute("INSERT OR IGNORE INTO buckets (key, rate, burst, ceiling, tokens, updated, paused_until) "
+                       "VALUES (?, ?, ?, ?, ?, ?, 0)", (key, rate, burst, rate, float(burst), time.time()))
+
+    @staticmethod
+    def _refill(row, now: float):
+        rate, burst, tokens, updated = row
+        # `updated` peut être dans le futur pendant une pause: pas de jetons avant sa fin
+        return min(float(burst), tokens + max(0.0, now - updated) * rate), max(updated, now)
+
+    def take_token(self, key: str, now: Optional[float] = None) -> float:
+        """Consomme un jeton et retourne 0, ou retourne le délai avant de pouvoir réessayer"""
+        now = now if now is not None else time.time()
+        with self._transaction() as db:
+            rate, burst, tokens, updated, paused_until = db.execute(
+                "SELECT rate, burst, tokens, updated, paused_until FROM buckets WHERE key = ?", (key,)).fetchone()
+            if now < paused_until:
+                return paused_until - now
+            tokens, updated = self._refill((rate, burst, tokens, updated), now)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            db.execute("UPDATE buckets SET tokens = ?, updated = ? WHERE key = ?", (tokens, updated, key))
+        return wait
+
+    def configure_bucket(self, key: str, rate: Optional[float] = None, burst: Optional[int] = None,
+                         ceiling: Optional[float] = None, now: Optional[float] = None):
+        """Change taux, rafale ou plafond sans perdre les jetons accumulés"""
+        now = now if now is not None else time.time()
+        with self._transaction() as db:
+            row = db.execute("SELECT rate, burst, tokens, updated, ceiling FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated = self._refill(row[:4], now)
+            rate = rate if rate is not None else row[0]
+            burst = burst if burst is not None else row[1]
+            ceiling = ceiling if ceiling is not None else row[4]
+            db.execute("UPDATE buckets SET rate = ?, burst = ?, ceiling = ?, tokens = ?, updated = ? WHERE key = ?",
+                       (rate, burst, ceiling, min(tokens, float(burst)), updated, key))
+
+    def pause_bucket(self, key: str, seconds: float, now: Optional[float] = None) -> bool:
+        """Suspend les départs de tous les workers; False si une pause plus longue est déjà en cours"""
+        until = (now if now is not None else time.time()) + max(0.0, seconds)
+        with self._transaction() as db:
+            cursor = db.execute("UPDATE buckets SET paused_until = ?, tokens = 0, updated = ? "
+                                "WHERE key = ? AND paused_until < ?", (until, until, key, until))
+            return cursor.rowcount > 0
+
+    def bucket_state(self, key: str) -> Dict:
+        with self.lock:
+            row = self.db.execute("SELECT rate, burst, ceiling, tokens, updated, paused_until FROM buckets "
+                                  "WHERE key = ?", (key,)).fetchone()
+        return dict(zip(('rate', 'burst', 'ceiling', 'tokens', 'updated', 'paused_until'), row))
+
+    # Réservations d'appel amont
+
+    def claim(self, key: str, now: Optional[float] = None) -> bool:
+        """Réserve l'appel amont d'une requête pour ce processus; False si un autre la tient"""
+        now = now if now is not None else time.time()
+        with self._transaction() as db:
+            row = db.execute("SELECT owner, claimed_at FROM claims WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[0] != self.owner:
+                if now - row[1] < self.claim_stale_after:
+                    self.stats['claim_conflicts'] += 1
+                    return False
+                self.stats['stale_claims'] += 1
+                logger.warning(f"Réservation abandonnée reprise: {key[:12]}... (détenteur {row[0]})")
+            db.execute("INSERT OR REPLACE INTO claims (key, owner, claimed_at) VALUES (?, ?, ?)", (key, self.owner, now))
+        self.stats['claims'] += 1
+        return True
+
+    def release(self, key: str):
+        with self._transaction() as db:
+            db.execute("DELETE FROM claims WHERE key = ? AND owner = ?", (key, self.owner))
+
+    # Requêtes suivies
+
+    def register_request(self, request_id: str, scheduler_id: str):
+        with self._transaction() as db:
+            db.execute("INSERT OR REPLACE INTO requests (request_id, scheduler_id, result_key, updated) "
+                       "VALUES (?, ?, NULL, ?)", (request_id, scheduler_id, time.time()))
+
+    def complete_requests(self, request_ids: List[str], result_key: str):
+        """La réponse de ces requêtes est dans le cache disque partagé sous result_key"""
+        with self._transaction() as db:
+            db.executemany("UPDATE requests SET result_key = ?, updated = ? WHERE request_id = ?",
+                           [(result_key, time.time(), request_id) for request_id in request_ids])
+
+    def request_info(self, request_id: str) -> Optional[Dict]:
+        """{'scheduler_id', 'result_key'} d'une requête suivie par n'importe quel worker, None sinon"""
+        with self.lock:
+            row = self.db.execute("SELECT scheduler_id, result_key FROM requests WHERE request_id = ?",
+                                  (request_id,)).fetchone()
+        return {'scheduler_id': row[0], 'result_key': row[1]} if row else None
+
+    def forget_request(self, request_id: str):
+        with self._transaction() as db:
+            db.execute("DELETE FROM requests WHERE request_id = ?", (request_id,))
+
+    def evict_requests(self, result_ttl: float, now: Optional[float] = None) -> int:
+        """Oublie les réponses non récupérées après result_ttl et les requêtes jamais terminées"""
+        now = now if now is not None else time.time()
+        with self._transaction() as db:
+            return db.execute("DELETE FROM requests WHERE (result_key IS NOT NULL AND updated < ?) OR updated < ?",
+                              (now - result_ttl, now - REQUEST_STALE_AFTER)).rowcount
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            claims = self.db.execute("SELECT COUNT(*) FROM claims").fetchone()[0]
+            requests = self.db.execute("SELECT COUNT(*) FROM requests").fetchone()[0]
+        return {'path': self.path, 'owner': self.owner, 'active_claims': claims, 'tracked_requests': requests,
+                **self.stats}
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+class SharedTokenBucket:
+    """Seau à jetons dont l'état est dans un SharedState: même interface que
+    rate_limiter.TokenBucket, mais le taux vaut pour tous les processus qui partagent
+    la base. Le plafond du contrôle adaptatif (ceiling) est porté par le seau, pour
+    qu'un réglage fait dans un worker s'applique aux autres.
+    """
+
+    def __init__(self, state: SharedState, key: str, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("Le taux d'appels doit être positif")
+        self.state = state
+        self.key = key
+        state.ensure_bucket(key, rate, max(1, int(burst)))
+        # Départs de ce processus dans leur ordre d'arrivée
+        self._lock = asyncio.Lock()
+        self.stats = {'acquired': 0, 'waited': 0, 'wait_time': 0.0, 'pauses': 0}
+
+    @property
+    def rate(self) -> float:
+        return self.state.bucket_state(self.key)['rate']
+
+    @property
+    def burst(self) -> int:
+        return self.state.bucket_state(self.key)['burst']
+
+    @property
+    def ceiling(self) -> float:
+        return self.state.bucket_state(self.key)['ceiling']
+
+    @ceiling.setter
+    def ceiling(self, ceiling: float):
+        self.state.configure_bucket(self.key, ceiling=ceiling)
+
+    @property
+    def paused_until(self) -> float:
+        """Fin de la pause en temps time.monotonic(), comme TokenBucket"""
+        return self.state.bucket_state(self.key)['paused_until'] - time.time() + time.monotonic()
+
+    def configure(self, rate: float, burst: int = None):
+        if rate <= 0:
+            raise ValueError("Le taux d'appels doit être positif")
+        self.state.configure_bucket(self.key, rate=rate, burst=max(1, int(burst)) if burst is not None else None)
+
+    def pause(self, seconds: float):
+        if self.state.pause_bucket(self.key, seconds):
+            self.stats['pauses'] += 1
+
+    async def acquire(self):
+        start = time.monotonic()
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            while True:
+                # transaction sqlite (jusqu'à BUSY_TIMEOUT si un autre worker écrit): hors de la boucle
+                wait = await loop.run_in_executor(None, self.state.take_token, self.key)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+
+        waited = time.monotonic() - start
+        self.stats['acquired'] += 1
+        if waited > 0.001:
+            self.stats['waited'] += 1
+            self.stats['wait_time'] += waited
+
+    def get_stats(self) -> Dict:
+        state = self.state.bucket_state(self.key)
+        now = time.time()
+        tokens, _ = SharedState._refill((state['rate'], state['burst'], state['tokens'], state['updated']), now)
+        return {
+            'rate': state['rate'],
+            'burst': state['burst'],
+            'tokens': round(tokens, 3),
+            'paused_for': round(max(0.0, state['paused_until'] - now), 3),
+            'shared': True,
+            **self.stats
+        }
@@ -1,10 +1,15 @@
 import time
 
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 import json
+import threading
 
 app = Flask(__name__)
 
+# Compteur d'appels reçus par /mockapi/bench (appels amont réellement effectués)
+bench_calls = {"count": 0}
+bench_lock = threading.Lock()
+
 
 @app.route('/mockapi/test/<int:i>')
 def test_with_index(i):
@@ -30,10 +35,32 @@ def thread_request(thread_id, i):
     return jsonify({})
 
 
+# Corps déjà sérialisés de /mockapi/large, par nombre de lignes (le générer n'est pas ce qu'on mesure)
+large_bodies = {}
+
+
+def sparql_results_body(rows):
+    """Résultat SPARQL JSON de type WDQS, `rows` lignes"""
+    if rows not in large_bodies:
+        bindings = [
+            {"oeuvre": {"type": "uri", "value": f"http://www.wikidata.org/entity/Q{100000 + n * 7}"},
+             "oeuvreLabel": {"xml:lang": "fr", "type": "literal", "value": f"Paysage avec rivière {n}"},
+             "image": {"type": "uri", "value": f"http://commons.wikimedia.org/wiki/Special:FilePath/Paysage%20{n}.jpg"},
+             "date": {"datatype": "http://www.w3.org/2001/XMLSchema#dateTime", "type": "literal",
+                      "value": f"{1850 + n % 100}-01-01T00:00:00Z"}}
+            for n in range(rows)]
+        large_bodies[rows] = json.dumps(
+            {"head": {"vars": ["oeuvre", "oeuvreLabel", "image", "date"]}, "results": {"bindings": bindings}}).encode()
+    return large_bodies[rows]
+
+
 @app.route('/mockapi/large/<int:i>')
 def large_endpoint(i):
-    """Endpoint pour les données volumineuses"""
-    return jsonify({})
+    """Endpoint pour les données volumineuses: ?rows=<n> rend un résultat SPARQL de n lignes"""
+    rows = request.args.get("rows", 0, type=int)
+    if rows <= 0:
+        return jsonify({})
+    return app.response_class(sparql_results_body(rows), mimetype="application/sparql-results+json")
 
 @app.route('/mockapi/delay/<int:delay>')
 def slow_endpoint(delay):
@@ -42,6 +69,51 @@ def slow_endpoint(delay):
     return jsonify({})
 
 
+@app.route('/mockapi/bench/<int:i>')
+def bench_endpoint(i):
+    """Endpoint de benchmark: ?size=<octets de charge utile>&latency_ms=<latence injectée>"""
+    with bench_lock:
+        bench_calls["count"] += 1
+    latency_ms = request.args.get("latency_ms", 0, type=float)
+    if latency_ms > 0:
+        time.sleep(latency_ms / 1000)
+    return jsonify({"index": i, "data": "x" * request.args.get("size", 0, type=int)})
+
+
+@app.route('/mockapi/bench/stats')
+def bench_stats():
+    """Nombre d'appels reçus par /mockapi/bench"""
+    return jsonify(bench_calls)
+
+
+# Seau à jetons de /mockapi/limited (capacité simulée de l'amont)
+limited_calls = {"accepted": 0, "refused": 0, "tokens": 0.0, "updated": 0.0}
+
+
+@app.route('/mockapi/limited/<int:i>')
+def limited_endpoint(i):
+    """Endpoint à capacité bornée: au-delà de ?capacity=<appels/s> (rafale ?burst=2), 429 avec Retry-After"""
+    capacity = request.args.get("capacity", 10, type=float)
+    burst = request.args.get("burst", 2, type=float)
+    now = time.monotonic()
+    with bench_lock:
+        tokens = min(burst, limited_calls["tokens"] + (now - limited_calls["updated"]) * capacity)
+        limited_calls["updated"] = now
+        if tokens < 1:
+            limited_calls["tokens"] = tokens
+            limited_calls["refused"] += 1
+            return jsonify({"error": "Too Many Requests"}), 429, {"Retry-After": request.args.get("retry_after", "1")}
+        limited_calls["tokens"] = tokens - 1
+        limited_calls["accepted"] += 1
+    return jsonify({"index": i})
+
+
+@app.route('/mockapi/limited/stats')
+def limited_stats():
+    """Appels acceptés et refusés par /mockapi/limited"""
+    return jsonify({"accepted": limited_calls["accepted"], "refused": limited_calls["refused"]})
+
+
 @app.route('/mockapi/empty')
 def empty_endpoint():
     """Endpoint qui retourne un objet vide"""
@@ -63,7 +135,9 @@ def index():
         "GET /mockapi/test - Retourne {'data': 'test'}",
         "GET /mockapi/unicode - Retourne {}",
         "GET /mockapi/thread/{thread_id}/req/{i} - Retourne {}",
-        "GET /mockapi/large/{i} - Retourne {}",
+        "GET /mockapi/large/{i}?rows=n - Résultat SPARQL de n lignes ({} sans rows)",
+        "GET /mockapi/bench/{i}?size=&latency_ms= - Charge utile et latence configurables",
+        "GET /mockapi/bench/stats - Appels reçus par /mockapi/bench",
         "GET /mockapi/empty - Retourne {}"
     ]
 
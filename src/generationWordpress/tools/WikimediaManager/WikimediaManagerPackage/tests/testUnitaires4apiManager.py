@@ -29,6 +29,7 @@ sys.modules['configPrivee'].config = config_mock
 from apiManagerClaude import (
      APIRequestScheduler, authenticate
 )
+from async_queue import ThreadSafeAsyncQueue
 
 # Classes de test copiées depuis le serveur pour éviter les imports
 from dataclasses import dataclass, asdict
@@ -194,7 +195,7 @@ class TestAPIRequestScheduler(unittest.TestCase):
             self.assertEqual(scheduler.api_patterns, self.api_patterns)
             self.assertEqual(scheduler.CALLS_PER_SECOND, 1)
             self.assertEqual(scheduler.CALL_INTERVAL, 1.0)
-            self.assertIsInstance(scheduler.request_queue, Queue)
+            self.assertIsInstance(scheduler.request_queue, ThreadSafeAsyncQueue)
             self.assertIsInstance(scheduler.response_store, dict)
             self.assertIsInstance(scheduler.request_dict, dict)
             self.assertIsNotNone(scheduler.scheduler_id)
@@ -0,0 +1,110 @@
+# tests/test_async_queue.py
+import os
+import sys
+import time
+import asyncio
+import unittest
+import threading
+from queue import Full
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+from async_queue import ThreadSafeAsyncQueue, PriorityLaneQueue
+
+
+class TestThreadSafeAsyncQueue(unittest.TestCase):
+
+    def test_put_from_other_thread_wakes_consumer(self):
+        """Un put() depuis un autre thread réveille le consommateur sans attente fixe"""
+        queue = ThreadSafeAsyncQueue()
+
+        async def consumer():
+            loop_ticks = 0
+
+            async def ticker():
+                nonlocal loop_ticks
+                while True:
+                    loop_ticks += 1
+                    await asyncio.sleep(0.01)
+
+            tick_task = asyncio.create_task(ticker())
+            t0 = time.perf_counter()
+            threading.Timer(0.05, queue.put, args=("item",)).start()
+            item = await queue.get()
+            latency = time.perf_counter() - t0
+            tick_task.cancel()
+            return item, latency, loop_ticks
+
+        item, latency, loop_ticks = asyncio.run(consumer())
+        self.assertEqual(item, "item")
+        self.assertLess(latency, 0.5)
+        # La boucle n'a pas été bloquée pendant l'attente
+        self.assertGreater(loop_ticks, 1)
+
+    def test_fifo_and_close(self):
+        """Ordre FIFO, puis None après close() une fois la file vidée"""
+        queue = ThreadSafeAsyncQueue()
+        for i in range(3):
+            queue.put(i)
+        queue.close()
+
+        async def drain():
+            return [await queue.get() for _ in range(4)]
+
+        self.assertEqual(asyncio.run(drain()), [0, 1, 2, None])
+
+    def test_maxsize(self):
+        """put() lève queue.Full au-delà de maxsize"""
+        queue = ThreadSafeAsyncQueue(maxsize=2)
+        queue.put(1)
+        queue.put(2)
+        with self.assertRaises(Full):
+            queue.put(3)
+        self.assertEqual(queue.qsize(), 2)
+
+
+class TestPriorityLaneQueue(unittest.TestCase):
+
+    @staticmethod
+    def _lane(item):
+        return item[0]
+
+    def test_weighted_fair_dequeue(self):
+        """Les voies non vides sont servies au prorata de leur poids, sans famine"""
+        queue = PriorityLaneQueue({'interactive': 3, 'batch': 1}, 'batch', lane_of=self._lane)
+        for i in range(8):
+            queue.put(('batch', i))
+        for i in range(6):
+            queue.put(('interactive', i))
+        queue.close()
+
+        async def drain():
+            items = []
+            while (item := await queue.get()) is not None:
+                items.append(item)
+            return items
+
+        lanes = [lane for lane, _ in asyncio.run(drain())]
+        # 3 interactives pour 1 lot tant que les deux voies sont occupées
+        self.assertEqual(lanes[:8], ['interactive', 'interactive', 'batch', 'interactive'] * 2)
+        self.assertEqual(lanes[8:], ['batch'] * 6)
+
+    def test_unknown_lane_and_stats(self):
+        """Voie inconnue -> voie par défaut; profondeur et attente rapportées par voie"""
+        queue = PriorityLaneQueue({'interactive': 3, 'normal': 1}, 'normal', lane_of=self._lane)
+        queue.put(('inconnue', 0))
+        queue.put(('interactive', 1))
+        stats = queue.get_stats()
+        self.assertEqual((stats['normal']['depth'], stats['interactive']['depth']), (1, 1))
+        self.assertEqual(queue.qsize(), 2)
+
+        self.assertEqual(asyncio.run(queue.get()), ('interactive', 1))
+        stats = queue.get_stats()
+        self.assertEqual(stats['interactive']['dequeued'], 1)
+        self.assertGreaterEqual(stats['interactive']['max_wait'], 0)
+        self.assertEqual(stats['interactive']['depth'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
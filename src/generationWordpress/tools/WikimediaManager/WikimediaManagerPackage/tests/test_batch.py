@@ -0,0 +1,149 @@
+# tests/test_batch.py
+import os
+import sys
+import json
+import time
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest.mock import MagicMock, patch
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+sys.path.insert(0, os.path.dirname(os.path.dirname(SCRIPT_DIR)))
+
+for name in ('configPrivee', 'WikimediaManagerPackage.configPrivee'):
+    try:
+        __import__(name)
+    except ImportError:
+        sys.modules[name] = MagicMock()
+
+import apiManagerClaude
+from apiManagerClaude import APIRequestScheduler
+from WikimediaManagerPackage import WikimediaAccessLegacy
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    """Endpoint dont la latence est donnée par le chemin (/batch/<ms>/...), compte les appels"""
+    hits = 0
+
+    def do_GET(self):
+        CountingHandler.hits += 1
+        time.sleep(int(self.path.split("/")[2]) / 1000)
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestBatchSubmission(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}/batch"
+        cls.scheduler = APIRequestScheduler([cls.base])
+        cls.scheduler.set_rate_limit(100, burst=10)
+        cls.scheduler_id = "test-batch-scheduler"
+        apiManagerClaude.schedulers[cls.scheduler_id] = cls.scheduler
+
+    @classmethod
+    def tearDownClass(cls):
+        apiManagerClaude.schedulers.pop(cls.scheduler_id, None)
+        cls.scheduler.cleanup()
+        cls.server.shutdown()
+
+    def setUp(self):
+        CountingHandler.hits = 0
+
+    def test_results_arrive_in_completion_order(self):
+        """Chaque résultat est rendu dès qu'il est prêt, avec l'indice de sa requête dans le lot"""
+        batch_id, ids = self.scheduler.add_batch([
+            {"url": f"{self.base}/400/slow", "method": "GET"},
+            {"url": f"{self.base}/10/fast", "method": "GET"},
+        ])
+        first = self.scheduler.next_batch_result(batch_id, timeout=10)
+        second = self.scheduler.next_batch_result(batch_id, timeout=10)
+
+        self.assertEqual((first["index"], first["request_id"]), (1, ids[1]))
+        self.assertEqual(first["response"], {"path": "/batch/10/fast"})
+        self.assertEqual(second["index"], 0)
+        # Lot entièrement livré: il est oublié
+        self.assertIsNone(self.scheduler.get_batch_progress(batch_id))
+
+    def test_invalid_entry_rejects_whole_batch(self):
+        queued = self.scheduler.get_stats()["queue_size"]
+        with self.assertRaises(ValueError):
+            self.scheduler.add_batch([{"url": f"{self.base}/10/a", "method": "GET"},
+                                      {"url": "http://ailleurs.example/x"}])
+        self.assertEqual(self.scheduler.get_stats()["queue_size"], queued)
+        self.assertEqual(CountingHandler.hits, 0)
+
+    @patch('apiManagerClaude.config', {'admin': {'Bearer': 'test-token'}})
+    def test_batch_route_streams_ndjson(self):
+        """POST /api/batch puis lecture du flux: une ligne par requête, doublons fusionnés"""
+        client = apiManagerClaude.app.test_client()
+        headers = {"Authorization": "Bearer test-token"}
+        resp = client.post("/api/batch", headers=headers, json={
+            "scheduler_id": self.scheduler_id,
+            "requests": [
+                {"url": f"{self.base}/50/q?x=1", "method": "GET"},
+                {"url": f"{self.base}/50/q?x=1", "method": "GET"},
+                {"url": f"{self.base}/50/q?x=2", "method": "GET", "priority": "interactive"},
+            ]
+        })
+        self.assertEqual(resp.status_code, 200)
+        info = resp.get_json()
+        self.assertEqual(len(info["request_ids"]), 3)
+
+        stream = client.get(info["stream_url"], headers=headers)
+        self.assertEqual(stream.mimetype, "application/x-ndjson")
+        lines = [json.loads(line) for line in stream.get_data(as_text=True).splitlines()]
+
+        results = {line["index"]: line["response"] for line in lines if "index" in line}
+        self.assertEqual(results, {0: {"path": "/batch/50/q?x=1"}, 1: {"path": "/batch/50/q?x=1"},
+                                   2: {"path": "/batch/50/q?x=2"}})
+        self.assertEqual(lines[-1]["done"], True)
+        self.assertEqual(CountingHandler.hits, 2)
+
+        self.assertEqual(client.get(info["status_url"], headers=headers).status_code, 404)
+
+    @patch('apiManagerClaude.config', {'admin': {'Bearer': 'test-token'}})
+    def test_batch_route_validation(self):
+        client = apiManagerClaude.app.test_client()
+        headers = {"Authorization": "Bearer test-token"}
+        self.assertEqual(client.post("/api/batch", headers=headers,
+                                     json={"scheduler_id": self.scheduler_id, "requests": []}).status_code, 400)
+        self.assertEqual(client.post("/api/batch", headers=headers,
+                                     json={"scheduler_id": "inconnu", "requests": [{}]}).status_code, 404)
+        self.assertEqual(client.post("/api/batch", json={"scheduler_id": self.scheduler_id}).status_code, 401)
+
+    def test_client_hands_each_streamed_result_over(self):
+        """sparqlQueryBatch: on_result reçoit chaque ligne du flux dès son arrivée, le retour suit l'ordre des requêtes"""
+        access = WikimediaAccessLegacy.WikimediaAccess.__new__(WikimediaAccessLegacy.WikimediaAccess)
+        access.scheduler_id = self.scheduler_id
+        access.setRateLimit = MagicMock()
+        lines = [json.dumps(line).encode() for line in
+                 ({"index": 1, "response": "b"}, {"pending": 1}, {"index": 0, "response": "a"}, {"done": True})]
+        stream = MagicMock()
+        stream.__enter__.return_value.iter_lines.return_value = lines
+        received = []
+        with patch.object(WikimediaAccessLegacy, 'config', {'admin': {'Bearer': 'test-token'}}), \
+                patch.object(WikimediaAccessLegacy.requests, 'post',
+                             return_value=MagicMock(text=json.dumps({"stream_url": "/api/batch/b1/stream"}))) as post, \
+                patch.object(WikimediaAccessLegacy.requests, 'get', return_value=stream):
+            results = access.sparqlQueryBatch(["select 1", "select 2"], on_result=lambda *item: received.append(item))
+
+        self.assertEqual(results, ["a", "b"])
+        self.assertEqual(received, [(1, "b"), (0, "a")])
+        self.assertEqual(len(post.call_args.kwargs["json"]["requests"]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
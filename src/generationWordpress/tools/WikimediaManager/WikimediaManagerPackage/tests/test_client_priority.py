@@ -0,0 +1,68 @@
+# tests/test_client_priority.py
+import os
+import sys
+import unittest
+from unittest.mock import patch, MagicMock
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+sys.path.insert(0, os.path.dirname(os.path.dirname(SCRIPT_DIR)))
+
+for name in ('configPrivee', 'WikimediaManagerPackage.configPrivee'):
+    try:
+        __import__(name)
+    except ImportError:
+        sys.modules[name] = MagicMock()
+
+import apiManagerClaude
+from apiManagerClaude import APIRequestScheduler
+from WikimediaManagerPackage import WikimediaAccessLegacy
+
+AUTH = {'Authorization': 'Bearer test-token'}
+
+
+class TestClientPriority(unittest.TestCase):
+    """La priorité passée à WikimediaAccess.sparqlQuery arrive jusqu'à la voie du scheduler"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.scheduler = APIRequestScheduler(["https://query.wikidata.org/sparql"])
+        apiManagerClaude.schedulers[cls.scheduler.scheduler_id] = cls.scheduler
+
+    @classmethod
+    def tearDownClass(cls):
+        apiManagerClaude.schedulers.pop(cls.scheduler.scheduler_id, None)
+        cls.scheduler.cleanup()
+
+    def setUp(self):
+        self.client = apiManagerClaude.app.test_client()
+        self.config_patch = patch.object(apiManagerClaude, 'config', {'admin': {'Bearer': 'test-token'}})
+        self.config_patch.start()
+        self.addCleanup(self.config_patch.stop)
+
+    def _route(self, method):
+        # les appels HTTP du client sont servis par l'application Flask de test
+        def call(url, json=None, headers=None, **kwargs):
+            response = getattr(self.client, method)(url.replace(WikimediaAccessLegacy.baseurl, ""), json=json, headers=AUTH)
+            return MagicMock(text=response.get_data(as_text=True))
+        return call
+
+    def test_sparql_query_priority_reaches_scheduler_lane(self):
+        access = WikimediaAccessLegacy.WikimediaAccess.__new__(WikimediaAccessLegacy.WikimediaAccess)
+        access.scheduler_id = self.scheduler.scheduler_id
+        access.setRateLimit = MagicMock()
+        access.waitResponse = MagicMock(side_effect=lambda reqinfo, headers: reqinfo)
+        with patch.object(WikimediaAccessLegacy, 'config', {'admin': {'Bearer': 'test-token'}}), \
+                patch.object(WikimediaAccessLegacy.requests, 'post', side_effect=self._route('post')), \
+                patch.object(WikimediaAccessLegacy.requests, 'get', side_effect=self._route('get')), \
+                patch.object(self.scheduler, 'add_request', return_value=("req-prio", 0.0)) as add_request:
+            reqinfo = access.sparqlQuery("SELECT ?s WHERE { ?s ?p ?o } LIMIT 1", priority="interactive")
+
+        self.assertEqual(reqinfo["priority"], "interactive")
+        kwargs = add_request.call_args.kwargs
+        self.assertEqual((kwargs["priority"], kwargs["method"], kwargs["cache_duration"]), ("interactive", "GET", 600))
+        self.assertIn("query.wikidata.org/sparql?query=", kwargs["url"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+# tests/test_client_rate_limit.py
+import os
+import sys
+import unittest
+from unittest.mock import patch, MagicMock
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+sys.path.insert(0, os.path.dirname(os.path.dirname(SCRIPT_DIR)))
+
+for name in ('configPrivee', 'WikimediaManagerPackage.configPrivee'):
+    try:
+        __import__(name)
+    except ImportError:
+        sys.modules[name] = MagicMock()
+
+from WikimediaManagerPackage import WikimediaAccessLegacy
+
+
+class TestClientRateLimit(unittest.TestCase):
+    """La limite de taux n'est gardée par WikimediaAccess que si le serveur l'a acceptée"""
+
+    def setUp(self):
+        self.access = WikimediaAccessLegacy.WikimediaAccess.__new__(WikimediaAccessLegacy.WikimediaAccess)
+        self.access.bearer = "test-token"
+        self.access.baseurl = WikimediaAccessLegacy.baseurl
+        self.access.headers = {"Authorization": "Bearer test-token"}
+        patcher = patch.object(WikimediaAccessLegacy, 'createScheduler', return_value="sched-1")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_refused_limit_not_cached(self):
+        with patch.object(WikimediaAccessLegacy.requests, 'post', return_value=MagicMock(status_code=401)) as post:
+            self.access.__enter__()
+            self.assertIsNone(self.access.rateLimit)
+            # limite redemandée au prochain appel
+            self.access.setRateLimit(0.1)
+        self.assertEqual(post.call_count, 2)
+        self.assertEqual(post.call_args.kwargs["json"], {"scheduler_id": "sched-1", "limit": 0.1})
+
+    def test_accepted_limit_cached_per_scheduler(self):
+        with patch.object(WikimediaAccessLegacy.requests, 'post', return_value=MagicMock(status_code=200)) as post:
+            self.access.__enter__()
+            self.assertEqual(self.access.rateLimit, 0.1)
+            self.access.setRateLimit(0.1)
+            self.assertEqual(post.call_count, 1)
+            # nouveau scheduler à chaque entrée: la limite lui est envoyée
+            self.access.__enter__()
+        self.assertEqual(post.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# tests/test_coalescing.py
+import os
+import sys
+import json
+import time
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest.mock import MagicMock
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+try:
+    import configPrivee  # noqa: F401
+except ImportError:
+    sys.modules['configPrivee'] = MagicMock()
+
+from apiManagerClaude import APIRequestScheduler
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    """Endpoint lent qui compte les appels reçus"""
+    hits = 0
+
+    def _answer(self):
+        CountingHandler.hits += 1
+        time.sleep(0.3)
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _answer
+    do_POST = _answer
+
+    def log_message(self, *args):
+        pass
+
+
+class TestRequestCoalescing(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}/coalesce"
+        cls.scheduler = APIRequestScheduler([cls.base])
+        cls.scheduler.set_rate_limit(100, burst=10)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.scheduler.cleanup()
+        cls.server.shutdown()
+
+    def setUp(self):
+        CountingHandler.hits = 0
+
+    def _collect(self, request_ids):
+        return [self.scheduler.wait_for_response(request_id, timeout=10) for request_id in request_ids]
+
+    def test_identical_get_requests_share_one_upstream_call(self):
+        """Des GET identiques soumis ensemble ne provoquent qu'un appel amont"""
+        saved_before = self.scheduler.get_stats()["coalescing"]["upstream_calls_saved"]
+        ids = [self.scheduler.add_request(f"{self.base}/q?x=1", method="GET")[0] for _ in range(5)]
+        other = self.scheduler.add_request(f"{self.base}/q?x=2", method="GET")[0]
+
+        responses = self._collect(ids + [other])
+
+        self.assertEqual(CountingHandler.hits, 2)
+        self.assertTrue(all(r == {"path": "/coalesce/q?x=1"} for r in responses[:5]))
+        self.assertEqual(responses[5], {"path": "/coalesce/q?x=2"})
+        coalescing = self.scheduler.get_stats()["coalescing"]
+        self.assertEqual(coalescing["upstream_calls_saved"] - saved_before, 4)
+        self.assertEqual(coalescing["pending_groups"], 0)
+
+        # Une fois le résultat livré, une nouvelle requête repart vers l'amont
+        again = self.scheduler.add_request(f"{self.base}/q?x=1", method="GET")[0]
+        self._collect([again])
+        self.assertEqual(CountingHandler.hits, 3)
+
+    def test_post_requests_are_not_coalesced(self):
+        """Les méthodes non idempotentes ne sont pas fusionnées"""
+        ids = [self.scheduler.add_request(f"{self.base}/p", payload={"a": 1}, method="POST")[0] for _ in range(2)]
+        self._collect(ids)
+        self.assertEqual(CountingHandler.hits, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+# tests/test_columnar_result.py
+import gc
+import os
+import sys
+import weakref
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+sys.path.insert(0, os.path.dirname(os.path.dirname(SCRIPT_DIR)))
+
+try:
+    import WikimediaManagerPackage.configPrivee  # noqa: F401
+except ImportError:
+    sys.modules['WikimediaManagerPackage.configPrivee'] = MagicMock()
+
+from columnar_result import ColumnarResult, columnar
+from WikimediaManagerPackage.WikimediaAccessLegacy import WikimediaAccess
+
+
+def sparql_json(names, rows):
+    """Réponse JSON SPARQL; None dans une ligne = variable non liée"""
+    return {
+        "head": {"vars": names},
+        "results": {"bindings": [
+            {name: {"type": "literal", "value": value} for name, value in zip(names, row) if value is not None}
+            for row in rows
+        ]}
+    }
+
+
+def sparql_wrapper2(names, rows):
+    """Équivalent d'un résultat SPARQLWrapper2: .variables et .bindings de valeurs à .value"""
+    bindings = [{name: SimpleNamespace(value=value) for name, value in zip(names, row) if value is not None}
+                for row in rows]
+    return SimpleNamespace(variables=names, bindings=bindings)
+
+
+class Response(dict):
+    """Réponse JSON SPARQL dont on peut suivre la libération (weakref)"""
+
+
+class TestColumnarResult(unittest.TestCase):
+
+    def test_both_formats_give_same_columns(self):
+        names, rows = ["lang", "c"], [("fr", "3"), ("en", None), ("fr", "7")]
+        for res in (sparql_json(names, rows), sparql_wrapper2(names, rows)):
+            result = ColumnarResult.from_sparql(res)
+            self.assertEqual(len(result), 3)
+            self.assertEqual(result.column("c"), ["3", None, "7"])
+            self.assertEqual(result.column("absent"), [None, None, None])
+            self.assertEqual(result.first("lang"), "fr")
+            # Dernière ligne gagnante, comme les boucles d'origine
+            self.assertEqual(result.last("lang", "fr", "c"), "7")
+            self.assertEqual(result.last("lang", "en", "c", 0), 0)
+
+    def test_empty_or_error_response(self):
+        for res in (None, {}, {"error": "Timeout"}, sparql_json(["c"], [])):
+            result = ColumnarResult.from_sparql(res)
+            self.assertEqual(len(result), 0)
+            self.assertEqual(result.first("c", 0), 0)
+
+    def test_columnar_keeps_no_response(self):
+        res = sparql_json(["v"], [("a",)])
+        result = columnar(res)
+        self.assertIs(columnar(result), result)
+        # pas de cache global: chaque appel convertit
+        self.assertIsNot(columnar(res), result)
+
+
+class TestWikimediaAccessHelpers(unittest.TestCase):
+
+    def setUp(self):
+        # Sans __init__/__enter__: pas de scheduler distant pour des filtres purs
+        self.access = object.__new__(WikimediaAccess)
+        self.access.lang = "fr"
+
+    def test_helpers_on_both_formats(self):
+        types = (["type", "typeLabel", "c"], [("Q1", "peinture", "120"), ("Q2", "dessin", "12"), ("Q3", "gravure", "2")])
+        items = (["v", "vLabel", "c"], [("Q4", "nature-morte", "5"), ("Q5", "paysage", "3")])
+        langs = (["lang", "c"], [("en", "40"), ("fr", "25")])
+        for build in (sparql_json, sparql_wrapper2):
+            self.assertEqual(self.access.getMainType(build(*types), "Q0"), "120 peintures")
+            self.assertEqual(self.access.getOtherTypes(build(*types), "Q0"),
+                             "12 dessins,  et d'autres types d'oeuvres plus exceptionnels.")
+            self.assertEqual(self.access.getLen(build(*types), "Q0"), 3)
+            self.assertEqual(self.access.getGenreList(build(*items), "Q0"),
+                             "    Genres\n      nature morte\n      paysage\n")
+            self.assertEqual((self.access.getCountFr(build(*langs), "Q0"), self.access.getCountEn(build(*langs), "Q0")),
+                             (25, 40))
+            self.assertEqual(self.access.getCountByLang(build(*langs), "Q0", "es"), 0)
+
+    def test_conversion_shared_within_step_then_released(self):
+        """Les filtres d'une même réponse partagent la conversion; la réponse suivante la remplace"""
+        first = Response(sparql_json(["v", "vLabel"], [("Q4", "nature-morte")]))
+        self.assertIs(self.access.columnar(first), self.access.columnar(first))
+        self.access.getItemList(first, "Q0")
+        self.assertIn("itemList", self.access.columnar(first).derived)
+        released = weakref.ref(first)
+        second = sparql_json(["v"], [("a",)])
+        self.assertEqual(len(self.access.columnar(second)), 1)
+        del first
+        gc.collect()
+        self.assertIsNone(released())
+
+    def test_name_link_and_external_links(self):
+        res = sparql_json(["qid", "qidLabel", "link", "baseUrl"],
+                          [("http://www.wikidata.org/entity/Q0", "Anonyme", "https://viaf.org/viaf/1/",
+                            "https://viaf.org/viaf/$1/"),
+                           ("http://www.wikidata.org/entity/Q0", "Anonyme", None, None)])
+        self.assertEqual(self.access.getName(res, "Q0"), "Anonyme")
+        self.assertEqual(self.access.getLink(res, "Q0"), '<a href="http://www.wikidata.org/entity/Q0">Anonyme</a>')
+        links = self.access.getExternalLinks(res, "Q0")
+        self.assertEqual(links.count("<td>"), 1)
+        self.assertIn('alt="link to VIAF"', links)
+
+
+if __name__ == '__main__':
+    unittest.main()
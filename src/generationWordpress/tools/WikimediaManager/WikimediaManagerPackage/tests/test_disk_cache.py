@@ -0,0 +1,206 @@
+# tests/test_disk_cache.py
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+import subprocess
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+import disk_cache
+from disk_cache import DiskCache, build_cache_key, stable_digest
+
+
+class TestDiskCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = DiskCache(self.temp_dir)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_digest_stable_between_processes(self):
+        """L'empreinte ne doit pas dépendre du sel de hash() du processus"""
+        key = build_cache_key("GET", "https://query.wikidata.org/sparql?query=x", None, {})
+        code = ("import sys; sys.path.insert(0, %r); from disk_cache import stable_digest; "
+                "print(stable_digest(%r))") % (os.path.dirname(SCRIPT_DIR), key)
+        other = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                               env={**os.environ, "PYTHONHASHSEED": "random"})
+        self.assertEqual(other.stdout.strip(), stable_digest(key))
+
+    def test_key_ignores_irrelevant_headers(self):
+        """User-Agent et Authorization ne fragmentent pas le cache"""
+        k1 = build_cache_key("GET", "https://x/sparql", {"b": 1, "a": 2}, {"User-Agent": "A"})
+        k2 = build_cache_key("get", "https://x/sparql", {"a": 2, "b": 1}, {"Authorization": "Bearer t"})
+        k3 = build_cache_key("GET", "https://x/sparql", {"a": 2, "b": 1}, {"Accept": "text/csv"})
+        self.assertEqual(k1, k2)
+        self.assertNotEqual(k1, k3)
+
+    def test_put_get_and_index(self):
+        """Une réponse écrite est relue, et l'index en connaît la taille"""
+        key = build_cache_key("GET", "https://x/sparql", {"q": 1})
+        size = self.cache.put(key, {"results": {"bindings": []}}, ttl=600)
+        self.assertEqual(self.cache.get(key, max_age=600), {"results": {"bindings": []}})
+        stats = self.cache.get_stats()
+        self.assertEqual(stats['entries'], 1)
+        self.assertEqual(stats['total_bytes'], size)
+        self.assertEqual(stats['hits'], 1)
+
+    def test_read_latency_measures_reads(self):
+        """La latence de lecture est une durée de lecture, pas un décalage dans le fichier"""
+        key = build_cache_key("GET", "https://x/sparql", {"q": "latence"})
+        self.cache.put(key, {"results": {"bindings": [{"c": {"value": "1"}}] * 50}}, ttl=600)
+        for raw in (False, True, False):
+            self.assertIsNotNone(self.cache.get(key, max_age=600, raw=raw))
+        latency = self.cache.get_stats()['read_latency']
+        self.assertEqual(latency['count'], 3)
+        self.assertGreaterEqual(latency['p50_ms'], 0)
+        self.assertLess(latency['max_ms'], 1000)
+
+    def test_survives_reopen(self):
+        """Un nouveau DiskCache sur le même répertoire retrouve les entrées (redémarrage)"""
+        key = build_cache_key("GET", "https://x/sparql", {"q": 2})
+        self.cache.put(key, [1, 2, 3], ttl=600)
+        reopened = DiskCache(self.temp_dir)
+        try:
+            self.assertEqual(reopened.get(key, max_age=600), [1, 2, 3])
+        finally:
+            reopened.close()
+
+    def test_expired_and_missing_file(self):
+        """Entrée trop ancienne ou fichier supprimé: miss"""
+        key = build_cache_key("GET", "https://x/sparql", {"q": 3})
+        self.cache.put(key, "data", ttl=600)
+        time.sleep(0.05)
+        self.assertIsNone(self.cache.get(key, max_age=0.01))
+        os.remove(self.cache.path_for(key))
+        self.assertIsNone(self.cache.get(key, max_age=600))
+        self.assertEqual(self.cache.get_stats()['entries'], 0)
+
+    def test_evict_expired_without_reading_payloads(self):
+        """L'expiration passe par l'index: seules les entrées expirées sont supprimées"""
+        old_key = build_cache_key("GET", "https://x/sparql", {"q": "old"})
+        new_key = build_cache_key("GET", "https://x/sparql", {"q": "new"})
+        self.cache.put(old_key, "old", ttl=1)
+        self.cache.put(new_key, "new", ttl=3600)
+        with unittest.mock.patch('builtins.open', side_effect=AssertionError("payload lu")):
+            removed = self.cache.evict_expired(now=time.time() + 10)
+        self.assertEqual(removed, 1)
+        self.assertFalse(os.path.exists(self.cache.path_for(old_key)))
+        self.assertEqual(self.cache.get(new_key, max_age=3600), "new")
+
+    def test_lru_size_bound(self):
+        """Au-delà de max_bytes, les entrées les moins récemment lues partent en premier"""
+        keys = [build_cache_key("GET", "https://x/sparql", {"q": i}) for i in range(3)]
+        size = self.cache.put(keys[0], "x" * 100, ttl=600)
+        self.cache.put(keys[1], "x" * 100, ttl=600)
+        self.cache.get(keys[0], max_age=600)  # keys[1] devient la moins récente
+        self.cache.max_bytes = 2 * size + 16  # marge: la taille varie avec le timestamp sérialisé
+        self.cache.put(keys[2], "x" * 100, ttl=600)
+        self.assertIsNone(self.cache.get(keys[1], max_age=600))
+        self.assertIsNotNone(self.cache.get(keys[0], max_age=600))
+        self.assertLessEqual(self.cache.get_stats()['total_bytes'], self.cache.max_bytes)
+        self.assertEqual(self.cache.total_bytes, self.cache.get_stats()['total_bytes'])
+
+
+
+def sparql_like_result(rows: int):
+    """Résultat WDQS typique: clés de binding et URIs très répétées"""
+    return {"head": {"vars": ["oeuvre", "label"]}, "results": {"bindings": [
+        {"oeuvre": {"type": "uri", "value": f"http://www.wikidata.org/entity/Q{1000 + i}"},
+         "label": {"xml:lang": "fr", "type": "literal", "value": f"Œuvre {i}"}} for i in range(rows)]}}
+
+
+class TestDiskCacheCompression(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_large_payload_compressed_small_left_raw(self):
+        cache = DiskCache(self.temp_dir, compression='gzip')
+        try:
+            big_key = build_cache_key("GET", "https://x/sparql", {"q": "big"})
+            small_key = build_cache_key("GET", "https://x/sparql", {"q": "small"})
+            big = sparql_like_result(2000)
+            size = cache.put(big_key, big, ttl=600)
+            cache.put(small_key, {"ok": True}, ttl=600)
+
+            self.assertTrue(cache.path_for(big_key).endswith(".json.gz"))
+            self.assertTrue(cache.path_for(small_key).endswith(".json"))
+            self.assertEqual(os.path.getsize(cache.path_for(big_key)), size)
+            self.assertEqual(cache.get(big_key, max_age=600), big)
+
+            stats = cache.get_stats()
+            self.assertGreater(stats['compression_ratio'], 5)
+            self.assertEqual(stats['encodings'], {'gzip': 1, 'identity': 1})
+            self.assertEqual(stats['total_bytes'], cache.total_bytes)
+            self.assertEqual(stats['read_latency']['count'], 1)
+        finally:
+            cache.close()
+
+    def test_read_through_any_encoding(self):
+        """Les entrées restent lisibles après un changement de réglage; la réécriture remplace le fichier"""
+        key = build_cache_key("GET", "https://x/sparql", {"q": "switch"})
+        raw_cache = DiskCache(self.temp_dir, compression=None)
+        raw_cache.put(key, sparql_like_result(500), ttl=600)
+        raw_path = raw_cache.path_for(key)
+        raw_cache.close()
+
+        cache = DiskCache(self.temp_dir, compression='gzip')
+        try:
+            self.assertEqual(cache.get(key, max_age=600), sparql_like_result(500))
+            cache.put(key, sparql_like_result(500), ttl=600)
+            self.assertFalse(os.path.exists(raw_path))
+            self.assertEqual(cache.get(key, max_age=600), sparql_like_result(500))
+            self.assertEqual(cache.evict_expired(now=time.time() + 3600), 1)
+            self.assertEqual(os.listdir(self.temp_dir), [disk_cache.INDEX_FILENAME])
+        finally:
+            cache.close()
+
+    def test_index_migration(self):
+        """Un index antérieur (sans encodage) est migré: ses entrées sont du JSON brut"""
+        import sqlite3
+        db = sqlite3.connect(os.path.join(self.temp_dir, disk_cache.INDEX_FILENAME))
+        db.execute("CREATE TABLE entries (digest TEXT PRIMARY KEY, size INTEGER NOT NULL, "
+                   "created_at REAL NOT NULL, ttl INTEGER NOT NULL)")
+        key = build_cache_key("GET", "https://x/sparql", {"q": "old"})
+        with open(os.path.join(self.temp_dir, f"{stable_digest(key)}.json"), "w") as f:
+            f.write('{"response": [1, 2], "timestamp": 0, "request_id": null}')
+        db.execute("INSERT INTO entries VALUES (?, 50, ?, 600)", (stable_digest(key), time.time()))
+        db.commit()
+        db.close()
+
+        cache = DiskCache(self.temp_dir)
+        try:
+            self.assertEqual(cache.get(key, max_age=600), [1, 2])
+            self.assertEqual(cache.get_stats()['raw_bytes'], 50)
+        finally:
+            cache.close()
+
+    @unittest.skipIf(disk_cache.zstandard is None, "module zstandard absent")
+    def test_zstd(self):
+        cache = DiskCache(self.temp_dir, compression='zstd')
+        try:
+            key = build_cache_key("GET", "https://x/sparql", {"q": "zstd"})
+            cache.put(key, sparql_like_result(2000), ttl=600)
+            self.assertTrue(cache.path_for(key).endswith(".json.zst"))
+            self.assertEqual(cache.get(key, max_age=600), sparql_like_result(2000))
+        finally:
+            cache.close()
+
+    def test_unknown_compression(self):
+        with self.assertRaises(ValueError):
+            DiskCache(self.temp_dir, compression='brotli')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+# tests/test_event_bus.py
+import os
+import sys
+import json
+import time
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest.mock import MagicMock, patch
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+try:
+    import configPrivee  # noqa: F401
+except ImportError:
+    sys.modules['configPrivee'] = MagicMock()
+
+import apiManagerClaude
+from apiManagerClaude import APIRequestScheduler
+from event_bus import EventBus
+from raw_json import decode
+
+
+class TestEventBus(unittest.TestCase):
+
+    def test_bounded_buffer_drops_oldest(self):
+        bus = EventBus()
+        subscription = bus.subscribe("t", maxsize=3)
+        for i in range(5):
+            self.assertEqual(bus.publish("t", i), 1)
+
+        self.assertEqual(subscription.get_batch(10, timeout=0), [2, 3, 4])
+        stats = bus.get_stats()
+        self.assertEqual(stats["dropped"], 2)
+        self.assertEqual(stats["subscriptions"][0]["high_water"], 3)
+
+    def test_publish_without_subscriber_never_waits(self):
+        bus = EventBus()
+        start = time.perf_counter()
+        for i in range(1000):
+            self.assertEqual(bus.publish("t", i), 0)
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual(bus.get_stats()["unrouted"], 1000)
+
+    def test_get_batch_wakes_on_publish_and_close(self):
+        bus = EventBus()
+        subscription = bus.subscribe("t")
+        threading.Timer(0.1, bus.publish, args=("t", "x")).start()
+        self.assertEqual(subscription.get_batch(10, timeout=5), ["x"])
+
+        threading.Timer(0.1, bus.unsubscribe, args=(subscription,)).start()
+        start = time.perf_counter()
+        self.assertEqual(subscription.get_batch(10, timeout=5), [])
+        self.assertLess(time.perf_counter() - start, 2)
+        self.assertEqual(bus.publish("t", "y"), 0)
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    """Amont de test: compte les appels, y compris un éventuel POST /send_message"""
+    hits = []
+
+    def _reply(self):
+        CountingHandler.hits.append((self.command, self.path))
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+class TestCompletionNotifications(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}/notify"
+        cls.scheduler = APIRequestScheduler([cls.base])
+        cls.scheduler.set_rate_limit(100, burst=10)
+        cls.scheduler_id = "test-notify-scheduler"
+        apiManagerClaude.schedulers[cls.scheduler_id] = cls.scheduler
+
+    @classmethod
+    def tearDownClass(cls):
+        apiManagerClaude.schedulers.pop(cls.scheduler_id, None)
+        cls.scheduler.cleanup()
+        cls.server.shutdown()
+
+    def setUp(self):
+        CountingHandler.hits = []
+        self.subscription = apiManagerClaude.notification_bus.subscribe(apiManagerClaude.NOTIFICATION_TOPIC, 2)
+        apiManagerClaude.connected_clients["c1"] = "sid-c1"
+
+    def tearDown(self):
+        apiManagerClaude.notification_bus.unsubscribe(self.subscription)
+        apiManagerClaude.connected_clients.pop("c1", None)
+
+    def test_completion_published_without_http_hop(self):
+        request_id, _ = self.scheduler.add_request(f"{self.base}/a", method="GET", client_id="c1")
+        events = self.subscription.get_batch(10, timeout=10)
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["request_id"], request_id)
+        self.assertEqual(events[0]["client_id"], "c1")
+        self.assertEqual(decode(events[0]["message"]["response"]), {"path": "/notify/a"})
+        # Seul l'appel amont a eu lieu: plus de POST vers /send_message
+        self.assertEqual(CountingHandler.hits, [("GET", "/notify/a")])
+
+    def test_stalled_consumer_does_not_delay_worker(self):
+        """Abonné qui ne lit rien: les requêtes sont servies, les notifications en trop abandonnées"""
+        ids = [self.scheduler.add_request(f"{self.base}/s{i}", method="GET", client_id="c1")[0] for i in range(5)]
+        for request_id in ids:
+            self.assertIsNotNone(self.scheduler.wait_for_response(request_id, timeout=10))
+
+        stats = self.subscription.get_stats()
+        self.assertEqual(stats["depth"], 2)
+        self.assertEqual(stats["dropped"], 3)
+
+    def test_dispatcher_emits_and_marks_delivered(self):
+        request_id, _ = self.scheduler.add_request(f"{self.base}/d", method="GET", client_id="c1")
+        self.assertIsNotNone(self.subscription.get_batch(1, timeout=10))
+        self.subscription.close()
+        self.subscription.buffer.append({"scheduler_id": self.scheduler_id, "request_id": request_id,
+                                         "client_id": "c1", "message": {"request_id": request_id}})
+
+        with patch.object(apiManagerClaude.socketio, 'emit') as emit, \
+                patch.object(self.scheduler, 'mark_delivered') as mark_delivered:
+            apiManagerClaude._dispatch_notifications(self.subscription)
+
+        emit.assert_called_once_with('message', {'data': {"request_id": request_id}}, room="c1", namespace='/')
+        mark_delivered.assert_called_once_with(request_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
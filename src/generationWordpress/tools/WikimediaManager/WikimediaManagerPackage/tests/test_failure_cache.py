@@ -0,0 +1,126 @@
+# tests/test_failure_cache.py
+import os
+import sys
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest.mock import MagicMock, patch
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+try:
+    import configPrivee  # noqa: F401
+except ImportError:
+    sys.modules['configPrivee'] = MagicMock()
+
+from apiManagerClaude import APIRequestScheduler
+from failure_cache import FailureCache, classify_failure
+
+
+class TestFailureCache(unittest.TestCase):
+
+    def test_classification(self):
+        self.assertEqual(classify_failure(400), 'client_error')
+        self.assertEqual(classify_failure(500), 'server_error')
+        self.assertEqual(classify_failure(timeout=True), 'timeout')
+        self.assertEqual(classify_failure(None), 'network')
+        # Surcharge: affaire du contrôle de taux, pas d'une requête
+        self.assertIsNone(classify_failure(429))
+        self.assertIsNone(classify_failure(503))
+
+    def test_failure_served_until_ttl_then_probe(self):
+        cache = FailureCache(ttls={'timeout': 300})
+        cache.record_failure("q", 'timeout', "Timeout", cost=30.0, now=1000)
+
+        self.assertEqual(cache.check("q", now=1100).reason, 'timeout')
+        self.assertEqual(cache.check("q", now=1200).error, "Timeout")
+        # TTL écoulé: la requête suivante part vers l'amont
+        self.assertIsNone(cache.check("q", now=1300))
+        stats = cache.get_stats(now=1300)
+        self.assertEqual((stats['fast_failures'], stats['probes'], stats['time_saved']), (2, 1, 60.0))
+        self.assertEqual(stats['fast_failures_by_reason'], {'timeout': 2})
+
+    def test_breaker_opens_longer_and_success_clears(self):
+        cache = FailureCache(ttls={'server_error': 60}, threshold=3, max_open=400)
+        durations = []
+        for _ in range(5):
+            durations.append(cache.record_failure("q", 'server_error', "HTTP 500", 500, now=0).until)
+        self.assertEqual(durations, [60, 60, 120, 240, 400])
+        self.assertEqual(cache.get_stats(now=0)['open_breakers'], 1)
+
+        cache.record_success("q")
+        self.assertIsNone(cache.check("q", now=1))
+        self.assertEqual(cache.get_stats()['recovered'], 1)
+
+    def test_unclassified_or_disabled_not_recorded(self):
+        cache = FailureCache()
+        self.assertIsNone(cache.record_failure("q", None, "HTTP 429"))
+        disabled = FailureCache(enabled=False)
+        disabled.record_failure("q", 'client_error', "HTTP 400")
+        self.assertIsNone(disabled.check("q"))
+
+
+class FailingHandler(BaseHTTPRequestHandler):
+    """Amont de test: /bad/... répond 400, le reste 200; compte les appels"""
+    hits = 0
+
+    def do_GET(self):
+        FailingHandler.hits += 1
+        status = 400 if self.path.startswith("/bad") else 200
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSchedulerNegativeCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FailingHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.cache_root = tempfile.mkdtemp()
+        with patch('os.getcwd', return_value=cls.cache_root):
+            cls.scheduler = APIRequestScheduler([f"{cls.base}/bad", f"{cls.base}/good"])
+        cls.scheduler.set_rate_limit(100, burst=10)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.scheduler.cleanup()
+        cls.server.shutdown()
+        shutil.rmtree(cls.cache_root, ignore_errors=True)
+
+    def test_known_bad_query_fails_fast(self):
+        FailingHandler.hits = 0
+        first, _ = self.scheduler.add_request(f"{self.base}/bad?query=x", method="GET")
+        response = self.scheduler.wait_for_response(first, timeout=10)
+        self.assertEqual((response["reason"], response["status_code"]), ("client_error", 400))
+        self.assertEqual(FailingHandler.hits, 1)
+
+        second, _ = self.scheduler.add_request(f"{self.base}/bad?query=x", method="GET")
+        response = self.scheduler.wait_for_response(second, timeout=10)
+        self.assertEqual(response["error_type"], "cached_failure")
+        self.assertEqual(response["reason"], "client_error")
+        self.assertGreater(response["retry_after"], 0)
+        # Aucun nouvel appel amont; une autre requête n'est pas touchée
+        self.assertEqual(FailingHandler.hits, 1)
+        other, _ = self.scheduler.add_request(f"{self.base}/good?query=x", method="GET")
+        self.assertEqual(self.scheduler.wait_for_response(other, timeout=10), {"path": "/good?query=x"})
+
+        stats = self.scheduler.get_stats()["failure_cache"]
+        self.assertEqual(stats["fast_failures"], 1)
+        self.assertGreater(stats["time_saved"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+# tests/test_http_pool.py
+import os
+import sys
+import asyncio
+import unittest
+
+from aiohttp import web
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+from http_pool import HostSessionPool
+
+
+class TestHostSessionPool(unittest.TestCase):
+
+    def test_connections_reused_across_requests(self):
+        """Des requêtes successives vers le même hôte réutilisent la même connexion"""
+
+        async def scenario():
+            app = web.Application()
+            app.router.add_get('/mockapi/test/{i}', lambda r: web.json_response({"index": r.match_info['i']}))
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+
+            pool = HostSessionPool(limit_per_host=2)
+            try:
+                for i in range(5):
+                    session = pool.get_session(f"http://127.0.0.1:{port}/mockapi/test/{i}")
+                    async with session.get(f"http://127.0.0.1:{port}/mockapi/test/{i}") as resp:
+                        self.assertEqual((await resp.json())["index"], str(i))
+                stats = pool.get_stats()
+            finally:
+                await pool.close()
+                await runner.cleanup()
+            return stats
+
+        stats = asyncio.run(scenario())
+        self.assertEqual(len(stats['hosts']), 1)
+        self.assertEqual(stats['requests'], 5)
+        self.assertEqual(stats['connections_created'], 1)
+        self.assertEqual(stats['connections_reused'], 4)
+        self.assertAlmostEqual(stats['reuse_ratio'], 0.8)
+        host_stats = next(iter(stats['hosts'].values()))
+        self.assertEqual(host_stats['idle'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
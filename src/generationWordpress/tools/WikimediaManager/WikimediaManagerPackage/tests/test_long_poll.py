@@ -0,0 +1,100 @@
+# tests/test_long_poll.py
+import os
+import sys
+import time
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+try:
+    import configPrivee  # noqa: F401
+except ImportError:
+    sys.modules['configPrivee'] = MagicMock()
+
+import apiManagerClaude
+from apiManagerClaude import APIRequestScheduler, RequestData
+
+AUTH = {'Authorization': 'Bearer test-token'}
+
+
+class TestLongPollWait(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.scheduler = APIRequestScheduler(["http://127.0.0.1:1/longpoll"])
+        apiManagerClaude.schedulers[cls.scheduler.scheduler_id] = cls.scheduler
+
+    @classmethod
+    def tearDownClass(cls):
+        apiManagerClaude.schedulers.pop(cls.scheduler.scheduler_id, None)
+        cls.scheduler.cleanup()
+
+    def setUp(self):
+        self.client = apiManagerClaude.app.test_client()
+        self.config_patch = patch.object(apiManagerClaude, 'config', {'admin': {'Bearer': 'test-token'}})
+        self.config_patch.start()
+
+    def tearDown(self):
+        self.config_patch.stop()
+
+    def _pending_request(self, request_id):
+        """Requête suivie par le scheduler mais jamais envoyée au worker"""
+        with self.scheduler.lock:
+            self.scheduler.request_dict[request_id] = RequestData(request_id=request_id, url="http://127.0.0.1:1/longpoll")
+            self.scheduler.completion_events[request_id] = threading.Event()
+
+    def _complete(self, request_id, response):
+        with self.scheduler.lock:
+            self.scheduler.response_store[request_id] = response
+            self.scheduler._signal_completion(request_id)
+
+    def test_wait_wakes_when_response_stored(self):
+        """/api/wait répond dès le stockage de la réponse, sans attendre le timeout"""
+        self._pending_request("req-push")
+        threading.Timer(0.2, self._complete, args=("req-push", {"ok": True})).start()
+
+        t0 = time.perf_counter()
+        resp = self.client.get("/api/wait/req-push?timeout=10", headers=AUTH)
+        elapsed = time.perf_counter() - t0
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json()["status"], "complete")
+        self.assertEqual(resp.get_json()["response"], {"ok": True})
+        self.assertGreater(elapsed, 0.15)
+        self.assertLess(elapsed, 2)
+        # La réponse a été consommée
+        self.assertFalse(self.scheduler.has_request("req-push"))
+        self.assertNotIn("req-push", self.scheduler.completion_events)
+
+    def test_wait_timeout_returns_pending(self):
+        """Sans réponse, /api/wait rend "pending" au bout du timeout"""
+        self._pending_request("req-slow")
+        resp = self.client.get("/api/wait/req-slow?timeout=0.1", headers=AUTH)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json()["status"], "pending")
+        self.assertTrue(self.scheduler.has_request("req-slow"))
+
+    def test_wait_unknown_request(self):
+        resp = self.client.get("/api/wait/inconnue?timeout=0.1", headers=AUTH)
+        self.assertEqual(resp.status_code, 404)
+
+    def test_concurrent_waits_do_not_use_native_thread_pool(self):
+        """Plus de long-polls simultanés que de threads tpool: tous réveillés, aucun thread natif occupé"""
+        import eventlet
+        events = [threading.Event() for _ in range(40)]
+        with patch("eventlet.tpool.execute", side_effect=AssertionError("tpool utilisé")):
+            waiters = [eventlet.spawn(apiManagerClaude._wait_event, event, 5) for event in events]
+            threading.Timer(0.2, lambda: [event.set() for event in events]).start()
+            t0 = time.perf_counter()
+            results = [waiter.wait() for waiter in waiters]
+        self.assertEqual(results, [True] * 40)
+        self.assertLess(time.perf_counter() - t0, 2)
+        # sans réponse, l'attente se termine au timeout
+        self.assertFalse(apiManagerClaude._wait_event(threading.Event(), 0.05))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+# tests/test_metrics.py
+import os
+import sys
+import random
+import unittest
+from unittest.mock import MagicMock
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+from metrics import LatencyHistogram, WikimediaMetricsCollector
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_quantiles_close_to_exact(self):
+        """p50/p90/p99 à moins de 20 % des valeurs exactes, max exact"""
+        rng = random.Random(42)
+        values = [rng.lognormvariate(-1.5, 1.0) for _ in range(20000)]
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+
+        values.sort()
+        for q in (0.5, 0.9, 0.99):
+            exact = values[int(q * len(values))]
+            self.assertAlmostEqual(histogram.quantile(q) / exact, 1.0, delta=0.2)
+        self.assertEqual(histogram.max, values[-1])
+        self.assertAlmostEqual(histogram.mean(), sum(values) / len(values))
+
+    def test_constant_memory_and_merge(self):
+        """Le nombre de buckets ne dépend pas du nombre de mesures; deux histogrammes se fusionnent"""
+        a, b = LatencyHistogram(), LatencyHistogram()
+        buckets = len(a.counts)
+        for i in range(5000):
+            a.record(0.01)
+            b.record(1.0)
+        b.record(500.0)  # au-delà du dernier bucket
+        self.assertEqual(len(a.counts), buckets)
+
+        a.merge(b)
+        self.assertEqual(a.count, 10001)
+        self.assertEqual(a.max, 500.0)
+        self.assertLess(a.quantile(0.25), 0.012)
+        self.assertGreater(a.quantile(0.75), 0.8)
+
+    def test_empty(self):
+        self.assertEqual(LatencyHistogram().summary_ms()["p99_ms"], 0.0)
+
+
+class TestMetricsCollectorExport(unittest.TestCase):
+
+    def test_percentiles_per_operation_and_endpoint(self):
+        collector = WikimediaMetricsCollector()
+        for i in range(100):
+            collector.record_operation_success("get_types", 0.1 if i < 90 else 2.0, endpoint="wdqs")
+        collector.record_operation_error("get_types", "TimeoutError", 30.0, endpoint="wdqs")
+
+        op = collector.get_metrics()["operations"]["get_types"]
+        self.assertLess(op["latency"]["p50_ms"], 120)
+        self.assertGreater(op["latency"]["p99_ms"], 1500)
+        self.assertEqual(op["latency"]["max_ms"], 30000.0)
+        self.assertEqual(op["endpoints"]["wdqs"]["count"], 101)
+        self.assertGreater(op["avg_response_time_ms"], 0)
+
+    def test_prometheus_text(self):
+        collector = WikimediaMetricsCollector()
+        collector.record_operation_success("get_types", 0.1, endpoint="wdqs")
+        text = collector.to_prometheus()
+
+        self.assertIn("# TYPE wikimedia_operation_duration_seconds histogram", text)
+        self.assertIn('wikimedia_operation_duration_seconds_bucket{operation="get_types",le="+Inf"} 1', text)
+        self.assertIn('wikimedia_operation_duration_seconds_count{operation="get_types"} 1', text)
+        self.assertIn('wikimedia_endpoint_duration_seconds_count{operation="get_types",endpoint="wdqs"} 1', text)
+        self.assertIn('wikimedia_operation_calls_total{operation="get_types",outcome="success"} 1', text)
+
+    def test_scheduler_metrics_route(self):
+        """Le serveur expose /metrics au format Prometheus"""
+        try:
+            import configPrivee  # noqa: F401
+        except ImportError:
+            sys.modules['configPrivee'] = MagicMock()
+        import apiManagerClaude
+
+        resp = apiManagerClaude.app.test_client().get("/metrics")
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.content_type.startswith("text/plain"))
+        text = resp.get_data(as_text=True)
+        self.assertIn("# TYPE api_manager_upstream_duration_seconds histogram", text)
+        self.assertIn("api_manager_memory_rss_bytes", text)
+
+
+if __name__ == '__main__':
+    unittest.main()
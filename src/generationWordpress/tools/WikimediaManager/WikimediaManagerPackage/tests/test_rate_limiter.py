@@ -0,0 +1,236 @@
+# tests/test_rate_limiter.py
+import os
+import sys
+import json
+import time
+import asyncio
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest.mock import MagicMock, patch
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+sys.path.insert(0, os.path.dirname(os.path.dirname(SCRIPT_DIR)))
+
+try:
+    import configPrivee  # noqa: F401
+except ImportError:
+    sys.modules['configPrivee'] = MagicMock()
+
+from rate_limiter import TokenBucket, AdaptiveRateController, parse_retry_after
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_burst_then_steady_rate(self):
+        """La rafale part immédiatement, les suivantes au rythme du taux"""
+        bucket = TokenBucket(rate=20, burst=3)
+
+        async def scenario():
+            t0 = time.perf_counter()
+            starts = []
+            for _ in range(5):
+                await bucket.acquire()
+                starts.append(time.perf_counter() - t0)
+            return starts
+
+        starts = asyncio.run(scenario())
+        self.assertLess(starts[2], 0.02)
+        # 2 jetons manquants à 20/s: environ 100 ms
+        self.assertGreater(starts[4], 0.08)
+        self.assertLess(starts[4], 0.3)
+        self.assertEqual(bucket.stats['acquired'], 5)
+        self.assertEqual(bucket.stats['waited'], 2)
+
+    def test_slow_requests_do_not_consume_budget(self):
+        """La durée des requêtes n'entre pas en compte: seuls les départs sont limités"""
+        bucket = TokenBucket(rate=50, burst=1)
+
+        async def slow_call():
+            await bucket.acquire()
+            await asyncio.sleep(0.3)
+
+        async def scenario():
+            t0 = time.perf_counter()
+            await asyncio.gather(*(slow_call() for _ in range(5)))
+            return time.perf_counter() - t0
+
+        # En série il faudrait 1,5 s; ici 4 intervalles de 20 ms + une requête de 300 ms
+        self.assertLess(asyncio.run(scenario()), 0.8)
+
+    def test_configure(self):
+        """configure() change taux et rafale; les valeurs invalides sont refusées"""
+        bucket = TokenBucket(rate=1, burst=5)
+        bucket.configure(10, burst=2)
+        self.assertEqual((bucket.rate, bucket.burst), (10, 2))
+        self.assertLessEqual(bucket.tokens, 2)
+        with self.assertRaises(ValueError):
+            bucket.configure(0)
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=-1)
+
+
+class TestAdaptiveRateController(unittest.TestCase):
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertAlmostEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480), 10.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("bientôt"))
+
+    def test_throttle_pauses_and_halves_rate(self):
+        """Un 429 suspend les départs pendant le Retry-After et divise le taux par deux"""
+        bucket = TokenBucket(rate=20, burst=5)
+        controller = AdaptiveRateController(bucket)
+        self.assertEqual(controller.on_throttled(retry_after=0.2), 0.2)
+        self.assertEqual(bucket.rate, 10)
+        # Une même vague de refus ne fait baisser le taux qu'une fois par période
+        controller.on_throttled(retry_after=0.2)
+        self.assertEqual(bucket.rate, 10)
+
+        async def first_start():
+            t0 = time.perf_counter()
+            await bucket.acquire()
+            return time.perf_counter() - t0
+
+        self.assertGreater(asyncio.run(first_start()), 0.18)
+        self.assertEqual(controller.stats['throttled'], 2)
+
+    def test_additive_increase_up_to_ceiling(self):
+        bucket = TokenBucket(rate=10)
+        controller = AdaptiveRateController(bucket, increase_step=0.5, cooldown=0)
+        controller.on_throttled(retry_after=0)
+        self.assertEqual(bucket.rate, 5)
+        for _ in range(5):
+            time.sleep(0.05)
+            controller.on_success(0.01)
+        # +50 % du plafond par seconde pendant ~0,25 s
+        self.assertGreater(bucket.rate, 5.8)
+        self.assertLess(bucket.rate, 10)
+        time.sleep(1.1)
+        controller.on_success(0.01)
+        self.assertEqual(bucket.rate, 10)
+
+    def test_mixed_latencies_keep_rate(self):
+        """Sans refus de l'amont, un mélange de requêtes rapides et lentes ne fait pas baisser le taux"""
+        bucket = TokenBucket(rate=0.5)
+        controller = AdaptiveRateController(bucket, cooldown=0)
+        for i in range(200):
+            controller.on_success([0.2, 0.3, 5.0, 0.25, 2.5][i % 5])
+        self.assertEqual(bucket.rate, 0.5)
+        self.assertEqual(controller.stats['decreases'], 0)
+
+    def test_same_ceiling_keeps_adapted_rate(self):
+        """set_rate_limit rappelé avec le même taux ne remet pas le taux adapté au plafond"""
+        bucket = TokenBucket(rate=4)
+        controller = AdaptiveRateController(bucket, cooldown=0)
+        controller.on_throttled(retry_after=0)
+        self.assertEqual(bucket.rate, 2)
+        controller.last_decrease -= 100  # repli ancien
+        controller.set_ceiling(4)
+        self.assertEqual(bucket.rate, 2)
+        controller.set_ceiling(3)
+        self.assertEqual((controller.ceiling, bucket.rate), (3, 3))
+
+    def test_disabled_and_ceiling(self):
+        bucket = TokenBucket(rate=10)
+        controller = AdaptiveRateController(bucket, enabled=False)
+        controller.on_throttled(retry_after=0)
+        self.assertEqual(bucket.rate, 10)
+        controller.set_ceiling(4)
+        self.assertEqual((controller.ceiling, bucket.rate), (4, 4))
+
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+    """Répond 429 (Retry-After: 1) aux `refusals` premiers appels, puis 200"""
+    refusals = 0
+    hits = []
+
+    def do_GET(self):
+        ThrottlingHandler.hits.append(time.perf_counter())
+        if ThrottlingHandler.refusals > 0:
+            ThrottlingHandler.refusals -= 1
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps({"ok": True}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSchedulerThrottling(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottlingHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}/throttle"
+        from apiManagerClaude import APIRequestScheduler
+        cls.scheduler = APIRequestScheduler([cls.base])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.scheduler.cleanup()
+        cls.server.shutdown()
+
+    def test_adaptive_control_on_by_default(self):
+        """Sans réglage, le taux s'adapte aux refus de l'amont: pas de set_rate_limit à ajuster à la main"""
+        from apiManagerClaude import APIRequestScheduler
+        scheduler = APIRequestScheduler([f"{self.base}/defaut"])
+        try:
+            self.assertTrue(all(controller.enabled for controller in scheduler.rate_controllers.values()))
+        finally:
+            scheduler.cleanup()
+            APIRequestScheduler._instances.pop((f"{self.base}/defaut",), None)
+
+    def test_retry_after_is_honored_and_rate_reduced(self):
+        """Un 429 est réessayé après le Retry-After, sans erreur pour le client, et le taux baisse"""
+        self.scheduler.set_rate_limit(50, burst=5, adaptive=True)
+        ThrottlingHandler.refusals, ThrottlingHandler.hits = 1, []
+        request_ids = [self.scheduler.add_request(f"{self.base}/{i}", method="GET")[0] for i in range(3)]
+        responses = [self.scheduler.wait_for_response(rid, timeout=10) for rid in request_ids]
+
+        self.assertEqual(responses, [{"ok": True}] * 3)
+        # Aucun départ pendant la pause qui suit le refus
+        refused_at = ThrottlingHandler.hits[0]
+        self.assertTrue(all(t - refused_at >= 0.95 for t in ThrottlingHandler.hits[1:] if t > refused_at + 0.05))
+        stats = self.scheduler.get_stats()["rate_limiters"][self.base]
+        self.assertEqual(stats["throttled"], 1)
+        self.assertEqual(stats["retry_after_honored"], 1)
+        self.assertLess(stats["rate"], 50)
+        self.assertEqual(stats["ceiling"], 50)
+
+
+class TestRetryOnErrorDecorator(unittest.TestCase):
+
+    def test_backoff_is_jittered_and_capped(self):
+        from WikimediaManagerPackage.decorators import retry_on_error
+        from WikimediaManagerPackage.exceptions import NetworkError
+
+        calls = []
+
+        @retry_on_error(max_retries=2, backoff_factor=10, max_backoff=5)
+        def flaky():
+            calls.append(time.perf_counter())
+            if len(calls) < 3:
+                raise NetworkError("réseau")
+            return "ok"
+
+        with patch("WikimediaManagerPackage.decorators.random.uniform", side_effect=lambda low, high: low) as uniform:
+            self.assertEqual(flaky(), "ok")
+        # délai tiré dans [0, backoff], backoff 10 ramené à max_backoff
+        self.assertEqual([c.args for c in uniform.call_args_list], [(0, 1), (0, 5)])
+        self.assertLess(calls[2] - calls[0], 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
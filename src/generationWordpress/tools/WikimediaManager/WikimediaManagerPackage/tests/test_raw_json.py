@@ -0,0 +1,132 @@
+# tests/test_raw_json.py
+import os
+import sys
+import json
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest.mock import MagicMock, patch
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+try:
+    import configPrivee  # noqa: F401
+except ImportError:
+    sys.modules['configPrivee'] = MagicMock()
+
+import apiManagerClaude
+from apiManagerClaude import APIRequestScheduler
+from disk_cache import DiskCache, build_cache_key
+from raw_json import RawJSON, encode_with_raw
+
+AUTH = {'Authorization': 'Bearer test-token'}
+
+
+def sparql_body(rows: int) -> bytes:
+    return json.dumps({"head": {"vars": ["oeuvre"]}, "results": {"bindings": [
+        {"oeuvre": {"type": "uri", "value": f"http://www.wikidata.org/entity/Q{i}"}} for i in range(rows)
+    ]}}, indent=1).encode()
+
+
+class TestRawJSON(unittest.TestCase):
+
+    def test_rows_decoded_one_by_one(self):
+        raw = RawJSON(sparql_body(50))
+        rows = raw.iter_rows()
+        self.assertEqual(next(rows), {"oeuvre": {"type": "uri", "value": "http://www.wikidata.org/entity/Q0"}})
+        self.assertEqual(list(rows), raw.json()["results"]["bindings"][1:])
+        self.assertEqual(list(RawJSON(b'{"results": {"bindings": []}}').iter_rows()), [])
+
+    def test_encode_with_raw_splices_bytes(self):
+        raw = RawJSON(sparql_body(3))
+        chunks = encode_with_raw({"status": "complete"}, "response", raw)
+        self.assertIs(chunks[1], raw.raw)
+        self.assertEqual(json.loads(b"".join(chunks)), {"status": "complete", "response": raw.json()})
+        self.assertEqual(json.loads(b"".join(encode_with_raw({}, "response", [1]))), {"response": [1]})
+
+    def test_disk_cache_keeps_bytes(self):
+        directory = tempfile.mkdtemp()
+        cache = DiskCache(directory, compression='gzip')
+        try:
+            key = build_cache_key("GET", "https://query.wikidata.org/sparql", {"q": 1})
+            raw = RawJSON(sparql_body(500))
+            cache.put(key, raw, ttl=600)
+            self.assertEqual(cache.get_stats()["compressed_writes"], 1)
+
+            cached = cache.get(key, max_age=600, raw=True)
+            self.assertIsInstance(cached, RawJSON)
+            self.assertEqual(cached.raw, raw.raw)
+            self.assertEqual(cache.get(key, max_age=600), raw.json())
+        finally:
+            cache.close()
+            shutil.rmtree(directory)
+
+
+class SparqlHandler(BaseHTTPRequestHandler):
+    """Amont de type WDQS (application/sparql-results+json), compte les appels"""
+    hits = 0
+
+    def do_GET(self):
+        SparqlHandler.hits += 1
+        body = sparql_body(200)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/sparql-results+json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestRawResponsesInScheduler(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), SparqlHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}/sparql"
+        cls.cache_root = tempfile.mkdtemp()
+        with patch('os.getcwd', return_value=cls.cache_root):
+            cls.scheduler = APIRequestScheduler([cls.base])
+        cls.scheduler.set_rate_limit(100, burst=10)
+        apiManagerClaude.schedulers[cls.scheduler.scheduler_id] = cls.scheduler
+
+    @classmethod
+    def tearDownClass(cls):
+        apiManagerClaude.schedulers.pop(cls.scheduler.scheduler_id, None)
+        cls.scheduler.cleanup()
+        cls.server.shutdown()
+        shutil.rmtree(cls.cache_root, ignore_errors=True)
+
+    def test_body_cached_and_served_as_received(self):
+        SparqlHandler.hits = 0
+        first, _ = self.scheduler.add_request(f"{self.base}?q=raw", method="GET", cache_duration=600)
+        response = self.scheduler.wait_for_response(first, timeout=10, raw=True)
+        self.assertIsInstance(response, RawJSON)
+        self.assertEqual(response.raw, sparql_body(200))
+
+        # Second appel servi par le cache, toujours sans décodage
+        second, _ = self.scheduler.add_request(f"{self.base}?q=raw", method="GET", cache_duration=600)
+        cached = self.scheduler.wait_for_response(second, timeout=10, raw=True)
+        self.assertEqual(cached.raw, sparql_body(200))
+        self.assertEqual(SparqlHandler.hits, 1)
+
+    def test_status_route_and_default_decoding(self):
+        first, _ = self.scheduler.add_request(f"{self.base}?q=status", method="GET")
+        second, _ = self.scheduler.add_request(f"{self.base}?q=decoded", method="GET")
+        # Sans raw=True, l'appelant reçoit l'objet décodé
+        self.assertEqual(self.scheduler.wait_for_response(second, timeout=10), json.loads(sparql_body(200)))
+
+        with patch.object(apiManagerClaude, 'config', {'admin': {'Bearer': 'test-token'}}):
+            resp = apiManagerClaude.app.test_client().get(f"/api/wait/{first}?timeout=10", headers=AUTH)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json(), {"status": "complete", "request_id": first,
+                                           "response": json.loads(sparql_body(200))})
+
+
+if __name__ == '__main__':
+    unittest.main()
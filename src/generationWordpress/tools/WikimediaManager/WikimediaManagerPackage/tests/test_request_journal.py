@@ -0,0 +1,121 @@
+# tests/test_request_journal.py
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest.mock import MagicMock, patch
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+try:
+    import configPrivee  # noqa: F401
+except ImportError:
+    sys.modules['configPrivee'] = MagicMock()
+
+import apiManagerClaude
+from apiManagerClaude import APIRequestScheduler
+from request_journal import RequestJournal
+
+
+class TestRequestJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "journal.sqlite")
+        self.patterns = ["http://example.org/api"]
+
+    def test_roundtrip(self):
+        journal = RequestJournal(self.path)
+        for i in range(3):
+            journal.record_accepted(self.patterns, f"r{i}", {"request_id": f"r{i}", "url": f"http://example.org/api/{i}"})
+        journal.record_completed(["r0", "r1"], {"ok": True})
+        journal.record_delivered("r1")
+        journal.close()
+
+        # Rouvert comme après un redémarrage
+        journal = RequestJournal(self.path)
+        pending, completed = journal.load(self.patterns)
+        self.assertEqual([data["request_id"] for data in pending], ["r2"])
+        self.assertEqual(completed, [("r0", {"ok": True})])
+        self.assertEqual(journal.journaled_patterns(), [self.patterns])
+        self.assertEqual(journal.load(["http://ailleurs.example"]), ([], []))
+
+    def test_scheduler_id_is_stable_and_forget(self):
+        journal = RequestJournal(self.path)
+        self.assertEqual(journal.scheduler_id_for(self.patterns, "a"), "a")
+        self.assertEqual(journal.scheduler_id_for(list(reversed(self.patterns)), "b"), "a")
+        journal.record_accepted(self.patterns, "r0", {})
+        journal.forget(self.patterns)
+        self.assertEqual(journal.get_stats()["pending"], 0)
+        self.assertEqual(journal.scheduler_id_for(self.patterns, "c"), "c")
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_GET(self):
+        CountingHandler.hits += 1
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSchedulerRestart(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}/journal"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def _restart(self, scheduler):
+        """Arrêt du scheduler et oubli du singleton, comme un arrêt du processus"""
+        scheduler.cleanup()
+        APIRequestScheduler._instances.pop(tuple(sorted([self.base])), None)
+        return APIRequestScheduler([self.base])
+
+    def test_pending_requests_and_results_survive_restart(self):
+        path = os.path.join(tempfile.mkdtemp(), "journal.sqlite")
+        with patch.object(apiManagerClaude, "REQUEST_JOURNAL", path):
+            scheduler = APIRequestScheduler([self.base])
+            scheduler.set_rate_limit(0.2, adaptive=False)  # un seul départ avant l'arrêt
+            request_ids = [scheduler.add_request(f"{self.base}/{i}", method="GET")[0] for i in range(3)]
+            deadline = time.time() + 5
+            while request_ids[0] not in scheduler.response_store and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(CountingHandler.hits, 1)
+
+            restarted = self._restart(scheduler)
+            try:
+                self.assertEqual(restarted.scheduler_id, scheduler.scheduler_id)
+                restarted.set_rate_limit(100, adaptive=False)
+                responses = [restarted.wait_for_response(rid, timeout=10) for rid in request_ids]
+                self.assertEqual(responses, [{"path": f"/journal/{i}"} for i in range(3)])
+                # La requête déjà servie avant l'arrêt n'est pas refaite
+                self.assertEqual(CountingHandler.hits, 3)
+                restarted.journal.flush()
+                stats = restarted.get_stats()["journal"]
+                self.assertEqual((stats["pending"], stats["completed"]), (0, 0))
+                self.assertEqual((stats["replayed_pending"], stats["replayed_completed"]), (2, 1))
+            finally:
+                restarted.journal.forget([self.base])
+                restarted.cleanup()
+                APIRequestScheduler._instances.pop(tuple(sorted([self.base])), None)
+
+
+if __name__ == '__main__':
+    unittest.main()
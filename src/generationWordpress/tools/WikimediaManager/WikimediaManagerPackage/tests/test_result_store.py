@@ -0,0 +1,72 @@
+# tests/test_result_store.py
+import os
+import sys
+import time
+import unittest
+from unittest.mock import MagicMock
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+from result_store import ResultStore, estimate_size
+
+
+class TestResultStore(unittest.TestCase):
+
+    def test_byte_accounting(self):
+        """La taille totale suit les ajouts, remplacements et retraits"""
+        store = ResultStore()
+        store["a"] = {"x": "1" * 100}
+        store["b"] = "é" * 10
+        self.assertEqual(store.total_bytes, estimate_size({"x": "1" * 100}) + 20)
+        store["a"] = {}
+        self.assertEqual(store.total_bytes, 2 + 20)
+        self.assertEqual(store.pop("b"), "é" * 10)
+        self.assertIsNone(store.pop("b", None))
+        self.assertEqual(store.total_bytes, 2)
+        store.clear()
+        self.assertEqual(store.total_bytes, 0)
+        self.assertGreaterEqual(store.high_water_bytes, 122)
+        self.assertEqual(store.high_water_entries, 2)
+
+    def test_size_limit_evicts_oldest(self):
+        """Au-delà de max_bytes, les réponses les plus anciennes sont évincées"""
+        evicted = []
+        store = ResultStore(max_bytes=250, on_evict=lambda key, reason: evicted.append((key, reason)))
+        for i in range(4):
+            store[f"r{i}"] = "x" * 100
+        self.assertEqual(list(store.keys()), ["r2", "r3"])
+        self.assertEqual(evicted, [("r0", "size"), ("r1", "size")])
+        self.assertLessEqual(store.total_bytes, 250)
+        # Une réponse plus grosse que la limite est conservée seule
+        store["big"] = "x" * 1000
+        self.assertEqual(list(store.keys()), ["big"])
+
+    def test_ttl_and_delivered(self):
+        """TTL par entrée, raccourci pour une réponse déjà livrée"""
+        store = ResultStore(ttl=300, delivered_ttl=1)
+        store["kept"] = 1
+        store["delivered"] = 2
+        store.mark_delivered("delivered")
+        self.assertEqual(store.evict_expired(), [])
+        self.assertEqual(store.evict_expired(now=time.time() + 2), ["delivered"])
+        self.assertEqual(store.evict_expired(now=time.time() + 301), ["kept"])
+        self.assertEqual(store.stats["evicted_ttl"], 2)
+        self.assertEqual(store.total_bytes, 0)
+
+    def test_health_reports_memory_high_water(self):
+        """Le health check expose la mémoire du processus et des réponses en attente"""
+        try:
+            import configPrivee  # noqa: F401
+        except ImportError:
+            sys.modules['configPrivee'] = MagicMock()
+        import apiManagerClaude
+
+        memory = apiManagerClaude.app.test_client().get("/api/health").get_json()["memory"]
+        self.assertGreater(memory["rss_bytes"], 0)
+        self.assertGreaterEqual(memory["rss_high_water_bytes"], memory["rss_bytes"])
+        self.assertIn("response_store_high_water_bytes", memory)
+
+
+if __name__ == '__main__':
+    unittest.main()
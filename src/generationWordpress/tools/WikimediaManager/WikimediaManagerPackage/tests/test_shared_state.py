@@ -0,0 +1,272 @@
+# tests/test_shared_state.py
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import tempfile
+import threading
+import unittest
+import multiprocessing
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest.mock import MagicMock, patch
+
+SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(SCRIPT_DIR))
+
+try:
+    import configPrivee  # noqa: F401
+except ImportError:
+    sys.modules['configPrivee'] = MagicMock()
+
+import apiManagerClaude
+from apiManagerClaude import APIRequestScheduler
+from disk_cache import DiskCache, build_cache_key
+from shared_state import SharedState, SharedTokenBucket
+
+
+def acquire_for(path, key, seconds, results):
+    """Processus worker: prend autant de jetons que possible pendant `seconds`"""
+    bucket = SharedTokenBucket(SharedState(path), key, rate=20, burst=1)
+
+    async def run():
+        count, deadline = 0, time.monotonic() + seconds
+        while True:
+            await bucket.acquire()
+            if time.monotonic() > deadline:
+                return count
+            count += 1
+
+    results.put(asyncio.run(run()))
+
+
+class TestSharedState(unittest.TestCase):
+    """Deux instances sur le même fichier: comme deux workers"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "shared.sqlite")
+        self.first, self.second = SharedState(self.path), SharedState(self.path)
+
+    def tearDown(self):
+        self.first.close()
+        self.second.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_same_scheduler_id_in_every_worker(self):
+        patterns = ["http://example.org/b", "http://example.org/a"]
+        self.assertEqual(self.first.scheduler_id_for(patterns, "id-1"), "id-1")
+        self.assertEqual(self.second.scheduler_id_for(list(reversed(patterns)), "id-2"), "id-1")
+        self.assertEqual(self.second.patterns_for("id-1"), sorted(patterns))
+        self.assertIsNone(self.second.patterns_for("id-2"))
+
+    def test_token_budget_is_global(self):
+        self.first.ensure_bucket("s p", rate=2, burst=2)
+        self.second.ensure_bucket("s p", rate=50, burst=10)  # seau existant: réglage conservé
+        now = time.time() + 1
+        self.assertEqual(self.first.take_token("s p", now=now), 0)
+        self.assertEqual(self.second.take_token("s p", now=now), 0)
+        # Rafale épuisée par les deux workers ensemble
+        self.assertAlmostEqual(self.first.take_token("s p", now=now), 0.5)
+        self.assertEqual(self.second.take_token("s p", now=now + 0.5), 0)
+
+        self.assertTrue(self.second.pause_bucket("s p", 10, now=now + 1))
+        self.assertAlmostEqual(self.first.take_token("s p", now=now + 5), 6)
+
+    def test_claims(self):
+        self.assertTrue(self.first.claim("k", now=0))
+        self.assertFalse(self.second.claim("k", now=1))
+        self.first.release("k")
+        self.assertTrue(self.second.claim("k", now=2))
+        # Détenteur disparu: la réservation est reprise après claim_stale_after
+        self.assertTrue(self.first.claim("k", now=2 + self.first.claim_stale_after))
+        self.assertEqual(self.first.get_stats()["stale_claims"], 1)
+
+    def test_acquire_does_not_block_event_loop(self):
+        """Base verrouillée par un autre worker: la boucle continue de tourner pendant l'attente"""
+        self.first.ensure_bucket("s p", rate=10, burst=1)
+        bucket = SharedTokenBucket(self.first, "s p", rate=10)
+        writer = self.second.db
+        writer.execute("BEGIN IMMEDIATE")
+        threading.Timer(0.5, writer.execute, args=("COMMIT",)).start()
+
+        async def run():
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+            ticker = asyncio.ensure_future(tick())
+            await bucket.acquire()
+            ticker.cancel()
+            return ticks
+
+        self.assertGreater(asyncio.run(run()), 20)
+
+    def test_tracked_requests(self):
+        self.first.register_request("r1", "s1")
+        self.assertEqual(self.second.request_info("r1"), {"scheduler_id": "s1", "result_key": None})
+        self.second.complete_requests(["r1"], "result r1")
+        self.assertEqual(self.first.request_info("r1")["result_key"], "result r1")
+        # réponse non récupérée: oubliée après le TTL des réponses
+        self.assertEqual(self.first.evict_requests(300, now=time.time() + 301), 1)
+        self.assertIsNone(self.second.request_info("r1"))
+
+    def test_rate_holds_across_processes(self):
+        results = multiprocessing.Queue()
+        SharedState(self.path).ensure_bucket("s p", rate=20, burst=1)
+        workers = [multiprocessing.Process(target=acquire_for, args=(self.path, "s p", 1.0, results))
+                   for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        total = sum(results.get(timeout=30) for _ in workers)
+        for worker in workers:
+            worker.join()
+        # 20/s pour l'ensemble des processus, pas 20/s chacun
+        self.assertLessEqual(total, 24)
+        self.assertGreaterEqual(total, 15)
+
+
+class TestSharedDiskCache(unittest.TestCase):
+
+    def test_index_and_size_limit_shared(self):
+        directory = tempfile.mkdtemp()
+        try:
+            first = DiskCache(directory, compression=None, shared=True)
+            second = DiskCache(directory, compression=None, shared=True)
+            first.put("a", {"data": "x" * 1000})
+            self.assertEqual(second.get("a"), {"data": "x" * 1000})
+
+            second.put("b", {"data": "y" * 1000})
+            self.assertEqual(second.total_bytes, first.get_stats()["total_bytes"])
+            # Réécriture d'une entrée: comptée une seule fois
+            first.put("a", {"data": "z" * 1000})
+            self.assertEqual(first.total_bytes, second.get_stats()["total_bytes"])
+
+            # La limite porte sur les écritures des deux processus
+            self.assertEqual(second.enforce_size_limit(first.total_bytes - 1), 1)
+            self.assertIsNone(first.get("b"))
+            first.close()
+            second.close()
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_GET(self):
+        CountingHandler.hits += 1
+        body = json.dumps({"from": "upstream"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSchedulerSharedMode(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}/shared"
+        cls.root = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.root, "shared.sqlite")
+        with patch.object(apiManagerClaude, "SHARED_STATE", cls.path), patch('os.getcwd', return_value=cls.root):
+            cls.scheduler = APIRequestScheduler([cls.base])
+        cls.scheduler.set_rate_limit(100, adaptive=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.scheduler.cleanup()
+        APIRequestScheduler._instances.pop((cls.base,), None)
+        cls.server.shutdown()
+        shutil.rmtree(cls.root, ignore_errors=True)
+
+    def test_request_in_flight_in_other_worker_is_not_repeated(self):
+        url = f"{self.base}/query?q=1"
+        other = SharedState(self.path)
+        self.assertEqual(other.scheduler_id_for([self.base], "autre"), self.scheduler.scheduler_id)
+        # L'autre worker a réservé l'appel amont de la même requête
+        cache_key = build_cache_key("GET", url, None, {}, {})
+        claim_key = apiManagerClaude.stable_digest(cache_key)
+        self.assertTrue(other.claim(claim_key))
+
+        CountingHandler.hits = 0
+        request_id, _ = self.scheduler.add_request(url, method="GET", cache_duration=60)
+        time.sleep(0.3)
+        self.assertIsNone(self.scheduler.get_response(request_id))
+
+        # ... puis met sa réponse dans le cache partagé et relâche la réservation
+        other_cache = DiskCache(os.path.join(self.root, "cache"), shared=True)
+        other_cache.put(cache_key, {"from": "other worker"}, ttl=60)
+        other.release(claim_key)
+
+        self.assertEqual(self.scheduler.wait_for_response(request_id, timeout=10), {"from": "other worker"})
+        self.assertEqual(CountingHandler.hits, 0)
+        self.assertEqual(self.scheduler.get_stats()["shared_state"]["served_from_other_worker"], 1)
+        other_cache.close()
+        other.close()
+
+    def test_status_and_wait_answered_by_any_worker(self):
+        """Requête reçue par un autre worker: /api/status et /api/wait la trouvent dans l'état partagé"""
+        other = SharedState(self.path)
+        other_cache = DiskCache(os.path.join(self.root, "cache"), shared=True)
+        other.register_request("req-other", self.scheduler.scheduler_id)
+        client = apiManagerClaude.app.test_client()
+        auth = {'Authorization': 'Bearer test-token'}
+        with patch.object(apiManagerClaude, 'config', {'admin': {'Bearer': 'test-token'}}), \
+                patch.object(apiManagerClaude, 'SHARED_STATE', self.path):
+            try:
+                resp = client.get("/api/status/req-other", headers=auth)
+                self.assertEqual((resp.status_code, resp.get_json()["status"]), (200, "pending"))
+
+                # l'autre worker termine la requête
+                threading.Timer(0.2, lambda: (other_cache.put("result req-other", {"from": "other worker"}, ttl=60),
+                                              other.complete_requests(["req-other"], "result req-other"))).start()
+                resp = client.get("/api/wait/req-other?timeout=5", headers=auth)
+                self.assertEqual(resp.get_json()["status"], "complete")
+                self.assertEqual(resp.get_json()["response"], {"from": "other worker"})
+                # rendue une fois, comme une réponse locale
+                self.assertEqual(client.get("/api/status/req-other", headers=auth).status_code, 404)
+            finally:
+                apiManagerClaude.schedulers.pop(self.scheduler.scheduler_id, None)
+        other_cache.close()
+        other.close()
+
+    def test_response_shared_with_other_workers(self):
+        """Réponse d'une requête de ce worker: lisible par les autres jusqu'à sa récupération"""
+        other = SharedState(self.path)
+        request_id, _ = self.scheduler.add_request(f"{self.base}/query?q=partage", method="GET")
+        deadline = time.monotonic() + 10
+        while not (other.request_info(request_id) or {}).get("result_key") and time.monotonic() < deadline:
+            time.sleep(0.05)
+        info = other.request_info(request_id)
+        self.assertEqual(info["scheduler_id"], self.scheduler.scheduler_id)
+        other_cache = DiskCache(os.path.join(self.root, "cache"), shared=True)
+        self.assertEqual(other_cache.get(info["result_key"]), {"from": "upstream"})
+
+        self.assertEqual(self.scheduler.get_response(request_id), {"from": "upstream"})
+        self.assertIsNone(other.request_info(request_id))
+        other_cache.close()
+        other.close()
+
+    def test_rate_limit_set_in_one_worker_applies_to_others(self):
+        other = SharedState(self.path)
+        key = f"{self.scheduler.scheduler_id} {self.base}"
+        self.scheduler.set_rate_limit(7, adaptive=False)
+        self.assertEqual((other.bucket_state(key)["rate"], other.bucket_state(key)["ceiling"]), (7, 7))
+        self.scheduler.set_rate_limit(100, adaptive=False)
+        other.close()
+
+
+if __name__ == '__main__':
+    unittest.main()